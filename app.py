@@ -14,27 +14,30 @@ from PyQt5.QtWidgets import (
     QFrame,
     QMessageBox,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
 
 from config import AppConfig
 from styles import ApplicationStyleManager
 from ui import MenuBuilder, ToolbarBuilder, StatusBarManager
 from database import DatabaseManager
+from order_management.archive_store import archive_files
 from order_management.database_manager import OrderManagementDB
 from payment_tab import PaymentTab
 from order_management.ui.expense_items_widget import ExpenseItemsWidget
-from order_management.ui.production_expense_detail_widget import ProductionExpenseDetailWidget
-from order_management.ui.production_master_widget import ProductionMasterWidget
-from order_management.ui.production_detail_widget import ProductionDetailWidget
-from master_management_tab import MasterManagementTab
-from data_management_tab import DataManagementTab
+from ui.lazy_tab import LazyTab, unwrap_tab
+from csv_import_service import ImportRequestServer
+from db_backup import start_background_backup
+from federated_db import database_paths
 from utils import get_latest_csv_file, log_message
 
 
 class RadioBillingApp(QMainWindow):
     """ラジオ局支払い・費用管理システムのメインウィンドウクラス"""
 
+    # ファイル監視からのインポート依頼（IPCスレッド → メインスレッド）
+    csv_import_requested = pyqtSignal(list)
+
     def __init__(self):
         super().__init__()
 
@@ -67,6 +70,20 @@ class RadioBillingApp(QMainWindow):
         # データの初期ロード
         self._load_initial_data()
 
+        # ファイル監視からのインポート依頼を受け付ける
+        self.csv_import_requested.connect(self.import_requested_csv_files)
+        self.import_server = ImportRequestServer(self.csv_import_requested.emit)
+        self.import_server.start()
+
+        # 全DB（アーカイブDBを含む）を別スレッドでバックアップ（前回から変更のないファイルは省略）
+        start_background_backup(
+            list(database_paths(self.db_manager).values()) + archive_files(self.order_db.db_path))
+
+    def closeEvent(self, event):
+        """終了時にインポート受付を停止"""
+        self.import_server.stop()
+        super().closeEvent(event)
+
     def _setup_window(self):
         """ウィンドウの基本設定"""
         self.setWindowTitle(self.config.WINDOW_TITLE)
@@ -134,35 +151,56 @@ class RadioBillingApp(QMainWindow):
         """各タブを追加
 
         タブの順序: 使用頻度の高い日常業務用タブを前に配置
+        起動直後に使うタブ以外は、最初に表示したときに作成・インポートする（LazyTab）
         """
         # メインタブ1: 費用項目管理（毎日使う - 最優先）
         self.expense_items_widget = ExpenseItemsWidget()
         self.expense_items_tab_index = tab_control.addTab(self.expense_items_widget, "📺 費用項目管理")
 
-        # メインタブ2: 支払い情報（毎日使う）
+        # メインタブ2: 支払い情報（毎日使う。起動時のCSVインポートで参照するため先に作成）
         self.payment_tab = PaymentTab(tab_control, self)
         tab_control.addTab(self.payment_tab, self.config.TAB_NAMES['payment'])
 
         # メインタブ3: 番組別費用詳細（毎日使う）
-        self.production_expense_detail_widget = ProductionExpenseDetailWidget()
+        self.production_expense_detail_widget = LazyTab(self._create_production_expense_detail_widget)
         self.production_expense_tab_index = tab_control.addTab(self.production_expense_detail_widget, "📊 番組別費用詳細")
 
         # メインタブ4: 番組・イベント管理（毎日使う）
-        self.production_master_widget = ProductionMasterWidget()
+        self.production_master_widget = LazyTab(self._create_production_master_widget)
         tab_control.addTab(self.production_master_widget, self.config.TAB_NAMES['production_management'])
 
         # メインタブ5: 番組詳細（毎日使う）
-        self.production_detail_widget = ProductionDetailWidget()
+        self.production_detail_widget = LazyTab(self._create_production_detail_widget)
         tab_control.addTab(self.production_detail_widget, "📋 番組詳細")
 
         # メインタブ6: マスター管理（たまに使う）
-        self.master_management_tab = MasterManagementTab(tab_control, self)
+        self.master_management_tab = LazyTab(lambda: self._create_master_management_tab(tab_control))
         tab_control.addTab(self.master_management_tab, self.config.TAB_NAMES['master_management'])
 
         # メインタブ7: データ管理（たまに使う、サブタブあり）
-        self.data_management_tab = DataManagementTab(tab_control, self)
+        self.data_management_tab = LazyTab(lambda: self._create_data_management_tab(tab_control))
         tab_control.addTab(self.data_management_tab, self.config.TAB_NAMES['data_management'])
 
+    def _create_production_expense_detail_widget(self):
+        from order_management.ui.production_expense_detail_widget import ProductionExpenseDetailWidget
+        return ProductionExpenseDetailWidget()
+
+    def _create_production_master_widget(self):
+        from order_management.ui.production_master_widget import ProductionMasterWidget
+        return ProductionMasterWidget()
+
+    def _create_production_detail_widget(self):
+        from order_management.ui.production_detail_widget import ProductionDetailWidget
+        return ProductionDetailWidget()
+
+    def _create_master_management_tab(self, tab_control):
+        from master_management_tab import MasterManagementTab
+        return MasterManagementTab(tab_control, self)
+
+    def _create_data_management_tab(self, tab_control):
+        from data_management_tab import DataManagementTab
+        return DataManagementTab(tab_control, self)
+
     def _load_initial_data(self):
         """初期データの読み込み"""
         # 起動時はダイアログを表示せずに追記モードでインポート
@@ -174,10 +212,9 @@ class RadioBillingApp(QMainWindow):
         # 支払いデータと費用項目の自動照合
         self._auto_reconcile_payments()
 
-        self.payment_tab.refresh_data()
-        # データ管理タブ内のサブタブのデータを更新
-        self.data_management_tab.expense_tab.refresh_data()
-        self.data_management_tab.master_tab.refresh_data()
+        # 各タブのデータは最初に表示されたときに読み込む
+        # （未作成のタブは作成時に読み込みを予約する: ui.lazy_tab）
+        self.payment_tab.refresher.invalidate()
 
     def _auto_reconcile_payments(self):
         """支払いデータと費用項目を自動照合
@@ -206,7 +243,16 @@ class RadioBillingApp(QMainWindow):
     def _auto_generate_monthly_expenses(self):
         """月次費用項目の自動生成（起動時実行）"""
         try:
+            from datetime import datetime
+
             from expense_auto_generator import ExpenseAutoGenerator
+            from headless_jobs import job_succeeded_since
+
+            # 本日すでに定期ジョブ（headless_jobs.py）で生成済みの場合は省略
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            if job_succeeded_since(self.order_db, "generate", today):
+                log_message("💰 月次費用項目は定期ジョブで生成済みのためスキップしました")
+                return
 
             log_message("💰 月次費用項目の自動生成を開始...")
             generator = ExpenseAutoGenerator(self.order_db)
@@ -289,6 +335,37 @@ class RadioBillingApp(QMainWindow):
             self.status_label.setText(f"CSVファイルの読み込みに失敗しました: {str(e)}")
             return False
 
+    def import_requested_csv_files(self, csv_files):
+        """ファイル監視から依頼されたCSVファイルを上書きインポート
+
+        Args:
+            csv_files: CSVファイルのパスのリスト
+        """
+        try:
+            csv_files = [path for path in csv_files if os.path.exists(path)]
+            if not csv_files:
+                return
+
+            counts = self.db_manager.import_csv_files(csv_files, self.header_mapping, overwrite=True)
+            row_count = sum(counts.values())
+            log_message(f"ファイル監視からの依頼で{row_count}件のデータをインポートしました: "
+                        f"{', '.join(os.path.basename(path) for path in csv_files)}")
+
+            # 支払いデータと費用項目の自動照合
+            self._auto_reconcile_payments()
+
+            latest_file = csv_files[-1]
+            file_size = os.path.getsize(latest_file) // 1024
+            self.payment_tab.csv_info_label.setText(f"CSV: {os.path.basename(latest_file)} ({file_size}KB)")
+            self.payment_tab.refresh_data()
+            self.status_label.setText(f"{row_count}件のデータをCSVからインポートしました")
+
+        except Exception as e:
+            log_message(f"CSVインポートエラー: {e}")
+            import traceback
+            log_message(traceback.format_exc())
+            self.status_label.setText(f"CSVインポートに失敗しました: {str(e)}")
+
     def reload_data(self):
         """データの再読み込み"""
         success = self.import_latest_csv()
@@ -303,7 +380,7 @@ class RadioBillingApp(QMainWindow):
 
     def save_current(self):
         """現在のタブの内容を保存"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'save_direct_edit'):
             # Master Tabの保存
             current_tab.save_direct_edit()
@@ -315,7 +392,7 @@ class RadioBillingApp(QMainWindow):
 
     def export_csv(self):
         """CSV出力処理"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
 
         # Master Tabの場合
         if hasattr(current_tab, 'export_to_csv'):
@@ -328,7 +405,7 @@ class RadioBillingApp(QMainWindow):
 
     def import_csv(self):
         """CSVインポート処理"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
 
         # Master Tabの場合
         if hasattr(current_tab, 'import_from_csv'):
@@ -338,7 +415,7 @@ class RadioBillingApp(QMainWindow):
 
     def create_new_entry(self):
         """新規エントリ作成"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'create_new_entry'):
             current_tab.create_new_entry()
         else:
@@ -346,7 +423,7 @@ class RadioBillingApp(QMainWindow):
 
     def delete_selected(self):
         """選択項目の削除"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'delete_selected'):
             current_tab.delete_selected()
         else:
@@ -354,7 +431,7 @@ class RadioBillingApp(QMainWindow):
 
     def show_search(self):
         """検索機能の表示"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'show_search'):
             current_tab.show_search()
         else:
@@ -362,7 +439,7 @@ class RadioBillingApp(QMainWindow):
 
     def reset_filters(self):
         """フィルターのリセット"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'reset_filters'):
             current_tab.reset_filters()
         else:
@@ -370,13 +447,13 @@ class RadioBillingApp(QMainWindow):
 
     def toggle_filter_panel(self, checked):
         """フィルターパネルの表示/非表示切り替え"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'toggle_filter_panel'):
             current_tab.toggle_filter_panel(checked)
 
     def run_matching(self):
         """照合実行"""
-        current_tab = self.tab_control.currentWidget()
+        current_tab = unwrap_tab(self.tab_control.currentWidget())
         if hasattr(current_tab, 'run_matching'):
             current_tab.run_matching()
         else:
@@ -453,8 +530,8 @@ def main():
         try:
             if os.path.exists(args.import_csv):
                 log_message(f"コマンドライン引数で指定されたCSVファイルをインポート: {args.import_csv}")
+                # 支払いタブは表示時に変更通知で再読み込みされる
                 row_count = window.db_manager.import_csv_data(args.import_csv, window.header_mapping, overwrite=True)
-                window.payment_tab.refresh_data()
                 window.status_label.setText(f"{row_count}件のデータをCSVからインポートしました")
 
                 # CSVファイル情報を更新
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""照合・インポート・費用生成のベンチマーク
+
+synthetic_data.py で生成した合成データに対して主要処理の実行時間を計測し、
+結果をJSONで出力します。ベースラインのJSONと比較して、
+閾値を超える劣化があれば終了コード1を返します（CIでの回帰検知用）。
+
+使用方法:
+    # 計測（benchmark_results/ にJSONを出力）
+    python benchmark.py --sizes 10000,100000,1000000 --repeat 3
+
+    # ベースラインと比較（中央値が20%以上遅くなったら終了コード1）
+    python benchmark.py --sizes 10000 --compare baseline.json --threshold 0.2
+
+計測対象:
+    import_csv_data_<行数>                DatabaseManager.import_csv_data
+    reconcile_payments_with_expenses      OrderManagementDB.reconcile_payments_with_expenses
+    match_orders_with_payments            DatabaseManager.match_orders_with_payments
+    check_payments_against_schedule       DatabaseManager.check_payments_against_schedule
+    generate_expense_items_from_contract  OrderManagementDB.generate_expense_items_from_contract
+    get_expense_items_with_details        OrderManagementDB.get_expense_items_with_details
+    startup_import_<モジュール>           起動時のインポート時間（python -X importtime）
+
+    # 起動時のインポート時間のみ計測（合成データを生成しない）
+    python benchmark.py --startup-only --repeat 5
+"""
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import synthetic_data
+from config import AppConfig
+from utils import log_message
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark_results")
+
+DEFAULT_THRESHOLD = 0.2
+
+# 照合系ベンチマークの対象月（合成データの期間内）
+TARGET_YEAR = synthetic_data.DATA_START_YEAR
+TARGET_MONTH = 6
+
+WORKSPACE_DB_FILES = ["billing.db", "order_management.db", "expenses.db",
+                      "expense_master.db", "payee_master.db"]
+
+# 起動時のインポート時間を計測するモジュール（app: メインウィンドウ、headless_jobs: 定期ジョブ）
+STARTUP_MODULES = ["app", "headless_jobs"]
+
+# インポート時間の内訳として記録するモジュール数
+STARTUP_TOP_IMPORTS = 15
+
+
+def get_git_commit():
+    """現在のコミットハッシュ（取得できない場合は 'unknown'）"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, timeout=10
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return "unknown"
+
+
+class BenchmarkWorkspace:
+    """合成データの作業ディレクトリ
+
+    DatabaseManager / OrderManagementDB はカレントディレクトリの相対パスで
+    DBを開くため、計測中は作業ディレクトリに移動します。
+    更新系の処理は毎回スナップショットから復元した状態で計測します。
+    """
+
+    def __init__(self, workdir, **generate_options):
+        self.workdir = workdir
+        self.snapshot_dir = os.path.join(workdir, "_snapshot")
+        self.generated = synthetic_data.build_workspace(workdir, **generate_options)
+        self.payment_csvs = self.generated['payment_csvs']
+        self._previous_dir = None
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        for name in WORKSPACE_DB_FILES:
+            shutil.copy2(os.path.join(workdir, name), os.path.join(self.snapshot_dir, name))
+
+    def restore(self):
+        """全DBをスナップショットの状態に戻す"""
+        for name in WORKSPACE_DB_FILES:
+            shutil.copy2(os.path.join(self.snapshot_dir, name), os.path.join(self.workdir, name))
+
+    def save_snapshot(self):
+        """現在のDBをスナップショットとして保存"""
+        for name in WORKSPACE_DB_FILES:
+            shutil.copy2(os.path.join(self.workdir, name), os.path.join(self.snapshot_dir, name))
+
+    def __enter__(self):
+        self._previous_dir = os.getcwd()
+        os.chdir(self.workdir)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        os.chdir(self._previous_dir)
+        return False
+
+
+def time_call(func, repeat, setup=None):
+    """関数の実行時間を計測
+
+    Args:
+        func: 計測対象（引数なし）
+        repeat: 計測回数
+        setup: 各回の前に実行する準備処理（計測対象外）
+
+    Returns:
+        dict: median_s / min_s / max_s / runs / result
+    """
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+
+    return {
+        'median_s': statistics.median(runs),
+        'min_s': min(runs),
+        'max_s': max(runs),
+        'runs': runs,
+        'result': result,
+    }
+
+
+def _summarize_result(value):
+    """ベンチマーク対象の戻り値をJSON向けに要約"""
+    if isinstance(value, (list, tuple)):
+        return {'len': len(value)}
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if isinstance(v, (int, float, str, bool))}
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _match_orders_error(result):
+    """match_orders_with_payments の戻り値 (照合件数, 未照合件数, エラー) から失敗を判定"""
+    matched, not_matched, errors = result
+    if errors:
+        return "; ".join(str(error) for error in errors)
+    if matched + not_matched == 0:
+        return "照合対象の発注データがありません"
+    return None
+
+
+def run_benchmarks(workspace, sizes, repeat, reconcile_size):
+    """全ベンチマークを実行
+
+    Args:
+        workspace: BenchmarkWorkspace
+        sizes: インポート計測する支払いCSVの行数リスト
+        repeat: 各ベンチマークの計測回数
+        reconcile_size: 照合系の計測で billing.db に投入しておく支払い件数
+
+    Returns:
+        dict: ベンチマーク名 -> 計測結果
+    """
+    from database import DatabaseManager
+    from order_management.database_manager import OrderManagementDB
+
+    results = {}
+
+    def record(name, func, setup=None, check=None):
+        log_message(f"ベンチマーク実行: {name}")
+        try:
+            timing = time_call(func, repeat, setup=setup)
+            # 処理内でエラーを握りつぶして戻る関数は、戻り値で失敗を判定する
+            error = check(timing['result']) if check else None
+            if error:
+                raise RuntimeError(error)
+            timing['result'] = _summarize_result(timing['result'])
+            results[name] = timing
+            log_message(f"  中央値 {timing['median_s']:.3f}s（{repeat}回）")
+        except Exception as e:
+            # 依存パッケージ不足などで実行できない処理は記録して続行
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+            log_message(f"  失敗: {type(e).__name__}: {e}")
+
+    with workspace:
+        db = DatabaseManager()
+        order_db = OrderManagementDB()
+
+        # CSVインポート（サイズ別）
+        for size in sizes:
+            csv_path = workspace.payment_csvs[size]
+            record(
+                f"import_csv_data_{size}",
+                lambda path=csv_path: db.import_csv_data(path, AppConfig.HEADER_MAPPING, overwrite=True),
+                setup=workspace.restore
+            )
+
+        # 照合系は指定サイズの支払いを投入した状態を基準にする
+        workspace.restore()
+        db.import_csv_data(workspace.payment_csvs[reconcile_size], AppConfig.HEADER_MAPPING, overwrite=True)
+        workspace.save_snapshot()
+
+        record("reconcile_payments_with_expenses",
+               lambda: order_db.reconcile_payments_with_expenses("billing.db"),
+               setup=workspace.restore)
+        record("match_orders_with_payments",
+               lambda: db.match_orders_with_payments(TARGET_YEAR, TARGET_MONTH),
+               setup=workspace.restore, check=_match_orders_error)
+        record("check_payments_against_schedule",
+               lambda: db.check_payments_against_schedule(f"{TARGET_YEAR}-{TARGET_MONTH:02d}"),
+               setup=workspace.restore)
+
+        # 費用項目の自動生成（費用項目を持たない契約を対象にする）
+        workspace.restore()
+        conn = sqlite3.connect("order_management.db")
+        try:
+            contract_ids = [row[0] for row in conn.execute("""
+                SELECT c.id FROM contracts c
+                WHERE NOT EXISTS (SELECT 1 FROM expense_items e WHERE e.contract_id = c.id)
+                ORDER BY c.id
+            """)]
+        finally:
+            conn.close()
+
+        def generate_all():
+            return sum(order_db.generate_expense_items_from_contract(cid) for cid in contract_ids)
+
+        record("generate_expense_items_from_contract", generate_all, setup=workspace.restore)
+
+        workspace.restore()
+        record("get_expense_items_with_details",
+               lambda: order_db.get_expense_items_with_details())
+
+    return results
+
+
+def parse_importtime(stderr):
+    """python -X importtime の出力を解析
+
+    Returns:
+        list: (モジュール名, 自身の時間(us), 累積時間(us), 階層) のリスト
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 見出し行
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+    return entries
+
+
+def measure_startup_imports(modules, repeat):
+    """起動時のインポート時間を別プロセスで計測
+
+    python -X importtime -c "import <モジュール>" を repeat 回実行し、
+    モジュールの累積インポート時間（秒）と、自身の時間が長いモジュールの内訳を記録します。
+
+    Returns:
+        dict: startup_import_<モジュール> -> 計測結果
+    """
+    results = {}
+    for module in modules:
+        name = f"startup_import_{module}"
+        log_message(f"ベンチマーク実行: {name}")
+        runs = []
+        entries = []
+        error = None
+        for _ in range(repeat):
+            completed = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                cwd=REPO_DIR, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                # 依存パッケージ不足（PyQt5 等）でインポートできない場合
+                error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+                break
+            entries = parse_importtime(completed.stderr)
+            total = [cumulative for entry_name, _, cumulative, depth in entries
+                     if entry_name == module and depth == 0]
+            runs.append(total[-1] / 1e6 if total else 0.0)
+
+        if error:
+            results[name] = {'error': error}
+            log_message(f"  失敗: {error}")
+            continue
+
+        slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:STARTUP_TOP_IMPORTS]
+        results[name] = {
+            'median_s': statistics.median(runs),
+            'min_s': min(runs),
+            'max_s': max(runs),
+            'runs': runs,
+            'result': {'modules': len(entries)},
+            'top_imports': [{'module': entry_name, 'self_s': self_us / 1e6, 'cumulative_s': cumulative / 1e6}
+                            for entry_name, self_us, cumulative, _ in slowest],
+        }
+        log_message(f"  中央値 {results[name]['median_s']:.3f}s（{repeat}回、{len(entries)}モジュール）")
+    return results
+
+
+def build_report(results, options):
+    """JSON出力用のレポートを組み立て"""
+    return {
+        'meta': {
+            'commit': get_git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            **options,
+        },
+        'results': results,
+    }
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """ベースラインと中央値を比較
+
+    Returns:
+        list: 劣化したベンチマーク (name, baseline_s, current_s, ratio)
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or 'median_s' not in previous or 'median_s' not in current:
+            continue
+        if previous['median_s'] <= 0:
+            continue
+        ratio = current['median_s'] / previous['median_s'] - 1
+        if ratio > threshold:
+            regressions.append((name, previous['median_s'], current['median_s'], ratio))
+    return regressions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='照合・インポート・費用生成のベンチマーク')
+    parser.add_argument('--sizes', type=synthetic_data.parse_sizes,
+                        default=synthetic_data.DEFAULT_PAYMENT_ROWS,
+                        help='インポート計測する支払いCSVの行数（カンマ区切り）')
+    parser.add_argument('--reconcile-size', type=int, default=None,
+                        help='照合系の計測で投入する支払い件数（既定: --sizes の最小値）')
+    parser.add_argument('--repeat', type=int, default=3, help='各ベンチマークの計測回数')
+    parser.add_argument('--seed', type=int, default=synthetic_data.DEFAULT_SEED, help='乱数シード')
+    parser.add_argument('--productions', type=int, default=200, help='番組数')
+    parser.add_argument('--partners', type=int, default=300, help='取引先数')
+    parser.add_argument('--contracts', type=int, default=1000, help='契約数')
+    parser.add_argument('--expense-items', type=int, default=20000, help='費用項目数')
+    parser.add_argument('--output', help='結果JSONの出力先（既定: benchmark_results/）')
+    parser.add_argument('--workdir', help='作業ディレクトリ（指定時は削除せず残す）')
+    parser.add_argument('--compare', help='比較するベースラインJSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='劣化とみなす中央値の増加率（既定: 0.2 = 20%%）')
+    parser.add_argument('--startup-only', action='store_true',
+                        help='起動時のインポート時間のみ計測（合成データを生成しない）')
+    args = parser.parse_args()
+
+    reconcile_size = args.reconcile_size or min(args.sizes)
+    sizes = sorted(set(args.sizes) | {reconcile_size})
+    options = {
+        'seed': args.seed,
+        'sizes': sizes,
+        'reconcile_size': reconcile_size,
+        'repeat': args.repeat,
+        'productions': args.productions,
+        'partners': args.partners,
+        'contracts': args.contracts,
+        'expense_items': args.expense_items,
+    }
+
+    if args.startup_only:
+        options['startup_only'] = True
+        results = {}
+    else:
+        workdir = args.workdir or tempfile.mkdtemp(prefix="billing_benchmark_")
+        try:
+            log_message(f"合成データ生成中: {workdir}")
+            workspace = BenchmarkWorkspace(
+                workdir, seed=args.seed, productions=args.productions,
+                partners=args.partners, contracts=args.contracts,
+                expense_items=args.expense_items, payment_rows=sizes
+            )
+            results = run_benchmarks(workspace, args.sizes, args.repeat, reconcile_size)
+        finally:
+            if not args.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    results.update(measure_startup_imports(STARTUP_MODULES, args.repeat))
+
+    report = build_report(results, options)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(
+            RESULTS_DIR,
+            f"benchmark_{report['meta']['commit']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'ベンチマーク':<45} {'中央値(s)':>10} {'最小(s)':>10}")
+    print("-" * 67)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<45} {'失敗':>10}  {result['error']}")
+        else:
+            print(f"{name:<45} {result['median_s']:>10.3f} {result['min_s']:>10.3f}")
+    print(f"\n結果を出力しました: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠ 性能劣化を検出しました（閾値 {args.threshold:.0%}）:")
+            for name, before, after, ratio in regressions:
+                print(f"  {name}: {before:.3f}s → {after:.3f}s (+{ratio:.0%})")
+            return 1
+        print(f"\n✓ 性能劣化はありません（閾値 {args.threshold:.0%}）")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
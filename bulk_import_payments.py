@@ -0,0 +1,208 @@
+"""支払いCSVの一括インポート
+
+dataフォルダ内の AccountingApprovalList_*.csv をまとめてインポートし、
+billing.db の支払いデータを再構築します。
+
+- ファイルの読み込み・パースはプロセスプールで並列に行う
+- 同じ日に何度も出力されたファイル（"AccountingApprovalList_20250814 (1).csv" 等）に
+  含まれる同一の明細は、内容のフィンガープリントで重複を除く
+- 書き込みはメインプロセスから1トランザクションで行う
+
+使用方法:
+    python bulk_import_payments.py                  # data/ を上書きインポート
+    python bulk_import_payments.py data --append    # 既存データに追記
+    python bulk_import_payments.py --workers 4 --dry-run
+"""
+import glob
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import AppConfig
+from database import DatabaseManager
+from utils import log_message
+
+DEFAULT_PATTERN = "AccountingApprovalList_*.csv"
+
+# 同じ請求書の明細を識別するための列（フィンガープリントにのみ使用）
+INVOICE_CODE_HEADER = "全体情報.請求書管理コード"
+INVOICE_CODE_FIELD = "_invoice_code"
+
+# 出力ごとに変わりうるためフィンガープリントに含めない列
+FINGERPRINT_EXCLUDED_FIELDS = {"status"}
+
+
+def parse_payment_file(csv_file, header_mapping):
+    """支払いCSVを読み込み、フィンガープリント付きの行に変換（プロセスプールで実行）
+
+    Args:
+        csv_file: CSVファイルのパス
+        header_mapping: ヘッダーマッピング辞書
+
+    Returns:
+        dict: csv_file / fields / rows / fingerprints / error
+    """
+    mapping = dict(header_mapping)
+    mapping[INVOICE_CODE_HEADER] = INVOICE_CODE_FIELD
+
+    try:
+        result = DatabaseManager()._read_payment_csv(csv_file, mapping)
+    except Exception as e:
+        return {'csv_file': csv_file, 'error': str(e)}
+
+    if result is None:
+        return {'csv_file': csv_file, 'error': "ヘッダーまたはエンコーディングが不正です"}
+
+    all_fields, raw_rows = result
+    key_indices = [i for i, field in enumerate(all_fields)
+                   if field not in FINGERPRINT_EXCLUDED_FIELDS]
+    value_indices = [i for i, field in enumerate(all_fields) if field != INVOICE_CODE_FIELD]
+
+    rows = []
+    fingerprints = []
+    for raw in raw_rows:
+        key = "\x1f".join(str(raw[i]) for i in key_indices)
+        fingerprints.append(hashlib.sha1(key.encode("utf-8")).hexdigest())
+        rows.append(tuple(raw[i] for i in value_indices))
+
+    return {
+        'csv_file': csv_file,
+        'fields': [all_fields[i] for i in value_indices],
+        'rows': rows,
+        'fingerprints': fingerprints,
+        'error': None,
+    }
+
+
+def deduplicate(parsed_files):
+    """ファイル間で重複する明細を除外
+
+    各ファイルは出力時点の全件スナップショットのため、同じ明細が
+    複数ファイルに含まれます。フィンガープリントごとに、1ファイル内での
+    最大件数だけを残し、値（ステータス等）は最も新しいファイルのものを採用します。
+
+    Args:
+        parsed_files: parse_payment_file の結果（古い順に並べたもの）
+
+    Returns:
+        tuple: (書き込むバッチのリスト, {csv_file: 採用件数})
+    """
+    # fingerprint -> (採用するファイルのインデックス, 行のリスト)
+    selected = {}
+    for index, parsed in enumerate(parsed_files):
+        grouped = {}
+        for fingerprint, row in zip(parsed['fingerprints'], parsed['rows']):
+            grouped.setdefault(fingerprint, []).append(row)
+
+        for fingerprint, rows in grouped.items():
+            current = selected.get(fingerprint)
+            # 新しいファイルほど後に来るため、件数が同じ以上なら置き換える
+            if current is None or len(rows) >= len(current[1]):
+                selected[fingerprint] = (index, rows)
+
+    kept_rows = [[] for _ in parsed_files]
+    for index, rows in selected.values():
+        kept_rows[index].extend(rows)
+
+    batches = []
+    kept_counts = {}
+    for parsed, rows in zip(parsed_files, kept_rows):
+        kept_counts[parsed['csv_file']] = len(rows)
+        if rows:
+            batches.append((parsed['fields'], rows))
+
+    return batches, kept_counts
+
+
+def bulk_import(folder=None, pattern=DEFAULT_PATTERN, overwrite=True,
+                workers=None, dry_run=False, db_manager=None):
+    """フォルダ内の支払いCSVを一括インポート
+
+    Args:
+        folder: 対象フォルダ（Noneの場合は AppConfig.get_data_folder()）
+        pattern: 対象ファイルのパターン
+        overwrite: True=上書き（既存データ削除）、False=追記
+        workers: パースに使うプロセス数（Noneの場合はCPU数）
+        dry_run: Trueの場合は書き込まずに件数のみ集計
+        db_manager: 書き込みに使う DatabaseManager
+
+    Returns:
+        dict: files（ファイルごとの件数）/ total_rows / imported / duplicates
+    """
+    folder = folder or AppConfig.get_data_folder()
+    # 更新日時（同じ場合はファイル名）の古い順に並べる
+    csv_files = sorted(glob.glob(os.path.join(folder, pattern)),
+                       key=lambda path: (os.path.getmtime(path), os.path.basename(path)))
+
+    summary = {'files': [], 'total_rows': 0, 'imported': 0, 'duplicates': 0}
+    if not csv_files:
+        log_message(f"インポート対象のCSVファイルがありません: {folder}")
+        return summary
+
+    log_message(f"支払いCSVの一括インポートを開始: {len(csv_files)}ファイル")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_payment_file, path, AppConfig.HEADER_MAPPING)
+                   for path in csv_files]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result['csv_file']] = result
+
+    parsed_files = [results[path] for path in csv_files if not results[path]['error']]
+    batches, kept_counts = deduplicate(parsed_files)
+
+    for path in csv_files:
+        result = results[path]
+        if result['error']:
+            file_summary = {'file': os.path.basename(path), 'rows': 0, 'imported': 0,
+                            'duplicates': 0, 'error': result['error']}
+        else:
+            rows = len(result['rows'])
+            imported = kept_counts[path]
+            file_summary = {'file': os.path.basename(path), 'rows': rows, 'imported': imported,
+                            'duplicates': rows - imported, 'error': None}
+            summary['total_rows'] += rows
+            summary['imported'] += imported
+            summary['duplicates'] += rows - imported
+        summary['files'].append(file_summary)
+
+    if dry_run:
+        log_message(f"ドライラン: {summary['imported']}件を取り込み予定（重複 {summary['duplicates']}件）")
+        return summary
+
+    if batches:
+        db_manager = db_manager or DatabaseManager()
+        db_manager.import_payment_rows(batches, overwrite)
+
+    log_message(f"支払いCSVの一括インポート完了: {summary['imported']}件"
+                f"（読み込み {summary['total_rows']}件, 重複 {summary['duplicates']}件）")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='支払いCSVの一括インポート')
+    parser.add_argument('folder', nargs='?', default=None, help='対象フォルダ（既定: data）')
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN, help='対象ファイルのパターン')
+    parser.add_argument('--append', action='store_true', help='既存データを残して追記する')
+    parser.add_argument('--workers', type=int, default=None, help='パースに使うプロセス数')
+    parser.add_argument('--dry-run', action='store_true', help='書き込まずに件数のみ表示')
+    args = parser.parse_args()
+
+    summary = bulk_import(args.folder, pattern=args.pattern, overwrite=not args.append,
+                          workers=args.workers, dry_run=args.dry_run)
+
+    print(f"\n{'ファイル':<45} {'読込':>6} {'取込':>6} {'重複':>6}")
+    print("-" * 68)
+    for item in summary['files']:
+        if item['error']:
+            print(f"{item['file']:<45} エラー: {item['error']}")
+        else:
+            print(f"{item['file']:<45} {item['rows']:>6} {item['imported']:>6} {item['duplicates']:>6}")
+    print("-" * 68)
+    print(f"{'合計':<45} {summary['total_rows']:>6} {summary['imported']:>6} {summary['duplicates']:>6}")
+
+    sys.exit(1 if any(item['error'] for item in summary['files']) else 0)
@@ -0,0 +1,84 @@
+"""データ変更通知
+
+DatabaseManager / OrderManagementDB の書き込みメソッドが、コミット後に
+「どのテーブルのどの行がどう変わったか」を通知するための軽量なイベントバスです。
+画面側はこれを購読し、影響のある行だけを反映したり、表示されていないタブは
+再読み込みを表示時まで遅らせたりします。PyQt5には依存しません
+（画面側での受信は ui/change_listener.py を使用）。
+
+使用例:
+    publish_change('expense_items', [item_id], UPDATE)
+
+    def on_change(event):
+        print(event.table, event.ids, event.kind)
+    change_bus.subscribe(on_change, tables=['expense_items'])
+"""
+import threading
+from collections import namedtuple
+
+from utils import log_message
+
+# 変更の種類
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+# テーブル全体の入れ替え（CSVの上書きインポート等）
+RELOAD = 'reload'
+
+# table: テーブル名 / ids: 変更された行IDのタプル（不明な場合はNone） / kind: 変更の種類
+ChangeEvent = namedtuple('ChangeEvent', ['table', 'ids', 'kind'])
+
+
+class ChangeBus:
+    """データ変更イベントの配信"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []  # (callback, テーブル名のfrozenset または None)
+
+    def subscribe(self, callback, tables=None):
+        """変更イベントを購読
+
+        Args:
+            callback: callback(ChangeEvent)。書き込みを行ったスレッドで呼ばれます
+            tables: 購読するテーブル名（Noneの場合は全テーブル）
+        """
+        with self._lock:
+            self._subscribers.append((callback, frozenset(tables) if tables else None))
+
+    def unsubscribe(self, callback):
+        """購読を解除"""
+        with self._lock:
+            self._subscribers = [(cb, tables) for cb, tables in self._subscribers if cb != callback]
+
+    def publish(self, table, ids=None, kind=UPDATE):
+        """変更イベントを通知
+
+        Args:
+            table: 変更したテーブル名
+            ids: 変更した行IDのリスト（不明・多数の場合はNone）
+            kind: INSERT / UPDATE / DELETE / RELOAD
+        """
+        if ids is not None:
+            ids = tuple(i for i in ids if i is not None)
+            if not ids:
+                return
+        event = ChangeEvent(table, ids, kind)
+
+        with self._lock:
+            subscribers = [cb for cb, tables in self._subscribers if tables is None or table in tables]
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                log_message(f"変更通知の処理エラー（{table}）: {e}")
+
+
+# アプリ全体で共有するイベントバス
+change_bus = ChangeBus()
+
+
+def publish_change(table, ids=None, kind=UPDATE):
+    """共有イベントバスに変更を通知"""
+    change_bus.publish(table, ids, kind)
@@ -0,0 +1,153 @@
+"""ストリーミングCSV出力
+
+DBカーソルから fetchmany で少しずつ取り出し、csv.writer でチャンクごとに
+書き出します。画面に表示中のデータには依存せず、件数が多くてもメモリを
+使い切らないようにするための共通処理です。PyQt5には依存しません
+（画面からの実行は ui/csv_export.py を使用）。
+
+使用例:
+    job = CSVExportJob(
+        headers=["ID", "名前"],
+        rows=lambda: iter_query_rows("order_management.db", "SELECT id, name FROM partners"),
+    )
+    count = job.write("partners.csv", encoding="cp932")
+"""
+import csv
+import os
+import sqlite3
+
+from query_profiler import connect as profiled_connect
+
+# 選択可能な文字コード（値, 表示名）
+EXPORT_ENCODINGS = [
+    ("utf-8-sig", "UTF-8（BOM付き）"),
+    ("cp932", "Shift_JIS（Excel用）"),
+]
+DEFAULT_ENCODING = "utf-8-sig"
+
+# fetchmany / writerows の1回あたりの行数
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ExportCancelled(Exception):
+    """CSV出力がキャンセルされた"""
+
+
+def iter_query_rows(db_path, query, params=(), chunk_size=DEFAULT_CHUNK_SIZE):
+    """クエリ結果を fetchmany で少しずつ返すジェネレーター
+
+    接続はジェネレーターを消費したスレッドで開かれ、終了時に閉じられます。
+    """
+    conn = profiled_connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def count_query_rows(db_path, query, params=()):
+    """クエリ結果の件数を取得（進捗表示用。取得できない場合はNone）"""
+    conn = profiled_connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+class CSVExportJob:
+    """CSV出力の内容（ヘッダー・行の取得方法・行の整形）"""
+
+    def __init__(self, headers, rows, row_mapper=None, total=None):
+        """
+        Args:
+            headers: ヘッダー行
+            rows: 行のイテラブルを返す関数（出力スレッドで呼ばれる）
+            row_mapper: 1行をCSVの1行に変換する関数（Noneの場合はそのまま）
+            total: 総件数を返す関数（進捗表示用、Noneの場合は件数不明）
+        """
+        self.headers = headers
+        self.rows = rows
+        self.row_mapper = row_mapper
+        self.total = total
+
+    @classmethod
+    def from_query(cls, db_path, query, params=(), headers=None, row_mapper=None,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+        """SQLクエリの結果を出力するジョブを作成"""
+        return cls(
+            headers=headers,
+            rows=lambda: iter_query_rows(db_path, query, params, chunk_size),
+            row_mapper=row_mapper,
+            total=lambda: count_query_rows(db_path, query, params),
+        )
+
+    def write(self, file_path, encoding=DEFAULT_ENCODING, chunk_size=DEFAULT_CHUNK_SIZE,
+              progress_callback=None, cancel_event=None):
+        """CSVファイルに書き出し
+
+        一時ファイル（.part）に書き込み、完了後に置き換えます。
+        キャンセル・エラー時は一時ファイルを削除し、既存のファイルは変更しません。
+
+        Args:
+            file_path: 出力先
+            encoding: 文字コード（utf-8-sig / cp932）
+            chunk_size: 書き込み単位の行数
+            progress_callback: progress_callback(書き込み済み件数, 総件数またはNone)
+            cancel_event: set() されたらキャンセルする threading.Event
+
+        Returns:
+            int: 書き込んだ件数
+
+        Raises:
+            ExportCancelled: キャンセルされた場合
+        """
+        total = self.total() if self.total else None
+        if progress_callback:
+            # 件数は出力スレッドで数え、書き込み前に進捗として通知する
+            progress_callback(0, total)
+        temp_path = file_path + ".part"
+        # cp932 で表せない文字（絵文字等）は ? に置き換える
+        errors = "replace" if encoding == "cp932" else "strict"
+        written = 0
+
+        try:
+            with open(temp_path, "w", newline="", encoding=encoding, errors=errors) as f:
+                writer = csv.writer(f)
+                writer.writerow(self.headers)
+
+                chunk = []
+                for row in self.rows():
+                    chunk.append(self.row_mapper(row) if self.row_mapper else row)
+                    if len(chunk) >= chunk_size:
+                        writer.writerows(chunk)
+                        written += len(chunk)
+                        chunk = []
+                        if progress_callback:
+                            progress_callback(written, total)
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise ExportCancelled()
+
+                if chunk:
+                    writer.writerows(chunk)
+                    written += len(chunk)
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if progress_callback:
+            progress_callback(written, total if total is not None else written)
+        return written
@@ -0,0 +1,431 @@
+"""CSVインポートサービス
+
+ファイル監視（file_watcher_gui）から検出したCSVを、アプリを起動せずに
+同一プロセス内でインポートするためのサービスです。PyQt5には依存しません。
+
+- 同じファイルへの作成・更新イベントの連続はデバウンスキューでまとめる
+- サイズと更新日時が一定時間変化しないことを確認してから取り込む
+  （監視スレッドをブロックせず、未完了のファイルは後で再確認する）
+- 同時に揃ったファイルは DatabaseManager.import_csv_files で1トランザクションで取り込む
+- アプリ起動中は、ローカルIPC経由でアプリにインポートを依頼する
+  （アプリ側で画面を更新するため）
+- IPCのソケット・認証キーはユーザー専用のフォルダ（0700）に置き、認証キーは
+  アプリの起動ごとに作り直す（0600）。他のユーザーはインポートを依頼できない
+
+使用例:
+    service = CSVImportService(on_result=print)
+    service.start()
+    service.submit("data/AccountingApprovalList_20251116.csv")
+"""
+import getpass
+import os
+import secrets
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from config import AppConfig
+from utils import log_message
+
+# 最後のイベントからインポートまでの待ち時間（秒）
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+
+# 書き込みが終わらないファイルを諦めるまでの時間（秒）
+DEFAULT_MAX_WAIT_SECONDS = 120.0
+
+# アプリ本体のインポート受付の種類
+IMPORT_SERVER_FAMILY = "AF_PIPE" if sys.platform == "win32" else "AF_UNIX"
+
+# 認証キーのファイル名（アプリの起動ごとに作り直す）
+AUTHKEY_FILENAME = "import.key"
+
+
+def _runtime_dir():
+    """インポート受付のソケット・認証キーを置くユーザー専用のフォルダ
+
+    Raises:
+        OSError: フォルダが他のユーザーのものなど、安全に使えない場合
+    """
+    if sys.platform == "win32":
+        path = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "billing_manager")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    path = (os.path.join(runtime_dir, "billing_manager") if runtime_dir
+            else os.path.join(tempfile.gettempdir(), f"billing_manager-{os.getuid()}"))
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f"インポート受付用のフォルダを使用できません（他のユーザーのものです）: {path}")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def import_server_address():
+    """アプリ本体のインポート受付用アドレス（ユーザーごと）"""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\billing_manager_import_{getpass.getuser()}"
+    return os.path.join(_runtime_dir(), "import.sock")
+
+
+def _authkey_path():
+    return os.path.join(_runtime_dir(), AUTHKEY_FILENAME)
+
+
+def _write_authkey(key):
+    """認証キーを保存（所有者のみ読み書き可）"""
+    path = _authkey_path()
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+
+
+def _read_authkey():
+    """起動中のアプリの認証キー（なければNone）"""
+    try:
+        with open(_authkey_path(), "rb") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def _socket_in_use(address):
+    """ソケットファイルが接続を受け付けているか（他のアプリが受付中か）"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1.0)
+    try:
+        sock.connect(address)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def _file_signature(path):
+    """ファイルのサイズと更新日時（読み取りできない場合はNone）"""
+    try:
+        stat = os.stat(path)
+        # 書き込み中のファイルはWindowsでは開けないため、開けるかも確認する
+        with open(path, "rb"):
+            pass
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class CSVImportService:
+    """デバウンスキュー付きのCSVインポートサービス
+
+    submit() は監視スレッドから呼ばれてもすぐに戻り、
+    インポートはワーカースレッドで行います。
+    """
+
+    def __init__(self, db_manager=None, header_mapping=None, overwrite=True,
+                 debounce_seconds=DEFAULT_DEBOUNCE_SECONDS,
+                 max_wait_seconds=DEFAULT_MAX_WAIT_SECONDS,
+                 delegate_to_app=True, on_result=None):
+        """
+        Args:
+            db_manager: DatabaseManager（Noneの場合は作成）
+            header_mapping: ヘッダーマッピング（Noneの場合は AppConfig.HEADER_MAPPING）
+            overwrite: True=上書きインポート、False=追記インポート
+            debounce_seconds: 最後のイベントからインポートまでの待ち時間
+            max_wait_seconds: 書き込み完了を待つ最大時間
+            delegate_to_app: アプリ起動中はアプリにインポートを依頼するか
+            on_result: バッチ完了時に結果dictを受け取るコールバック
+        """
+        if db_manager is None:
+            from database import DatabaseManager
+            db_manager = DatabaseManager()
+
+        self.db_manager = db_manager
+        self.header_mapping = header_mapping or AppConfig.HEADER_MAPPING
+        self.overwrite = overwrite
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.delegate_to_app = delegate_to_app
+        self.on_result = on_result
+
+        # path -> {'due': 確認時刻, 'signature': 前回確認時の署名, 'first_seen': 初回検出時刻}
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """ワーカースレッドを開始"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="CSVImportService", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """ワーカースレッドを停止（未処理のファイルは破棄）"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, path):
+        """インポート対象のファイルを登録
+
+        同じファイルのイベントが続いた場合は、最後のイベントから
+        debounce_seconds 経過するまでインポートを遅らせます。
+        """
+        path = os.path.abspath(path)
+        now = time.monotonic()
+        with self._condition:
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = {'due': now + self.debounce_seconds,
+                                       'signature': None, 'first_seen': now}
+            else:
+                entry['due'] = now + self.debounce_seconds
+                entry['signature'] = None
+            self._condition.notify_all()
+
+    def pending_count(self):
+        """インポート待ちのファイル数"""
+        with self._condition:
+            return len(self._pending)
+
+    def _run(self):
+        """ワーカースレッドのメインループ"""
+        while True:
+            with self._condition:
+                while self._running and not self._due_paths_locked():
+                    timeout = self._next_due_locked()
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+                due = self._due_paths_locked()
+
+            ready, failed = self._check_completion(due)
+            if ready or failed:
+                self._process_batch(ready, failed)
+
+    def _due_paths_locked(self):
+        now = time.monotonic()
+        return [path for path, entry in self._pending.items() if entry['due'] <= now]
+
+    def _next_due_locked(self):
+        if not self._pending:
+            return None
+        return max(0.0, min(entry['due'] for entry in self._pending.values()) - time.monotonic())
+
+    def _check_completion(self, paths):
+        """書き込みが完了したファイルを判定
+
+        前回確認時からサイズ・更新日時が変わっていなければ完了とみなします。
+        未完了のファイルは debounce_seconds 後に再確認します。
+
+        Returns:
+            tuple: (完了したファイルのリスト, 諦めたファイルのリスト)
+        """
+        ready = []
+        failed = []
+        now = time.monotonic()
+
+        with self._condition:
+            for path in paths:
+                entry = self._pending.get(path)
+                if entry is None:
+                    continue
+
+                signature = _file_signature(path)
+                if signature is not None and signature[0] > 0 and signature == entry['signature']:
+                    ready.append(path)
+                    del self._pending[path]
+                elif now - entry['first_seen'] > self.max_wait_seconds:
+                    failed.append(path)
+                    del self._pending[path]
+                else:
+                    entry['signature'] = signature
+                    entry['due'] = now + self.debounce_seconds
+
+        return ready, failed
+
+    def _process_batch(self, paths, failed=()):
+        """完了したファイルをまとめてインポートし、結果を通知"""
+        result = {
+            'files': sorted(list(paths) + list(failed)),
+            'imported': {},
+            'superseded': [],
+            'errors': {path: "書き込みが完了しませんでした" for path in failed},
+            'delegated': False,
+        }
+
+        if paths:
+            try:
+                self._import_files(paths, result)
+            except Exception as e:
+                log_message(f"CSV一括インポートエラー: {e}")
+                for path in paths:
+                    result['errors'][path] = str(e)
+
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                log_message(f"インポート結果の通知エラー: {e}")
+
+    def _import_files(self, paths, result):
+        """ファイルをインポート（アプリ起動中はアプリに依頼）"""
+        # 上書きモードでは最後に取り込んだファイルの内容だけが残るため、
+        # 同じバッチ内では最新のファイルのみを取り込む
+        paths = sorted(paths, key=lambda p: (os.path.getmtime(p), p))
+        if self.overwrite and len(paths) > 1:
+            result['superseded'] = paths[:-1]
+            paths = paths[-1:]
+
+        if self.delegate_to_app and send_import_request(paths):
+            log_message(f"起動中のアプリにインポートを依頼しました: {len(paths)}件")
+            result['delegated'] = True
+            return
+
+        counts = self.db_manager.import_csv_files(paths, self.header_mapping, self.overwrite)
+        result['imported'] = counts
+        total = sum(counts.values())
+        log_message(f"CSVを一括インポートしました: {len(paths)}ファイル, {total}件")
+
+
+class ImportRequestServer:
+    """アプリ本体でインポート依頼を受け付けるローカルIPCサーバー
+
+    受け付けたファイルは handler(paths) に渡します。
+    handler はサーバースレッドから呼ばれるため、画面更新はシグナル等で
+    メインスレッドに渡してください。
+    """
+
+    def __init__(self, handler, address=None):
+        self.handler = handler
+        self.address = address
+        self._authkey = None
+        self._listener = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """受付を開始（開始できない場合はFalse）"""
+        try:
+            if self.address is None:
+                self.address = import_server_address()
+
+            if IMPORT_SERVER_FAMILY == "AF_UNIX" and os.path.exists(self.address):
+                if _socket_in_use(self.address):
+                    # 他のアプリが受付中（ソケットを奪わない）
+                    log_message(f"インポート受付は他のアプリで起動中です: {self.address}")
+                    return False
+                # 前回の異常終了で残ったソケットファイルを削除
+                os.unlink(self.address)
+
+            authkey = secrets.token_bytes(32)
+            self._listener = Listener(self.address, family=IMPORT_SERVER_FAMILY, authkey=authkey)
+            # 受付を開始してから認証キーを公開する（起動中のアプリのキーを上書きしないため）
+            self._authkey = authkey
+            _write_authkey(authkey)
+        except OSError as e:
+            if self._listener is not None:
+                self._listener.close()
+                self._listener = None
+            log_message(f"インポート受付を開始できませんでした: {e}")
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="ImportRequestServer", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """受付を停止"""
+        if not self._running:
+            return
+        self._running = False
+        # accept() を抜けるためにダミーの接続を行う
+        try:
+            conn = Client(self.address, family=IMPORT_SERVER_FAMILY, authkey=self._authkey)
+            conn.close()
+        except (OSError, AuthenticationError):
+            pass
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._listener.close()
+        self._listener = None
+        # 自分の認証キーのままなら削除
+        if _read_authkey() == self._authkey:
+            try:
+                os.remove(_authkey_path())
+            except OSError:
+                pass
+        self._authkey = None
+
+    def _serve(self):
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._running:
+                    log_message(f"インポート依頼の受付エラー: {e}")
+                continue
+
+            with conn:
+                if not self._running:
+                    break
+                try:
+                    request = conn.recv()
+                    self.handler(request['files'])
+                    conn.send({'accepted': True})
+                except Exception as e:
+                    log_message(f"インポート依頼の処理エラー: {e}")
+                    try:
+                        conn.send({'accepted': False, 'error': str(e)})
+                    except OSError:
+                        pass
+
+
+def send_import_request(paths, address=None):
+    """起動中のアプリにインポートを依頼
+
+    Returns:
+        bool: アプリが依頼を受け付けた場合True（アプリ未起動ならFalse）
+    """
+    try:
+        if address is None:
+            address = import_server_address()
+    except OSError:
+        return False
+    if IMPORT_SERVER_FAMILY == "AF_UNIX" and not os.path.exists(address):
+        return False
+
+    authkey = _read_authkey()
+    if authkey is None:
+        return False
+
+    try:
+        conn = Client(address, family=IMPORT_SERVER_FAMILY, authkey=authkey)
+    except (OSError, AuthenticationError):
+        return False
+
+    try:
+        conn.send({'files': list(paths)})
+        response = conn.recv()
+        return bool(response.get('accepted'))
+    except (OSError, EOFError):
+        return False
+    finally:
+        conn.close()
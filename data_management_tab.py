@@ -5,10 +5,8 @@
 """
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget
 
-from expense_tab import ExpenseTab
-from master_tab import MasterTab
-from order_check_tab import OrderCheckTab
-from order_payment_reconciliation_tab import OrderPaymentReconciliationTab
+import query_profiler
+from ui.lazy_tab import LazyTab
 
 
 class DataManagementTab(QWidget):
@@ -19,6 +17,7 @@ class DataManagementTab(QWidget):
     - 費用マスター
     - 発注チェック
     - 発注・支払照合
+    - クエリプロファイル（BILLING_QUERY_PROFILE=1 の場合のみ）
     """
 
     def __init__(self, parent_tab_control, main_window):
@@ -33,24 +32,54 @@ class DataManagementTab(QWidget):
         # サブタブウィジェット作成
         self.sub_tab_control = QTabWidget()
 
+        # サブタブは最初に表示したときに作成する（モジュールのインポートも表示時）
         # サブタブ1: 費用管理
-        self.expense_tab = ExpenseTab(self.parent_tab_control, self.main_window)
+        self.expense_tab = LazyTab(self._create_expense_tab)
         self.sub_tab_control.addTab(self.expense_tab, "費用管理")
 
         # サブタブ2: 費用マスター
-        self.master_tab = MasterTab(self.parent_tab_control, self.main_window)
+        self.master_tab = LazyTab(self._create_master_tab)
         self.sub_tab_control.addTab(self.master_tab, "費用マスター")
 
         # サブタブ3: 発注チェック
-        self.order_check_tab = OrderCheckTab()
+        self.order_check_tab = LazyTab(self._create_order_check_tab)
         self.sub_tab_control.addTab(self.order_check_tab, "発注チェック")
 
         # サブタブ4: 発注・支払照合
-        self.reconciliation_tab = OrderPaymentReconciliationTab()
+        self.reconciliation_tab = LazyTab(self._create_reconciliation_tab)
         self.sub_tab_control.addTab(self.reconciliation_tab, "発注・支払照合")
 
+        # サブタブ5: クエリプロファイル（BILLING_QUERY_PROFILE=1 の場合のみ）
+        if query_profiler.is_enabled():
+            self.query_profile_tab = LazyTab(self._create_query_profile_tab)
+            self.sub_tab_control.addTab(self.query_profile_tab, "クエリプロファイル")
+
         # レイアウト設定
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)  # 余白なし
         layout.addWidget(self.sub_tab_control)
         self.setLayout(layout)
+
+    def _create_expense_tab(self):
+        from expense_tab import ExpenseTab
+        tab = ExpenseTab(self.parent_tab_control, self.main_window)
+        tab.refresher.invalidate()  # 表示されたときにデータを読み込む
+        return tab
+
+    def _create_master_tab(self):
+        from master_tab import MasterTab
+        tab = MasterTab(self.parent_tab_control, self.main_window)
+        tab.refresher.invalidate()  # 表示されたときにデータを読み込む
+        return tab
+
+    def _create_order_check_tab(self):
+        from order_check_tab import OrderCheckTab
+        return OrderCheckTab()
+
+    def _create_reconciliation_tab(self):
+        from order_payment_reconciliation_tab import OrderPaymentReconciliationTab
+        return OrderPaymentReconciliationTab()
+
+    def _create_query_profile_tab(self):
+        from query_profile_tab import QueryProfileTab
+        return QueryProfileTab()
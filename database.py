@@ -1,8 +1,82 @@
 import sqlite3
 import csv
 import calendar
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
-from utils import log_message, calculate_count_based_amount
+from utils import log_message, calculate_count_based_amount, format_payee_code
+from query_profiler import connect as profiled_connect
+from change_events import publish_change, INSERT, UPDATE, DELETE, RELOAD
+from order_management.models import Contract, Payment, ScheduleEntry, record_factory
+from order_management.broadcast_utils import (
+    adjust_payment_date_by_timing,
+    build_monthly_broadcast_counts,
+    calculate_monthly_broadcast_count,
+)
+from search_cache import file_stamp
+from federated_db import database_paths, open_federated
+from db_backup import create_restore_point
+
+# 費用マスターの案件名から分離した番組名・費用項目と、その分離元の案件名（発注登録状況の照合用）
+EXPENSE_MASTER_SPLIT_COLUMNS = ("program_name", "item_name", "split_source")
+
+# 支払いの絞込み項目の集計テーブル（payment_facets）
+#   facet -> 値のSQL式（{ref} は payments / NEW / OLD）。値ごとの件数を payments のトリガーで差分更新する
+PAYMENT_MONTH_SQL = "strftime('%Y-%m', REPLACE({ref}payment_date, '/', '-'))"
+PAYMENT_FACETS = {
+    'project_status': "{ref}project_status",
+    'status': "{ref}status",
+    'department': "{ref}department",
+    'client_name': "{ref}client_name",
+    'payment_month': PAYMENT_MONTH_SQL,
+}
+
+PAYMENT_FACET_TRIGGERS = [
+    'trg_payment_facets_insert',
+    'trg_payment_facets_update',
+    'trg_payment_facets_delete',
+]
+
+# 絞込み・案件別表示でよく使う条件の索引
+PAYMENT_INDEXES = {
+    'idx_payments_project_date': "project_name, payment_date",
+    'idx_payments_month_status': f"{PAYMENT_MONTH_SQL.format(ref='')}, status",
+    'idx_payments_project_status': "project_status, status",
+    'idx_payments_department': "department",
+    'idx_payments_client': "client_name",
+}
+
+
+def _payment_facet_value(facet, ref=""):
+    """絞込み項目の値のSQL式（ref は 'NEW.' / 'OLD.' 等）"""
+    return PAYMENT_FACETS[facet].format(ref=ref)
+
+
+def _payment_facets_apply_sql(ref, sign):
+    """OLD/NEW の支払いを集計テーブルに加算（sign='+'）・減算（sign='-'）するSQL"""
+    statements = []
+    for facet in PAYMENT_FACETS:
+        value = _payment_facet_value(facet, f"{ref}.")
+        if sign == '+':
+            statements.append(f"""
+        INSERT INTO payment_facets (facet, value, count)
+        SELECT '{facet}', {value}, 1 WHERE {value} IS NOT NULL AND {value} != ''
+        ON CONFLICT(facet, value) DO UPDATE SET count = count + 1;""")
+        else:
+            statements.append(f"""
+        UPDATE payment_facets SET count = count - 1 WHERE facet = '{facet}' AND value = {value};
+        DELETE FROM payment_facets WHERE facet = '{facet}' AND value = {value} AND count <= 0;""")
+    return "".join(statements)
+
+
+def _facet_condition(expression, value, conditions, params):
+    """絞込み条件を追加（値がリスト・タプルの場合はいずれかに一致）"""
+    if isinstance(value, (list, tuple, set)):
+        values = list(value)
+        conditions.append(f"{expression} IN ({', '.join(['?'] * len(values))})")
+        params.extend(values)
+    else:
+        conditions.append(f"{expression} = ?")
+        params.append(value)
 
 
 class DatabaseManager:
@@ -13,11 +87,27 @@ class DatabaseManager:
         self.payee_master_db = "payee_master.db"  # 支払い先マスター追加
         self.order_db_path = "order_management.db"  # 発注管理データベース
         self.db_name = self.billing_db  # expensesテーブル用
+        # 番組別の月間放送回数のキャッシュ（order_management.db の状態, 計算済みの月, {(番組ID, 年月): 回数}）
+        self._broadcast_count_cache = (None, set(), {})
+
+    def _connect(self, db_path):
+        """データベース接続を取得（クエリプロファイラー有効時は計測付き）"""
+        return profiled_connect(db_path)
+
+    def _connect_federated(self, primary, *aliases):
+        """複数のDBファイルを別名で ATTACH した接続を取得（federated_db.py 参照）
+
+        Args:
+            primary: main として開くDBの別名（'orders', 'billing' 等）
+            aliases: ATTACH するDBの別名
+        """
+        paths = database_paths(self)
+        return open_federated({alias: paths[alias] for alias in (primary, *aliases)}, primary)
 
     def init_db(self):
         """データベースの初期化"""
         # 支払いデータベース
-        conn = sqlite3.connect(self.billing_db)
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
 
         # payments テーブルを削除して再作成
@@ -52,8 +142,14 @@ class DatabaseManager:
         conn.commit()
         conn.close()
 
+        # 絞込み項目の集計テーブル・索引（テーブルの再作成でトリガーも削除されるため作り直す）
+        try:
+            self.rebuild_payment_facets()
+        except Exception as e:
+            log_message(f"絞込み項目の集計テーブルの作成エラー: {e}")
+
         # 費用データベース
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
 
         # 既存のexpensesテーブルに新しいカラムを追加（存在しない場合のみ）
@@ -135,7 +231,7 @@ class DatabaseManager:
         conn.close()
 
         # 費用マスターデータベース
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
 
         # 費用マスターテーブル（案件情報フィールド追加）
@@ -182,6 +278,7 @@ class DatabaseManager:
                 ("urgency_level", "TEXT DEFAULT '通常'"),
                 ("payment_timing", "TEXT DEFAULT '翌月末払い'")
             ]
+            project_columns += [(col_name, "TEXT") for col_name in EXPENSE_MASTER_SPLIT_COLUMNS]
 
             for col_name, col_def in project_columns:
                 if col_name not in master_columns:
@@ -226,7 +323,7 @@ class DatabaseManager:
             return
 
         # データマイグレーション（partners統合）のみ実行
-        conn = sqlite3.connect(order_db)
+        conn = self._connect(order_db)
         cursor = conn.cursor()
         try:
             # データマイグレーション: 既存マスタからpartnersへ移行
@@ -242,7 +339,7 @@ class DatabaseManager:
     def _create_order_management_tables_fallback(self):
         """マイグレーションシステムが利用できない場合のフォールバック処理"""
         order_db = "order_management.db"
-        conn = sqlite3.connect(order_db)
+        conn = self._connect(order_db)
         cursor = conn.cursor()
 
         try:
@@ -377,7 +474,7 @@ class DatabaseManager:
             log_message("取引先マスタの統合を開始します")
 
             # 1. 支払先マスタからの移行
-            payee_conn = sqlite3.connect(self.payee_master_db)
+            payee_conn = self._connect(self.payee_master_db)
             payee_cursor = payee_conn.cursor()
 
             try:
@@ -440,7 +537,7 @@ class DatabaseManager:
 
     def init_payee_master_db(self):
         """支払い先マスターデータベースの初期化"""
-        conn = sqlite3.connect(self.payee_master_db)
+        conn = self._connect(self.payee_master_db)
         cursor = conn.cursor()
 
         # 支払い先マスターテーブル
@@ -462,7 +559,7 @@ class DatabaseManager:
 
     def get_payee_suggestions(self, partial_name=""):
         """支払い先の候補を取得（オートコンプリート用）"""
-        conn = sqlite3.connect(self.payee_master_db)
+        conn = self._connect(self.payee_master_db)
         cursor = conn.cursor()
 
         if partial_name:
@@ -488,7 +585,7 @@ class DatabaseManager:
 
     def get_payee_code_by_name(self, payee_name):
         """支払い先名からコードを取得"""
-        conn = sqlite3.connect(self.payee_master_db)
+        conn = self._connect(self.payee_master_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -508,7 +605,7 @@ class DatabaseManager:
         if not payee_name or not payee_code:
             return False
 
-        conn = sqlite3.connect(self.payee_master_db)
+        conn = self._connect(self.payee_master_db)
         cursor = conn.cursor()
 
         try:
@@ -541,6 +638,7 @@ class DatabaseManager:
                 log_message(f"支払い先マスター追加: {payee_name} -> {payee_code}")
 
             conn.commit()
+            publish_change('payee_master', None, UPDATE)
             return True
 
         except sqlite3.Error as e:
@@ -551,60 +649,83 @@ class DatabaseManager:
             conn.close()
 
     def sync_payee_master_from_data(self):
-        """既存データから支払い先マスターを同期"""
-        # 支払いデータから支払い先情報を収集
-        billing_conn = sqlite3.connect(self.billing_db)
-        billing_cursor = billing_conn.cursor()
+        """既存データから支払い先マスターを同期
 
-        billing_cursor.execute(
-            """
-            SELECT DISTINCT payee, payee_code FROM payments 
-            WHERE payee IS NOT NULL AND payee != '' 
-            AND payee_code IS NOT NULL AND payee_code != ''
-            """
-        )
-        billing_payees = billing_cursor.fetchall()
-        billing_conn.close()
+        支払い・費用・費用マスターの (支払い先名, コード) をそれぞれ1回のクエリで読み込み、
+        現在のマスターとメモリ上で比較して、追加・変更のある行だけを
+        1トランザクションの executemany（payee_name の UNIQUE 制約による UPSERT）で反映します。
 
-        # 費用データからも収集
-        expenses_conn = sqlite3.connect(self.expenses_db)
-        expenses_cursor = expenses_conn.cursor()
+        同じ支払い先名に複数のコードがある場合、現在のマスターのコードが含まれていれば変更せず、
+        含まれていなければ後のデータ（支払い → 費用 → 費用マスターの順）のコードを使います。
 
-        expenses_cursor.execute(
-            """
-            SELECT DISTINCT payee, payee_code FROM expenses 
-            WHERE payee IS NOT NULL AND payee != '' 
-            AND payee_code IS NOT NULL AND payee_code != ''
-            """
-        )
-        expense_payees = expenses_cursor.fetchall()
-        expenses_conn.close()
+        Returns:
+            dict: {'inserted': 追加件数, 'changed': コードを変更した件数, 'unchanged': 変更なしの件数}
+        """
+        result = {'inserted': 0, 'changed': 0, 'unchanged': 0}
 
-        # マスターデータからも収集
-        master_conn = sqlite3.connect(self.expense_master_db)
-        master_cursor = master_conn.cursor()
+        # 支払い・費用・費用マスターから支払い先情報を収集（支払い先名 -> コードの候補）
+        sources = [
+            (self.billing_db, "payments"),
+            (self.expenses_db, "expenses"),
+            (self.expense_master_db, "expense_master"),
+        ]
+        candidates = {}
+        for db_path, table in sources:
+            conn = self._connect(db_path)
+            try:
+                rows = conn.execute(
+                    f"""
+                    SELECT DISTINCT payee, payee_code FROM {table}
+                    WHERE payee IS NOT NULL AND payee != ''
+                    AND payee_code IS NOT NULL AND payee_code != ''
+                    ORDER BY payee, payee_code
+                    """
+                ).fetchall()
+            finally:
+                conn.close()
+            for payee_name, payee_code in rows:
+                candidates.setdefault(payee_name, []).append(payee_code)
 
-        master_cursor.execute(
-            """
-            SELECT DISTINCT payee, payee_code FROM expense_master 
-            WHERE payee IS NOT NULL AND payee != '' 
-            AND payee_code IS NOT NULL AND payee_code != ''
-            """
-        )
-        master_payees = master_cursor.fetchall()
-        master_conn.close()
+        # 支払い先マスターとの差分を反映
+        conn = self._connect(self.payee_master_db)
+        try:
+            current = dict(conn.execute("SELECT payee_name, payee_code FROM payee_master"))
+
+            changes = []
+            for payee_name, codes in candidates.items():
+                if payee_name not in current:
+                    result['inserted'] += 1
+                elif current[payee_name] in codes:
+                    result['unchanged'] += 1
+                    continue
+                else:
+                    result['changed'] += 1
+                changes.append((payee_name, codes[-1]))
 
-        # すべてのデータを統合
-        all_payees = set(billing_payees + expense_payees + master_payees)
+            if changes:
+                conn.executemany(
+                    """
+                    INSERT INTO payee_master (payee_name, payee_code) VALUES (?, ?)
+                    ON CONFLICT(payee_name) DO UPDATE
+                    SET payee_code = excluded.payee_code, updated_date = CURRENT_TIMESTAMP
+                    """,
+                    changes,
+                )
+                conn.commit()
+                publish_change('payee_master', None, UPDATE)
 
-        # 支払い先マスターに反映
-        count = 0
-        for payee_name, payee_code in all_payees:
-            if self.update_or_create_payee_master(payee_name, payee_code):
-                count += 1
+        except sqlite3.Error as e:
+            log_message(f"支払い先マスター同期エラー: {e}")
+            conn.rollback()
+            return {'inserted': 0, 'changed': 0, 'unchanged': 0}
+        finally:
+            conn.close()
 
-        log_message(f"支払い先マスター同期完了: {count}件")
-        return count
+        log_message(
+            f"支払い先マスター同期完了: 追加 {result['inserted']}件 / "
+            f"変更 {result['changed']}件 / 変更なし {result['unchanged']}件"
+        )
+        return result
 
     def import_csv_data(self, csv_file, header_mapping, overwrite=True):
         """CSVファイルからデータをインポート（支払いコード0埋め対応）
@@ -614,19 +735,93 @@ class DatabaseManager:
             header_mapping: ヘッダーマッピング辞書
             overwrite: True=上書き（既存データ削除）、False=追記
         """
-        from utils import format_payee_code  # 追加
+        counts = self.import_csv_files([csv_file], header_mapping, overwrite)
+        return counts.get(csv_file, 0)
+
+    def import_csv_files(self, csv_files, header_mapping, overwrite=True):
+        """複数のCSVファイルを1トランザクションでインポート
+
+        すべてのファイルを読み込んでから書き込むため、途中で失敗した場合は
+        どのファイルも反映されません。支払い先マスターの同期は最後に1回だけ行います。
+
+        Args:
+            csv_files: CSVファイルのパスのリスト
+            header_mapping: ヘッダーマッピング辞書
+            overwrite: True=上書き（既存データ削除）、False=追記
 
-        # データベース接続
-        conn = sqlite3.connect(self.billing_db)
+        Returns:
+            dict: {CSVファイルのパス: インポート件数}（読み込めなかったファイルは0件）
+        """
+        parsed = []
+        counts = {}
+        for csv_file in csv_files:
+            result = self._read_payment_csv(csv_file, header_mapping)
+            counts[csv_file] = 0
+            if result is not None:
+                parsed.append((csv_file, result))
+
+        # 読み込めたファイルが無い場合は既存データを保持する
+        if not parsed:
+            return counts
+
+        self.import_payment_rows([result for _, result in parsed], overwrite)
+        for csv_file, (_, rows) in parsed:
+            counts[csv_file] = len(rows)
+
+        return counts
+
+    def import_payment_rows(self, batches, overwrite=True):
+        """読み込み済みの支払いデータを1トランザクションで書き込み
+
+        Args:
+            batches: (列名のリスト, 行タプルのリスト) のリスト
+            overwrite: True=上書き（既存データ削除）、False=追記
+
+        Returns:
+            int: 書き込んだ件数
+        """
+        # 取込前に検証済みの復元ポイントを作成（作成できない場合は取り込まない）
+        create_restore_point(self.billing_db, "pre_import")
+
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
+        total = 0
+
+        try:
+            # 上書きモードの場合は既存のデータを削除
+            if overwrite:
+                cursor.execute("DELETE FROM payments")
+
+            for fields, rows in batches:
+                placeholders = ", ".join(["?"] * len(fields))
+                query = f"INSERT INTO payments ({', '.join(fields)}) VALUES ({placeholders})"
+                cursor.executemany(query, rows)
+                total += len(rows)
+
+            conn.commit()
+            publish_change('payments', None, RELOAD if overwrite else INSERT)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
-        # 上書きモードの場合は既存のデータを削除
-        if overwrite:
-            cursor.execute("DELETE FROM payments")
+        # 支払い先マスターを同期
+        self.sync_payee_master_from_data()
+
+        return total
 
+    def _read_payment_csv(self, csv_file, header_mapping):
+        """支払いCSVを読み込み、paymentsテーブルへの挿入値に変換
+
+        Args:
+            csv_file: CSVファイルのパス
+            header_mapping: ヘッダーマッピング辞書
+
+        Returns:
+            tuple: (列名のリスト, 行タプルのリスト)。読み込めない場合はNone
+        """
         # CSVファイルを読み込む（エンコーディング自動検出）
-        row_count = 0
-        # エンコーディングを試行
         encodings = ['utf-8', 'shift_jis', 'cp932']
         file_content = None
         used_encoding = None
@@ -642,15 +837,17 @@ class DatabaseManager:
 
         if file_content is None:
             log_message(f"CSVファイルのエンコーディングを検出できませんでした: {csv_file}")
-            conn.close()
-            return 0
+            return None
 
         log_message(f"CSVファイルのエンコーディング: {used_encoding}")
 
         # 読み込んだ内容をCSVとしてパース
         import io
         csv_reader = csv.reader(io.StringIO(file_content))
-        headers = next(csv_reader)  # ヘッダー行を読み込み
+        headers = next(csv_reader, None)  # ヘッダー行を読み込み
+        if headers is None:
+            log_message(f"CSVファイルが空です: {csv_file}")
+            return None
 
         # ヘッダーマッピングの作成
         header_indices = {}
@@ -678,10 +875,13 @@ class DatabaseManager:
             log_message(
                 f"CSVファイルのヘッダーが不正です: {', '.join(missing_headers)}"
             )
-            conn.close()
-            return 0
+            return None
+
+        fields = list(header_indices.keys())
+        if "status" not in fields:
+            fields.append("status")
 
-        # データの挿入
+        rows = []
         for row in csv_reader:
             if not row:  # 空行はスキップ
                 continue
@@ -707,36 +907,22 @@ class DatabaseManager:
                 values["amount"] = 0
 
             # ステータスのデフォルト値
-            if "status" not in values or not values["status"]:
+            if not values.get("status"):
                 values["status"] = "未処理"
 
-            # データをデータベースに挿入
-            fields = list(values.keys())
-            placeholders = ", ".join(["?"] * len(fields))
-
-            query = f"INSERT INTO payments ({', '.join(fields)}) VALUES ({placeholders})"
-            cursor.execute(query, [values[field] for field in fields])
+            rows.append(tuple(values[field] for field in fields))
 
-            row_count += 1
+        return fields, rows
 
-        conn.commit()
-        conn.close()
-
-        # 支払い先マスターを同期
-        self.sync_payee_master_from_data()
-
-        return row_count
-
-    def get_payment_data(self, search_term=None):
-        """支払いデータを取得（支払いコード0埋め対応）"""
-        from utils import format_payee_code  # 追加
-
-        conn = sqlite3.connect(self.billing_db)
-        cursor = conn.cursor()
+    def build_payment_data_query(self, search_term=None):
+        """支払いデータ取得用のクエリを作成（get_payment_data・CSV出力で共用）
 
+        Returns:
+            tuple: (クエリ, パラメータ)
+        """
         if search_term:
             search_param = f"%{search_term}%"
-            cursor.execute(
+            return (
                 """
                 SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status 
                 FROM payments
@@ -745,14 +931,21 @@ class DatabaseManager:
                 """,
                 (search_param, search_param, search_param, search_param, search_param),
             )
-        else:
-            cursor.execute(
-                """
-                SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status
-                FROM payments
-                ORDER BY payment_date DESC
-                """
-            )
+        return (
+            """
+            SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status
+            FROM payments
+            ORDER BY payment_date DESC
+            """,
+            (),
+        )
+
+    def get_payment_data(self, search_term=None):
+        """支払いデータを取得（支払いコード0埋め対応）"""
+        conn = self._connect(self.billing_db)
+        cursor = conn.cursor()
+
+        cursor.execute(*self.build_payment_data_query(search_term))
 
         payment_rows = cursor.fetchall()
 
@@ -778,7 +971,7 @@ class DatabaseManager:
 
     def update_payment_status(self, subject, payment_date, payee, status):
         """支払いデータのステータスを更新"""
-        conn = sqlite3.connect(self.billing_db)
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -792,14 +985,13 @@ class DatabaseManager:
 
         count = cursor.rowcount
         conn.commit()
+        publish_change('payments', None, UPDATE)
         conn.close()
         return count
 
     def get_expense_data(self, search_term=None):
         """費用データを取得"""
-        from utils import format_payee_code
-
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
 
         try:
@@ -851,7 +1043,7 @@ class DatabaseManager:
 
     def get_expense_by_id(self, expense_id):
         """IDで費用データを取得"""
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -870,10 +1062,7 @@ class DatabaseManager:
 
     def save_expense(self, data, is_new=False):
         """費用データを保存"""
-        # 関数の最初に追加
-        from utils import format_payee_code
-
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
 
         # 【追加】支払い先コードの0埋め処理
@@ -947,6 +1136,7 @@ class DatabaseManager:
                 expense_id = data["id"]
 
             conn.commit()
+            publish_change('expenses', [expense_id], INSERT if is_new else UPDATE)
             log_message(f"費用データ保存完了: ID={expense_id}")
             return expense_id
 
@@ -959,16 +1149,17 @@ class DatabaseManager:
 
     def delete_expense(self, expense_id):
         """費用データを削除"""
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
         cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
         conn.commit()
+        publish_change('expenses', [expense_id], DELETE)
         conn.close()
         return cursor.rowcount
 
     def duplicate_expense(self, expense_id):
         """費用データを複製"""
-        conn = sqlite3.connect(self.expenses_db)
+        conn = self._connect(self.expenses_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -1001,43 +1192,39 @@ class DatabaseManager:
 
         new_id = cursor.lastrowid
         conn.commit()
+        publish_change('expenses', [new_id], INSERT)
         conn.close()
         return new_id
 
-    def get_master_data(self, search_term=None, full_data=False):
-        # 関数の最初に追加
-        from utils import format_payee_code
+    def build_master_export_query(self, search_term=None):
+        """費用マスターの全フィールド取得用クエリを作成（CSV出力用）
+
+        Returns:
+            tuple: (クエリ, パラメータ)
+        """
+        query = """
+            SELECT id, project_name, payee, payee_code, amount, payment_type,
+                   broadcast_days, start_date, end_date, client_name, department,
+                   project_status, project_start_date, project_end_date, budget,
+                   approver, urgency_level
+            FROM expense_master
+        """
+        params = ()
+        if search_term:
+            search_param = f"%{search_term}%"
+            query += " WHERE project_name LIKE ? OR payee LIKE ? OR payee_code LIKE ?"
+            params = (search_param, search_param, search_param)
+        query += " ORDER BY id"
+        return query, params
 
+    def get_master_data(self, search_term=None, full_data=False):
         """費用マスターデータを取得"""
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
 
         if full_data:
             # 全フィールドを取得（CSV出力用）
-            if search_term:
-                search_param = f"%{search_term}%"
-                cursor.execute(
-                    """
-                    SELECT id, project_name, payee, payee_code, amount, payment_type,
-                           broadcast_days, start_date, end_date, client_name, department,
-                           project_status, project_start_date, project_end_date, budget,
-                           approver, urgency_level
-                    FROM expense_master
-                    WHERE project_name LIKE ? OR payee LIKE ? OR payee_code LIKE ?
-                    ORDER BY id
-                    """,
-                    (search_param, search_param, search_param),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT id, project_name, payee, payee_code, amount, payment_type,
-                           broadcast_days, start_date, end_date, client_name, department,
-                           project_status, project_start_date, project_end_date, budget,
-                           approver, urgency_level
-                    FROM expense_master
-                    ORDER BY id
-                    """)
+            cursor.execute(*self.build_master_export_query(search_term))
         else:
             # 基本フィールドのみ取得（既存の動作を維持）
             if search_term:
@@ -1075,7 +1262,7 @@ class DatabaseManager:
 
     def get_master_by_id(self, master_id):
         """IDで費用マスターデータを取得"""
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -1095,10 +1282,7 @@ class DatabaseManager:
 
     def save_master(self, data, is_new=False):
         """費用マスターデータを保存"""
-        # 関数の最初に追加
-        from utils import format_payee_code
-
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
 
         # 【追加】支払い先コードの0埋め処理
@@ -1176,6 +1360,7 @@ class DatabaseManager:
                 master_id = data["id"]
 
             conn.commit()
+            publish_change('expense_master', [master_id], INSERT if is_new else UPDATE)
             log_message(f"マスターデータ保存完了: ID={master_id}")
             return master_id
 
@@ -1188,16 +1373,17 @@ class DatabaseManager:
 
     def delete_master(self, master_id):
         """費用マスターデータを削除"""
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
         cursor.execute("DELETE FROM expense_master WHERE id = ?", (master_id,))
         conn.commit()
+        publish_change('expense_master', [master_id], DELETE)
         conn.close()
         return cursor.rowcount
 
     def duplicate_master(self, master_id):
         """費用マスターデータを複製"""
-        conn = sqlite3.connect(self.expense_master_db)
+        conn = self._connect(self.expense_master_db)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -1235,6 +1421,7 @@ class DatabaseManager:
 
         new_id = cursor.lastrowid
         conn.commit()
+        publish_change('expense_master', [new_id], INSERT)
         conn.close()
         return new_id
 
@@ -1261,10 +1448,10 @@ class DatabaseManager:
         target_year/target_month = 支払い月として処理
         payment_timingに応じて発生月を計算し、回数ベースの計算を行う
         """
-        master_conn = sqlite3.connect(self.expense_master_db)
+        master_conn = self._connect(self.expense_master_db)
         master_cursor = master_conn.cursor()
 
-        expense_conn = sqlite3.connect(self.expenses_db)
+        expense_conn = self._connect(self.expenses_db)
         expense_cursor = expense_conn.cursor()
 
         try:
@@ -1400,6 +1587,7 @@ class DatabaseManager:
                     generated_count += 1
 
             expense_conn.commit()
+            publish_change('expenses', None, INSERT)
 
             log_message(
                 f"{target_year}年{target_month}月支払い分の費用データを生成: 新規{generated_count}件、更新{updated_count}件"
@@ -1420,10 +1608,10 @@ class DatabaseManager:
         current_year = current_date.year
         current_month = current_date.month
 
-        master_conn = sqlite3.connect(self.expense_master_db)
+        master_conn = self._connect(self.expense_master_db)
         master_cursor = master_conn.cursor()
 
-        expense_conn = sqlite3.connect(self.expenses_db)
+        expense_conn = self._connect(self.expenses_db)
         expense_cursor = expense_conn.cursor()
 
         try:
@@ -1538,6 +1726,7 @@ class DatabaseManager:
                 )
 
             expense_conn.commit()
+            publish_change('expenses', None, INSERT)
 
             log_message(f"新規マスター項目を今月分に反映: {generated_count}件")
             return generated_count, generated_items
@@ -1552,7 +1741,7 @@ class DatabaseManager:
 
     def get_missing_master_expenses_for_month(self, target_year, target_month):
         """指定月に未反映のマスター項目を取得"""
-        master_conn = sqlite3.connect(self.expense_master_db)
+        master_conn = self._connect(self.expense_master_db)
         master_cursor = master_conn.cursor()
 
         try:
@@ -1583,19 +1772,19 @@ class DatabaseManager:
             master_conn.close()
 
     def match_expenses_with_payments(self):
-        """費用テーブルと支払いテーブルを照合（シンプル版: 支払い先コード + 金額 + 支払い月）"""
-        from utils import format_payee_code
-
-        # データベース接続
-        expenses_conn = sqlite3.connect(self.expenses_db)
-        expenses_cursor = expenses_conn.cursor()
+        """費用テーブルと支払いテーブルを照合（シンプル版: 支払い先コード + 金額 + 支払い月）
 
-        billing_conn = sqlite3.connect(self.billing_db)
-        billing_cursor = billing_conn.cursor()
+        expenses.db に billing.db を ATTACH し、照合条件が一致する 費用 × 支払い の
+        組み合わせを1回の結合で求めます。各費用には、まだ使われていない支払いのうち
+        IDが最も小さいものを割り当てます。
+        """
+        # expenses.dbに接続し、billing.dbを ATTACH（両方の更新を1回のコミットで確定）
+        conn = self._connect_federated('expenses', 'billing')
+        cursor = conn.cursor()
 
         try:
             # 費用データを取得（payment_timingも含む）
-            expenses_cursor.execute(
+            cursor.execute(
                 """
                 SELECT id, project_name, payee, payee_code, amount, payment_date, status, payment_timing
                 FROM expenses
@@ -1604,29 +1793,28 @@ class DatabaseManager:
                 ORDER BY id
                 """
             )
-            expense_rows = expenses_cursor.fetchall()
+            expense_rows = cursor.fetchall()
 
             if not expense_rows:
                 log_message("照合対象の費用データがありません")
                 return 0, 0
 
-            # 支払いデータを取得
-            billing_cursor.execute(
+            # 支払いデータの件数
+            cursor.execute(
                 """
-                SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status
-                FROM payments
+                SELECT COUNT(*)
+                FROM billing.payments
                 WHERE payee_code IS NOT NULL AND payee_code != ''
                 AND status != '照合済'
-                ORDER BY id
                 """
             )
-            payment_rows = billing_cursor.fetchall()
+            payment_count = cursor.fetchone()[0]
 
-            if not payment_rows:
+            if not payment_count:
                 log_message("照合対象の支払いデータがありません")
                 return 0, 0
 
-            log_message(f"照合処理開始: 費用データ {len(expense_rows)}件、支払いデータ {len(payment_rows)}件")
+            log_message(f"照合処理開始: 費用データ {len(expense_rows)}件、支払いデータ {payment_count}件")
 
             # 照合結果カウント
             matched_count = 0
@@ -1661,6 +1849,35 @@ class DatabaseManager:
                 """
                 return extract_year_month(expense_date)
 
+            # 照合条件（支払い先コード + 金額（整数化） + 支払い月）が一致する組み合わせ
+            conn.create_function("extract_year_month", 1, extract_year_month)
+            cursor.execute(
+                """
+                WITH e AS (
+                    SELECT id, format_payee_code(payee_code) AS code,
+                           CASE WHEN amount THEN CAST(CAST(amount AS REAL) AS INTEGER) ELSE 0 END AS amount,
+                           extract_year_month(payment_date) AS year_month
+                    FROM expenses
+                    WHERE payee_code IS NOT NULL AND payee_code != ''
+                    AND status != '照合済'
+                ), p AS (
+                    SELECT id, format_payee_code(payee_code) AS code,
+                           CASE WHEN amount THEN CAST(CAST(amount AS REAL) AS INTEGER) ELSE 0 END AS amount,
+                           extract_year_month(payment_date) AS year_month
+                    FROM billing.payments
+                    WHERE payee_code IS NOT NULL AND payee_code != ''
+                    AND status != '照合済'
+                )
+                SELECT e.id, p.id
+                FROM e
+                JOIN p ON p.code = e.code AND p.amount = e.amount AND p.year_month = e.year_month
+                ORDER BY e.id, p.id
+                """
+            )
+            candidates = defaultdict(list)
+            for expense_id, payment_id in cursor.fetchall():
+                candidates[expense_id].append(payment_id)
+
             # 成功した更新ID一覧（重複更新を避けるため）
             updated_payment_ids = set()
             updated_expense_ids = set()
@@ -1671,8 +1888,6 @@ class DatabaseManager:
                     continue
 
                 expense_id = expense[0]
-                expense_payee_code = format_payee_code(expense[3].strip())
-                expense_amount = int(float(expense[4])) if expense[4] else 0  # 整数化
                 expense_payment_date = expense[5]
                 expense_payment_timing = expense[7] if len(expense) > 7 and expense[7] else "翌月末払い"
 
@@ -1686,51 +1901,41 @@ class DatabaseManager:
                     not_matched_count += 1
                     continue
 
-                # 一致する支払いデータを検索
+                # 一致する支払いデータのうち、まだ使われていないもの
                 best_match = None
 
-                for payment in payment_rows:
-                    if payment[0] in updated_payment_ids:
+                for payment_id in candidates.get(expense_id, ()):
+                    if payment_id in updated_payment_ids:
                         continue
-
-                    payment_id = payment[0]
-                    payment_payee_code = format_payee_code(payment[4].strip()) if payment[4] else ""
-                    payment_amount = int(float(payment[5])) if payment[5] else 0  # 整数化
-                    payment_year_month = extract_year_month(payment[6])
-
-                    # 照合条件: 支払い先コード + 金額 + 支払い月
-                    code_match = expense_payee_code == payment_payee_code
-                    amount_match = expense_amount == payment_amount
-                    month_match = expected_payment_month == payment_year_month
-
-                    # 3条件全て一致したら照合成功
-                    if code_match and amount_match and month_match:
-                        best_match = payment_id
-                        log_message(f"照合成功: 費用ID:{expense_id} <-> 支払ID:{payment_id}")
-                        break
+                    best_match = payment_id
+                    log_message(f"照合成功: 費用ID:{expense_id} <-> 支払ID:{payment_id}")
+                    break
 
                 if best_match:
                     try:
                         # 費用データを照合済みに更新
-                        expenses_cursor.execute(
+                        cursor.execute(
                             "UPDATE expenses SET status = '照合済' WHERE id = ?",
                             (expense_id,),
                         )
 
-                        if expenses_cursor.rowcount == 0:
+                        if cursor.rowcount == 0:
                             log_message(f"⚠️ 費用データ更新失敗: ID={expense_id}")
                             continue
 
                         # 支払いデータを照合済みに更新
-                        billing_cursor.execute(
-                            "UPDATE payments SET status = '照合済' WHERE id = ?",
+                        cursor.execute(
+                            "UPDATE billing.payments SET status = '照合済' WHERE id = ?",
                             (best_match,),
                         )
 
-                        if billing_cursor.rowcount == 0:
+                        if cursor.rowcount == 0:
                             log_message(f"⚠️ 支払いデータ更新失敗: ID={best_match}")
-                            expenses_conn.rollback()
-                            billing_conn.rollback()
+                            # この費用の更新だけを元に戻す
+                            cursor.execute(
+                                "UPDATE expenses SET status = ? WHERE id = ?",
+                                (expense[6], expense_id),
+                            )
                             continue
 
                         updated_expense_ids.add(expense_id)
@@ -1743,14 +1948,15 @@ class DatabaseManager:
                     not_matched_count += 1
 
             # コミット
-            expenses_conn.commit()
-            billing_conn.commit()
+            conn.commit()
+            publish_change('expenses', updated_expense_ids, UPDATE)
+            publish_change('payments', updated_payment_ids, UPDATE)
 
             # 統計情報をログ出力
             log_message("=" * 50)
             log_message("照合処理統計結果:")
             log_message(f"  対象費用データ: {len(expense_rows)}件")
-            log_message(f"  対象支払いデータ: {len(payment_rows)}件")
+            log_message(f"  対象支払いデータ: {payment_count}件")
             log_message(f"  照合成功: {matched_count}件")
             log_message(f"  照合失敗: {not_matched_count}件")
             log_message(f"  照合率: {matched_count/(len(expense_rows)) * 100:.1f}%")
@@ -1760,68 +1966,153 @@ class DatabaseManager:
 
         except Exception as e:
             log_message(f"照合処理中にエラー: {e}")
-            expenses_conn.rollback()
-            billing_conn.rollback()
+            conn.rollback()
             raise
 
         finally:
-            expenses_conn.close()
-            billing_conn.close()
+            conn.close()
 
-    def get_project_filter_data(self, filters=None):
-        """案件絞込み用のデータを取得"""
-        conn = sqlite3.connect(self.billing_db)
-        cursor = conn.cursor()
+    def _ensure_payment_facets(self):
+        """絞込み項目の集計テーブル（payment_facets）と payments の索引を準備
 
+        集計テーブルは payments のトリガーで差分更新されます。
+        テーブル・トリガー・索引のいずれかが存在しない場合
+        （payments が作り直された場合等）のみ作成し、集計を再構築します。
+        """
+        conn = self._connect(self.billing_db)
         try:
-            # 基本クエリ
-            base_query = """
-                SELECT DISTINCT project_name, client_name, department, project_status, 
-                       project_start_date, project_end_date, budget,
-                       COUNT(*) as payment_count,
-                       SUM(amount) as total_amount
-                FROM payments 
-                WHERE project_name IS NOT NULL AND project_name != ''
-            """
-            
-            params = []
-            conditions = []
+            existing = {row[0] for row in conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE (type = 'table' AND name = 'payment_facets')
+                   OR (type = 'trigger' AND name LIKE 'trg_payment_facets_%')
+                   OR (type = 'index' AND name LIKE 'idx_payments_%')
+            """)}
+        finally:
+            conn.close()
+
+        if existing >= {'payment_facets', *PAYMENT_FACET_TRIGGERS, *PAYMENT_INDEXES}:
+            return
+
+        self.rebuild_payment_facets()
+
+    def rebuild_payment_facets(self):
+        """絞込み項目の集計テーブルとトリガー・索引を作り直し、payments から再集計"""
+        values = " UNION ALL ".join(
+            f"SELECT '{facet}' AS facet, {_payment_facet_value(facet)} AS value FROM payments"
+            for facet in PAYMENT_FACETS
+        )
+
+        conn = self._connect(self.billing_db)
+        cursor = conn.cursor()
+        try:
+            for trigger in PAYMENT_FACET_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute("DROP TABLE IF EXISTS payment_facets")
+
+            cursor.execute("""
+                CREATE TABLE payment_facets (
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (facet, value)
+                ) WITHOUT ROWID
+            """)
+
+            cursor.execute(f"""
+                INSERT INTO payment_facets (facet, value, count)
+                SELECT facet, value, COUNT(*) FROM ({values})
+                WHERE value IS NOT NULL AND value != ''
+                GROUP BY facet, value
+            """)
+
+            cursor.execute(f"""
+                CREATE TRIGGER trg_payment_facets_insert
+                AFTER INSERT ON payments
+                BEGIN{_payment_facets_apply_sql('NEW', '+')}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_payment_facets_update
+                AFTER UPDATE OF project_status, status, department, client_name, payment_date ON payments
+                BEGIN{_payment_facets_apply_sql('OLD', '-')}{_payment_facets_apply_sql('NEW', '+')}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_payment_facets_delete
+                AFTER DELETE ON payments
+                BEGIN{_payment_facets_apply_sql('OLD', '-')}
+                END
+            """)
+
+            for name, columns in PAYMENT_INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON payments({columns})")
 
-            # フィルター条件を追加
-            if filters:
-                if filters.get('search_term'):
-                    conditions.append("(project_name LIKE ? OR client_name LIKE ?)")
-                    search_param = f"%{filters['search_term']}%"
-                    params.extend([search_param, search_param])
-                
-                if filters.get('project_status'):
-                    conditions.append("project_status = ?")
-                    params.append(filters['project_status'])
-                
-                if filters.get('department'):
-                    conditions.append("department = ?")
-                    params.append(filters['department'])
-                
-                if filters.get('client_name'):
-                    conditions.append("client_name = ?")
-                    params.append(filters['client_name'])
-                
-                if filters.get('payment_month'):
-                    conditions.append("strftime('%Y-%m', REPLACE(payment_date, '/', '-')) = ?")
-                    params.append(filters['payment_month'])
-                
-                if filters.get('payment_status'):
-                    conditions.append("status = ?")
-                    params.append(filters['payment_status'])
-
-            # 条件を結合
-            if conditions:
-                base_query += " AND " + " AND ".join(conditions)
+            conn.commit()
+            log_message("支払いの絞込み項目の集計テーブルを再構築しました")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def build_project_filter_query(self, filters=None):
+        """案件絞込み用のクエリを作成（get_project_filter_data・CSV出力で共用）
+
+        Returns:
+            tuple: (クエリ, パラメータ)
+        """
+        # 基本クエリ
+        base_query = """
+            SELECT DISTINCT project_name, client_name, department, project_status, 
+                   project_start_date, project_end_date, budget,
+                   COUNT(*) as payment_count,
+                   SUM(amount) as total_amount
+            FROM payments 
+            WHERE project_name IS NOT NULL AND project_name != ''
+        """
+        
+        params = []
+        conditions = []
+
+        # フィルター条件を追加（絞込み項目はリストで複数選択可）
+        if filters:
+            if filters.get('search_term'):
+                conditions.append("(project_name LIKE ? OR client_name LIKE ?)")
+                search_param = f"%{filters['search_term']}%"
+                params.extend([search_param, search_param])
             
-            base_query += " GROUP BY project_name, client_name, department, project_status"
-            base_query += " ORDER BY project_name"
+            if filters.get('project_status'):
+                _facet_condition("project_status", filters['project_status'], conditions, params)
+            
+            if filters.get('department'):
+                _facet_condition("department", filters['department'], conditions, params)
+            
+            if filters.get('client_name'):
+                _facet_condition("client_name", filters['client_name'], conditions, params)
+            
+            if filters.get('payment_month'):
+                _facet_condition(_payment_facet_value('payment_month'), filters['payment_month'],
+                                 conditions, params)
+            
+            if filters.get('payment_status'):
+                _facet_condition("status", filters['payment_status'], conditions, params)
+
+        # 条件を結合
+        if conditions:
+            base_query += " AND " + " AND ".join(conditions)
+        
+        base_query += " GROUP BY project_name, client_name, department, project_status"
+        base_query += " ORDER BY project_name"
+
+        return base_query, params
+
+    def get_project_filter_data(self, filters=None):
+        """案件絞込み用のデータを取得"""
+        conn = self._connect(self.billing_db)
+        cursor = conn.cursor()
 
-            cursor.execute(base_query, params)
+        try:
+            cursor.execute(*self.build_project_filter_query(filters))
             project_rows = cursor.fetchall()
 
             return project_rows
@@ -1832,30 +2123,36 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def build_payments_by_project_query(self, project_name, payment_month=None):
+        """指定案件の支払いデータ取得用クエリを作成（get_payments_by_project・CSV出力で共用）
+
+        Returns:
+            tuple: (クエリ, パラメータ)
+        """
+        base_query = """
+            SELECT id, subject, project_name, payee, payee_code, amount, 
+                   payment_date, status, urgency_level, approver
+            FROM payments
+            WHERE project_name = ?
+        """
+        params = [project_name]
+        
+        # 支払い月フィルターを追加（日付形式変換対応、リストで複数選択可）
+        if payment_month:
+            conditions = []
+            _facet_condition(_payment_facet_value('payment_month'), payment_month, conditions, params)
+            base_query += " AND " + conditions[0]
+        
+        base_query += " ORDER BY payment_date DESC"
+        return base_query, params
+
     def get_payments_by_project(self, project_name, payment_month=None):
         """指定案件の支払いデータを取得"""
-        from utils import format_payee_code
-        
-        conn = sqlite3.connect(self.billing_db)
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
 
         try:
-            base_query = """
-                SELECT id, subject, project_name, payee, payee_code, amount, 
-                       payment_date, status, urgency_level, approver
-                FROM payments
-                WHERE project_name = ?
-            """
-            params = [project_name]
-            
-            # 支払い月フィルターを追加（日付形式変換対応）
-            if payment_month:
-                base_query += " AND strftime('%Y-%m', REPLACE(payment_date, '/', '-')) = ?"
-                params.append(payment_month)
-            
-            base_query += " ORDER BY payment_date DESC"
-            
-            cursor.execute(base_query, params)
+            cursor.execute(*self.build_payments_by_project_query(project_name, payment_month))
 
             payment_rows = cursor.fetchall()
 
@@ -1876,37 +2173,37 @@ class DatabaseManager:
             conn.close()
 
     def get_filter_options(self):
-        """絞込み用の選択肢を取得"""
-        conn = sqlite3.connect(self.billing_db)
-        cursor = conn.cursor()
+        """絞込み用の選択肢を取得
+
+        payments を走査せず、トリガーで差分更新される集計テーブル（payment_facets）から
+        値と件数を読み込みます。
 
+        Returns:
+            dict: 各絞込み項目の選択肢のリストと、
+                  'facet_counts'（絞込み項目 -> {値: 件数}）
+        """
         try:
-            # 案件進行状況の選択肢
-            cursor.execute("SELECT DISTINCT project_status FROM payments WHERE project_status IS NOT NULL AND project_status != ''")
-            project_status_options = [row[0] for row in cursor.fetchall()]
-            
-            # 支払い状態の選択肢
-            cursor.execute("SELECT DISTINCT status FROM payments WHERE status IS NOT NULL AND status != ''")
-            payment_status_options = [row[0] for row in cursor.fetchall()]
+            self._ensure_payment_facets()
+
+            conn = self._connect(self.billing_db)
+            try:
+                rows = conn.execute(
+                    "SELECT facet, value, count FROM payment_facets ORDER BY facet, value"
+                ).fetchall()
+            finally:
+                conn.close()
 
-            # 担当部門の選択肢
-            cursor.execute("SELECT DISTINCT department FROM payments WHERE department IS NOT NULL AND department != ''")
-            department_options = [row[0] for row in cursor.fetchall()]
+            facet_counts = {facet: {} for facet in PAYMENT_FACETS}
+            for facet, value, count in rows:
+                if facet in facet_counts:
+                    facet_counts[facet][value] = count
+
+            project_status_options = list(facet_counts['project_status'])
+            payment_status_options = list(facet_counts['status'])
+            department_options = list(facet_counts['department'])
+            client_options = list(facet_counts['client_name'])
+            payment_month_options = sorted(facet_counts['payment_month'], reverse=True)
 
-            # クライアントの選択肢
-            cursor.execute("SELECT DISTINCT client_name FROM payments WHERE client_name IS NOT NULL AND client_name != ''")
-            client_options = [row[0] for row in cursor.fetchall()]
-            
-            # 支払い月の選択肢（日付形式変換対応）
-            cursor.execute("""
-                SELECT DISTINCT strftime('%Y-%m', REPLACE(payment_date, '/', '-')) as payment_month
-                FROM payments 
-                WHERE payment_date IS NOT NULL AND payment_date != ''
-                AND strftime('%Y-%m', REPLACE(payment_date, '/', '-')) IS NOT NULL
-                ORDER BY payment_month DESC
-            """)
-            payment_month_options = [row[0] for row in cursor.fetchall() if row[0]]
-            
             # デバッグログ出力
             log_message(f"フィルターオプション取得結果:")
             log_message(f"  案件進行状況: {len(project_status_options)}件")
@@ -1920,7 +2217,8 @@ class DatabaseManager:
                 'payment_status_options': payment_status_options,
                 'department_options': department_options,
                 'client_options': client_options,
-                'payment_month_options': payment_month_options
+                'payment_month_options': payment_month_options,
+                'facet_counts': facet_counts
             }
 
         except Exception as e:
@@ -1932,14 +2230,13 @@ class DatabaseManager:
                 'payment_status_options': [],
                 'department_options': [],
                 'client_options': [],
-                'payment_month_options': []
+                'payment_month_options': [],
+                'facet_counts': {facet: {} for facet in PAYMENT_FACETS}
             }
-        finally:
-            conn.close()
 
     def update_payment_project_info(self, payment_id, project_info):
         """支払いデータの案件情報を更新"""
-        conn = sqlite3.connect(self.billing_db)
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
 
         try:
@@ -1965,6 +2262,7 @@ class DatabaseManager:
             )
 
             conn.commit()
+            publish_change('payments', [payment_id], UPDATE)
             return cursor.rowcount > 0
 
         except Exception as e:
@@ -1993,15 +2291,10 @@ class DatabaseManager:
         Returns:
             tuple: (照合成功件数, 未照合件数, エラーメッセージリスト)
         """
-        from utils import format_payee_code
-
-        # order_management.dbに接続
-        order_conn = sqlite3.connect("order_management.db")
-        order_cursor = order_conn.cursor()
-
-        # billing.dbに接続
-        billing_conn = sqlite3.connect(self.billing_db)
-        billing_cursor = billing_conn.cursor()
+        # order_management.dbに接続し、billing.dbを ATTACH（両方の更新を1回のコミットで確定）
+        conn = self._connect_federated('orders', 'billing')
+        order_cursor = conn.cursor()
+        billing_cursor = conn.cursor()
 
         try:
             target_month = f"{year:04d}-{month:02d}"
@@ -2036,12 +2329,13 @@ class DatabaseManager:
                 log_message(f"{year}年{month}月の照合対象発注データがありません")
                 return 0, 0, []
 
-            # 支払データを取得（未照合のもの）
+            # 支払データを取得（未照合のもの。費用項目に照合済みの支払い = payment_expense_items を除く）
             billing_cursor.execute("""
                 SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status
-                FROM payments
+                FROM billing.payments
                 WHERE payee_code IS NOT NULL AND payee_code != ''
                   AND status != '照合済'
+                  AND id NOT IN (SELECT payment_id FROM payment_expense_items)
                 ORDER BY id
             """)
 
@@ -2081,7 +2375,6 @@ class DatabaseManager:
                         expected_payment_year_month = order_year_month
                     else:  # 翌月末払い
                         # 翌月末払いの場合、発注月の翌月と照合
-                        from order_management.broadcast_utils import adjust_payment_date_by_timing
                         order_year = int(order_year_month[:4])
                         order_month = int(order_year_month[5:7])
                         adjusted_year, adjusted_month = adjust_payment_date_by_timing(
@@ -2094,7 +2387,6 @@ class DatabaseManager:
 
                 # 回数ベースの場合、期待金額を計算
                 if payment_type == "回数ベース" and broadcast_days and unit_price:
-                    from order_management.broadcast_utils import calculate_monthly_broadcast_count
                     try:
                         payment_year = int(payment_date[:4])
                         payment_month = int(payment_date[5:7])
@@ -2149,7 +2441,7 @@ class DatabaseManager:
 
                         # 支払テーブルを更新
                         billing_cursor.execute("""
-                            UPDATE payments
+                            UPDATE billing.payments
                             SET status = '照合済'
                             WHERE id = ?
                         """, (payment_id,))
@@ -2176,8 +2468,9 @@ class DatabaseManager:
                               f"期待月:{expected_payment_year_month})")
 
             # コミット
-            order_conn.commit()
-            billing_conn.commit()
+            conn.commit()
+            publish_change('expense_items', matched_order_ids, UPDATE)
+            publish_change('payments', matched_payment_ids, UPDATE)
 
             log_message(f"照合完了: {matched_count}件照合、{not_matched_count}件未照合")
 
@@ -2187,12 +2480,10 @@ class DatabaseManager:
             log_message(f"照合処理エラー: {e}")
             import traceback
             log_message(f"エラー詳細: {traceback.format_exc()}")
-            order_conn.rollback()
-            billing_conn.rollback()
+            conn.rollback()
             return 0, 0, [str(e)]
         finally:
-            order_conn.close()
-            billing_conn.close()
+            conn.close()
 
     def _split_program_and_item(self, project_name_full):
         """
@@ -2230,10 +2521,48 @@ class DatabaseManager:
             # キーワードが見つからない場合は全体を番組名として返す
             return project_name_full, ""
 
+    def _prepare_expense_master_split(self, cursor):
+        """照合用の番組名・費用項目を費用マスターに保存（ATTACH済みの expense_master スキーマ）
+
+        案件名から分離した番組名・費用項目を program_name / item_name 列に保存し、
+        分離元の案件名を split_source 列に記録します。案件名が変わった行
+        （split_source と一致しない行）だけを分離し直します。
+        """
+        cursor.execute("PRAGMA expense_master.table_info(expense_master)")
+        master_columns = {column[1] for column in cursor.fetchall()}
+        for col_name in EXPENSE_MASTER_SPLIT_COLUMNS:
+            if col_name not in master_columns:
+                cursor.execute(f"ALTER TABLE expense_master.expense_master ADD COLUMN {col_name} TEXT")
+
+        cursor.execute("""
+            SELECT id, project_name FROM expense_master.expense_master
+            WHERE split_source IS NOT project_name
+        """)
+        updates = []
+        for master_id, project_name in cursor.fetchall():
+            program_name, item_name = self._split_program_and_item(project_name or "")
+            updates.append((program_name, item_name, project_name, master_id))
+        if updates:
+            cursor.executemany("""
+                UPDATE expense_master.expense_master
+                SET program_name = ?, item_name = ?, split_source = ?
+                WHERE id = ?
+            """, updates)
+            log_message(f"費用マスターの番組名・費用項目を分離: {len(updates)}件")
+
+        # 番組ID・取引先ID・費用項目で契約を引くための索引
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS main.idx_contracts_production_partner_item
+            ON contracts(production_id, partner_id, item_name)
+        """)
+
     def get_expense_master_with_order_status(self):
         """
         費用マスターの全レコードと発注登録状況を取得
 
+        order_management.db の接続に expense_master.db・payee_master.db を ATTACH し、
+        1回の LEFT JOIN で全件の発注登録状況を判定します。
+
         Returns:
             list: 費用マスター情報と発注状況のリスト
             [
@@ -2256,52 +2585,44 @@ class DatabaseManager:
                 ...
             ]
         """
-        master_conn = sqlite3.connect(self.expense_master_db)
-        order_conn = sqlite3.connect("order_management.db")
+        order_conn = self._connect_federated('orders', 'expense_master', 'payee_master')
 
         try:
-            master_cursor = master_conn.cursor()
-            order_cursor = order_conn.cursor()
-
-            # 費用マスターの全レコードを取得
-            master_cursor.execute("""
-                SELECT id, project_name, payee, payee_code, amount,
-                       start_date, end_date, payment_type, payment_timing,
-                       broadcast_days
-                FROM expense_master
-                ORDER BY project_name
+            cursor = order_conn.cursor()
+            self._prepare_expense_master_split(cursor)
+            order_conn.commit()
+
+            # contractsで照合
+            # 照合条件:
+            # 1. productions.name = 案件名から分離した番組名
+            # 2. contracts.item_name = 案件名から分離した費用項目（未設定の契約も一致）
+            # 3. partners.name = 取引先名（一致する取引先がない場合は、支払い先マスターの
+            #    支払い先コードが一致する取引先 = payee_partners）
+            cursor.execute("""
+                SELECT m.id, m.project_name, m.program_name, m.item_name,
+                       m.payee, m.payee_code, m.amount,
+                       m.start_date, m.end_date, m.payment_type, m.payment_timing,
+                       m.broadcast_days, MIN(c.id)
+                FROM expense_master.expense_master m
+                LEFT JOIN productions prod ON prod.name = m.program_name
+                LEFT JOIN partners p ON p.id = COALESCE(
+                    (SELECT id FROM partners WHERE name = m.payee),
+                    (SELECT partner_id FROM payee_partners WHERE payee_name = m.payee ORDER BY partner_id)
+                )
+                LEFT JOIN contracts c
+                       ON c.production_id = prod.id
+                      AND c.partner_id = p.id
+                      AND (c.item_name = m.item_name OR c.item_name IS NULL)
+                GROUP BY m.id
+                ORDER BY m.project_name, m.id
             """)
 
-            expense_records = master_cursor.fetchall()
             results = []
-
-            for record in expense_records:
-                (master_id, project_name_full, payee, payee_code, amount,
-                 start_date, end_date, payment_type, payment_timing,
-                 broadcast_days) = record
-
-                # 番組名と費用項目を分離
-                program_name, item_name = self._split_program_and_item(project_name_full)
-
-                # contractsで照合
-                # 照合条件:
-                # 1. productions.name = 抽出した制作物名
-                # 2. contracts.item_name = 抽出した費用項目
-                # 3. partners.name = 取引先名
-                order_cursor.execute("""
-                    SELECT c.id
-                    FROM contracts c
-                    LEFT JOIN productions prod ON c.production_id = prod.id
-                    LEFT JOIN partners p ON c.partner_id = p.id
-                    WHERE prod.name = ?
-                      AND (c.item_name = ? OR c.item_name IS NULL)
-                      AND p.name = ?
-                    LIMIT 1
-                """, (program_name, item_name, payee))
-
-                order_result = order_cursor.fetchone()
-                has_order = order_result is not None
-                order_contract_id = order_result[0] if has_order else None
+            for record in cursor.fetchall():
+                (master_id, project_name_full, program_name, item_name,
+                 payee, payee_code, amount, start_date, end_date,
+                 payment_type, payment_timing, broadcast_days,
+                 order_contract_id) = record
 
                 results.append({
                     'master_id': master_id,
@@ -2316,7 +2637,7 @@ class DatabaseManager:
                     'payment_type': payment_type or "月額固定",
                     'payment_timing': payment_timing or "翌月末払い",
                     'broadcast_days': broadcast_days or "",
-                    'has_order': has_order,
+                    'has_order': order_contract_id is not None,
                     'order_contract_id': order_contract_id
                 })
 
@@ -2327,9 +2648,9 @@ class DatabaseManager:
             log_message(f"費用マスターチェックエラー: {e}")
             import traceback
             log_message(f"エラー詳細: {traceback.format_exc()}")
+            order_conn.rollback()
             return []
         finally:
-            master_conn.close()
             order_conn.close()
 
     def generate_monthly_payment_schedule(self, target_month=None):
@@ -2339,141 +2660,221 @@ class DatabaseManager:
             target_month: 対象月 "YYYY-MM" 形式。Noneの場合は全期間
 
         Returns:
-            List[dict]: 月次支払予定のリスト
+            List[ScheduleEntry]: 月次支払予定のリスト
         """
-        from datetime import datetime
-        from dateutil.relativedelta import relativedelta
+        try:
+            schedule = list(self.iter_monthly_payment_schedule(target_month))
+            log_message(f"月次支払予定生成完了: {len(schedule)}件")
+            return schedule
 
-        order_conn = sqlite3.connect(self.order_db_path)
-        order_conn.row_factory = sqlite3.Row
-        order_cursor = order_conn.cursor()
+        except Exception as e:
+            log_message(f"月次支払予定生成エラー: {e}")
+            import traceback
+            log_message(f"エラー詳細: {traceback.format_exc()}")
+            return []
 
-        schedule = []
+    def iter_monthly_payment_schedule(self, target_month=None):
+        """発注マスターから月次支払予定を順に生成（ジェネレーター）
 
-        try:
-            # contractsから全レコードを取得
-            order_cursor.execute("""
-                SELECT
-                    c.id as order_contract_id,
-                    c.production_id,
-                    prod.name as production_name,
-                    c.partner_id,
-                    p.name as partner_name,
-                    p.code as partner_code,
-                    c.item_name,
-                    c.contract_start_date,
-                    c.contract_end_date,
-                    c.implementation_date,
-                    COALESCE(c.payment_type, '月額固定') as payment_type,
-                    c.unit_price,
-                    c.spot_amount,
-                    COALESCE(c.order_category, 'レギュラー制作発注書') as order_category,
-                    COALESCE(c.document_type, '発注書') as document_type,
-                    COALESCE(c.document_status, '未完了') as document_status,
-                    c.pdf_status,
-                    c.pdf_distributed_date,
-                    c.email_sent_date
-                FROM contracts c
-                LEFT JOIN productions prod ON c.production_id = prod.id
-                LEFT JOIN partners p ON c.partner_id = p.id
-            """)
+        target_month を指定した場合は、その月に該当する契約だけをSQLで絞り込み、
+        契約ごとに該当月の1件を返します。指定しない場合は、レギュラー契約を
+        契約期間の月ごとに展開しながら返します（全件をメモリに載せません）。
+
+        Args:
+            target_month: 対象月 "YYYY-MM" 形式。Noneの場合は全期間
+
+        Yields:
+            ScheduleEntry: 月次支払予定
+        """
+        query = """
+            SELECT
+                c.id,
+                c.production_id,
+                prod.name as production_name,
+                c.partner_id,
+                p.name as partner_name,
+                p.code as partner_code,
+                c.item_name,
+                c.contract_start_date,
+                c.contract_end_date,
+                c.implementation_date,
+                COALESCE(c.payment_type, '月額固定') as payment_type,
+                c.unit_price,
+                c.spot_amount,
+                COALESCE(c.order_category, 'レギュラー制作発注書') as order_category,
+                COALESCE(c.document_type, '発注書') as document_type,
+                COALESCE(c.document_status, '未完了') as document_status,
+                c.pdf_status,
+                c.pdf_distributed_date,
+                c.email_sent_date
+            FROM contracts c
+            LEFT JOIN productions prod ON c.production_id = prod.id
+            LEFT JOIN partners p ON c.partner_id = p.id
+        """
+        params = []
+        if target_month:
+            # 単発は実施月、レギュラーは契約期間が対象月に重なるもの
+            query += """
+            WHERE (COALESCE(c.order_category, 'レギュラー制作発注書') LIKE '単発%'
+                   AND substr(c.implementation_date, 1, 7) = ?)
+               OR (COALESCE(c.order_category, 'レギュラー制作発注書') NOT LIKE '単発%'
+                   AND c.contract_start_date <= ? AND c.contract_end_date >= ?)
+            """
+            params = [target_month, f"{target_month}-31", f"{target_month}-01"]
+
+        # 回数ベースの金額計算に使う放送回数を、対象期間分まとめて計算
+        if target_month:
+            months = [target_month]
+        else:
+            months = self._count_based_contract_months()
+        broadcast_counts = self.get_monthly_broadcast_counts(months)
 
-            contracts = order_cursor.fetchall()
+        order_conn = self._connect(self.order_db_path)
+        order_cursor = order_conn.cursor()
+        order_cursor.row_factory = record_factory(Contract)
 
-            for contract in contracts:
+        try:
+            for contract in order_cursor.execute(query, params):
                 # 単発案件の処理
-                if contract['order_category'] and contract['order_category'].startswith('単発'):
-                    if contract['implementation_date']:
-                        impl_date = datetime.strptime(contract['implementation_date'], '%Y-%m-%d')
+                if contract.order_category and contract.order_category.startswith('単発'):
+                    if contract.implementation_date:
+                        impl_date = datetime.strptime(contract.implementation_date, '%Y-%m-%d')
                         year_month = impl_date.strftime('%Y-%m')
 
-                        # target_monthが指定されている場合はフィルタ
-                        if target_month and year_month != target_month:
-                            continue
-
-                        amount = contract['spot_amount'] if contract['spot_amount'] else 0
-
-                        schedule.append({
-                            'item_name': contract['item_name'] or '',
-                            'partner_id': contract['partner_id'],
-                            'partner_name': contract['partner_name'] or '',
-                            'partner_code': contract['partner_code'] or '',
-                            'year_month': year_month,
-                            'amount': amount,
-                            'order_contract_id': contract['order_contract_id'],
-                            'order_category': contract['order_category'],
-                            'document_type': contract['document_type'],
-                            'document_status': contract['document_status'],
-                            'pdf_status': contract['pdf_status'],
-                            'pdf_distributed_date': contract['pdf_distributed_date'],
-                            'email_sent_date': contract['email_sent_date'],
-                            'program_name': contract['production_name'] or '',
-                            'contract_start_date': contract['implementation_date'],
-                            'contract_end_date': contract['implementation_date']
-                        })
+                        amount = contract.spot_amount if contract.spot_amount else 0
+                        yield self._schedule_entry(contract, year_month, amount,
+                                                   contract.implementation_date, contract.implementation_date)
 
                 # レギュラー案件の処理
                 else:
-                    if not contract['contract_start_date'] or not contract['contract_end_date']:
+                    if not contract.contract_start_date or not contract.contract_end_date:
                         continue
 
-                    start_date = datetime.strptime(contract['contract_start_date'], '%Y-%m-%d')
-                    end_date = datetime.strptime(contract['contract_end_date'], '%Y-%m-%d')
-
-                    # 月ごとに展開
-                    current_date = start_date.replace(day=1)  # 月初に設定
-                    end_month = end_date.replace(day=1)
-
-                    while current_date <= end_month:
-                        year_month = current_date.strftime('%Y-%m')
+                    start_date = datetime.strptime(contract.contract_start_date, '%Y-%m-%d')
+                    end_date = datetime.strptime(contract.contract_end_date, '%Y-%m-%d')
 
-                        # target_monthが指定されている場合はフィルタ
-                        if target_month and year_month != target_month:
-                            current_date = current_date + relativedelta(months=1)
-                            continue
+                    if target_month:
+                        # SQLで契約期間に対象月を含むものに絞り込み済み
+                        months = [target_month]
+                    else:
+                        months = self._iter_months(start_date, end_date)
 
+                    for year_month in months:
                         # 金額計算
-                        if contract['payment_type'] == '回数ベース':
-                            # 回数ベース: 単価 × 回数（暫定的に4回とする）
-                            # TODO: 実際の放送回数を取得する仕組みが必要
-                            unit_price = contract['unit_price'] if contract['unit_price'] else 0
-                            amount = unit_price * 4
+                        if contract.payment_type == '回数ベース':
+                            # 回数ベース: 単価 × その月の放送回数（放送例外を反映）
+                            unit_price = contract.unit_price if contract.unit_price else 0
+                            broadcast_count = broadcast_counts.get((contract.production_id, year_month))
+                            if broadcast_count is None:
+                                # 放送曜日が未設定の番組は月4回で概算
+                                broadcast_count = 4
+                            amount = unit_price * broadcast_count
                         else:
                             # 月額固定
-                            amount = contract['unit_price'] if contract['unit_price'] else 0
-
-                        schedule.append({
-                            'item_name': contract['item_name'] or '',
-                            'partner_id': contract['partner_id'],
-                            'partner_name': contract['partner_name'] or '',
-                            'partner_code': contract['partner_code'] or '',
-                            'year_month': year_month,
-                            'amount': amount,
-                            'order_contract_id': contract['order_contract_id'],
-                            'order_category': contract['order_category'],
-                            'document_type': contract['document_type'],
-                            'document_status': contract['document_status'],
-                            'pdf_status': contract['pdf_status'],
-                            'pdf_distributed_date': contract['pdf_distributed_date'],
-                            'email_sent_date': contract['email_sent_date'],
-                            'program_name': contract['production_name'] or '',
-                            'contract_start_date': contract['contract_start_date'],
-                            'contract_end_date': contract['contract_end_date']
-                        })
-
-                        current_date = current_date + relativedelta(months=1)
-
-            log_message(f"月次支払予定生成完了: {len(schedule)}件")
-            return schedule
+                            amount = contract.unit_price if contract.unit_price else 0
 
-        except Exception as e:
-            log_message(f"月次支払予定生成エラー: {e}")
-            import traceback
-            log_message(f"エラー詳細: {traceback.format_exc()}")
-            return []
+                        yield self._schedule_entry(contract, year_month, amount,
+                                                   contract.contract_start_date, contract.contract_end_date)
         finally:
             order_conn.close()
 
+    def _count_based_contract_months(self):
+        """回数ベースの契約期間に含まれる月（"YYYY-MM"）のリスト"""
+        conn = self._connect(self.order_db_path)
+        try:
+            first, last = conn.execute("""
+                SELECT MIN(contract_start_date), MAX(contract_end_date)
+                FROM contracts
+                WHERE payment_type = '回数ベース'
+                  AND contract_start_date IS NOT NULL AND contract_start_date != ''
+                  AND contract_end_date IS NOT NULL AND contract_end_date != ''
+            """).fetchone()
+        finally:
+            conn.close()
+
+        if not first or not last:
+            return []
+        return list(self._iter_months(datetime.strptime(first, '%Y-%m-%d'),
+                                      datetime.strptime(last, '%Y-%m-%d')))
+
+    def get_monthly_broadcast_counts(self, months):
+        """回数ベース契約の番組について、月ごとの放送回数を取得
+
+        productions.broadcast_days（放送曜日）と broadcast_exceptions（休止・追加放送）から
+        未計算の月をまとめて1回で計算し、キャッシュします。
+        order_management.db が更新されるとキャッシュを破棄します。
+
+        Args:
+            months: 対象月 "YYYY-MM" のリスト
+
+        Returns:
+            dict: {(番組ID, "YYYY-MM"): 放送回数}（放送曜日が未設定の番組は含まない）
+        """
+        stamp = file_stamp(self.order_db_path)
+        cached_stamp, cached_months, counts = self._broadcast_count_cache
+        if stamp != cached_stamp:
+            cached_months, counts = set(), {}
+
+        missing = sorted(set(months) - cached_months)
+        if missing:
+            conn = self._connect(self.order_db_path)
+            try:
+                broadcast_days = dict(conn.execute("""
+                    SELECT id, broadcast_days FROM productions
+                    WHERE broadcast_days IS NOT NULL AND broadcast_days != ''
+                      AND id IN (SELECT production_id FROM contracts WHERE payment_type = '回数ベース')
+                """).fetchall())
+                try:
+                    exceptions = conn.execute("""
+                        SELECT production_id, broadcast_date, exception_type
+                        FROM broadcast_exceptions
+                        WHERE broadcast_date >= ? AND broadcast_date <= ?
+                    """, (f"{missing[0]}-01", f"{missing[-1]}-31")).fetchall()
+                except sqlite3.OperationalError:
+                    # 放送例外テーブルが未作成（OrderManagementDB を未初期化）
+                    exceptions = []
+            finally:
+                conn.close()
+
+            counts = dict(counts)
+            counts.update(build_monthly_broadcast_counts(broadcast_days, missing, exceptions))
+            cached_months = cached_months | set(missing)
+            self._broadcast_count_cache = (stamp, cached_months, counts)
+
+        return counts
+
+    @staticmethod
+    def _iter_months(start_date, end_date):
+        """開始日の月から終了日の月までの "YYYY-MM" を順に返す"""
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            yield f"{year:04d}-{month:02d}"
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+
+    @staticmethod
+    def _schedule_entry(contract, year_month, amount, contract_start_date, contract_end_date):
+        """発注契約から月次支払予定を作成"""
+        return ScheduleEntry(
+            item_name=contract.item_name or '',
+            partner_id=contract.partner_id,
+            partner_name=contract.partner_name or '',
+            partner_code=contract.partner_code or '',
+            year_month=year_month,
+            amount=amount,
+            order_contract_id=contract.id,
+            order_category=contract.order_category,
+            document_type=contract.document_type,
+            document_status=contract.document_status,
+            pdf_status=contract.pdf_status,
+            pdf_distributed_date=contract.pdf_distributed_date,
+            email_sent_date=contract.email_sent_date,
+            program_name=contract.production_name or '',
+            contract_start_date=contract_start_date,
+            contract_end_date=contract_end_date
+        )
+
     def check_payments_against_schedule(self, target_month):
         """月次支払予定と実績を照合
 
@@ -2483,15 +2884,13 @@ class DatabaseManager:
         Returns:
             List[dict]: 照合結果
         """
-        from datetime import datetime
-
         # 月次支払予定を生成
         schedule = self.generate_monthly_payment_schedule(target_month)
 
         # paymentsテーブルから該当月の実績を取得
-        conn = sqlite3.connect(self.billing_db)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect(self.billing_db)
         cursor = conn.cursor()
+        cursor.row_factory = record_factory(Payment)
 
         results = []
 
@@ -2511,9 +2910,15 @@ class DatabaseManager:
                 WHERE substr(replace(payment_date, '/', '-'), 1, 7) = ?
             """, (target_month,))
 
-            all_payments = [dict(row) for row in cursor.fetchall()]
-            payments = {(row['payee_code'], row['amount']): row for row in all_payments}
-            matched_payment_keys = set()  # マッチングした支払実績を記録
+            all_payments = cursor.fetchall()
+            # 同じ支払先コード・金額の支払いが複数ある場合に備え、キーごとに順番待ちで保持
+            payments = defaultdict(deque)
+            for payment in all_payments:
+                key = self._payment_match_key(payment.payee_code, payment.amount)
+                if key is not None:
+                    payments[key].append(payment)
+            matched_payment_ids = set()  # マッチングした支払実績を記録
+            expense_updates = []  # 照合成功時のexpense_items更新（最後にまとめて反映）
 
             # 各支払予定について照合
             for sched in schedule:
@@ -2524,21 +2929,22 @@ class DatabaseManager:
                 actual_payment = None
                 actual_amount = None
 
-                # 支払先コードと金額が完全一致するものを検索
-                key = (partner_code, scheduled_amount)
-                if key in payments:
-                    actual_payment = payments[key]
+                # 支払先コードと金額が完全一致するもの（未使用の最初の1件）を検索
+                # （支払先コードが空の予定は照合しない）
+                candidates = payments.get(self._payment_match_key(partner_code, scheduled_amount))
+                if candidates:
+                    actual_payment = candidates.popleft()
                     actual_amount = scheduled_amount
-                    matched_payment_keys.add(key)  # マッチング記録
+                    matched_payment_ids.add(actual_payment.id)  # マッチング記録
 
                     # 照合成功時：expense_itemsを更新
                     if sched['order_contract_id']:
-                        self._update_expense_items_payment_status(
-                            contract_id=sched['order_contract_id'],
-                            year_month=sched['year_month'],
-                            payment_id=actual_payment['id'],
-                            payment_date=actual_payment['payment_date']
-                        )
+                        expense_updates.append((
+                            sched['order_contract_id'],
+                            sched['year_month'],
+                            actual_payment.id,
+                            actual_payment.payment_date
+                        ))
 
                 # ステータス判定
                 missing_items = []
@@ -2607,10 +3013,11 @@ class DatabaseManager:
                     'contract_end_date': sched['contract_end_date']
                 })
 
+            self._update_expense_items_payment_status_bulk(expense_updates)
+
             # マッチングしなかった支払実績を追加（発注なしの支払い）
             for payment in all_payments:
-                key = (payment['payee_code'], payment['amount'])
-                if key not in matched_payment_keys:
+                if payment.id not in matched_payment_ids:
                     # 発注契約がない支払い
                     results.append({
                         'item_name': payment.get('project_name', ''),
@@ -2643,6 +3050,17 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @staticmethod
+    def _payment_match_key(payee_code, amount):
+        """支払予定と支払実績を照合するキー（支払先コードは format_payee_code で正規化）
+
+        支払先コードが空・NULL の場合は None（空のコード同士を一致させない）
+        """
+        code = format_payee_code(payee_code)
+        if not code:
+            return None
+        return code, float(amount) if amount is not None else None
+
     def _update_expense_items_payment_status(self, contract_id, year_month, payment_id, payment_date):
         """照合成功時にexpense_itemsの支払情報を更新
 
@@ -2652,35 +3070,50 @@ class DatabaseManager:
             payment_id: billing.dbのpayments.id
             payment_date: 支払日 "YYYY/MM/DD" 形式
         """
-        try:
-            order_conn = sqlite3.connect(self.order_db_path)
-            order_cursor = order_conn.cursor()
+        self._update_expense_items_payment_status_bulk([(contract_id, year_month, payment_id, payment_date)])
+
+    def _update_expense_items_payment_status_bulk(self, updates):
+        """照合成功時にexpense_itemsの支払情報をまとめて更新（1トランザクション）
+
+        Args:
+            updates: (契約ID, 支払年月 "YYYY-MM", billing.dbのpayments.id, 支払日) のリスト
+        """
+        if not updates:
+            return
 
+        params = []
+        for contract_id, year_month, payment_id, payment_date in updates:
             # payment_dateを"YYYY-MM-DD"形式に変換
-            from datetime import datetime
-            if '/' in payment_date:
-                payment_date_obj = datetime.strptime(payment_date, '%Y/%m/%d')
-                payment_date_formatted = payment_date_obj.strftime('%Y-%m-%d')
+            if payment_date and '/' in payment_date:
+                payment_date_formatted = datetime.strptime(payment_date, '%Y/%m/%d').strftime('%Y-%m-%d')
             else:
                 payment_date_formatted = payment_date
+            params.append((payment_id, payment_date_formatted, contract_id, year_month))
 
-            # contract_idと支払月が一致するexpense_itemsを更新
-            order_cursor.execute("""
-                UPDATE expense_items
-                SET payment_matched_id = ?,
-                    payment_status = '支払済',
-                    actual_payment_date = ?
-                WHERE contract_id = ?
-                  AND strftime('%Y-%m', expected_payment_date) = ?
-                  AND (payment_matched_id IS NULL OR payment_matched_id = '')
-            """, (payment_id, payment_date_formatted, contract_id, year_month))
-
-            updated_count = order_cursor.rowcount
-            if updated_count > 0:
-                log_message(f"expense_items更新: contract_id={contract_id}, 月={year_month}, {updated_count}件")
+        try:
+            order_conn = self._connect(self.order_db_path)
+            try:
+                order_cursor = order_conn.cursor()
+                # contract_idと支払月が一致するexpense_itemsを更新
+                # （executemany の rowcount は全件の更新行数の合計。コミットは最後に1回）
+                order_cursor.executemany("""
+                    UPDATE expense_items
+                    SET payment_matched_id = ?,
+                        payment_status = '支払済',
+                        actual_payment_date = ?
+                    WHERE contract_id = ?
+                      AND strftime('%Y-%m', expected_payment_date) = ?
+                      AND (payment_matched_id IS NULL OR payment_matched_id = '')
+                """, params)
+                updated_count = max(order_cursor.rowcount, 0)
+
+                order_conn.commit()
+            finally:
+                order_conn.close()
 
-            order_conn.commit()
-            order_conn.close()
+            if updated_count > 0:
+                log_message(f"expense_items更新: {len(params)}件の照合から{updated_count}件")
+                publish_change('expense_items', None, UPDATE)
 
         except Exception as e:
             log_message(f"expense_items更新エラー: {e}")
@@ -0,0 +1,311 @@
+"""SQLiteデータベースのオンラインバックアップ
+
+sqlite3.Connection.backup（SQLiteのバックアップAPI）で、アプリが接続を保持したままでも
+安全にDBファイルを複製します。ファイルのコピーと違い、書き込み途中の状態を複製しません。
+
+- 複製は PAGES_PER_STEP ページずつ行い、ステップの間は他の接続が書き込めるようにする
+  （ステップ中はGILを解放するため、別スレッドで実行すれば画面は止まらない）
+- 前回の同じ種類のバックアップからDBが変わっていなければ複製しない
+  （DBヘッダーの変更カウンターと、DB・WALファイルのサイズ・更新日時で判定）
+- 複製したファイルは PRAGMA quick_check で検証してから確定する（検証済みの復元ポイント）
+- DBファイル・種類ごとに新しいものから keep 件を残し、古いものは削除する
+
+バックアップは backups/ に <DB名>_<種類>_<日時>.db の名前で保存します。
+種類: auto（定期）, pre_migration（マイグレーション前）, pre_import（一括取込前）,
+      pre_archive（アーカイブDBへの移動前） 等
+
+使用例:
+    # マイグレーション・一括取込の前（検証済みの復元ポイントのパスを返す）
+    create_restore_point("order_management.db", "pre_migration")
+
+    # 起動時に全DBを別スレッドでバックアップ
+    start_background_backup(["billing.db", "order_management.db"])
+
+    # 復元
+    restore_backup("backups/order_management_pre_migration_20250101_120000.db",
+                   "order_management.db")
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from search_cache import file_stamp
+from utils import create_backup_filename, ensure_directory_exists, log_message
+
+BACKUP_DIR = "backups"
+
+# DBファイル・種類ごとに残すバックアップの数
+KEEP_BACKUPS = 10
+
+# 1ステップで複製するページ数と、ステップ間の待ち時間（秒）
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.005
+
+# 前回のバックアップの記録（DBファイル・種類 -> バックアップのパス・DBの状態）
+MANIFEST_NAME = "manifest.json"
+
+_manifest_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    """バックアップ・復元の失敗（検証エラー等）"""
+
+
+def change_stamp(db_path):
+    """DBの変更判定用の値（ヘッダーの変更カウンター, DB・WALファイルのサイズ・更新日時）
+
+    変更カウンターはロールバックジャーナルモードでコミットごとに増えます。
+    WALモードでは増えないことがあるため、WALファイルの状態も合わせて比較します。
+    """
+    try:
+        with open(db_path, "rb") as f:
+            header = f.read(28)
+        counter = int.from_bytes(header[24:28], "big") if len(header) == 28 else None
+    except OSError:
+        counter = None
+    return [counter, [list(item) if item else None for item in file_stamp(db_path)]]
+
+
+def _manifest_path(backup_dir):
+    return os.path.join(backup_dir, MANIFEST_NAME)
+
+
+def _load_manifest(backup_dir):
+    try:
+        with open(_manifest_path(backup_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(backup_dir, manifest):
+    path = _manifest_path(backup_dir)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _manifest_key(db_path, label):
+    return f"{os.path.abspath(db_path)}|{label}"
+
+
+def _backup_prefix(db_path, label):
+    """バックアップファイル名の先頭（<DB名>_<種類>_）"""
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    return f"{name}_{label}_"
+
+
+def _new_backup_path(db_path, label, backup_dir):
+    """重複しないバックアップファイルのパス"""
+    base = create_backup_filename(os.path.join(backup_dir, os.path.basename(db_path)), label)
+    path, number = base, 1
+    while os.path.exists(path):
+        stem, ext = os.path.splitext(base)
+        path = f"{stem}_{number}{ext}"
+        number += 1
+    return path
+
+
+def _pause(status, remaining, total):
+    """ステップ間で他の接続・スレッドに処理を譲る"""
+    if remaining:
+        time.sleep(STEP_PAUSE)
+
+
+def verify_backup(path):
+    """バックアップファイルを検証（PRAGMA quick_check）
+
+    Raises:
+        BackupError: 検証に失敗した場合
+    """
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA quick_check").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        raise BackupError(f"バックアップを開けません: {path}: {e}")
+    if not result or result[0] != "ok":
+        raise BackupError(f"バックアップの検証に失敗しました: {path}: {result[0] if result else ''}")
+
+
+def list_backups(db_path, label=None, backup_dir=BACKUP_DIR):
+    """DBファイルのバックアップのパス（新しい順）
+
+    Args:
+        db_path: DBファイルのパス
+        label: 種類（None の場合はすべて）
+        backup_dir: バックアップの保存先
+    """
+    if not os.path.isdir(backup_dir):
+        return []
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    prefix = _backup_prefix(db_path, label) if label else f"{name}_"
+    ext = os.path.splitext(db_path)[1]
+    paths = [
+        os.path.join(backup_dir, filename)
+        for filename in os.listdir(backup_dir)
+        if filename.startswith(prefix) and filename.endswith(ext)
+    ]
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path), reverse=True)
+
+
+def _rotate(db_path, label, backup_dir, keep):
+    """新しいものから keep 件を残して古いバックアップを削除"""
+    removed = 0
+    for path in list_backups(db_path, label, backup_dir)[keep:]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            log_message(f"古いバックアップを削除できません: {path}: {e}")
+    return removed
+
+
+def backup_database(source, label="auto", backup_dir=BACKUP_DIR, keep=KEEP_BACKUPS):
+    """DBをバックアップAPIで複製し、検証・世代管理する
+
+    前回の同じ種類のバックアップからDBが変わっていない場合は複製せず、
+    前回のバックアップのパスを返します。
+
+    Args:
+        source: DBファイルのパス、または接続（トランザクション中でない場合はその接続から複製）
+        label: バックアップの種類（ファイル名に含める）
+        backup_dir: 保存先のディレクトリ
+        keep: DBファイル・種類ごとに残す数
+
+    Returns:
+        dict: {'path': バックアップのパス（DBが空・メモリ上の場合は None）, 'copied': 複製したか}
+
+    Raises:
+        BackupError: 複製・検証に失敗した場合
+    """
+    if isinstance(source, str):
+        db_path, source_conn = source, None
+    else:
+        row = source.execute("PRAGMA database_list").fetchone()
+        db_path = row[2] if row else ""
+        source_conn = None if source.in_transaction else source
+
+    if not db_path or not os.path.exists(db_path) or os.path.getsize(db_path) == 0:
+        return {'path': None, 'copied': False}
+
+    ensure_directory_exists(backup_dir)
+    key = _manifest_key(db_path, label)
+    stamp = change_stamp(db_path)
+
+    with _manifest_lock:
+        previous = _load_manifest(backup_dir).get(key)
+    if previous and previous.get('stamp') == stamp and os.path.exists(previous.get('path', "")):
+        return {'path': previous['path'], 'copied': False}
+
+    path = _new_backup_path(db_path, label, backup_dir)
+    partial = path + ".partial"
+    started = time.perf_counter()
+    try:
+        conn = source_conn or sqlite3.connect(db_path)
+        try:
+            target = sqlite3.connect(partial)
+            try:
+                conn.backup(target, pages=PAGES_PER_STEP, progress=_pause)
+            finally:
+                target.close()
+        finally:
+            if conn is not source_conn:
+                conn.close()
+        verify_backup(partial)
+        os.replace(partial, path)
+    except (sqlite3.Error, OSError, BackupError) as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise BackupError(f"バックアップに失敗しました: {db_path}: {e}")
+
+    with _manifest_lock:
+        manifest = _load_manifest(backup_dir)
+        manifest[key] = {'path': path, 'stamp': stamp}
+        _save_manifest(backup_dir, manifest)
+
+    removed = _rotate(db_path, label, backup_dir, keep)
+    log_message(
+        f"バックアップ作成: {db_path} -> {path} "
+        f"（{(time.perf_counter() - started) * 1000:.0f}ms, 古いバックアップ {removed}件削除）"
+    )
+    return {'path': path, 'copied': True}
+
+
+def create_restore_point(source, reason, backup_dir=BACKUP_DIR, keep=KEEP_BACKUPS):
+    """マイグレーション・一括取込の前に検証済みの復元ポイントを作成
+
+    Args:
+        source: DBファイルのパス、または接続
+        reason: 種類（'pre_migration', 'pre_import' 等）
+
+    Returns:
+        str: 復元ポイントのパス（DBが空・メモリ上の場合は None）
+
+    Raises:
+        BackupError: 作成できない場合（呼び出し側は処理を中止する）
+    """
+    return backup_database(source, reason, backup_dir, keep)['path']
+
+
+def backup_all(db_paths, label="auto", backup_dir=BACKUP_DIR, keep=KEEP_BACKUPS):
+    """複数のDBファイルをバックアップ（失敗したファイルがあっても続ける）
+
+    Returns:
+        dict: {'copied': 複製した数, 'skipped': 変更がなく省略した数, 'failed': 失敗した数}
+    """
+    result = {'copied': 0, 'skipped': 0, 'failed': 0}
+    for db_path in db_paths:
+        try:
+            copied = backup_database(db_path, label, backup_dir, keep)
+        except BackupError as e:
+            log_message(str(e))
+            result['failed'] += 1
+            continue
+        result['copied' if copied['copied'] else 'skipped'] += 1
+    return result
+
+
+def start_background_backup(db_paths, label="auto", backup_dir=BACKUP_DIR, keep=KEEP_BACKUPS):
+    """別スレッドで backup_all を実行（画面を止めずに定期バックアップする）
+
+    Returns:
+        threading.Thread: 実行中のスレッド
+    """
+    thread = threading.Thread(
+        target=backup_all, args=(list(db_paths), label, backup_dir, keep),
+        name="db-backup", daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def restore_backup(backup_path, db_path):
+    """バックアップからDBを復元（バックアップAPIで上書き）
+
+    復元の前にバックアップを検証し、現在のDBの復元ポイント（pre_restore）を作成します。
+
+    Raises:
+        BackupError: 検証・復元に失敗した場合
+    """
+    verify_backup(backup_path)
+    create_restore_point(db_path, "pre_restore")
+
+    try:
+        source = sqlite3.connect(f"file:{os.path.abspath(backup_path)}?mode=ro", uri=True)
+        try:
+            target = sqlite3.connect(db_path)
+            try:
+                source.backup(target, pages=PAGES_PER_STEP, progress=_pause)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    except sqlite3.Error as e:
+        raise BackupError(f"復元に失敗しました: {backup_path} -> {db_path}: {e}")
+
+    log_message(f"バックアップから復元しました: {backup_path} -> {db_path}")
@@ -15,7 +15,6 @@ from PyQt5.QtWidgets import (
     QComboBox,
     QFileDialog,
     QMessageBox,
-    QCompleter,
     QSplitter,
     QDialog,
     QAbstractItemView,
@@ -26,49 +25,15 @@ from order_management.ui.custom_date_edit import ImprovedDateEdit
 import csv
 import os
 from datetime import datetime, timedelta
-from utils import format_amount, log_message
+from utils import format_amount, format_payee_code, log_message
 from matching_utils import MatchingLogic, get_matching_logic
+from ui.change_listener import LazyRefresher
+from payee_line_edit import PayeeLineEdit, refresh_payee_model
 
 # 不要なインポートを削除
 import sqlite3
 
 
-class PayeeLineEdit(QLineEdit):
-    """支払い先入力用のカスタムLineEdit（自動補完機能付き）"""
-
-    def __init__(self, db_manager, code_field=None):
-        super().__init__()
-        self.db_manager = db_manager
-        self.code_field = code_field  # 連動するコードフィールド
-        self.setup_completer()
-
-    def setup_completer(self):
-        """オートコンプリーターの設定"""
-        # 支払い先候補を取得
-        suggestions = self.db_manager.get_payee_suggestions()
-        payee_names = [suggestion[0] for suggestion in suggestions]
-
-        # コンプリーターを設定
-        completer = QCompleter(payee_names)
-        completer.setCaseSensitivity(Qt.CaseInsensitive)
-        completer.setFilterMode(Qt.MatchContains)
-        self.setCompleter(completer)
-
-        # テキスト変更時にコードを自動入力
-        self.textChanged.connect(self.auto_fill_code)
-
-    def auto_fill_code(self, text):
-        """支払い先名が変更された時にコードを自動入力（0埋め対応）"""
-        from utils import format_payee_code  # 追加
-
-        if self.code_field and text:
-            code = self.db_manager.get_payee_code_by_name(text)
-            if code:
-                # 【追加】コードを0埋めしてから設定
-                formatted_code = format_payee_code(code)
-                self.code_field.setText(formatted_code)
-
-
 class ExpenseTab(QWidget):
     def __init__(self, parent, app):
         super().__init__(parent)
@@ -99,6 +64,10 @@ class ExpenseTab(QWidget):
         # レイアウト設定
         self.setup_ui()
 
+        # 他のタブでの変更は、次に表示されたときに反映
+        self.refresher = LazyRefresher(self, ['contracts', 'expense_items', 'expenses', 'payments'],
+                                       self.refresh_data, hidden_only=True)
+
     def setup_ui(self):
         # メインレイアウト
         main_layout = QVBoxLayout(self)
@@ -902,8 +871,6 @@ class ExpenseTab(QWidget):
 
         # データベースから支払い月リストを取得
         try:
-            import sqlite3
-
             conn = sqlite3.connect(self.db_manager.expenses_db)
             cursor = conn.cursor()
 
@@ -1006,8 +973,6 @@ class ExpenseTab(QWidget):
     def apply_month_filter(self, selected_month, selected_month_text):
         """指定された月でフィルタリングを実行"""
         try:
-            import sqlite3
-
             conn = sqlite3.connect(self.db_manager.expenses_db)
             cursor = conn.cursor()
 
@@ -1251,10 +1216,8 @@ class ExpenseTab(QWidget):
             # 支払い月フィルタを更新（データ更新後）← この位置に移動
             self.update_payment_month_filter()
 
-            # 支払い先のオートコンプリーターを更新
-            payee_widget = self.edit_entries.get("payee")
-            if isinstance(payee_widget, PayeeLineEdit):
-                payee_widget.setup_completer()
+            # 支払い先の候補を更新（他のプロセスで支払い先マスターが変更された場合）
+            refresh_payee_model(self.db_manager)
 
             log_message("費用データの更新が完了しました")
 
@@ -1331,9 +1294,6 @@ class ExpenseTab(QWidget):
     def save_direct_edit(self):
         """費用テーブルの直接編集を保存（新規作成対応・コード0埋め対応）"""
         try:
-            # utils.pyから関数をインポート
-            from utils import format_payee_code
-
             # 基本情報の入力値を取得
             expense_id = self.edit_entries["id"].text()
             project_name = self.edit_entries["project_name"].text()
@@ -1574,8 +1534,7 @@ class ExpenseTab(QWidget):
             )
 
             # フィルター状態を保持してデータを更新
-            self.refresh_data_with_filters()  # 費用データを更新
-            self.app.payment_tab.refresh_data()  # 支払いデータも更新
+            self.refresh_data_with_filters()  # 費用データを更新（支払いタブは変更通知で更新）
             
             # フィルター状態を復元
             if current_month:
@@ -1669,8 +1628,6 @@ class ExpenseTab(QWidget):
     def import_from_csv(self):
         """CSVファイルから費用データをインポート（支払いコード0埋め対応）"""
         try:
-            from utils import format_payee_code  # 追加
-
             # インポートするCSVファイルを選択
             file_path, _ = QFileDialog.getOpenFileName(
                 self, "インポートするCSVファイルを選択", "", "CSVファイル (*.csv)"
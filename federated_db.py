@@ -0,0 +1,196 @@
+"""複数のSQLiteファイルを1つの接続で扱う（ATTACH）
+
+billing.db / expenses.db / expense_master.db / payee_master.db / order_management.db
+を決まった別名（スキーマ名）で1つの接続に ATTACH し、ファイルをまたぐ結合を
+SQLite の結合処理で行えるようにします。
+
+- 別名: billing, expenses, expense_master, payee_master, orders
+  （最初に開いたDBは別名ではなく main スキーマになります。横断ビューはどちらでも作成できます）
+- 横断ビュー（TEMPビュー、接続ごと）:
+    payment_expense_items  支払い（payments）⋈ 照合済みの費用項目（expense_items）
+    payee_partners         支払い先マスター（payee_master）⋈ 取引先（partners）
+  必要なファイルがすべて ATTACH されている場合のみ作成します。
+- payee_partners は、保存済みの正規化したコード（payee_master.payee_code_key /
+  partners.code_key。format_payee_code と同じ0埋め）のインデックスで結合します。
+  正規化したコードのカラムがない場合は、最初の ATTACH 時にカラム・トリガー・インデックスを作成します。
+- SQL関数 format_payee_code()（utils.format_payee_code と同じ0埋め）を登録します。
+- 1つの接続なので、複数ファイルへの更新を1回の commit() でまとめて確定できます
+  （ジャーナルモードが WAL の場合、ファイル単位では確定しますが全体の原子性は保証されません）。
+
+使用例:
+    conn = open_federated({'orders': "order_management.db", 'billing': "billing.db"}, 'orders')
+    rows = conn.execute("SELECT * FROM payment_expense_items").fetchall()
+
+    # 既存の接続に一時的に ATTACH する場合
+    detach = attach_databases(order_conn, 'orders', {'billing': "billing.db"})
+    try:
+        ...
+        order_conn.commit()
+    finally:
+        detach()
+"""
+import sqlite3
+
+from query_profiler import connect as profiled_connect
+from utils import format_payee_code, log_message
+
+# スキーマの別名 -> DatabaseManager の属性名
+SCHEMA_ATTRIBUTES = {
+    'billing': 'billing_db',
+    'expenses': 'expenses_db',
+    'expense_master': 'expense_master_db',
+    'payee_master': 'payee_master_db',
+    'orders': 'order_db_path',
+}
+
+# format_payee_code と同じ正規化（前後の空白を除き、4桁未満の数字は0埋め）のSQL
+# （トリガーで使うため組み込み関数だけで書く。{column} は元のカラム）
+PAYEE_CODE_KEY_SQL = """CASE
+        WHEN trim(COALESCE({column}, '')) = '' THEN ''
+        WHEN trim({column}) NOT GLOB '*[^0-9]*' AND length(trim({column})) < 4
+            THEN substr('0000' || trim({column}), -4)
+        ELSE trim({column})
+    END"""
+
+# 正規化したコードを保存するカラム: 別名 -> (テーブル, 元のカラム, 正規化したコードのカラム)
+PAYEE_CODE_KEYS = {
+    'payee_master': ('payee_master', 'payee_code', 'payee_code_key'),
+    'orders': ('partners', 'code', 'code_key'),
+}
+
+# 横断ビュー: ビュー名 -> (必要なスキーマ, 正規化したコードのカラムが必要なスキーマ, SQL)
+# （{別名} は実際のスキーマ名に置き換える）
+CROSS_DB_VIEWS = {
+    'payment_expense_items': (('billing', 'orders'), (), """
+        SELECT pay.id AS payment_id, pay.subject, pay.project_name, pay.payee,
+               pay.payee_code, pay.amount AS payment_amount, pay.payment_date,
+               pay.status AS payment_status,
+               ei.id AS expense_item_id, ei.order_number, ei.production_id,
+               ei.partner_id, ei.item_name, ei.amount AS expense_amount,
+               ei.expected_payment_date, ei.payment_status AS expense_payment_status
+        FROM {billing}.payments pay
+        JOIN {orders}.expense_items ei ON ei.payment_matched_id = pay.id
+    """),
+    'payee_partners': (('payee_master', 'orders'), ('payee_master', 'orders'), """
+        SELECT pm.id AS payee_id, pm.payee_name, pm.payee_code,
+               pt.id AS partner_id, pt.name AS partner_name, pt.code AS partner_code
+        FROM {payee_master}.payee_master pm
+        JOIN {orders}.partners pt ON pt.code_key = pm.payee_code_key
+        WHERE pm.payee_code_key != ''
+    """),
+}
+
+
+def database_paths(db_manager):
+    """DatabaseManager の各DBファイルのパス（別名 -> パス）"""
+    return {alias: getattr(db_manager, attribute)
+            for alias, attribute in SCHEMA_ATTRIBUTES.items()}
+
+
+def _ensure_payee_code_key(conn, schema, alias):
+    """正規化したコードのカラム・トリガー・インデックスを準備
+
+    Returns:
+        bool: カラムがあるか（テーブルがない・作成できない場合は False）
+    """
+    table, column, key_column = PAYEE_CODE_KEYS[alias]
+    columns = [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+    if key_column in columns:
+        return True
+    if column not in columns:
+        return False
+
+    key_sql = PAYEE_CODE_KEY_SQL.format(column=f"NEW.{column}")
+    try:
+        conn.execute("BEGIN")
+        conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {key_column} TEXT")
+        conn.execute(f"UPDATE {schema}.{table} SET {key_column} = {PAYEE_CODE_KEY_SQL.format(column=column)}")
+        for event in ("INSERT", f"UPDATE OF {column}"):
+            name = f"trg_{table}_{key_column}_{event.split()[0].lower()}"
+            conn.execute(f"""
+                CREATE TRIGGER {schema}.{name} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE {table} SET {key_column} = {key_sql} WHERE rowid = NEW.rowid;
+                END
+            """)
+        conn.execute(f"CREATE INDEX {schema}.idx_{table}_{key_column} ON {table}({key_column})")
+        conn.commit()
+        log_message(f"{table}.{key_column}（正規化した支払い先コード）を作成しました")
+        return True
+    except sqlite3.Error as e:
+        # 別の接続が同時に作成した場合など
+        conn.rollback()
+        log_message(f"{table}.{key_column} の作成エラー: {e}")
+        columns = [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+        return key_column in columns
+
+
+def _attach(conn, primary, databases, aliases, views):
+    """ATTACH して横断ビューを作成（ATTACH した別名・作成したビュー名を aliases / views に追加）"""
+    conn.create_function("format_payee_code", 1, format_payee_code)
+
+    schemas = {primary: 'main'}
+    for alias, path in databases.items():
+        if alias not in SCHEMA_ATTRIBUTES:
+            raise ValueError(f"不明なデータベースの別名です: {alias}")
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        aliases.append(alias)
+        schemas[alias] = alias
+
+    for name, (required, code_keys, sql) in CROSS_DB_VIEWS.items():
+        if not all(schema in schemas for schema in required):
+            continue
+        if not all(_ensure_payee_code_key(conn, schemas[alias], alias) for alias in code_keys):
+            continue
+        conn.execute(f"DROP VIEW IF EXISTS temp.{name}")
+        conn.execute(f"CREATE TEMP VIEW {name} AS {sql.format(**schemas)}")
+        views.append(name)
+
+
+def open_federated(databases, primary):
+    """複数のDBファイルを ATTACH した接続を開く
+
+    Args:
+        databases: 別名 -> DBファイルのパス（primary を含む）
+        primary: main として開くDBの別名
+
+    Returns:
+        sqlite3.Connection: 接続（close() で ATTACH も解除される）
+    """
+    conn = profiled_connect(databases[primary])
+    try:
+        attach = {alias: path for alias, path in databases.items() if alias != primary}
+        _attach(conn, primary, attach, [], [])
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def attach_databases(conn, primary, databases):
+    """既存の接続に ATTACH して横断ビューを作成
+
+    Args:
+        conn: 接続（primary のDB）
+        primary: 接続しているDBの別名
+        databases: ATTACH する 別名 -> DBファイルのパス
+
+    Returns:
+        function: ATTACH を解除する関数（ビューを削除して DETACH。未コミットの変更は取り消す）
+    """
+    aliases, views = [], []
+
+    def detach():
+        if conn.in_transaction:
+            conn.rollback()
+        for name in views:
+            conn.execute(f"DROP VIEW IF EXISTS temp.{name}")
+        for alias in aliases:
+            conn.execute(f"DETACH DATABASE {alias}")
+
+    try:
+        _attach(conn, primary, databases, aliases, views)
+    except Exception:
+        detach()
+        raise
+    return detach
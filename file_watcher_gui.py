@@ -1,158 +1,97 @@
 import os
-import sys
-import time
-import subprocess
 import threading
 from pathlib import Path
 from datetime import datetime
-import psutil
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from csv_import_service import CSVImportService, DEFAULT_DEBOUNCE_SECONDS
 from utils import log_message
 
 
 class CSVFileHandlerGUI(FileSystemEventHandler):
-    """GUI用CSVファイルハンドラー"""
+    """GUI用CSVファイルハンドラー
+
+    検出したCSVは CSVImportService に登録するだけで、監視スレッドはブロックしません。
+    作成・更新イベントの連続はサービス側のデバウンスキューでまとめられます。
+    """
     
-    def __init__(self, callback_func, config):
+    def __init__(self, callback_func, config, import_service=None):
         self.callback_func = callback_func
         self.config = config
-        self.last_processed = {}
+        self.import_service = import_service
         self.processing_lock = threading.Lock()
         
     def on_created(self, event):
         """新しいファイルが作成されたときの処理"""
-        if event.is_directory:
-            return
-            
-        file_path = Path(event.src_path)
-        if file_path.suffix.lower() == '.csv':
-            self.callback_func('file_detected', {
-                'action': 'created',
-                'file_path': str(file_path),
-                'filename': file_path.name
-            })
-            self._process_csv_file(file_path)
+        self._handle_event(event, 'created')
     
     def on_modified(self, event):
         """ファイルが更新されたときの処理"""
+        self._handle_event(event, 'modified')
+
+    def on_moved(self, event):
+        """ファイルが移動（一時ファイルからのリネーム等）されたときの処理"""
+        if event.is_directory:
+            return
+
+        file_path = Path(event.dest_path)
+        if file_path.suffix.lower() == '.csv':
+            self._enqueue(file_path, 'moved')
+
+    def _handle_event(self, event, action):
         if event.is_directory:
             return
             
         file_path = Path(event.src_path)
         if file_path.suffix.lower() == '.csv':
-            if self._wait_for_file_completion(file_path):
-                self.callback_func('file_detected', {
-                    'action': 'modified',
-                    'file_path': str(file_path),
-                    'filename': file_path.name
-                })
-                self._process_csv_file(file_path)
-    
-    def _wait_for_file_completion(self, file_path, max_wait=10):
-        """ファイルの書き込み完了を待つ"""
-        last_size = -1
-        wait_count = 0
-        
-        while wait_count < max_wait:
-            try:
-                current_size = file_path.stat().st_size
-                if current_size == last_size and current_size > 0:
-                    time.sleep(0.5)
-                    return True
-                last_size = current_size
-                time.sleep(1)
-                wait_count += 1
-            except (OSError, FileNotFoundError):
-                time.sleep(1)
-                wait_count += 1
-                
-        return True
-    
-    def _process_csv_file(self, file_path):
-        """CSVファイルを処理する"""
+            self._enqueue(file_path, action)
+
+    def _enqueue(self, file_path, action):
+        """CSVファイルをインポートキューに登録"""
+        self.callback_func('file_detected', {
+            'action': action,
+            'file_path': str(file_path),
+            'filename': file_path.name
+        })
+
+        # 自動処理が無効な場合は検出のみ
+        if not self.config.get('auto_process', True) or self.import_service is None:
+            self._notify_processed(file_path, "検出のみ")
+            return
+
+        self.import_service.submit(str(file_path))
+
+    def handle_import_result(self, result):
+        """インポートサービスからの結果を処理（ワーカースレッドから呼ばれる）"""
         with self.processing_lock:
-            file_key = str(file_path)
-            current_time = time.time()
-            
-            # 重複処理防止
-            duplicate_interval = self.config.get('duplicate_interval', 5.0)
-            if file_key in self.last_processed:
-                if current_time - self.last_processed[file_key] < duplicate_interval:
-                    self.callback_func('log', f"重複処理をスキップ: {file_path.name}")
-                    return
-            
-            self.last_processed[file_key] = current_time
-            
-            # ファイル情報を取得
-            try:
-                file_stat = file_path.stat()
-                file_size = f"{file_stat.st_size:,} bytes"
-            except:
-                file_size = "不明"
-            
-            # 自動処理が有効な場合のみアプリを起動
-            if self.config.get('auto_process', True):
-                success = self._launch_app(file_path)
-                status = "処理完了" if success else "処理失敗"
-            else:
-                status = "検出のみ"
-                success = True
-            
-            # ファイル処理履歴を通知
-            self.callback_func('file_processed', {
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'filename': file_path.name,
-                'size': file_size,
-                'status': status
-            })
-    
-    def _launch_app(self, csv_file_path):
-        """アプリを起動してCSVファイルをインポート"""
-        try:
-            if self._is_app_running():
-                self.callback_func('log', f"アプリが既に起動中のため、{csv_file_path.name}の処理をスキップ")
-                return False
-            
-            app_path = Path(__file__).parent / "app.py"
-            cmd = [sys.executable, str(app_path), "--import-csv", str(csv_file_path)]
-            
-            self.callback_func('log', f"アプリを起動: {csv_file_path.name}")
-            
-            # バックグラウンドでアプリを起動
-            subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-            )
-            
-            return True
-            
-        except Exception as e:
-            self.callback_func('log', f"アプリ起動エラー: {str(e)}")
-            return False
-    
-    def _is_app_running(self):
-        """アプリが起動中かチェック"""
+            for path in result['files']:
+                file_path = Path(path)
+                if path in result['errors']:
+                    self.callback_func('log', f"インポートエラー: {file_path.name}: {result['errors'][path]}")
+                    status = "処理失敗"
+                elif path in result['superseded']:
+                    status = "スキップ（新しいファイルあり）"
+                elif result['delegated']:
+                    self.callback_func('log', f"起動中のアプリにインポートを依頼: {file_path.name}")
+                    status = "アプリで処理"
+                else:
+                    status = f"処理完了（{result['imported'].get(path, 0)}件）"
+                self._notify_processed(file_path, status)
+
+    def _notify_processed(self, file_path, status):
+        """ファイル処理履歴を通知"""
         try:
-            current_pid = os.getpid()
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['pid'] == current_pid:
-                        continue
-                    
-                    if proc.info['name'] and 'python' in proc.info['name'].lower():
-                        cmdline = proc.info['cmdline']
-                        if cmdline and any('app.py' in arg for arg in cmdline):
-                            return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            return False
-        except Exception:
-            return False
+            file_size = f"{file_path.stat().st_size:,} bytes"
+        except OSError:
+            file_size = "不明"
+
+        self.callback_func('file_processed', {
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'filename': file_path.name,
+            'size': file_size,
+            'status': status
+        })
 
 
 class FileWatcherManager(QObject):
@@ -166,6 +105,7 @@ class FileWatcherManager(QObject):
         super().__init__()
         self.observer = None
         self.handler = None
+        self.import_service = None
         self.is_running = False
         self.config = {}
         self.stats = {
@@ -198,7 +138,14 @@ class FileWatcherManager(QObject):
         
         try:
             # ハンドラーとオブザーバーを作成
+            # 重複処理防止間隔をデバウンス時間として使用する
             self.handler = CSVFileHandlerGUI(self._handle_callback, config)
+            self.import_service = CSVImportService(
+                debounce_seconds=config.get('duplicate_interval', DEFAULT_DEBOUNCE_SECONDS),
+                on_result=self.handler.handle_import_result
+            )
+            self.handler.import_service = self.import_service
+            self.import_service.start()
             self.observer = Observer()
             self.observer.schedule(self.handler, folder_path, recursive=False)
             
@@ -226,6 +173,10 @@ class FileWatcherManager(QObject):
                 self.observer.stop()
                 self.observer.join(timeout=5)
                 self.observer = None
+
+            if self.import_service:
+                self.import_service.stop()
+                self.import_service = None
             
             self.handler = None
             self.is_running = False
@@ -0,0 +1,108 @@
+"""一覧画面の絞り込み用のメモリ上の列ストア
+
+読み込んだ結果（行のリスト）から、検索用の小文字キーと状態ごとのビット集合を
+一度だけ作り、表示フィルタ・検索キーワードの変更はビット演算だけで判定します。
+PyQt5には依存しません（画面側のモデルは ui/record_table_model.py）。
+
+- 行の集合は int のビット集合（i ビット目 = i 行目）で表す
+- 状態フィルタは状態ごとのビット集合の AND / AND NOT で組み合わせる
+- 検索は前回のキーワードを含むキーワードなら前回の一致行だけを調べ直す
+
+使用例:
+    store = FilterStore(rows,
+                        search_fields=('program_name', 'payee'),
+                        flags={'has_order': lambda row: row['has_order']})
+    mask = store.select(exclude=('has_order',), term="サンプル")
+    print(store.count(mask), store.indices(mask))
+"""
+
+
+def _iter_bits(mask):
+    """ビット集合に含まれる行番号（昇順）"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class FilterStore:
+    """検索キーと状態ビット集合を持つ、絞り込み用の行ストア"""
+
+    def __init__(self, rows, search_fields=(), flags=None):
+        """
+        Args:
+            rows: 行（dict）のリスト
+            search_fields: キーワード検索の対象にするキー
+            flags: 状態名 -> 行を受け取り真偽を返す関数
+        """
+        self.rows = list(rows)
+        self.all = (1 << len(self.rows)) - 1
+
+        # 検索対象の列を小文字にしてつないだもの（列をまたいで一致しないよう \0 で区切る）
+        self._search_keys = [
+            "\0".join(str(row.get(field) or "").lower() for field in search_fields)
+            for row in self.rows
+        ]
+
+        self._flags = {}
+        for name, predicate in (flags or {}).items():
+            mask = 0
+            for index, row in enumerate(self.rows):
+                if predicate(row):
+                    mask |= 1 << index
+            self._flags[name] = mask
+
+        # 直前の検索（キーワード, 一致した行のビット集合）
+        self._last_search = ("", self.all)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def flag(self, name):
+        """状態のビット集合"""
+        return self._flags[name]
+
+    def search(self, term):
+        """キーワード（大文字・小文字を区別しない）を含む行のビット集合"""
+        term = (term or "").lower()
+        if not term:
+            return self.all
+
+        last_term, last_mask = self._last_search
+        if term == last_term:
+            return last_mask
+
+        # 前回のキーワードを含むなら、前回一致した行だけを調べればよい
+        candidates = _iter_bits(last_mask) if last_term and last_term in term \
+            else range(len(self.rows))
+        mask = 0
+        for index in candidates:
+            if term in self._search_keys[index]:
+                mask |= 1 << index
+
+        self._last_search = (term, mask)
+        return mask
+
+    def select(self, include=(), exclude=(), term=""):
+        """条件に合う行のビット集合
+
+        Args:
+            include: すべて満たす状態名
+            exclude: いずれも満たさない状態名
+            term: 検索キーワード
+        """
+        mask = self.search(term)
+        for name in include:
+            mask &= self._flags[name]
+        for name in exclude:
+            mask &= ~self._flags[name]
+        return mask
+
+    @staticmethod
+    def count(mask):
+        """ビット集合の行数"""
+        return bin(mask).count("1")
+
+    def indices(self, mask):
+        """ビット集合に含まれる行番号（昇順）"""
+        return list(_iter_bits(mask))
@@ -0,0 +1,319 @@
+"""定期ジョブのヘッドレス実行（画面なし・PyQt5不要）
+
+アプリ起動時に行っている重い処理を、夜間などにまとめて実行しておくための
+コマンドです。アプリは照合済みのデータで起動できます。
+
+- backup:    全DBファイル（アーカイブDBを含む）のバックアップ（db_backup.backup_all、変更のないファイルは省略）
+- renew:     契約の自動延長（OrderManagementDB.check_and_execute_auto_renewal）
+- generate:  月次費用項目の自動生成（ExpenseAutoGenerator.generate_monthly_expenses）
+- reconcile: 支払いデータと費用項目の照合（OrderManagementDB.reconcile_payments_with_expenses）
+
+実行結果（所要時間・件数・エラー）は order_management.db の job_runs テーブルに記録します。
+常駐モードでは order_management.db への接続を1本保持して使い回します。
+
+使用方法:
+    python headless_jobs.py                         # 全ジョブを1回実行
+    python headless_jobs.py --jobs reconcile        # 照合のみ
+    python headless_jobs.py --interval 60           # 60分ごとに実行し続ける
+    python headless_jobs.py --at 03:00              # 毎日3時に実行し続ける
+    python headless_jobs.py --history               # 実行履歴を表示
+
+終了コード:
+    0: すべてのジョブが成功
+    1: 失敗したジョブ（または一部の件数が失敗）がある
+    2: 引数の誤り
+    3: データベースを開けない
+"""
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timedelta
+
+from utils import log_message
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_USAGE = 2
+EXIT_DB_ERROR = 3
+
+# ジョブの実行結果
+STATUS_SUCCESS = "success"
+STATUS_PARTIAL = "partial"  # 処理はできたが一部の件数が失敗
+STATUS_FAILED = "failed"
+
+# 実行順（処理前にバックアップし、延長した契約で費用を生成し、生成した費用項目を照合する）
+JOB_NAMES = ["backup", "renew", "generate", "reconcile"]
+
+JOB_RUNS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS job_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_name TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        counts TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job_name, started_at);
+"""
+
+
+def _run_backup(db, options):
+    from database import DatabaseManager
+    from db_backup import backup_all
+    from federated_db import database_paths
+    from order_management.archive_store import archive_files
+
+    paths = database_paths(DatabaseManager())
+    paths.update({'orders': db.db_path, 'billing': options.get("billing_db", "billing.db")})
+    return backup_all(list(paths.values()) + archive_files(db.db_path))
+
+
+def _run_renew(db, options):
+    result = db.check_and_execute_auto_renewal(executed_by="定期ジョブ")
+    return {key: result[key] for key in ("checked", "extended", "failed")}
+
+
+def _run_generate(db, options):
+    from expense_auto_generator import ExpenseAutoGenerator
+
+    result = ExpenseAutoGenerator(db).generate_monthly_expenses(options.get("target_month"))
+    return {key: result[key] for key in ("generated", "skipped", "failed")}
+
+
+def _run_reconcile(db, options):
+    result = db.reconcile_payments_with_expenses(options.get("billing_db", "billing.db"))
+    return {key: result.get(key, 0) for key in ("matched", "unmatched_expenses", "unmatched_payments")}
+
+
+JOBS = {
+    "backup": _run_backup,
+    "renew": _run_renew,
+    "generate": _run_generate,
+    "reconcile": _run_reconcile,
+}
+
+
+def ensure_job_runs_table(db):
+    """実行履歴テーブル（job_runs）を準備"""
+    conn = db._get_connection()
+    try:
+        conn.executescript(JOB_RUNS_SCHEMA)
+    finally:
+        conn.close()
+
+
+def record_job_run(db, job_name, started_at, duration_ms, status, counts=None, error=None):
+    """ジョブの実行結果を job_runs に記録"""
+    conn = db._get_connection()
+    try:
+        conn.execute("""
+            INSERT INTO job_runs (job_name, started_at, finished_at, duration_ms, status, counts, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            job_name,
+            started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            duration_ms,
+            status,
+            json.dumps(counts, ensure_ascii=False) if counts is not None else None,
+            error,
+        ))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_job_history(db, job_name=None, limit=20):
+    """実行履歴を新しい順に取得
+
+    Returns:
+        list: (id, job_name, started_at, duration_ms, status, counts, error)
+    """
+    query = "SELECT id, job_name, started_at, duration_ms, status, counts, error FROM job_runs"
+    params = []
+    if job_name:
+        query += " WHERE job_name = ?"
+        params.append(job_name)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+
+    conn = db._get_connection()
+    try:
+        return conn.execute(query, params).fetchall()
+    except Exception:
+        # 定期ジョブを一度も実行していない（テーブルなし）
+        return []
+    finally:
+        conn.close()
+
+
+def job_succeeded_since(db, job_name, since):
+    """指定日時以降にジョブが成功しているか（アプリ起動時の重複実行を省くため）
+
+    Args:
+        db: OrderManagementDB
+        job_name: ジョブ名
+        since: datetime
+    """
+    conn = db._get_connection()
+    try:
+        row = conn.execute("""
+            SELECT 1 FROM job_runs
+            WHERE job_name = ? AND status = ? AND started_at >= ?
+            LIMIT 1
+        """, (job_name, STATUS_SUCCESS, since.strftime("%Y-%m-%d %H:%M:%S"))).fetchone()
+        return row is not None
+    except Exception:
+        return False
+    finally:
+        conn.close()
+
+
+def run_job(db, job_name, options=None):
+    """ジョブを1つ実行して履歴に記録
+
+    Returns:
+        str: STATUS_SUCCESS / STATUS_PARTIAL / STATUS_FAILED
+    """
+    started_at = datetime.now()
+    start = time.perf_counter()
+    counts = None
+    error = None
+
+    log_message(f"[定期ジョブ] {job_name} を開始")
+    try:
+        counts = JOBS[job_name](db, options or {})
+        status = STATUS_PARTIAL if counts.get("failed") else STATUS_SUCCESS
+    except Exception as e:
+        import traceback
+        status = STATUS_FAILED
+        error = str(e)
+        log_message(f"[定期ジョブ] {job_name} でエラー: {e}")
+        log_message(traceback.format_exc())
+
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    try:
+        record_job_run(db, job_name, started_at, duration_ms, status, counts, error)
+    except Exception as e:
+        log_message(f"[定期ジョブ] 実行履歴の記録に失敗: {e}")
+
+    log_message(f"[定期ジョブ] {job_name} 終了: {status}（{duration_ms}ms） {counts or ''}")
+    return status
+
+
+def run_jobs(db, job_names, options=None):
+    """ジョブを順に実行
+
+    Returns:
+        int: 終了コード（EXIT_OK / EXIT_JOB_FAILED）
+    """
+    statuses = [run_job(db, job_name, options) for job_name in job_names]
+    return EXIT_OK if all(status == STATUS_SUCCESS for status in statuses) else EXIT_JOB_FAILED
+
+
+def seconds_until(at, now=None):
+    """次の HH:MM までの秒数"""
+    now = now or datetime.now()
+    hour, minute = map(int, at.split(":"))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def parse_jobs(value):
+    """--jobs の値（カンマ区切り）を実行順のジョブ名リストに変換"""
+    import argparse
+
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in JOBS]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"不明なジョブ: {', '.join(unknown) or value}（{', '.join(JOB_NAMES)} から指定）")
+    return [name for name in JOB_NAMES if name in names]
+
+
+def parse_time(value):
+    """--at の値（HH:MM）を検証"""
+    import argparse
+
+    try:
+        datetime.strptime(value, "%H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"時刻は HH:MM 形式で指定してください: {value}")
+    return value
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="定期ジョブ（バックアップ・自動延長・費用生成・照合）のヘッドレス実行")
+    parser.add_argument("--jobs", type=parse_jobs, default=list(JOB_NAMES),
+                        help=f"実行するジョブ（カンマ区切り。既定: {','.join(JOB_NAMES)}）")
+    parser.add_argument("--db", default="order_management.db", help="発注管理データベース")
+    parser.add_argument("--billing-db", default="billing.db", help="支払いデータベース")
+    parser.add_argument("--target-month", help="費用生成の対象月（YYYY-MM。既定: 当月）")
+    schedule = parser.add_mutually_exclusive_group()
+    schedule.add_argument("--interval", type=float, help="指定した分ごとに実行し続ける")
+    schedule.add_argument("--at", type=parse_time, help="毎日指定した時刻（HH:MM）に実行し続ける")
+    schedule.add_argument("--history", action="store_true", help="実行履歴を表示して終了")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"データベースが見つかりません: {args.db}", file=sys.stderr)
+        return EXIT_DB_ERROR
+
+    try:
+        from order_management.database_manager import OrderManagementDB
+        db = OrderManagementDB(args.db)
+        ensure_job_runs_table(db)
+    except Exception as e:
+        print(f"データベースを開けません: {e}", file=sys.stderr)
+        return EXIT_DB_ERROR
+
+    if args.history:
+        for run_id, job_name, started_at, duration_ms, status, counts, error in get_job_history(db):
+            print(f"{run_id:>5}  {started_at}  {job_name:<10} {status:<8} {duration_ms:>7}ms  {error or counts or ''}")
+        return EXIT_OK
+
+    options = {"billing_db": args.billing_db, "target_month": args.target_month}
+
+    if args.interval is None and args.at is None:
+        with db.hold_connection():
+            return run_jobs(db, args.jobs, options)
+
+    # 常駐モード（SIGTERM / Ctrl+C で終了）
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    exit_code = EXIT_OK
+    log_message(f"[定期ジョブ] 常駐モードで開始: {', '.join(args.jobs)}")
+
+    try:
+        with db.hold_connection():
+            while not stopping:
+                if args.at:
+                    wait = seconds_until(args.at)
+                else:
+                    exit_code = run_jobs(db, args.jobs, options)
+                    wait = args.interval * 60
+
+                # 終了要求を確認しながら待機
+                deadline = time.monotonic() + wait
+                while not stopping and time.monotonic() < deadline:
+                    time.sleep(max(0.0, min(1.0, deadline - time.monotonic())))
+
+                if args.at and not stopping:
+                    exit_code = run_jobs(db, args.jobs, options)
+    except KeyboardInterrupt:
+        pass
+
+    log_message("[定期ジョブ] 常駐モードを終了")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget
 
 from order_management.ui.partner_master_widget import PartnerMasterWidget
-from order_management.ui.cast_master_widget import CastMasterWidget
+from ui.lazy_tab import LazyTab
 
 
 class MasterManagementTab(QWidget):
@@ -31,8 +31,8 @@ class MasterManagementTab(QWidget):
         self.partner_widget = PartnerMasterWidget()
         self.sub_tab_control.addTab(self.partner_widget, "取引先マスター")
 
-        # Sub-tab 2: 出演者マスター
-        self.cast_widget = CastMasterWidget()
+        # Sub-tab 2: 出演者マスター（最初に表示したときに作成）
+        self.cast_widget = LazyTab(self._create_cast_widget)
         self.sub_tab_control.addTab(self.cast_widget, "出演者マスター")
 
         # Layout
@@ -40,3 +40,7 @@ class MasterManagementTab(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self.sub_tab_control)
         self.setLayout(layout)
+
+    def _create_cast_widget(self):
+        from order_management.ui.cast_master_widget import CastMasterWidget
+        return CastMasterWidget()
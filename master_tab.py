@@ -22,8 +22,12 @@ from PyQt5.QtGui import QColor, QFont, QBrush
 from order_management.ui.custom_date_edit import ImprovedDateEdit
 import csv
 import os
+import sqlite3
 from datetime import datetime
-from utils import format_amount, log_message
+from utils import format_amount, format_payee_code, log_message
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
+from ui.change_listener import LazyRefresher
 
 # 不要なインポートを削除
 
@@ -57,6 +61,9 @@ class MasterTab(QWidget):
         # レイアウト設定
         self.setup_ui()
 
+        # 他のタブでの変更は、次に表示されたときに反映
+        self.refresher = LazyRefresher(self, ['expense_master'], self.refresh_data, hidden_only=True)
+
     def setup_ui(self):
         # メインレイアウト
         main_layout = QVBoxLayout(self)
@@ -649,9 +656,6 @@ class MasterTab(QWidget):
     def save_direct_edit(self):
         """費用マスターテーブルの直接編集を保存（新規作成対応・コード0埋め対応）"""
         try:
-            # utils.pyから関数をインポート
-            from utils import format_payee_code
-
             # 入力値を取得
             master_id = self.edit_entries["id"].text()
             project_name = self.edit_entries["project_name"].text()
@@ -907,76 +911,51 @@ class MasterTab(QWidget):
             )
 
     def export_to_csv(self):
-        """費用マスターデータをCSVファイルにエクスポート（全フィールド対応）"""
-        try:
-            # データベースから全データを取得（全フィールド）
-            master_rows = self.db_manager.get_master_data(full_data=True)
-
-            if not master_rows:
-                QMessageBox.information(
-                    self, "情報", "エクスポートするデータがありません"
-                )
-                return
+        """費用マスターデータをCSVファイルにエクスポート（全フィールド対応）
 
-            # 保存先のファイルを選択
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "費用マスターデータの保存先を選択",
+        画面の表示内容ではなくDBから直接、バックグラウンドで出力します。
+        件数の取得も出力スレッドで行い、進捗として表示します。
+        """
+        try:
+            query, params = self.db_manager.build_master_export_query()
+            db_path = self.db_manager.expense_master_db
+
+            job = CSVExportJob.from_query(
+                db_path, query, params,
+                # ヘッダー行（全17フィールド）
+                headers=[
+                    "ID",
+                    "費用項目",
+                    "支払い先",
+                    "支払い先コード",
+                    "金額",
+                    "種別",
+                    "放送曜日",
+                    "開始日",
+                    "終了日",
+                    "クライアント名",
+                    "担当部門",
+                    "案件状況",
+                    "案件開始日",
+                    "完了予定日",
+                    "予算",
+                    "承認者",
+                    "緊急度",
+                ],
+                row_mapper=lambda row: ["" if value is None else value for value in row],
+            )
+            worker = run_csv_export(
+                self, job, "費用マスターデータの保存先を選択",
                 f"費用マスター_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "CSVファイル (*.csv)",
+                label="費用マスターデータ",
             )
-
-            if not file_path:
-                return  # キャンセルされた場合
-
-            # CSVファイルに書き込み
-            with open(file_path, "w", newline="", encoding="shift_jis") as file:
-                writer = csv.writer(file)
-
-                # ヘッダー行を書き込み（全17フィールド）
-                writer.writerow(
-                    [
-                        "ID",
-                        "費用項目",
-                        "支払い先",
-                        "支払い先コード",
-                        "金額",
-                        "種別",
-                        "放送曜日",
-                        "開始日",
-                        "終了日",
-                        "クライアント名",
-                        "担当部門",
-                        "案件状況",
-                        "案件開始日",
-                        "完了予定日",
-                        "予算",
-                        "承認者",
-                        "緊急度",
-                    ]
+            if worker:
+                worker.completed.connect(
+                    lambda count: self.app.status_label.setText(
+                        f"費用マスターデータを{os.path.basename(worker.file_path)}にエクスポートしました"
+                    )
                 )
 
-                # データ行を書き込み
-                for row in master_rows:
-                    # 全17フィールドのデータを保証
-                    full_row = list(row)
-                    # 不足しているフィールドがあればデフォルト値で補完
-                    while len(full_row) < 17:
-                        full_row.append("")
-                    writer.writerow(full_row)
-
-            log_message(f"費用マスターデータを{file_path}にエクスポートしました")
-            self.app.status_label.setText(
-                f"費用マスターデータを{os.path.basename(file_path)}にエクスポートしました"
-            )
-
-            # エクスポート後に確認メッセージを表示
-            QMessageBox.information(
-                self,
-                "エクスポート完了",
-                f"{len(master_rows)}件のデータを\n{os.path.basename(file_path)}\nにエクスポートしました",
-            )
-
         except Exception as e:
             log_message(f"費用マスターデータのエクスポート中にエラーが発生: {e}")
             import traceback
@@ -989,8 +968,6 @@ class MasterTab(QWidget):
     def import_from_csv(self):
         """CSVファイルから費用マスターデータをインポート（支払いコード0埋め対応）"""
         try:
-            from utils import format_payee_code  # 追加
-
             # インポートするCSVファイルを選択
             file_path, _ = QFileDialog.getOpenFileName(
                 self, "インポートするCSVファイルを選択", "", "CSVファイル (*.csv)"
@@ -1091,8 +1068,6 @@ class MasterTab(QWidget):
                 return
 
             # データベースに反映
-            import sqlite3
-
             conn = sqlite3.connect(self.db_manager.expense_master_db)
             cursor = conn.cursor()
 
@@ -24,6 +24,8 @@ import hashlib
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 
+from db_backup import BackupError, create_restore_point
+
 
 class MigrationManager:
     """SQLマイグレーション管理システム"""
@@ -181,6 +183,19 @@ class MigrationManager:
             result['skipped'] = len(pending)
             return result
 
+        # 実行前に検証済みの復元ポイントを作成（作成できない場合は実行しない）
+        try:
+            restore_point = create_restore_point(self.db_path, "pre_migration")
+        except BackupError as e:
+            result['errors'].append({
+                'version': pending[0]['version'],
+                'name': pending[0]['name'],
+                'error': str(e)
+            })
+            return result
+        if restore_point:
+            print(f"💾 復元ポイント: {restore_point}")
+
         # 実際の実行
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
@@ -251,6 +266,15 @@ class MigrationManager:
             'errors': []
         }
 
+        # 実行前に検証済みの復元ポイントを作成（作成できない場合は実行しない）
+        try:
+            restore_point = create_restore_point(self.db_path, "pre_rollback")
+        except BackupError as e:
+            result['errors'].append({'version': None, 'name': None, 'error': str(e)})
+            return result
+        if restore_point:
+            print(f"💾 復元ポイント: {restore_point}")
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
@@ -0,0 +1,18 @@
+-- マイグレーション: 放送例外テーブルの作成
+-- バージョン: 008
+-- 作成日: 2026-10-18
+-- 説明: 休止（特番・祝日による差し替え等）と追加放送の日付を登録し、
+--       回数ベースの支払予定額を実際の放送回数で計算する
+
+CREATE TABLE IF NOT EXISTS broadcast_exceptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    production_id INTEGER REFERENCES productions(id) ON DELETE CASCADE,  -- NULLの場合は全番組（祝日等）
+    broadcast_date DATE NOT NULL,  -- YYYY-MM-DD
+    exception_type TEXT NOT NULL DEFAULT '休止',  -- 休止/追加
+    reason TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- インデックス作成
+CREATE INDEX IF NOT EXISTS idx_broadcast_exceptions_date ON broadcast_exceptions(broadcast_date);
+CREATE INDEX IF NOT EXISTS idx_broadcast_exceptions_production ON broadcast_exceptions(production_id, broadcast_date);
@@ -0,0 +1,26 @@
+-- マイグレーション: 費用項目の検索経路に合わせた部分インデックス・複合インデックスの追加
+-- バージョン: 009
+-- 作成日: 2026-10-19
+-- 説明: 照合の未照合の費用項目、費用項目の自動生成の重複チェック、
+--       番組別・月別の明細で使う条件に合わせたインデックスを追加する
+--       （プランナーが使っているかは order_management.database_manager.check_expense_index_usage で確認）
+
+-- 照合（reconcile_payments_with_expenses）: 未照合・アーカイブしていない費用項目だけの部分インデックス
+-- （照合で参照するカラムを含め、テーブルを読まずに取得する）
+CREATE INDEX IF NOT EXISTS idx_expense_items_unmatched
+    ON expense_items(payment_status, partner_id, amount, expected_payment_date, item_name,
+                     payment_matched_id, archived)
+    WHERE payment_matched_id IS NULL AND (archived = 0 OR archived IS NULL);
+
+-- 費用項目の自動生成の重複チェック（契約ID・実施日・金額）
+CREATE INDEX IF NOT EXISTS idx_expense_items_contract_date_amount
+    ON expense_items(contract_id, implementation_date, amount);
+
+-- 番組の部分インデックス（実施日）は下の番組・支払予定日のインデックスと重複するため削除する
+-- （アーカイブしていない番組の費用項目の検索はすべて下のインデックスを使える）
+DROP INDEX IF EXISTS idx_expense_items_live_production;
+
+-- 番組別・支払予定月別の明細（アーカイブしていない費用項目。支払予定日は範囲で絞り込む）
+CREATE INDEX IF NOT EXISTS idx_expense_items_live_production_payment
+    ON expense_items(production_id, expected_payment_date)
+    WHERE archived = 0 OR archived IS NULL;
@@ -0,0 +1,22 @@
+-- マイグレーション: アーカイブDBに移動した費用項目のキーのテーブル作成
+-- バージョン: 010
+-- 作成日: 2026-10-19
+-- 説明: archive_YYYY.db に移動した費用項目の契約・番組・取引先・実施日・金額を発注管理DBに残し、
+--       自動生成の重複チェック、番組の削除、未登録支払いの抽出でアーカイブ済みの行も参照する
+--       （行は order_management.archive_store.move_to_archive が移動時に追加する）
+
+CREATE TABLE IF NOT EXISTS archived_expense_keys (
+    id INTEGER PRIMARY KEY,  -- 費用項目ID
+    year TEXT NOT NULL,  -- アーカイブDBの年（archive_YYYY.db）
+    contract_id INTEGER,
+    production_id INTEGER,
+    partner_id INTEGER,
+    implementation_date DATE,
+    amount REAL
+);
+
+-- インデックス作成
+CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_contract
+    ON archived_expense_keys(contract_id, implementation_date, amount);
+CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_production ON archived_expense_keys(production_id);
+CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_partner ON archived_expense_keys(partner_id, amount);
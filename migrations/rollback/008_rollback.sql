@@ -0,0 +1,7 @@
+-- ロールバック: 放送例外テーブル削除
+-- バージョン: 008
+
+DROP INDEX IF EXISTS idx_broadcast_exceptions_production;
+DROP INDEX IF EXISTS idx_broadcast_exceptions_date;
+
+DROP TABLE IF EXISTS broadcast_exceptions;
@@ -0,0 +1,6 @@
+-- ロールバック: 費用項目の検索経路に合わせたインデックスの削除
+-- バージョン: 009
+
+DROP INDEX IF EXISTS idx_expense_items_live_production_payment;
+DROP INDEX IF EXISTS idx_expense_items_contract_date_amount;
+DROP INDEX IF EXISTS idx_expense_items_unmatched;
@@ -0,0 +1,8 @@
+-- ロールバック: アーカイブDBに移動した費用項目のキーのテーブル削除
+-- バージョン: 010
+
+DROP INDEX IF EXISTS idx_archived_expense_keys_partner;
+DROP INDEX IF EXISTS idx_archived_expense_keys_production;
+DROP INDEX IF EXISTS idx_archived_expense_keys_contract;
+
+DROP TABLE IF EXISTS archived_expense_keys;
@@ -4,15 +4,52 @@
 未登録のものを簡単に追加できる機能を提供します。
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLabel,
+                             QTableView, QLabel,
                              QRadioButton, QButtonGroup, QLineEdit, QHeaderView,
                              QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QColor, QBrush
+from PyQt5.QtGui import QColor
 
 from database import DatabaseManager
+from filter_store import FilterStore
 from order_management.database_manager import OrderManagementDB
 from order_management.ui.unified_order_dialog import UnifiedOrderDialog
+from ui.record_table_model import Column, MaskFilterProxyModel, RecordTableModel
+
+TEXT_COLOR = QColor(0, 0, 0)  # 黒
+HAS_ORDER_STATUS_COLOR = QColor(200, 255, 200)  # 薄い緑
+NO_ORDER_ROW_COLOR = QColor(255, 240, 240)  # とても薄い赤
+ACTION_COLOR = QColor(0, 102, 204)  # 青
+
+# アクション列（未登録の行をクリックすると発注を追加）
+ACTION_COLUMN = 8
+
+
+def _period_text(item):
+    """契約期間の表示"""
+    if item['start_date'] and item['end_date']:
+        return f"{item['start_date']} ~ {item['end_date']}"
+    if item['start_date']:
+        return f"{item['start_date']} ~"
+    return ""
+
+
+# 表示列（0: ID と 9: 元の案件名は非表示）
+COLUMNS = [
+    Column("ID", lambda item: str(item['master_id'])),
+    Column("番組名", lambda item: item['program_name']),
+    Column("費用項目", lambda item: item['item_name']),
+    Column("取引先名", lambda item: item['payee']),
+    Column("金額", lambda item: f"{int(item['amount']):,}円" if item['amount'] else "-"),
+    Column("契約期間", _period_text),
+    Column("支払タイプ", lambda item: item['payment_type']),
+    Column("発注状況", lambda item: "✓ 登録済" if item['has_order'] else "✕ 未登録",
+           background=lambda item: HAS_ORDER_STATUS_COLOR if item['has_order'] else None,
+           foreground=lambda item: TEXT_COLOR),
+    Column("アクション", lambda item: "" if item['has_order'] else "発注追加",
+           foreground=lambda item: ACTION_COLOR, alignment=Qt.AlignCenter),
+    Column("元の案件名", lambda item: item['project_name_full']),
+]
 
 
 class OrderCheckTab(QWidget):
@@ -26,6 +63,7 @@ class OrderCheckTab(QWidget):
         self.db = DatabaseManager()
         self.order_db = OrderManagementDB()
         self.expense_data = []  # 費用マスターデータを保持
+        self.store = FilterStore([])
         self.init_ui()
         self.load_data()
 
@@ -81,12 +119,18 @@ class OrderCheckTab(QWidget):
         layout.addLayout(filter_layout)
 
         # === 中央: テーブル ===
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "番組名", "費用項目", "取引先名", "金額",
-            "契約期間", "支払タイプ", "発注状況", "アクション", "元の案件名"
-        ])
+        # 行は読み込み時に1回だけモデルに設定し、フィルタ変更はプロキシで表示行を切り替える
+        self.model = RecordTableModel(
+            COLUMNS,
+            background=lambda item: None if item['has_order'] else NO_ORDER_ROW_COLOR,
+            foreground=lambda item: None if item['has_order'] else TEXT_COLOR,
+        )
+        self.proxy = MaskFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.clicked.connect(self.on_table_clicked)
 
         # カラム幅の設定
         header = self.table.horizontalHeader()
@@ -99,8 +143,8 @@ class OrderCheckTab(QWidget):
         self.table.setColumnHidden(0, True)
         self.table.setColumnHidden(9, True)
 
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)  # 編集不可
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)  # 編集不可
 
         layout.addWidget(self.table)
 
@@ -120,106 +164,35 @@ class OrderCheckTab(QWidget):
     def load_data(self):
         """費用マスターデータを読み込み"""
         self.expense_data = self.db.get_expense_master_with_order_status()
+        self.store = FilterStore(
+            self.expense_data,
+            search_fields=('program_name', 'payee'),
+            flags={'has_order': lambda item: item['has_order']},
+        )
+        self.model.set_rows(self.store.rows)
         self.apply_filter()
         self.update_statistics()
 
     def apply_filter(self):
-        """フィルタを適用してテーブルを更新"""
-        filter_type = None
+        """フィルタを適用してテーブルを更新（表示する行を切り替えるだけで行は作り直さない）"""
+        include, exclude = (), ()
         if self.rb_no_order.isChecked():
-            filter_type = "no_order"
+            exclude = ('has_order',)
         elif self.rb_has_order.isChecked():
-            filter_type = "has_order"
+            include = ('has_order',)
 
-        search_term = self.search_input.text().lower()
+        self.proxy.set_mask(self.store.select(include, exclude, self.search_input.text()))
 
-        # フィルタリング
-        filtered_data = []
-        for item in self.expense_data:
-            # フィルタタイプチェック
-            if filter_type == "no_order" and item['has_order']:
-                continue
-            if filter_type == "has_order" and not item['has_order']:
-                continue
-
-            # 検索キーワードチェック
-            if search_term:
-                if (search_term not in item['program_name'].lower() and
-                    search_term not in item['payee'].lower()):
-                    continue
-
-            filtered_data.append(item)
-
-        # テーブル更新
-        self.populate_table(filtered_data)
-
-    def populate_table(self, data):
-        """テーブルにデータを表示"""
-        self.table.setRowCount(len(data))
-
-        for row, item in enumerate(data):
-            # ID (非表示)
-            self.table.setItem(row, 0, QTableWidgetItem(str(item['master_id'])))
-
-            # 番組名
-            self.table.setItem(row, 1, QTableWidgetItem(item['program_name']))
-
-            # 費用項目
-            self.table.setItem(row, 2, QTableWidgetItem(item['item_name']))
-
-            # 取引先名
-            self.table.setItem(row, 3, QTableWidgetItem(item['payee']))
-
-            # 金額
-            amount_text = f"{int(item['amount']):,}円" if item['amount'] else "-"
-            self.table.setItem(row, 4, QTableWidgetItem(amount_text))
-
-            # 契約期間
-            period_text = ""
-            if item['start_date'] and item['end_date']:
-                period_text = f"{item['start_date']} ~ {item['end_date']}"
-            elif item['start_date']:
-                period_text = f"{item['start_date']} ~"
-            self.table.setItem(row, 5, QTableWidgetItem(period_text))
-
-            # 支払タイプ
-            self.table.setItem(row, 6, QTableWidgetItem(item['payment_type']))
-
-            # 発注状況
-            status_text = "✓ 登録済" if item['has_order'] else "✕ 未登録"
-            status_item = QTableWidgetItem(status_text)
-            text_color = QColor(0, 0, 0)  # 黒
-            if item['has_order']:
-                status_item.setBackground(QColor(200, 255, 200))  # 薄い緑
-            else:
-                status_item.setBackground(QColor(255, 200, 200))  # 薄い赤
-            status_item.setForeground(QBrush(text_color))
-            self.table.setItem(row, 7, status_item)
-
-            # アクションボタン
-            if not item['has_order']:
-                add_btn = QPushButton("発注追加")
-                add_btn.clicked.connect(lambda checked, r=row: self.add_order_contract(r))
-                add_btn.setMinimumWidth(80)
-                self.table.setCellWidget(row, 8, add_btn)
-            else:
-                self.table.setItem(row, 8, QTableWidgetItem(""))
-
-            # 元の案件名 (非表示)
-            self.table.setItem(row, 9, QTableWidgetItem(item['project_name_full']))
-
-            # 行全体の背景色と文字色
-            for col in range(self.table.columnCount()):
-                cell_item = self.table.item(row, col)
-                if cell_item and not item['has_order']:
-                    cell_item.setBackground(QColor(255, 240, 240))  # とても薄い赤
-                    cell_item.setForeground(QBrush(text_color))
-
-    def add_order_contract(self, row):
-        """発注契約を追加"""
-        # 現在表示されているデータから該当行を取得
-        master_id = int(self.table.item(row, 0).text())
+    def on_table_clicked(self, index):
+        """アクション列（発注追加）のクリック"""
+        if index.column() != ACTION_COLUMN:
+            return
+        item = self.proxy.record(index)
+        if item and not item['has_order']:
+            self.add_order_contract(item['master_id'])
 
+    def add_order_contract(self, master_id):
+        """発注契約を追加"""
         # expense_dataから該当レコードを取得
         expense_item = None
         for item in self.expense_data:
@@ -442,8 +415,8 @@ class OrderCheckTab(QWidget):
 
     def update_statistics(self):
         """統計情報を更新"""
-        total = len(self.expense_data)
-        has_order = sum(1 for item in self.expense_data if item['has_order'])
+        total = len(self.store)
+        has_order = self.store.count(self.store.flag('has_order'))
         no_order = total - has_order
 
         self.stats_label.setText(
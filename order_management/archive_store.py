@@ -0,0 +1,312 @@
+"""費用項目のアーカイブ（年別のアーカイブDBへの移動）
+
+アーカイブした費用項目とその履歴（order_history / status_history）を、
+order_management.db と同じフォルダの archive_YYYY.db（支払予定日の年ごと）に移動します。
+発注管理DBにはアーカイブしていない行だけが残るため、通常の一覧・集計・照合は
+当年分の行だけを対象にできます。
+
+- 移動は1つの接続に年別のアーカイブDBを ATTACH し、1トランザクションで行う
+  （コピー → 削除。ジャーナルモードが WAL でなければファイルをまたいで原子的に確定する）
+- アーカイブDBのテーブルは発注管理DBと同じカラムで作成し、カラムが増えた場合は追加する
+- 移動は同じIDの行を置き換える（発注管理DBをバックアップから戻した後に再度移動しても重複しない）
+- 「アーカイブ済みを表示」用に、発注管理DBとアーカイブDBを UNION ALL する
+  TEMPビュー（expense_items_all 等）を作成する。発注管理DBにも残っているIDの行は
+  発注管理DBの行を使う（アーカイブDBの古い写しは除く）
+- アーカイブDBもバックアップの対象にする（archive_files）
+- 移動した費用項目の重複チェック・参照チェック用のキー（契約・番組・取引先・実施日・金額）を
+  発注管理DBの archived_expense_keys に残す（自動生成の重複チェック、番組の削除、
+  未登録支払いの抽出はアーカイブDBを ATTACH せずにアーカイブ済みの行を参照できる）
+
+使用例:
+    moved = move_to_archive(conn, db.db_path, "archived = 1")
+
+    detach = attach_archives(conn, db.db_path)
+    try:
+        rows = conn.execute("SELECT * FROM expense_items_all").fetchall()
+    finally:
+        detach()
+"""
+import os
+import re
+
+from utils import log_message
+
+# アーカイブするテーブル -> UNION ALL ビュー名
+ARCHIVE_VIEWS = {
+    'expense_items': 'expense_items_all',
+    'order_history': 'order_history_all',
+    'status_history': 'status_history_all',
+}
+
+# 費用項目と一緒に移動する履歴テーブル（expense_id で紐付け）
+HISTORY_TABLES = ('order_history', 'status_history')
+
+# archived_expense_keys に残す費用項目のカラム
+ARCHIVED_KEY_COLUMNS = ('contract_id', 'production_id', 'partner_id', 'implementation_date', 'amount')
+
+# migrations/010_create_archived_expense_keys.sql と同じ定義
+ARCHIVED_EXPENSE_KEYS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archived_expense_keys (
+        id INTEGER PRIMARY KEY,
+        year TEXT NOT NULL,
+        contract_id INTEGER,
+        production_id INTEGER,
+        partner_id INTEGER,
+        implementation_date DATE,
+        amount REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_contract
+        ON archived_expense_keys(contract_id, implementation_date, amount);
+    CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_production ON archived_expense_keys(production_id);
+    CREATE INDEX IF NOT EXISTS idx_archived_expense_keys_partner ON archived_expense_keys(partner_id, amount);
+"""
+
+# アーカイブDBの年（支払予定日の年。未設定の場合はアーカイブ日・当年）
+ARCHIVE_YEAR_SQL = (
+    "COALESCE(strftime('%Y', expected_payment_date), strftime('%Y', archived_date),"
+    " strftime('%Y', 'now'))"
+)
+
+# ビューで同時に ATTACH するアーカイブDBの上限（SQLiteの既定の上限は10）
+MAX_ATTACHED_ARCHIVES = 8
+
+_ARCHIVE_FILE = re.compile(r'^archive_(\d{4})\.db$')
+
+
+def archive_path(db_path, year):
+    """年のアーカイブDBのパス（発注管理DBと同じフォルダ）"""
+    return os.path.join(os.path.dirname(db_path), f"archive_{year}.db")
+
+
+def archive_years(db_path):
+    """アーカイブDBがある年（新しい順）"""
+    directory = os.path.dirname(db_path) or "."
+    try:
+        filenames = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted((m.group(1) for m in map(_ARCHIVE_FILE.match, filenames) if m), reverse=True)
+
+
+def archive_files(db_path):
+    """アーカイブDBのパス（新しい年順。バックアップの対象）"""
+    return [archive_path(db_path, year) for year in archive_years(db_path)]
+
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _attach_years(conn, db_path, years):
+    """アーカイブDBを archive_YYYY の別名で ATTACH
+
+    Returns:
+        tuple: ({年: スキーマ名}, ATTACH を解除する関数)
+    """
+    schemas = {}
+
+    def detach():
+        for schema in schemas.values():
+            conn.execute(f"DETACH DATABASE {schema}")
+
+    try:
+        for year in years:
+            schema = f"archive_{year}"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (archive_path(db_path, year),))
+            schemas[year] = schema
+    except Exception:
+        detach()
+        raise
+    return schemas, detach
+
+
+def _ensure_archive_tables(conn, schema):
+    """アーカイブDBのテーブルを発注管理DBと同じカラムで準備"""
+    for table in ARCHIVE_VIEWS:
+        live_columns = _columns(conn, 'main', table)
+        if not live_columns:
+            continue
+        archived_columns = _columns(conn, schema, table)
+        if not archived_columns:
+            conn.execute(f"CREATE TABLE {schema}.{table} AS SELECT * FROM main.{table} WHERE 0")
+            conn.execute(f"CREATE UNIQUE INDEX {schema}.idx_{table}_id ON {table}(id)")
+            if table in HISTORY_TABLES:
+                conn.execute(f"CREATE INDEX {schema}.idx_{table}_expense ON {table}(expense_id)")
+            continue
+        for column in live_columns:
+            if column not in archived_columns:
+                conn.execute(f'ALTER TABLE {schema}.{table} ADD COLUMN "{column}"')
+
+
+def move_to_archive(conn, db_path, where, params=(), before_delete=()):
+    """条件に一致する費用項目と履歴を年別のアーカイブDBに移動（コミットまで行う）
+
+    移動した費用項目は archived = 1（archived_date 未設定の場合は当日）になります。
+
+    Args:
+        conn: 発注管理DBの接続（トランザクション中でないこと）
+        db_path: 発注管理DBのパス（アーカイブDBの保存先）
+        where: 移動する expense_items の条件（SQL）
+        params: where のパラメータ
+        before_delete: 削除前に同じトランザクションで実行する (SQL, パラメータ) のリスト
+                       （移動する費用項目のIDは temp.archive_move(id, year) で参照できる）
+
+    Returns:
+        int: 移動した費用項目の件数
+    """
+    years = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT {ARCHIVE_YEAR_SQL} FROM main.expense_items WHERE {where}", params)]
+    if not years:
+        return 0
+
+    conn.executescript(ARCHIVED_EXPENSE_KEYS_SCHEMA)
+    schemas, detach = _attach_years(conn, db_path, years)
+    try:
+        for schema in schemas.values():
+            _ensure_archive_tables(conn, schema)
+
+        conn.execute("DROP TABLE IF EXISTS temp.archive_move")
+        conn.execute("CREATE TEMP TABLE archive_move (id INTEGER PRIMARY KEY, year TEXT NOT NULL)")
+
+        cursor = conn.cursor()
+        try:
+            if not conn.in_transaction:
+                cursor.execute("BEGIN")
+
+            # 移動する行を確定（条件の再評価で対象が変わらないように）
+            cursor.execute(f"""
+                INSERT INTO temp.archive_move (id, year)
+                SELECT id, {ARCHIVE_YEAR_SQL} FROM main.expense_items WHERE {where}
+            """, params)
+
+            item_columns = _columns(conn, 'main', 'expense_items')
+            values = ", ".join(
+                "1" if column == 'archived'
+                else "COALESCE(archived_date, CURRENT_DATE)" if column == 'archived_date'
+                else f'"{column}"'
+                for column in item_columns
+            )
+            history_tables = [table for table in HISTORY_TABLES if _columns(conn, 'main', table)]
+
+            for year, schema in schemas.items():
+                # 同じIDの行（発注管理DBを戻す前に移動した写し）は置き換える
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO {schema}.expense_items ({', '.join(f'"{c}"' for c in item_columns)})
+                    SELECT {values} FROM main.expense_items
+                    WHERE id IN (SELECT id FROM temp.archive_move WHERE year = ?)
+                """, (year,))
+                for table in history_tables:
+                    columns = ", ".join(f'"{c}"' for c in _columns(conn, 'main', table))
+                    cursor.execute(f"""
+                        INSERT OR REPLACE INTO {schema}.{table} ({columns})
+                        SELECT {columns} FROM main.{table}
+                        WHERE expense_id IN (SELECT id FROM temp.archive_move WHERE year = ?)
+                    """, (year,))
+
+            key_columns = ", ".join(ARCHIVED_KEY_COLUMNS)
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO main.archived_expense_keys (id, year, {key_columns})
+                SELECT ei.id, am.year, {", ".join(f"ei.{c}" for c in ARCHIVED_KEY_COLUMNS)}
+                FROM main.expense_items ei
+                JOIN temp.archive_move am ON am.id = ei.id
+            """)
+
+            for sql, sql_params in before_delete:
+                cursor.execute(sql, sql_params)
+
+            for table in history_tables:
+                cursor.execute(f"""
+                    DELETE FROM main.{table} WHERE expense_id IN (SELECT id FROM temp.archive_move)
+                """)
+            cursor.execute("DELETE FROM main.expense_items WHERE id IN (SELECT id FROM temp.archive_move)")
+            count = cursor.rowcount
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DROP TABLE IF EXISTS temp.archive_move")
+    finally:
+        detach()
+
+    log_message(f"{count}件の費用項目をアーカイブDBに移動しました（{', '.join(sorted(years))}年）")
+    return count
+
+
+def sync_archived_keys(conn, db_path):
+    """アーカイブDBの費用項目のうち archived_expense_keys にないキーを追加（コミットまで行う）
+
+    バックアップから戻した発注管理DBでは、その後に移動した費用項目のキーがないため、
+    起動時にアーカイブDBから補います。
+
+    Returns:
+        int: 追加したキーの件数
+    """
+    conn.executescript(ARCHIVED_EXPENSE_KEYS_SCHEMA)
+    added = 0
+    for year in archive_years(db_path):
+        schemas, detach = _attach_years(conn, db_path, [year])
+        try:
+            schema = schemas[year]
+            archived_columns = set(_columns(conn, schema, 'expense_items'))
+            if not archived_columns:
+                continue
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO main.archived_expense_keys (id, year, {})
+                SELECT id, ?, {} FROM {}.expense_items
+            """.format(
+                ", ".join(ARCHIVED_KEY_COLUMNS),
+                ", ".join(c if c in archived_columns else f"NULL AS {c}" for c in ARCHIVED_KEY_COLUMNS),
+                schema), (year,))
+            added += max(cursor.rowcount, 0)
+            conn.commit()
+        finally:
+            detach()
+    if added:
+        log_message(f"アーカイブDBの費用項目のキーを{added}件追加しました")
+    return added
+
+
+def attach_archives(conn, db_path):
+    """アーカイブDBを ATTACH し、UNION ALL のTEMPビュー（expense_items_all 等）を作成
+
+    アーカイブDBがない場合も、発注管理DBのテーブルだけのビューを作成します。
+    アーカイブDBが MAX_ATTACHED_ARCHIVES より多い場合は新しい年のものだけを含めます。
+
+    Returns:
+        function: ビューを削除して ATTACH を解除する関数
+    """
+    years = archive_years(db_path)
+    if len(years) > MAX_ATTACHED_ARCHIVES:
+        log_message(f"アーカイブDBが多いため {', '.join(years[MAX_ATTACHED_ARCHIVES:])}年 を除いて表示します")
+        years = years[:MAX_ATTACHED_ARCHIVES]
+
+    schemas, detach_schemas = _attach_years(conn, db_path, years)
+    views = []
+
+    def detach():
+        for view in views:
+            conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+        detach_schemas()
+
+    try:
+        for table, view in ARCHIVE_VIEWS.items():
+            columns = _columns(conn, 'main', table)
+            if not columns:
+                continue
+            selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+            for schema in schemas.values():
+                archived_columns = set(_columns(conn, schema, table))
+                if archived_columns:
+                    # 発注管理DBにも残っているID（バックアップから戻した場合）は発注管理DBの行を使う
+                    selects.append("SELECT {} FROM {}.{} WHERE id NOT IN (SELECT id FROM main.{})".format(
+                        ", ".join(c if c in archived_columns else f"NULL AS {c}" for c in columns),
+                        schema, table, table))
+            conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+            conn.execute(f"CREATE TEMP VIEW {view} AS {' UNION ALL '.join(selects)}")
+            views.append(view)
+    except Exception:
+        detach()
+        raise
+    return detach
@@ -84,6 +84,83 @@ def calculate_monthly_broadcast_count(year: int, month: int, broadcast_days: str
     return total_count
 
 
+# 放送例外の種類
+EXCEPTION_CANCELLED = "休止"  # 特番・祝日等で放送なし
+EXCEPTION_ADDED = "追加"  # 通常の曜日以外の追加放送
+
+
+def parse_broadcast_weekdays(broadcast_days: str) -> frozenset:
+    """放送曜日の文字列を曜日番号の集合に変換
+
+    Args:
+        broadcast_days: 放送曜日の文字列（例: "月,水,金" or "月水金"）
+
+    Returns:
+        frozenset: 曜日番号（0=月曜, 6=日曜）の集合
+    """
+    weekday_map = get_weekday_name_to_number()
+    return frozenset(weekday_map[c] for c in (broadcast_days or "") if c in weekday_map)
+
+
+def build_monthly_broadcast_counts(broadcast_days_by_production: dict, months, exceptions=()) -> dict:
+    """番組ごと・月ごとの放送回数を一括計算
+
+    各月の曜日ごとの日数を1回だけ数え、番組の放送曜日の分を合計したうえで、
+    放送例外（休止・追加）を反映します。
+
+    Args:
+        broadcast_days_by_production: {番組ID: 放送曜日の文字列}
+        months: 対象月 "YYYY-MM" のリスト
+        exceptions: (番組ID（Noneの場合は全番組）, 日付 "YYYY-MM-DD", 種類) のリスト
+
+    Returns:
+        dict: {(番組ID, "YYYY-MM"): 放送回数}（放送曜日が未設定の番組は含まない）
+    """
+    weekdays_by_production = {
+        production_id: parse_broadcast_weekdays(broadcast_days)
+        for production_id, broadcast_days in broadcast_days_by_production.items()
+    }
+    weekdays_by_production = {pid: days for pid, days in weekdays_by_production.items() if days}
+
+    counts = {}
+    for year_month in set(months):
+        year, month = int(year_month[:4]), int(year_month[5:7])
+        first_weekday, last_day = calendar.monthrange(year, month)
+        # 曜日ごとの日数（4回または5回）
+        weekday_counts = [4] * 7
+        for offset in range(last_day - 28):
+            weekday_counts[(first_weekday + offset) % 7] += 1
+
+        for production_id, weekdays in weekdays_by_production.items():
+            counts[(production_id, year_month)] = sum(weekday_counts[w] for w in weekdays)
+
+    # 放送例外を反映（同じ番組・同じ日の重複登録は1回として扱う）
+    cancelled = set()
+    added = set()
+    for production_id, broadcast_date, exception_type in exceptions:
+        try:
+            d = datetime.strptime(broadcast_date[:10], "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            continue
+        year_month = d.strftime("%Y-%m")
+        targets = weekdays_by_production if production_id is None else [production_id]
+        for target in targets:
+            if (target, year_month) not in counts:
+                continue
+            scheduled = d.weekday() in weekdays_by_production[target]
+            if exception_type == EXCEPTION_CANCELLED and scheduled:
+                cancelled.add((target, d))
+            elif exception_type == EXCEPTION_ADDED and not scheduled and production_id is not None:
+                added.add((target, d))
+
+    for production_id, d in cancelled:
+        counts[(production_id, d.strftime("%Y-%m"))] -= 1
+    for production_id, d in added:
+        counts[(production_id, d.strftime("%Y-%m"))] += 1
+
+    return counts
+
+
 def calculate_payment_amount(year: int, month: int, broadcast_days: str,
                             payment_type: str, unit_price: float = None) -> float:
     """指定月の支払予定額を計算
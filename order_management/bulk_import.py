@@ -0,0 +1,227 @@
+"""CSVマスターデータ取込の共通処理
+
+OrderManagementDB の import_*_from_csv で使う一括取込の仕組みです。
+
+1. 取込開始時に 名前 → ID の対応表・既存IDの集合を1回だけ読み込む（LookupMaps）
+2. 全行をメモリ上で検証・変換し、行ごとのエラーを記録する（BulkImportPlan）
+3. 検証済みの復元ポイント（db_backup.py）を作成してから、
+   追加・更新をそれぞれ executemany で1トランザクションにまとめて反映する
+
+検証のみ（dry_run）の場合も 3 と同じSQLを SAVEPOINT 内で実行し、制約違反等の
+エラーと件数を記録したうえで必ず取り消します（復元ポイントは作成しません）。
+番組が見つからない・名前が重複する等、反映時に失敗する行も検証結果に含まれます。
+
+使用例:
+    plan = BulkImportPlan()
+    maps = LookupMaps(cursor)
+    for row_num, row in enumerate(csv_data, start=2):
+        partner_id = maps.partner_ids().get(row['取引先名'])
+        if partner_id is None:
+            plan.error(row_num, '取引先が見つかりません')
+            continue
+        plan.insert(row_num, (row['名前'], partner_id), key=(row['名前'], partner_id))
+    plan.apply(conn, insert_sql=INSERT_SQL, dry_run=dry_run)
+    if not dry_run:
+        conn.commit()
+    return plan.result
+"""
+import sqlite3
+
+from db_backup import create_restore_point
+
+
+def load_name_map(cursor, table, key_columns=("name",), where=None):
+    """キー列 → ID の対応表を作成
+
+    同じキーの行が複数ある場合は、`SELECT id ... WHERE name = ?` の結果と
+    同じく最も小さいIDを使います。
+
+    Args:
+        cursor: カーソル
+        table: テーブル名
+        key_columns: キーにする列（1列の場合は値、複数列の場合はタプルがキー）
+        where: 対象行の条件（SQL）
+
+    Returns:
+        dict: キー -> ID
+    """
+    query = f"SELECT id, {', '.join(key_columns)} FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    query += " ORDER BY id"
+
+    mapping = {}
+    for row in cursor.execute(query):
+        key = row[1] if len(key_columns) == 1 else tuple(row[1:])
+        mapping.setdefault(key, row[0])
+    return mapping
+
+
+def load_id_set(cursor, table, where=None):
+    """テーブルの既存IDの集合"""
+    query = f"SELECT id FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    return {row[0] for row in cursor.execute(query)}
+
+
+class LookupMaps:
+    """取込中に参照する対応表（必要になったものだけを1回読み込む）"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self._cache = {}
+
+    def _get(self, key, loader):
+        if key not in self._cache:
+            self._cache[key] = loader()
+        return self._cache[key]
+
+    def production_ids(self):
+        """番組名 → 番組ID"""
+        return self._get('productions', lambda: load_name_map(self.cursor, 'productions'))
+
+    def partner_ids(self):
+        """取引先名 → 取引先ID"""
+        return self._get('partners', lambda: load_name_map(self.cursor, 'partners'))
+
+    def cast_ids(self):
+        """(出演者名, 所属事務所ID) → 出演者ID"""
+        return self._get('cast', lambda: load_name_map(self.cursor, 'cast', ('name', 'partner_id')))
+
+    def contract_ids(self):
+        """(番組ID, 取引先ID, 委託開始日, 委託終了日) → 契約ID"""
+        return self._get('contracts', lambda: load_name_map(
+            self.cursor, 'contracts',
+            ('production_id', 'partner_id', 'contract_start_date', 'contract_end_date')))
+
+    def ids(self, table, where=None):
+        """テーブルの既存IDの集合"""
+        return self._get(('ids', table, where), lambda: load_id_set(self.cursor, table, where))
+
+
+class BulkImportPlan:
+    """検証・変換済みの行を集め、一括で反映する"""
+
+    def __init__(self, warnings=False):
+        """
+        Args:
+            warnings: 結果に 'warnings'（取り込むが注意が必要な行）を含めるか
+        """
+        self.result = {
+            'success': 0,
+            'updated': 0,
+            'inserted': 0,
+            'skipped': 0,
+            'errors': []
+        }
+        if warnings:
+            self.result['warnings'] = []
+
+        self.inserts = []    # [パラメータ, [(行番号, 集計した種類), ...]]
+        self.updates = []    # [パラメータ, [(行番号, 集計した種類)]]
+        self._pending = {}   # 一致キー -> inserts の要素
+
+    def error(self, row_num, reason):
+        """取り込めない行を記録"""
+        self.result['errors'].append({'row': row_num, 'reason': reason})
+        self.result['skipped'] += 1
+
+    def warning(self, row_num, reason):
+        """取り込むが注意が必要な行を記録"""
+        self.result['warnings'].append({'row': row_num, 'reason': reason})
+
+    def insert(self, row_num, params, key=None, match=True):
+        """追加する行
+
+        Args:
+            row_num: CSVの行番号
+            params: INSERT文のパラメータ
+            key: 一致キー（同じ取込の後の行で同じキーのものは、この行の更新として扱う）
+            match: Falseの場合、同じキーの追加予定の行があっても更新とせずに追加する
+                   （IDを指定した行など）
+        """
+        if match and key is not None and key in self._pending:
+            # 先に追加予定にした行を、この行の内容で更新する
+            entry = self._pending[key]
+            entry[0] = params
+            entry[1].append((row_num, 'updated'))
+            self._count('updated')
+            return
+
+        entry = [params, [(row_num, 'inserted')]]
+        self.inserts.append(entry)
+        if key is not None:
+            self._pending.setdefault(key, entry)
+        self._count('inserted')
+
+    def update(self, row_num, params):
+        """既存の行を更新する"""
+        self.updates.append([params, [(row_num, 'updated')]])
+        self._count('updated')
+
+    def _count(self, kind):
+        self.result[kind] += 1
+        self.result['success'] += 1
+
+    def apply(self, conn, insert_sql=None, update_sql=None, before=(), dry_run=False):
+        """追加・更新を1トランザクションで反映（コミットは呼び出し側）
+
+        反映の前に復元ポイント（pre_import）を作成します。
+
+        Args:
+            conn: DB接続
+            insert_sql: 追加のSQL（inserts のパラメータで実行）
+            update_sql: 更新のSQL（updates のパラメータで実行）
+            before: 反映前に同じトランザクションで実行するSQL（上書き時の削除等）
+            dry_run: Trueの場合は同じSQLを SAVEPOINT 内で実行して結果だけを記録し、必ず取り消す
+        """
+        if dry_run:
+            self.result['dry_run'] = True
+            cursor = conn.cursor()
+            cursor.execute("SAVEPOINT bulk_import_dry_run")
+            try:
+                self._apply(cursor, insert_sql, update_sql, before)
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_import_dry_run")
+                cursor.execute("RELEASE SAVEPOINT bulk_import_dry_run")
+            return
+
+        if self.inserts or self.updates or before:
+            # 取込前に検証済みの復元ポイントを作成（作成できない場合は取り込まない）
+            create_restore_point(conn, "pre_import")
+
+        cursor = conn.cursor()
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        self._apply(cursor, insert_sql, update_sql, before)
+
+    def _apply(self, cursor, insert_sql, update_sql, before):
+        for sql in before:
+            cursor.execute(sql)
+        if update_sql:
+            self._execute(cursor, update_sql, self.updates)
+        if insert_sql:
+            self._execute(cursor, insert_sql, self.inserts)
+
+    def _execute(self, cursor, sql, entries):
+        """executemany で反映（失敗した場合は1行ずつ実行して失敗した行を記録）"""
+        if not entries:
+            return
+
+        cursor.execute("SAVEPOINT bulk_import")
+        try:
+            cursor.executemany(sql, [params for params, _ in entries])
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_import")
+            for params, rows in entries:
+                try:
+                    cursor.execute(sql, params)
+                except sqlite3.Error as e:
+                    # この内容にまとめた行はすべて取り込めなかったものとする
+                    for row_num, kind in rows:
+                        self.result[kind] -= 1
+                        self.result['success'] -= 1
+                        self.error(row_num, str(e))
+            self.result['errors'].sort(key=lambda error: error['row'])
+        cursor.execute("RELEASE SAVEPOINT bulk_import")
@@ -2,10 +2,26 @@
 
 発注管理機能のデータベース操作を担当します。
 """
-import sqlite3
+import calendar
+import os
+from contextlib import contextmanager
 from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from utils import log_message
+from query_profiler import connect as profiled_connect
+from db_backup import create_restore_point
+from federated_db import attach_databases
+from change_events import publish_change, INSERT, UPDATE, DELETE, RELOAD
+from order_management.models import ExpenseItem, record_factory
+from order_management.bulk_import import BulkImportPlan, LookupMaps
+from order_management.archive_store import (
+    archive_files, attach_archives, move_to_archive, sync_archived_keys,
+)
+from order_management.broadcast_utils import (
+    EXCEPTION_ADDED,
+    EXCEPTION_CANCELLED,
+    calculate_monthly_broadcast_count,
+)
 
 
 def parse_flexible_date(date_str: str) -> Optional[str]:
@@ -46,24 +62,338 @@ def parse_flexible_date(date_str: str) -> Optional[str]:
     return None
 
 
+
+# ========================================
+# 番組別費用集計テーブル（production_expense_rollup）
+# ========================================
+
+# 集計テーブルのカラム（production_id, year_month 以外）
+EXPENSE_ROLLUP_COLUMNS = [
+    'all_count', 'all_amount',  # アーカイブ済みを含む全件
+    'item_count', 'total_amount', 'unpaid_count', 'unpaid_amount',
+    'paid_count', 'paid_amount', 'pending_count',  # アーカイブ済みを除く
+]
+
+EXPENSE_ROLLUP_TRIGGERS = [
+    'trg_expense_rollup_insert',
+    'trg_expense_rollup_update',
+    'trg_expense_rollup_delete',
+]
+
+# 集計に影響するカラム（これ以外の更新ではトリガーを実行しない）
+EXPENSE_ROLLUP_SOURCE_COLUMNS = [
+    'production_id', 'amount', 'amount_pending', 'payment_status',
+    'expected_payment_date', 'archived',
+]
+
+
+def _expense_rollup_month(ref: str) -> str:
+    """費用項目の集計月（支払予定日の年月、未設定の場合は空文字）"""
+    return f"COALESCE(strftime('%Y-%m', {ref}.expected_payment_date), '')"
+
+
+def _expense_rollup_values(ref: str) -> List[str]:
+    """費用項目1件が集計テーブルの各カラムに加算する値のSQL式
+
+    get_production_expense_summary の従来の集計条件と同じ条件で加算します。
+    """
+    active = f"({ref}.archived = 0 OR {ref}.archived IS NULL)"
+    amount = f"COALESCE({ref}.amount, 0)"
+    return [
+        "1",
+        amount,
+        f"CASE WHEN {active} THEN 1 ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.amount_pending IS NOT 1 THEN {amount} ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.payment_status = '未払い' THEN 1 ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.payment_status = '未払い' AND {ref}.amount_pending = 0"
+        f" THEN {amount} ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.payment_status = '支払済' THEN 1 ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.payment_status = '支払済' THEN {amount} ELSE 0 END",
+        f"CASE WHEN {active} AND {ref}.amount_pending = 1 THEN 1 ELSE 0 END",
+    ]
+
+
+def _expense_rollup_apply_sql(ref: str, sign: str) -> str:
+    """OLD/NEW の費用項目を集計テーブルに加算（sign='+'）・減算（sign='-'）するSQL"""
+    columns = ", ".join(EXPENSE_ROLLUP_COLUMNS)
+    values = ", ".join(f"{sign}({value})" for value in _expense_rollup_values(ref))
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in EXPENSE_ROLLUP_COLUMNS)
+    month = _expense_rollup_month(ref)
+    return f"""
+        INSERT INTO production_expense_rollup (production_id, year_month, {columns})
+        VALUES ({ref}.production_id, {month}, {values})
+        ON CONFLICT(production_id, year_month) DO UPDATE SET {updates};
+        DELETE FROM production_expense_rollup
+        WHERE production_id = {ref}.production_id AND year_month = {month} AND all_count <= 0;"""
+
+
+# ========================================
+# 放送例外（broadcast_exceptions）
+# ========================================
+
+# migrations/008_create_broadcast_exceptions.sql と同じ定義
+BROADCAST_EXCEPTIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS broadcast_exceptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        production_id INTEGER REFERENCES productions(id) ON DELETE CASCADE,
+        broadcast_date DATE NOT NULL,
+        exception_type TEXT NOT NULL DEFAULT '休止',
+        reason TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_broadcast_exceptions_date ON broadcast_exceptions(broadcast_date);
+    CREATE INDEX IF NOT EXISTS idx_broadcast_exceptions_production ON broadcast_exceptions(production_id, broadcast_date);
+"""
+
+
+# ========================================
+# 費用項目の検索経路に合わせたインデックス
+# ========================================
+
+# 番組（production_id）のインデックスは次の2つだけにする（更新時に維持するインデックスを増やさない）
+#   idx_expense_items_production（migrations/002）: アーカイブ済みを含む番組の費用項目
+#       get_expenses_by_production, delete_production の件数確認, get_monthly_expenses_by_production
+#   idx_expense_items_live_production_payment: アーカイブしていない番組の費用項目
+#       get_production_expense_details_by_month（支払予定日の範囲まで使う）,
+#       get_production_expense_details, get_expense_months_by_production（番組の条件のみ使う）
+#   （以前の idx_expense_items_live_production（番組・実施日）は重複するため削除する）
+
+# migrations/009_add_expense_items_access_path_indexes.sql と同じ定義
+EXPENSE_ACCESS_PATH_INDEXES_SCHEMA = """
+    CREATE INDEX IF NOT EXISTS idx_expense_items_unmatched
+        ON expense_items(payment_status, partner_id, amount, expected_payment_date, item_name,
+                         payment_matched_id, archived)
+        WHERE payment_matched_id IS NULL AND (archived = 0 OR archived IS NULL);
+    CREATE INDEX IF NOT EXISTS idx_expense_items_contract_date_amount
+        ON expense_items(contract_id, implementation_date, amount);
+    DROP INDEX IF EXISTS idx_expense_items_live_production;
+    CREATE INDEX IF NOT EXISTS idx_expense_items_live_production_payment
+        ON expense_items(production_id, expected_payment_date)
+        WHERE archived = 0 OR archived IS NULL;
+"""
+
+# 照合（reconcile_payments_with_expenses）: 未照合・アーカイブしていない費用項目
+# （idx_expense_items_unmatched だけで取得できる）
+UNMATCHED_EXPENSE_ITEMS_SQL = """
+    SELECT ei.id, ei.item_name, p.name as partner_name, p.code as partner_code,
+           ei.amount, ei.expected_payment_date, ei.payment_status
+    FROM expense_items ei
+    LEFT JOIN partners p ON ei.partner_id = p.id
+    WHERE ei.payment_matched_id IS NULL
+      AND ei.payment_status != '支払済'
+      AND (ei.archived = 0 OR ei.archived IS NULL)
+"""
+
+# 費用項目の自動生成（generate_expense_items_from_contract）の重複チェック
+# アーカイブDBに移動した費用項目（archived_expense_keys）も含める
+# パラメータ: (契約ID, 実施日, 金額)
+# （idx_expense_items_contract_date_amount, idx_archived_expense_keys_contract を使う）
+CONTRACT_EXPENSE_EXISTS_SQL = """
+    SELECT (SELECT COUNT(*) FROM expense_items
+            WHERE contract_id = ?1 AND implementation_date = ?2 AND amount = ?3)
+         + (SELECT COUNT(*) FROM archived_expense_keys
+            WHERE contract_id = ?1 AND implementation_date = ?2 AND amount = ?3)
+"""
+
+# 回数ベース契約の重複チェック（金額は放送回数で変わるため契約ID・実施日のみ）
+# パラメータ: (契約ID, 実施日)
+CONTRACT_MONTH_EXPENSE_EXISTS_SQL = """
+    SELECT (SELECT COUNT(*) FROM expense_items
+            WHERE contract_id = ?1 AND implementation_date = ?2)
+         + (SELECT COUNT(*) FROM archived_expense_keys
+            WHERE contract_id = ?1 AND implementation_date = ?2)
+"""
+
+# 番組に紐付く費用項目の件数（アーカイブDBに移動した費用項目を含む）
+# パラメータ: (番組ID,)
+PRODUCTION_EXPENSE_COUNT_SQL = """
+    SELECT (SELECT COUNT(*) FROM expense_items WHERE production_id = ?1)
+         + (SELECT COUNT(*) FROM archived_expense_keys
+            WHERE production_id = ?1 AND id NOT IN (SELECT id FROM expense_items))
+"""
+
+# 費用項目が紐付いている番組のID（アーカイブDBに移動した費用項目を含む）
+REFERENCED_PRODUCTION_IDS_SQL = """
+    SELECT production_id FROM expense_items WHERE production_id IS NOT NULL
+    UNION
+    SELECT production_id FROM archived_expense_keys WHERE production_id IS NOT NULL
+"""
+
+# 番組別・月別の明細（get_production_expense_details_by_month）
+# 番組とコーナーを IN、支払予定日を範囲で絞り込む（idx_expense_items_live_production_payment を使う）
+# パラメータ: (番組ID, 番組ID, 'YYYY-MM', 'YYYY-MM')
+PRODUCTION_MONTH_DETAILS_SQL = """
+    SELECT
+        ei.id,
+        p.name as partner_name,
+        ei.item_name,
+        ei.amount,
+        ei.implementation_date,
+        ei.expected_payment_date,
+        ei.payment_status,
+        ei.status,
+        ei.notes,
+        ei.amount_pending,
+        ei.work_type,
+        corner.name as corner_name,
+        ei.corner_id,
+        ei.contract_id,
+        ei.invoice_received_date,
+        ei.actual_payment_date,
+        ei.payment_matched_id,
+        c.document_status
+    FROM expense_items ei
+    LEFT JOIN partners p ON ei.partner_id = p.id
+    LEFT JOIN productions corner ON ei.corner_id = corner.id
+    LEFT JOIN contracts c ON ei.contract_id = c.id
+    WHERE ei.production_id IN (
+              SELECT ?
+              UNION ALL
+              SELECT id FROM productions WHERE parent_production_id = ?
+          )
+      AND ei.expected_payment_date >= ? || '-01'
+      AND ei.expected_payment_date < date(? || '-01', '+1 month')
+      AND (ei.archived = 0 OR ei.archived IS NULL)
+    ORDER BY ei.implementation_date ASC, ei.id ASC
+"""
+
+# インデックス -> それを使うはずのクエリ（各メソッドと同じSQL）と確認用のパラメータ
+EXPENSE_INDEX_PLAN_CHECKS = {
+    'idx_expense_items_unmatched': (UNMATCHED_EXPENSE_ITEMS_SQL, ()),
+    'idx_expense_items_contract_date_amount': (CONTRACT_EXPENSE_EXISTS_SQL, (1, '2025-01-01', 0)),
+    'idx_archived_expense_keys_contract': (CONTRACT_EXPENSE_EXISTS_SQL, (1, '2025-01-01', 0)),
+    'idx_expense_items_live_production_payment': (PRODUCTION_MONTH_DETAILS_SQL, (1, 1, '2025-01', '2025-01')),
+}
+
+
+def check_expense_index_usage(conn) -> List[dict]:
+    """費用項目のインデックスをクエリプランナーが使っているか確認
+
+    EXPENSE_INDEX_PLAN_CHECKS の各クエリを EXPLAIN QUERY PLAN し、
+    対応するインデックスを使っていないものを返します（インデックスの劣化の検出用）。
+
+    Returns:
+        List[dict]: [{'index': インデックス名, 'plan': プランの各行}]（すべて使っていれば空）
+    """
+    problems = []
+    for index, (sql, params) in EXPENSE_INDEX_PLAN_CHECKS.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        if not any(f"INDEX {index} " in f"{line} " for line in plan):
+            problems.append({'index': index, 'plan': plan})
+    return problems
+
+
+# ========================================
+# アーカイブ（archive_YYYY.db への移動）
+# ========================================
+
+# 以前にアーカイブ済み（archived = 1）にして発注管理DBに残っている費用項目
+ARCHIVE_FLAGGED_WHERE = "archived = 1"
+
+# 指定月数より前の支払済みの費用項目（パラメータ: '-月数'）
+ARCHIVE_OLD_PAID_WHERE = """
+    payment_status = '支払済'
+    AND expected_payment_date < date('now', ? || ' months')
+    AND (archived = 0 OR archived IS NULL)
+"""
+
+# アーカイブDBに移動する費用項目（上の2つ）
+ARCHIVE_CANDIDATES_WHERE = f"{ARCHIVE_FLAGGED_WHERE} OR ({ARCHIVE_OLD_PAID_WHERE})"
+
+# 発注管理DBに残る（アーカイブしていない）費用項目だけの部分インデックス
+LIVE_EXPENSE_INDEXES_SCHEMA = """
+    CREATE INDEX IF NOT EXISTS idx_expense_items_live_payment_date
+        ON expense_items(expected_payment_date)
+        WHERE archived = 0 OR archived IS NULL;
+"""
+
+
+class _HeldConnection:
+    """close() しても閉じない接続（常駐ジョブで接続を使い回すため）
+
+    各メソッドは従来どおり close() を呼びますが、実際には未コミットの変更を
+    取り消して row_factory を戻すだけで、接続は OrderManagementDB.hold_connection()
+    を抜けるまで保持されます。メソッドの中から別のメソッドを呼んだ場合は、
+    外側のメソッドが close() するまで取り消しません。
+    """
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_depth', 0)
+
+    def acquire(self):
+        object.__setattr__(self, '_depth', self._depth + 1)
+        return self
+
+    def close(self):
+        object.__setattr__(self, '_depth', max(self._depth - 1, 0))
+        if self._depth:
+            return
+        if self._conn.in_transaction:
+            self._conn.rollback()
+        self._conn.row_factory = None
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+
 class OrderManagementDB:
     """発注管理データベースマネージャー"""
 
     def __init__(self, db_path="order_management.db"):
         self.db_path = db_path
+        self._held_connection = None
         # テーブル存在チェックと自動作成
         self._ensure_tables_exist()
         # 起動時に自動マイグレーションを実行
         self._auto_migrate()
+        # 番組別費用集計テーブルとトリガーを準備
+        self._ensure_expense_rollup()
+        # 放送例外テーブルを準備
+        self._ensure_broadcast_exceptions()
+        # アーカイブしていない費用項目の部分インデックスを準備
+        self._ensure_live_expense_indexes()
+        # アーカイブDBに移動した費用項目のキーを準備
+        self._ensure_archived_keys()
 
     def _get_connection(self):
         """データベース接続を取得"""
-        return sqlite3.connect(self.db_path)
+        if self._held_connection is not None:
+            return self._held_connection.acquire()
+        return profiled_connect(self.db_path)
+
+    @contextmanager
+    def hold_connection(self):
+        """ブロック内では1本の接続を使い回す（常駐ジョブ用。スレッド間では共有しないこと）
+
+        使用例:
+            with db.hold_connection():
+                db.reconcile_payments_with_expenses()
+                db.check_and_execute_auto_renewal()
+        """
+        if self._held_connection is not None:
+            yield self
+            return
+
+        conn = profiled_connect(self.db_path)
+        self._held_connection = _HeldConnection(conn)
+        try:
+            yield self
+        finally:
+            self._held_connection = None
+            conn.close()
 
     def _ensure_tables_exist(self):
         """必須テーブルが存在することを保証"""
-        import os
-
         # DBファイルが存在しない場合は作成
         if not os.path.exists(self.db_path):
             open(self.db_path, 'a').close()
@@ -119,7 +449,6 @@ class OrderManagementDB:
 
     def _auto_migrate(self):
         """起動時に自動でマイグレーションを実行"""
-        import os
         if not os.path.exists(self.db_path):
             return  # データベースがまだ作成されていない場合はスキップ
 
@@ -160,6 +489,127 @@ class OrderManagementDB:
         except Exception as e:
             print(f"⚠️  自動マイグレーションエラー: {e}")
 
+    def _ensure_expense_rollup(self):
+        """番組別費用集計テーブル（production_expense_rollup）を準備
+
+        集計テーブルは expense_items のトリガーで差分更新されます。
+        テーブルまたはトリガーが存在しない場合のみ作成し、集計を再構築します。
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT name FROM sqlite_master
+                WHERE (type = 'table' AND name = 'production_expense_rollup')
+                   OR (type = 'trigger' AND name LIKE 'trg_expense_rollup_%')
+            """)
+            existing = {row[0] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+
+        if existing >= {'production_expense_rollup', *EXPENSE_ROLLUP_TRIGGERS}:
+            return
+
+        try:
+            self.rebuild_expense_rollup()
+        except Exception as e:
+            print(f"⚠️  費用集計テーブルの作成エラー: {e}")
+
+    def _ensure_broadcast_exceptions(self):
+        """放送例外テーブル（broadcast_exceptions）を準備"""
+        conn = self._get_connection()
+        try:
+            conn.executescript(BROADCAST_EXCEPTIONS_SCHEMA)
+        except Exception as e:
+            print(f"⚠️  放送例外テーブルの作成エラー: {e}")
+        finally:
+            conn.close()
+
+    def _ensure_live_expense_indexes(self):
+        """アーカイブしていない費用項目の部分インデックスと、検索経路に合わせたインデックスを準備"""
+        conn = self._get_connection()
+        try:
+            conn.executescript(LIVE_EXPENSE_INDEXES_SCHEMA + EXPENSE_ACCESS_PATH_INDEXES_SCHEMA)
+        except Exception as e:
+            print(f"⚠️  費用項目のインデックスの作成エラー: {e}")
+        finally:
+            conn.close()
+
+    def _ensure_archived_keys(self):
+        """アーカイブDBに移動した費用項目のキー（archived_expense_keys）を準備し、不足分を補う"""
+        conn = self._get_connection()
+        try:
+            sync_archived_keys(conn, self.db_path)
+        except Exception as e:
+            print(f"⚠️  アーカイブ済み費用項目のキーの準備エラー: {e}")
+        finally:
+            conn.close()
+
+    def rebuild_expense_rollup(self):
+        """番組別費用集計テーブルとトリガーを作り直し、expense_items から再集計
+
+        アーカイブDBに移動した費用項目も全件（all_count, all_amount）に含めます。
+        """
+        amount_columns = {'all_amount', 'total_amount', 'unpaid_amount', 'paid_amount'}
+        column_defs = ",\n".join(
+            f"    {column} {'REAL' if column in amount_columns else 'INTEGER'} NOT NULL DEFAULT 0"
+            for column in EXPENSE_ROLLUP_COLUMNS
+        )
+        columns = ", ".join(EXPENSE_ROLLUP_COLUMNS)
+        sums = ", ".join(f"SUM({value})" for value in _expense_rollup_values('ei'))
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        detach_archives = attach_archives(conn, self.db_path)
+        try:
+            for trigger in EXPENSE_ROLLUP_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute("DROP TABLE IF EXISTS production_expense_rollup")
+
+            cursor.execute(f"""
+                CREATE TABLE production_expense_rollup (
+                    production_id INTEGER NOT NULL,
+                    year_month TEXT NOT NULL DEFAULT '',
+                {column_defs},
+                    PRIMARY KEY (production_id, year_month)
+                )
+            """)
+
+            cursor.execute(f"""
+                INSERT INTO production_expense_rollup (production_id, year_month, {columns})
+                SELECT ei.production_id, {_expense_rollup_month('ei')}, {sums}
+                FROM expense_items_all ei
+                GROUP BY 1, 2
+            """)
+
+            cursor.execute(f"""
+                CREATE TRIGGER trg_expense_rollup_insert
+                AFTER INSERT ON expense_items
+                BEGIN{_expense_rollup_apply_sql('NEW', '+')}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_expense_rollup_update
+                AFTER UPDATE OF {", ".join(EXPENSE_ROLLUP_SOURCE_COLUMNS)} ON expense_items
+                BEGIN{_expense_rollup_apply_sql('OLD', '-')}{_expense_rollup_apply_sql('NEW', '+')}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_expense_rollup_delete
+                AFTER DELETE ON expense_items
+                BEGIN{_expense_rollup_apply_sql('OLD', '-')}
+                END
+            """)
+
+            conn.commit()
+            log_message("番組別費用集計テーブルを再構築しました")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            detach_archives()
+            conn.close()
+
     # ========================================
     # 統合取引先マスター操作（Phase 6）
     # ========================================
@@ -290,6 +740,7 @@ class OrderManagementDB:
                 supplier_id = supplier_data['id']
 
             conn.commit()
+            publish_change('suppliers', [supplier_id], INSERT if is_new else UPDATE)
             log_message(f"発注先保存完了: ID={supplier_id}")
             return supplier_id
         except Exception as e:
@@ -307,6 +758,7 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM suppliers WHERE id = ?", (supplier_id,))
             conn.commit()
+            publish_change('suppliers', [supplier_id], DELETE)
             return cursor.rowcount
         finally:
             conn.close()
@@ -418,6 +870,7 @@ class OrderManagementDB:
                 expense_id = expense_data['id']
 
             conn.commit()
+            publish_change('expense_items', [expense_id], INSERT if is_new else UPDATE)
             log_message(f"費用項目保存完了: ID={expense_id}")
             return expense_id
         except Exception as e:
@@ -435,6 +888,7 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM expense_items WHERE id = ?", (expense_id,))
             conn.commit()
+            publish_change('expense_items', [expense_id], DELETE)
             return cursor.rowcount
         finally:
             conn.close()
@@ -452,9 +906,9 @@ class OrderManagementDB:
         cursor = conn.cursor()
 
         try:
-            # 実績合計取得
+            # 実績合計取得（番組別費用集計テーブルから）
             cursor.execute("""
-                SELECT SUM(amount) FROM expense_items WHERE production_id = ?
+                SELECT SUM(all_amount) FROM production_expense_rollup WHERE production_id = ?
             """, (production_id,))
             row = cursor.fetchone()
             actual = row[0] if row and row[0] else 0.0
@@ -635,6 +1089,7 @@ class OrderManagementDB:
                 production_id = production_data['id']
 
             conn.commit()
+            publish_change('productions', [production_id], INSERT if is_new else UPDATE)
             return production_id
         except Exception as e:
             conn.rollback()
@@ -648,10 +1103,8 @@ class OrderManagementDB:
         cursor = conn.cursor()
 
         try:
-            # 関連する費用項目が存在するかチェック
-            cursor.execute("""
-                SELECT COUNT(*) FROM expense_items WHERE production_id = ?
-            """, (production_id,))
+            # 関連する費用項目が存在するかチェック（アーカイブDBに移動した費用項目を含む）
+            cursor.execute(PRODUCTION_EXPENSE_COUNT_SQL, (production_id,))
             count = cursor.fetchone()[0]
 
             if count > 0:
@@ -660,6 +1113,9 @@ class OrderManagementDB:
             # CASCADE削除により出演者・制作会社も自動削除される
             cursor.execute("DELETE FROM productions WHERE id = ?", (production_id,))
             conn.commit()
+            publish_change('productions', [production_id], DELETE)
+            # 紐付く費用項目もカスケード削除される
+            publish_change('expense_items', None, DELETE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -740,6 +1196,7 @@ class OrderManagementDB:
                 ))
 
             conn.commit()
+            publish_change('productions', [new_production_id], INSERT)
             log_message(f"制作物複製完了: 元ID={production_id}, 新ID={new_production_id}, 費用項目={len(expenses)}件")
             return new_production_id
 
@@ -794,6 +1251,7 @@ class OrderManagementDB:
                 """, (production_id, cast['cast_id'], cast.get('role', ''), now))
 
             conn.commit()
+            publish_change('production_cast', None, UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -844,6 +1302,7 @@ class OrderManagementDB:
                 """, (production_id, partner_id, now))
 
             conn.commit()
+            publish_change('production_producers', None, UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -988,6 +1447,7 @@ class OrderManagementDB:
             """, (production_id, partner_id))
 
             conn.commit()
+            publish_change('production_cast', [production_cast_id], DELETE)
         except Exception as e:
             conn.rollback()
             log_message(f"出演者削除エラー: {e}")
@@ -1018,6 +1478,7 @@ class OrderManagementDB:
             """, (production_id, partner_id))
 
             conn.commit()
+            publish_change('production_producers', [production_producer_id], DELETE)
         except Exception as e:
             conn.rollback()
             log_message(f"制作会社削除エラー: {e}")
@@ -1025,12 +1486,14 @@ class OrderManagementDB:
         finally:
             conn.close()
 
-    def import_productions_from_csv(self, csv_data: List[dict], overwrite: bool = False) -> dict:
+    def import_productions_from_csv(self, csv_data: List[dict], overwrite: bool = False,
+                                    dry_run: bool = False) -> dict:
         """CSVデータから番組・イベントをインポート
 
         Args:
             csv_data: CSVから読み込んだデータのリスト（辞書形式）
             overwrite: Trueの場合は既存データを削除してから挿入
+            dry_run: Trueの場合は検証のみ行い、テーブルには書き込まない
 
         Returns:
             dict: インポート結果 {'success': 成功件数, 'inserted': 新規追加件数,
@@ -1039,34 +1502,29 @@ class OrderManagementDB:
         """
         conn = self._get_connection()
         cursor = conn.cursor()
+        plan = BulkImportPlan()
 
-        result = {
-            'success': 0,
-            'inserted': 0,
-            'updated': 0,
-            'skipped': 0,
-            'errors': []
-        }
+        # 費用項目が関連付けられている番組（アーカイブDBに移動した費用項目を含む）は
+        # 削除できないため、上書きモードでは関連データがない番組のみ削除
+        delete_sql = f"""
+            DELETE FROM productions
+            WHERE id NOT IN ({REFERENCED_PRODUCTION_IDS_SQL})
+        """
 
         try:
-            # 上書きモードの場合は既存データを削除
+            maps = LookupMaps(cursor)
             if overwrite:
-                # 費用項目が関連付けられている番組は削除できないため、
-                # 関連データがない番組のみ削除
-                cursor.execute("""
-                    DELETE FROM productions
-                    WHERE id NOT IN (SELECT DISTINCT production_id FROM expense_items)
-                """)
+                # 削除後に残る番組
+                existing_ids = maps.ids('productions', f"id IN ({REFERENCED_PRODUCTION_IDS_SQL})")
+            else:
+                existing_ids = maps.ids('productions')
+            now = datetime.now()
 
             for idx, row in enumerate(csv_data, start=2):  # CSVの2行目から（ヘッダー除く）
                 try:
                     # 必須項目のチェック
                     if not row.get('制作物名'):
-                        result['errors'].append({
-                            'row': idx,
-                            'reason': '制作物名が空です'
-                        })
-                        result['skipped'] += 1
+                        plan.error(idx, '制作物名が空です')
                         continue
 
                     # IDがある場合は更新、ない場合は新規追加
@@ -1082,148 +1540,94 @@ class OrderManagementDB:
                     if parent_id_str and parent_id_str.isdigit():
                         parent_production_id = int(parent_id_str)
 
-                    production_data = {
-                        'name': row.get('制作物名', '').strip(),
-                        'description': row.get('説明', '').strip(),
-                        'production_type': row.get('制作物種別', 'レギュラー番組').strip(),
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'start_time': row.get('実施開始時間', '').strip() or None,
-                        'end_time': row.get('実施終了時間', '').strip() or None,
-                        'broadcast_time': row.get('放送時間', '').strip() or None,
-                        'broadcast_days': row.get('放送曜日', '').strip() or None,
-                        'status': row.get('ステータス', '放送中').strip(),
-                        'parent_production_id': parent_production_id
-                    }
-
-                    now = datetime.now()
-
-                    if production_id and str(production_id).strip().isdigit():
+                    values = (
+                        row.get('制作物名', '').strip(),
+                        row.get('説明', '').strip(),
+                        row.get('制作物種別', 'レギュラー番組').strip(),
+                        start_date,
+                        end_date,
+                        row.get('実施開始時間', '').strip() or None,
+                        row.get('実施終了時間', '').strip() or None,
+                        row.get('放送時間', '').strip() or None,
+                        row.get('放送曜日', '').strip() or None,
+                        row.get('ステータス', '放送中').strip(),
+                        parent_production_id,
+                    )
+
+                    if (production_id and str(production_id).strip().isdigit()
+                            and int(production_id) in existing_ids):
                         # 更新モード
-                        production_data['id'] = int(production_id)
-
-                        # 既存データが存在するか確認
-                        cursor.execute("SELECT id FROM productions WHERE id = ?", (production_data['id'],))
-                        if cursor.fetchone():
-                            # 更新
-                            cursor.execute("""
-                                UPDATE productions SET
-                                    name = ?,
-                                    description = ?,
-                                    production_type = ?,
-                                    start_date = ?,
-                                    end_date = ?,
-                                    start_time = ?,
-                                    end_time = ?,
-                                    broadcast_time = ?,
-                                    broadcast_days = ?,
-                                    status = ?,
-                                    parent_production_id = ?,
-                                    updated_at = ?
-                                WHERE id = ?
-                            """, (
-                                production_data['name'],
-                                production_data['description'],
-                                production_data['production_type'],
-                                production_data['start_date'],
-                                production_data['end_date'],
-                                production_data['start_time'],
-                                production_data['end_time'],
-                                production_data['broadcast_time'],
-                                production_data['broadcast_days'],
-                                production_data['status'],
-                                production_data['parent_production_id'],
-                                now,
-                                production_data['id']
-                            ))
-                            result['updated'] += 1
-                            result['success'] += 1
-                        else:
-                            # IDが指定されているが存在しない場合は新規追加
-                            cursor.execute("""
-                                INSERT INTO productions (
-                                    name, description, production_type, start_date, end_date,
-                                    start_time, end_time, broadcast_time, broadcast_days, status,
-                                    parent_production_id, created_at, updated_at
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (
-                                production_data['name'],
-                                production_data['description'],
-                                production_data['production_type'],
-                                production_data['start_date'],
-                                production_data['end_date'],
-                                production_data['start_time'],
-                                production_data['end_time'],
-                                production_data['broadcast_time'],
-                                production_data['broadcast_days'],
-                                production_data['status'],
-                                production_data['parent_production_id'],
-                                now,
-                                now
-                            ))
-                            result['inserted'] += 1
-                            result['success'] += 1
+                        plan.update(idx, values + (now, int(production_id)))
                     else:
-                        # 新規追加モード
-                        cursor.execute("""
-                            INSERT INTO productions (
-                                name, description, production_type, start_date, end_date,
-                                start_time, end_time, broadcast_time, broadcast_days, status,
-                                parent_production_id, created_at, updated_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            production_data['name'],
-                            production_data['description'],
-                            production_data['production_type'],
-                            production_data['start_date'],
-                            production_data['end_date'],
-                            production_data['start_time'],
-                            production_data['end_time'],
-                            production_data['broadcast_time'],
-                            production_data['broadcast_days'],
-                            production_data['status'],
-                            production_data['parent_production_id'],
-                            now,
-                            now
-                        ))
-                        result['inserted'] += 1
-                        result['success'] += 1
+                        # 新規追加（IDが指定されているが存在しない場合も新規追加）
+                        plan.insert(idx, values + (now, now))
 
                 except Exception as e:
-                    result['errors'].append({
-                        'row': idx,
-                        'reason': str(e)
-                    })
-                    result['skipped'] += 1
+                    plan.error(idx, str(e))
 
+            plan.apply(
+                conn,
+                insert_sql="""
+                    INSERT INTO productions (
+                        name, description, production_type, start_date, end_date,
+                        start_time, end_time, broadcast_time, broadcast_days, status,
+                        parent_production_id, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                update_sql="""
+                    UPDATE productions SET
+                        name = ?,
+                        description = ?,
+                        production_type = ?,
+                        start_date = ?,
+                        end_date = ?,
+                        start_time = ?,
+                        end_time = ?,
+                        broadcast_time = ?,
+                        broadcast_days = ?,
+                        status = ?,
+                        parent_production_id = ?,
+                        updated_at = ?
+                    WHERE id = ?
+                """,
+                before=[delete_sql] if overwrite else (),
+                dry_run=dry_run,
+            )
+            if dry_run:
+                return plan.result
             conn.commit()
+            publish_change('productions', None, RELOAD)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
-        return result
+        return plan.result
 
     # ========================================
     # 出演者マスター操作
     # ========================================
 
+    def build_casts_query(self, search_term: str = "") -> Tuple[str, list]:
+        """出演者マスター一覧のクエリを作成（get_casts・CSV出力で共用）"""
+        query = """
+            SELECT c.id, c.name, p.name, p.code, c.notes
+            FROM cast c LEFT JOIN partners p ON c.partner_id = p.id WHERE 1=1
+        """
+        params = []
+        if search_term:
+            query += " AND (c.name LIKE ? OR p.name LIKE ?)"
+            params.extend([f"%{search_term}%", f"%{search_term}%"])
+        query += " ORDER BY c.name"
+        return query, params
+
     def get_casts(self, search_term: str = "") -> List[Tuple]:
         """出演者マスター一覧を取得"""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            query = """
-                SELECT c.id, c.name, p.name, p.code, c.notes
-                FROM cast c LEFT JOIN partners p ON c.partner_id = p.id WHERE 1=1
-            """
-            params = []
-            if search_term:
-                query += " AND (c.name LIKE ? OR p.name LIKE ?)"
-                params.extend([f"%{search_term}%", f"%{search_term}%"])
-            query += " ORDER BY c.name"
-            cursor.execute(query, params)
+            cursor.execute(*self.build_casts_query(search_term))
             return cursor.fetchall()
         finally:
             conn.close()
@@ -1253,6 +1657,7 @@ class OrderManagementDB:
                               (cast_data['name'], cast_data['partner_id'], cast_data.get('notes', ''), now, cast_data['id']))
                 cast_id = cast_data['id']
             conn.commit()
+            publish_change('cast', [cast_id], INSERT if is_new else UPDATE)
             return cast_id
         except Exception as e:
             conn.rollback()
@@ -1270,6 +1675,7 @@ class OrderManagementDB:
                 raise Exception("この出演者は制作物に関連付けられています。削除できません。")
             cursor.execute("DELETE FROM cast WHERE id = ?", (cast_id,))
             conn.commit()
+            publish_change('cast', [cast_id], DELETE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -1303,6 +1709,7 @@ class OrderManagementDB:
                 cursor.execute("INSERT INTO production_cast (production_id, cast_id, role, created_at) VALUES (?, ?, ?, ?)",
                               (production_id, assignment['cast_id'], assignment.get('role', ''), now))
             conn.commit()
+            publish_change('production_cast', None, UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -1735,6 +2142,7 @@ class OrderManagementDB:
                 contract_id = cursor.lastrowid
 
             conn.commit()
+            publish_change('contracts', [contract_id], UPDATE if contract_data.get('id') else INSERT)
             return contract_id
 
         except Exception as e:
@@ -1751,6 +2159,9 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM contracts WHERE id = ?", (contract_id,))
             conn.commit()
+            publish_change('contracts', [contract_id], DELETE)
+            # 紐付く費用項目の contract_id は NULL になる
+            publish_change('expense_items', None, UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -1773,6 +2184,7 @@ class OrderManagementDB:
                 WHERE id = ?
             """, (pdf_status, now, contract_id))
             conn.commit()
+            publish_change('contracts', [contract_id], UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -1808,6 +2220,7 @@ class OrderManagementDB:
             """, (start_date, end_date, now, production_id))
 
             conn.commit()
+            publish_change('productions', [production_id], UPDATE)
             return True
 
         except Exception as e:
@@ -1948,7 +2361,6 @@ class OrderManagementDB:
                 calculation_detail = ""
                 if payment_type == "回数ベース" and broadcast_days and unit_price:
                     # 放送回数を計算
-                    from order_management.broadcast_utils import calculate_monthly_broadcast_count
                     try:
                         # payment_dateから年月を抽出
                         payment_year = int(payment_date[:4])
@@ -2457,13 +2869,15 @@ class OrderManagementDB:
     # CSV一括インポート機能
     # ========================================
 
-    def import_casts_from_csv(self, csv_data: List[dict], overwrite: bool = False) -> dict:
+    def import_casts_from_csv(self, csv_data: List[dict], overwrite: bool = False,
+                              dry_run: bool = False) -> dict:
         """出演者データをCSVから一括インポート
 
         Args:
             csv_data: CSVから読み込んだ辞書のリスト
                      期待されるキー: ID, 出演者名, 所属事務所, 所属コード, 備考
             overwrite: True=上書き（既存データ削除）、False=追記/更新
+            dry_run: Trueの場合は検証のみ行い、テーブルには書き込まない
 
         Returns:
             dict: {
@@ -2474,22 +2888,18 @@ class OrderManagementDB:
                 'errors': [{'row': 行番号, 'reason': 理由}]
             }
         """
-        result = {
-            'success': 0,
-            'updated': 0,
-            'inserted': 0,
-            'skipped': 0,
-            'errors': []
-        }
-
         conn = self._get_connection()
         cursor = conn.cursor()
+        plan = BulkImportPlan()
 
         try:
-            # 上書きモードの場合は既存データを削除
-            if overwrite:
-                cursor.execute("DELETE FROM cast")
-                conn.commit()
+            maps = LookupMaps(cursor)
+            partner_ids = maps.partner_ids()
+            # 上書きモードでは既存の出演者をすべて削除してから取り込む
+            cast_ids = {} if overwrite else maps.cast_ids()
+            existing_ids = set() if overwrite else maps.ids('cast')
+            now = datetime.now()
+
             for row_num, row_data in enumerate(csv_data, start=2):  # ヘッダー行は1行目なので2から開始
                 try:
                     # 必須項目チェック
@@ -2497,76 +2907,70 @@ class OrderManagementDB:
                     partner_name = row_data.get('所属事務所', '').strip()
 
                     if not cast_name:
-                        result['errors'].append({'row': row_num, 'reason': '出演者名が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '出演者名が空です')
                         continue
 
                     if not partner_name:
-                        result['errors'].append({'row': row_num, 'reason': '所属事務所が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '所属事務所が空です')
                         continue
 
                     # 所属事務所を検索
-                    cursor.execute("SELECT id FROM partners WHERE name = ?", (partner_name,))
-                    partner_result = cursor.fetchone()
-
-                    if not partner_result:
-                        result['errors'].append({'row': row_num, 'reason': f'所属事務所「{partner_name}」が見つかりません'})
-                        result['skipped'] += 1
+                    partner_id = partner_ids.get(partner_name)
+                    if partner_id is None:
+                        plan.error(row_num, f'所属事務所「{partner_name}」が見つかりません')
                         continue
 
-                    partner_id = partner_result[0]
                     notes = row_data.get('備考', '').strip()
                     cast_id_str = row_data.get('ID', '').strip()
 
-                    now = datetime.now()
-
                     # UPSERTロジック: IDまたは出演者名+所属事務所で既存レコードを検索
-                    existing_cast = None
-                    if cast_id_str and cast_id_str.isdigit():
+                    key = (cast_name, partner_id)
+                    by_id = bool(cast_id_str and cast_id_str.isdigit())
+                    if by_id:
                         # IDが指定されている場合はIDで検索
-                        cast_id = int(cast_id_str)
-                        cursor.execute("SELECT id FROM cast WHERE id = ?", (cast_id,))
-                        existing_cast = cursor.fetchone()
+                        existing_id = int(cast_id_str) if int(cast_id_str) in existing_ids else None
                     else:
                         # IDがない場合は出演者名+所属事務所で検索
-                        cursor.execute("SELECT id FROM cast WHERE name = ? AND partner_id = ?",
-                                     (cast_name, partner_id))
-                        existing_cast = cursor.fetchone()
+                        existing_id = cast_ids.get(key)
 
-                    if existing_cast:
+                    if existing_id is not None:
                         # 既存出演者を更新
-                        existing_id = existing_cast[0]
-                        cursor.execute("""
-                            UPDATE cast
-                            SET name=?, partner_id=?, notes=?, updated_at=?
-                            WHERE id=?
-                        """, (cast_name, partner_id, notes, now, existing_id))
-                        result['updated'] += 1
-                        result['success'] += 1
+                        plan.update(row_num, (cast_name, partner_id, notes, now, existing_id))
                     else:
-                        # 新規追加
-                        cursor.execute("""
-                            INSERT INTO cast (name, partner_id, notes, created_at, updated_at)
-                            VALUES (?, ?, ?, ?, ?)
-                        """, (cast_name, partner_id, notes, now, now))
-                        result['inserted'] += 1
-                        result['success'] += 1
+                        # 新規追加（同じ取込で先に追加する同名の出演者があれば、その更新として扱う）
+                        plan.insert(row_num, (cast_name, partner_id, notes, now, now), key=key, match=not by_id)
 
                 except Exception as e:
-                    result['errors'].append({'row': row_num, 'reason': str(e)})
-                    result['skipped'] += 1
-
+                    plan.error(row_num, str(e))
+
+            plan.apply(
+                conn,
+                insert_sql="""
+                    INSERT INTO cast (name, partner_id, notes, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                update_sql="""
+                    UPDATE cast
+                    SET name=?, partner_id=?, notes=?, updated_at=?
+                    WHERE id=?
+                """,
+                before=["DELETE FROM cast"] if overwrite else (),
+                dry_run=dry_run,
+            )
+            if dry_run:
+                return plan.result
             conn.commit()
+            publish_change('cast', None, RELOAD)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
-        return result
+        return plan.result
 
-    def import_expense_items_from_csv(self, csv_data: List[dict], overwrite: bool = False) -> dict:
+    def import_expense_items_from_csv(self, csv_data: List[dict], overwrite: bool = False,
+                                      dry_run: bool = False) -> dict:
         """費用項目データをCSVから一括インポート
 
         Args:
@@ -2577,6 +2981,7 @@ class OrderManagementDB:
                                     支払状態, 源泉徴収額, 消費税額, 支払金額,
                                     請求書ファイルパス, 支払方法, 承認者, 承認日, 備考
             overwrite: True=上書き（既存データ削除）、False=追記/更新
+            dry_run: Trueの場合は検証のみ行い、テーブルには書き込まない
 
         Returns:
             dict: {
@@ -2587,22 +2992,17 @@ class OrderManagementDB:
                 'errors': [{'row': 行番号, 'reason': 理由}]
             }
         """
-        result = {
-            'success': 0,
-            'updated': 0,
-            'inserted': 0,
-            'skipped': 0,
-            'errors': []
-        }
-
         conn = self._get_connection()
         cursor = conn.cursor()
+        plan = BulkImportPlan()
 
         try:
-            # 上書きモードの場合は既存データを削除
-            if overwrite:
-                cursor.execute("DELETE FROM expense_items")
-                conn.commit()
+            maps = LookupMaps(cursor)
+            production_ids = maps.production_ids()
+            partner_ids = maps.partner_ids()
+            # 上書きモードでは既存の費用項目をすべて削除してから取り込む
+            existing_ids = set() if overwrite else maps.ids('expense_items')
+            now = datetime.now()
 
             for row_num, row_data in enumerate(csv_data, start=2):  # ヘッダー行は1行目なので2から開始
                 try:
@@ -2611,35 +3011,21 @@ class OrderManagementDB:
                     amount_str = row_data.get('金額', '').strip()
 
                     if not item_name:
-                        result['errors'].append({'row': row_num, 'reason': '項目名が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '項目名が空です')
                         continue
 
                     # 金額をfloatに変換
                     try:
                         amount = float(amount_str) if amount_str else 0
                     except ValueError:
-                        result['errors'].append({'row': row_num, 'reason': f'金額の形式が不正です: {amount_str}'})
-                        result['skipped'] += 1
+                        plan.error(row_num, f'金額の形式が不正です: {amount_str}')
                         continue
 
-                    # 番組を検索
-                    production_id = None
+                    # 番組・取引先を検索（見つからない場合はNULL）
                     production_name = row_data.get('番組名', '').strip()
-                    if production_name:
-                        cursor.execute("SELECT id FROM productions WHERE name = ?", (production_name,))
-                        prod_result = cursor.fetchone()
-                        if prod_result:
-                            production_id = prod_result[0]
-
-                    # 取引先を検索
-                    partner_id = None
+                    production_id = production_ids.get(production_name) if production_name else None
                     partner_name = row_data.get('取引先名', '').strip()
-                    if partner_name:
-                        cursor.execute("SELECT id FROM partners WHERE name = ?", (partner_name,))
-                        partner_result = cursor.fetchone()
-                        if partner_result:
-                            partner_id = partner_result[0]
+                    partner_id = partner_ids.get(partner_name) if partner_name else None
 
                     # 契約IDの取得
                     contract_id_str = row_data.get('契約ID', '').strip()
@@ -2676,73 +3062,66 @@ class OrderManagementDB:
 
                     expense_id_str = row_data.get('ID', '').strip()
 
-                    now = datetime.now()
-
-                    # UPSERTロジック: IDで既存レコードを検索
-                    existing_expense = None
-                    if expense_id_str and expense_id_str.isdigit():
-                        expense_id = int(expense_id_str)
-                        cursor.execute("SELECT id FROM expense_items WHERE id = ?", (expense_id,))
-                        existing_expense = cursor.fetchone()
-
-                    if existing_expense:
-                        # 既存費用項目を更新
-                        existing_id = existing_expense[0]
-                        cursor.execute("""
-                            UPDATE expense_items
-                            SET contract_id=?, production_id=?, partner_id=?, item_name=?, work_type=?,
-                                amount=?, implementation_date=?, order_number=?, order_date=?,
-                                status=?, invoice_received_date=?, expected_payment_date=?,
-                                actual_payment_date=?, invoice_number=?, payment_status=?,
-                                withholding_tax=?, consumption_tax=?, payment_amount=?,
-                                invoice_file_path=?, payment_method=?, approver=?, approval_date=?,
-                                notes=?, updated_at=?
-                            WHERE id=?
-                        """, (contract_id, production_id, partner_id, item_name, work_type,
+                    values = (contract_id, production_id, partner_id, item_name, work_type,
                               amount, implementation_date or None, order_number or None, order_date or None,
                               status, invoice_received_date or None, expected_payment_date or None,
                               actual_payment_date or None, invoice_number or None, payment_status,
                               withholding_tax, consumption_tax, payment_amount,
                               invoice_file_path or None, payment_method or None, approver or None, approval_date or None,
-                              notes or None, now, existing_id))
-                        result['updated'] += 1
-                        result['success'] += 1
+                              notes or None)
+
+                    # UPSERTロジック: IDで既存レコードを検索
+                    if expense_id_str and expense_id_str.isdigit() and int(expense_id_str) in existing_ids:
+                        # 既存費用項目を更新
+                        plan.update(row_num, values + (now, int(expense_id_str)))
                     else:
                         # 新規追加
-                        cursor.execute("""
-                            INSERT INTO expense_items (
-                                contract_id, production_id, partner_id, item_name, work_type,
-                                amount, implementation_date, order_number, order_date,
-                                status, invoice_received_date, expected_payment_date,
-                                actual_payment_date, invoice_number, payment_status,
-                                withholding_tax, consumption_tax, payment_amount,
-                                invoice_file_path, payment_method, approver, approval_date,
-                                notes, created_at, updated_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (contract_id, production_id, partner_id, item_name, work_type,
-                              amount, implementation_date or None, order_number or None, order_date or None,
-                              status, invoice_received_date or None, expected_payment_date or None,
-                              actual_payment_date or None, invoice_number or None, payment_status,
-                              withholding_tax, consumption_tax, payment_amount,
-                              invoice_file_path or None, payment_method or None, approver or None, approval_date or None,
-                              notes or None, now, now))
-                        result['inserted'] += 1
-                        result['success'] += 1
+                        plan.insert(row_num, values + (now, now))
 
                 except Exception as e:
-                    result['errors'].append({'row': row_num, 'reason': str(e)})
-                    result['skipped'] += 1
+                    plan.error(row_num, str(e))
 
+            plan.apply(
+                conn,
+                insert_sql="""
+                    INSERT INTO expense_items (
+                        contract_id, production_id, partner_id, item_name, work_type,
+                        amount, implementation_date, order_number, order_date,
+                        status, invoice_received_date, expected_payment_date,
+                        actual_payment_date, invoice_number, payment_status,
+                        withholding_tax, consumption_tax, payment_amount,
+                        invoice_file_path, payment_method, approver, approval_date,
+                        notes, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                update_sql="""
+                    UPDATE expense_items
+                    SET contract_id=?, production_id=?, partner_id=?, item_name=?, work_type=?,
+                        amount=?, implementation_date=?, order_number=?, order_date=?,
+                        status=?, invoice_received_date=?, expected_payment_date=?,
+                        actual_payment_date=?, invoice_number=?, payment_status=?,
+                        withholding_tax=?, consumption_tax=?, payment_amount=?,
+                        invoice_file_path=?, payment_method=?, approver=?, approval_date=?,
+                        notes=?, updated_at=?
+                    WHERE id=?
+                """,
+                before=["DELETE FROM expense_items"] if overwrite else (),
+                dry_run=dry_run,
+            )
+            if dry_run:
+                return plan.result
             conn.commit()
+            publish_change('expense_items', None, RELOAD)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
-        return result
+        return plan.result
 
-    def import_programs_from_csv(self, csv_data: List[dict], overwrite: bool = False) -> dict:
+    def import_programs_from_csv(self, csv_data: List[dict], overwrite: bool = False,
+                                 dry_run: bool = False) -> dict:
         """番組データをCSVから一括インポート
 
         Args:
@@ -2750,34 +3129,29 @@ class OrderManagementDB:
                      期待されるキー: ID, 制作物名, 説明, 開始日, 終了日,
                                     放送時間, 放送曜日, ステータス, 制作物種別, 親制作物ID
             overwrite: True=上書き（既存データ削除）、False=追記/更新
+            dry_run: Trueの場合は検証のみ行い、テーブルには書き込まない
 
         Returns:
             dict: 処理結果サマリー
         """
-        result = {
-            'success': 0,
-            'updated': 0,
-            'inserted': 0,
-            'skipped': 0,
-            'errors': []
-        }
-
         conn = self._get_connection()
         cursor = conn.cursor()
+        plan = BulkImportPlan()
 
         try:
-            # 上書きモードの場合は既存データを削除
-            if overwrite:
-                cursor.execute("DELETE FROM productions")
-                conn.commit()
+            maps = LookupMaps(cursor)
+            # 上書きモードでは既存の制作物をすべて削除してから取り込む
+            production_ids = {} if overwrite else maps.production_ids()
+            existing_ids = set() if overwrite else maps.ids('productions')
+            now = datetime.now()
+
             for row_num, row_data in enumerate(csv_data, start=2):
                 try:
                     # 必須項目チェック
                     program_name = row_data.get('制作物名', '').strip()
 
                     if not program_name:
-                        result['errors'].append({'row': row_num, 'reason': '制作物名が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '制作物名が空です')
                         continue
 
                     # データ取得
@@ -2792,11 +3166,7 @@ class OrderManagementDB:
 
                     # 放送曜日に日付が入っていないかチェック（データ整合性）
                     if broadcast_days_raw and parse_flexible_date(broadcast_days_raw):
-                        result['errors'].append({
-                            'row': row_num,
-                            'reason': f'放送曜日列に日付が入っています: {broadcast_days_raw}。CSVファイルの列順序を確認してください'
-                        })
-                        result['skipped'] += 1
+                        plan.error(row_num, f'放送曜日列に日付が入っています: {broadcast_days_raw}。CSVファイルの列順序を確認してください')
                         continue
 
                     broadcast_days = broadcast_days_raw
@@ -2806,84 +3176,80 @@ class OrderManagementDB:
                     if start_date_raw:
                         start_date = parse_flexible_date(start_date_raw)
                         if start_date is None:
-                            result['errors'].append({'row': row_num, 'reason': f'開始日のフォーマットが不正です: {start_date_raw}'})
-                            result['skipped'] += 1
+                            plan.error(row_num, f'開始日のフォーマットが不正です: {start_date_raw}')
                             continue
 
                     end_date = None
                     if end_date_raw:
                         end_date = parse_flexible_date(end_date_raw)
                         if end_date is None:
-                            result['errors'].append({'row': row_num, 'reason': f'終了日のフォーマットが不正です: {end_date_raw}'})
-                            result['skipped'] += 1
+                            plan.error(row_num, f'終了日のフォーマットが不正です: {end_date_raw}')
                             continue
 
                     # 親制作物IDのチェック
                     parent_production_id = None
                     if parent_program_id_str and parent_program_id_str.isdigit():
                         parent_production_id = int(parent_program_id_str)
-                        cursor.execute("SELECT id FROM productions WHERE id = ?", (parent_production_id,))
-                        if not cursor.fetchone():
-                            result['errors'].append({'row': row_num, 'reason': f'親制作物ID {parent_production_id} が見つかりません'})
-                            result['skipped'] += 1
+                        if parent_production_id not in existing_ids:
+                            plan.error(row_num, f'親制作物ID {parent_production_id} が見つかりません')
                             continue
 
                     program_id_str = row_data.get('ID', '').strip()
-                    now = datetime.now()
+                    values = (program_name, description, start_date or None, end_date or None,
+                              broadcast_time, broadcast_days, status, production_type,
+                              parent_production_id)
 
                     # UPSERTロジック: IDまたは制作物名で既存レコードを検索
-                    existing_program = None
-                    if program_id_str and program_id_str.isdigit():
+                    by_id = bool(program_id_str and program_id_str.isdigit())
+                    if by_id:
                         # IDが指定されている場合はIDで検索
-                        production_id = int(program_id_str)
-                        cursor.execute("SELECT id FROM productions WHERE id = ?", (production_id,))
-                        existing_program = cursor.fetchone()
+                        existing_id = int(program_id_str) if int(program_id_str) in existing_ids else None
                     else:
                         # IDがない場合は制作物名で検索
-                        cursor.execute("SELECT id FROM productions WHERE name = ?", (program_name,))
-                        existing_program = cursor.fetchone()
+                        existing_id = production_ids.get(program_name)
 
-                    if existing_program:
+                    if existing_id is not None:
                         # 既存制作物を更新
-                        existing_id = existing_program[0]
-                        cursor.execute("""
-                            UPDATE productions
-                            SET name=?, description=?, start_date=?, end_date=?,
-                                broadcast_time=?, broadcast_days=?, status=?,
-                                production_type=?, parent_production_id=?, updated_at=?
-                            WHERE id=?
-                        """, (program_name, description, start_date or None, end_date or None,
-                              broadcast_time, broadcast_days, status, production_type,
-                              parent_production_id, now, existing_id))
-                        result['updated'] += 1
-                        result['success'] += 1
+                        plan.update(row_num, values + (now, existing_id))
                     else:
-                        # 新規追加
-                        cursor.execute("""
-                            INSERT INTO productions (name, description, start_date, end_date,
-                                                 broadcast_time, broadcast_days, status,
-                                                 production_type, parent_production_id, created_at, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (program_name, description, start_date or None, end_date or None,
-                              broadcast_time, broadcast_days, status, production_type,
-                              parent_production_id, now, now))
-                        result['inserted'] += 1
-                        result['success'] += 1
+                        # 新規追加（同じ取込で先に追加する同名の制作物があれば、その更新として扱う）
+                        plan.insert(row_num, values + (now, now), key=program_name, match=not by_id)
 
                 except Exception as e:
-                    result['errors'].append({'row': row_num, 'reason': str(e)})
-                    result['skipped'] += 1
-
+                    plan.error(row_num, str(e))
+
+            plan.apply(
+                conn,
+                insert_sql="""
+                    INSERT INTO productions (name, description, start_date, end_date,
+                                             broadcast_time, broadcast_days, status,
+                                             production_type, parent_production_id, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                update_sql="""
+                    UPDATE productions
+                    SET name=?, description=?, start_date=?, end_date=?,
+                        broadcast_time=?, broadcast_days=?, status=?,
+                        production_type=?, parent_production_id=?, updated_at=?
+                    WHERE id=?
+                """,
+                before=["DELETE FROM productions"] if overwrite else (),
+                dry_run=dry_run,
+            )
+            if dry_run:
+                return plan.result
             conn.commit()
+            publish_change('productions', None, RELOAD)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
-        return result
+        return plan.result
 
-    def import_order_contracts_from_csv(self, csv_data: List[dict], overwrite: bool = False) -> dict:
+    def import_order_contracts_from_csv(self, csv_data: List[dict], overwrite: bool = False,
+                                        dry_run: bool = False) -> dict:
         """発注データをCSVから一括インポート
 
         Args:
@@ -2891,27 +3257,24 @@ class OrderManagementDB:
                      期待されるキー: ID, 番組・イベント名, 取引先名, 委託開始日, 委託終了日,
                                     発注種別, 発注ステータス, PDFステータス, 備考
             overwrite: True=上書き（既存データ削除）、False=追記/更新
+            dry_run: Trueの場合は検証のみ行い、テーブルには書き込まない
 
         Returns:
             dict: 処理結果サマリー
         """
-        result = {
-            'success': 0,
-            'updated': 0,
-            'inserted': 0,
-            'skipped': 0,
-            'errors': [],
-            'warnings': []
-        }
-
         conn = self._get_connection()
         cursor = conn.cursor()
+        plan = BulkImportPlan(warnings=True)
 
         try:
-            # 上書きモードの場合は既存データを削除
-            if overwrite:
-                cursor.execute("DELETE FROM contracts")
-                conn.commit()
+            maps = LookupMaps(cursor)
+            production_ids = maps.production_ids()
+            partner_ids = maps.partner_ids()
+            # 上書きモードでは既存の発注をすべて削除してから取り込む
+            contract_ids = {} if overwrite else maps.contract_ids()
+            existing_ids = set() if overwrite else maps.ids('contracts')
+            now = datetime.now()
+
             for row_num, row_data in enumerate(csv_data, start=2):
                 try:
                     # 必須項目チェック
@@ -2921,60 +3284,44 @@ class OrderManagementDB:
                     end_date_raw = row_data.get('委託終了日', '').strip()
 
                     if not program_name:
-                        result['errors'].append({'row': row_num, 'reason': '番組・イベント名が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '番組・イベント名が空です')
                         continue
 
                     if not partner_name:
-                        result['errors'].append({'row': row_num, 'reason': '取引先名が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '取引先名が空です')
                         continue
 
                     if not start_date_raw:
-                        result['errors'].append({'row': row_num, 'reason': '委託開始日が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '委託開始日が空です')
                         continue
 
                     if not end_date_raw:
-                        result['errors'].append({'row': row_num, 'reason': '委託終了日が空です'})
-                        result['skipped'] += 1
+                        plan.error(row_num, '委託終了日が空です')
                         continue
 
                     # 日付フォーマット変換（柔軟に対応）
                     start_date = parse_flexible_date(start_date_raw)
                     if start_date is None:
-                        result['errors'].append({'row': row_num, 'reason': f'委託開始日のフォーマットが不正です: {start_date_raw}'})
-                        result['skipped'] += 1
+                        plan.error(row_num, f'委託開始日のフォーマットが不正です: {start_date_raw}')
                         continue
 
                     end_date = parse_flexible_date(end_date_raw)
                     if end_date is None:
-                        result['errors'].append({'row': row_num, 'reason': f'委託終了日のフォーマットが不正です: {end_date_raw}'})
-                        result['skipped'] += 1
+                        plan.error(row_num, f'委託終了日のフォーマットが不正です: {end_date_raw}')
                         continue
 
                     # 制作物IDを検索
-                    cursor.execute("SELECT id FROM productions WHERE name = ?", (program_name,))
-                    program_result = cursor.fetchone()
-
-                    if not program_result:
+                    production_id = production_ids.get(program_name)
+                    if production_id is None:
                         # 番組が見つからない場合は警告のみでproduction_id=Nullで続行
-                        production_id = None
-                        result['warnings'].append({'row': row_num, 'reason': f'番組「{program_name}」が見つかりません（production_idはNULLで保存されます）'})
-                    else:
-                        production_id = program_result[0]
+                        plan.warning(row_num, f'番組「{program_name}」が見つかりません（production_idはNULLで保存されます）')
 
                     # 取引先IDを検索
-                    cursor.execute("SELECT id FROM partners WHERE name = ?", (partner_name,))
-                    partner_result = cursor.fetchone()
-
-                    if not partner_result:
-                        result['errors'].append({'row': row_num, 'reason': f'取引先「{partner_name}」が見つかりません'})
-                        result['skipped'] += 1
+                    partner_id = partner_ids.get(partner_name)
+                    if partner_id is None:
+                        plan.error(row_num, f'取引先「{partner_name}」が見つかりません')
                         continue
 
-                    partner_id = partner_result[0]
-
                     # その他のデータ取得（全項目対応）
                     item_name = row_data.get('費用項目名', '').strip()
                     period_type = row_data.get('契約期間種別', '半年').strip()
@@ -3006,84 +3353,76 @@ class OrderManagementDB:
                     renewal_period_months = int(renewal_period_str) if renewal_period_str.isdigit() else 3
 
                     contract_id_str = row_data.get('ID', '').strip()
-                    now = datetime.now()
+                    values = (production_id, partner_id, item_name,
+                              start_date, end_date, period_type,
+                              order_type, order_status, pdf_status, pdf_file_path, pdf_distributed_date,
+                              payment_type, unit_price, payment_timing, contract_type,
+                              implementation_date, spot_amount, order_category,
+                              email_subject, email_body, email_to, email_sent_date,
+                              auto_renewal_enabled, renewal_period_months, termination_notice_date,
+                              notes)
 
                     # UPSERTロジック: IDまたは番組+取引先+期間で既存レコードを検索
-                    existing_contract = None
-                    if contract_id_str and contract_id_str.isdigit():
+                    # （番組が見つからない場合、番組+取引先+期間では一致しない）
+                    key = (production_id, partner_id, start_date, end_date) if production_id is not None else None
+                    by_id = bool(contract_id_str and contract_id_str.isdigit())
+                    if by_id:
                         # IDが指定されている場合はIDで検索
-                        contract_id = int(contract_id_str)
-                        cursor.execute("SELECT id FROM contracts WHERE id = ?", (contract_id,))
-                        existing_contract = cursor.fetchone()
+                        existing_id = int(contract_id_str) if int(contract_id_str) in existing_ids else None
                     else:
                         # IDがない場合は番組+取引先+期間で検索
-                        cursor.execute("""
-                            SELECT id FROM contracts
-                            WHERE production_id = ? AND partner_id = ?
-                            AND contract_start_date = ? AND contract_end_date = ?
-                        """, (production_id, partner_id, start_date, end_date))
-                        existing_contract = cursor.fetchone()
+                        existing_id = contract_ids.get(key) if key is not None else None
 
-                    if existing_contract:
+                    if existing_id is not None:
                         # 既存発注を更新（全項目対応）
-                        existing_id = existing_contract[0]
-                        cursor.execute("""
-                            UPDATE contracts
-                            SET production_id=?, partner_id=?, item_name=?,
-                                contract_start_date=?, contract_end_date=?, contract_period_type=?,
-                                order_type=?, order_status=?, pdf_status=?, pdf_file_path=?, pdf_distributed_date=?,
-                                payment_type=?, unit_price=?, payment_timing=?, contract_type=?,
-                                implementation_date=?, spot_amount=?, order_category=?,
-                                email_subject=?, email_body=?, email_to=?, email_sent_date=?,
-                                auto_renewal_enabled=?, renewal_period_months=?, termination_notice_date=?,
-                                notes=?, updated_at=?
-                            WHERE id=?
-                        """, (production_id, partner_id, item_name,
-                              start_date, end_date, period_type,
-                              order_type, order_status, pdf_status, pdf_file_path, pdf_distributed_date,
-                              payment_type, unit_price, payment_timing, contract_type,
-                              implementation_date, spot_amount, order_category,
-                              email_subject, email_body, email_to, email_sent_date,
-                              auto_renewal_enabled, renewal_period_months, termination_notice_date,
-                              notes, now, existing_id))
-                        result['updated'] += 1
-                        result['success'] += 1
+                        plan.update(row_num, values + (now, existing_id))
                     else:
                         # 新規追加（全項目対応）
-                        cursor.execute("""
-                            INSERT INTO contracts (
-                                production_id, partner_id, item_name,
-                                contract_start_date, contract_end_date, contract_period_type,
-                                order_type, order_status, pdf_status, pdf_file_path, pdf_distributed_date,
-                                payment_type, unit_price, payment_timing, contract_type,
-                                implementation_date, spot_amount, order_category,
-                                email_subject, email_body, email_to, email_sent_date,
-                                auto_renewal_enabled, renewal_period_months, termination_notice_date,
-                                notes, created_at, updated_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (production_id, partner_id, item_name,
-                              start_date, end_date, period_type,
-                              order_type, order_status, pdf_status, pdf_file_path, pdf_distributed_date,
-                              payment_type, unit_price, payment_timing, contract_type,
-                              implementation_date, spot_amount, order_category,
-                              email_subject, email_body, email_to, email_sent_date,
-                              auto_renewal_enabled, renewal_period_months, termination_notice_date,
-                              notes, now, now))
-                        result['inserted'] += 1
-                        result['success'] += 1
+                        plan.insert(row_num, values + (now, now), key=key, match=not by_id)
 
                 except Exception as e:
-                    result['errors'].append({'row': row_num, 'reason': str(e)})
-                    result['skipped'] += 1
+                    plan.error(row_num, str(e))
 
+            plan.apply(
+                conn,
+                insert_sql="""
+                    INSERT INTO contracts (
+                        production_id, partner_id, item_name,
+                        contract_start_date, contract_end_date, contract_period_type,
+                        order_type, order_status, pdf_status, pdf_file_path, pdf_distributed_date,
+                        payment_type, unit_price, payment_timing, contract_type,
+                        implementation_date, spot_amount, order_category,
+                        email_subject, email_body, email_to, email_sent_date,
+                        auto_renewal_enabled, renewal_period_months, termination_notice_date,
+                        notes, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                update_sql="""
+                    UPDATE contracts
+                    SET production_id=?, partner_id=?, item_name=?,
+                        contract_start_date=?, contract_end_date=?, contract_period_type=?,
+                        order_type=?, order_status=?, pdf_status=?, pdf_file_path=?, pdf_distributed_date=?,
+                        payment_type=?, unit_price=?, payment_timing=?, contract_type=?,
+                        implementation_date=?, spot_amount=?, order_category=?,
+                        email_subject=?, email_body=?, email_to=?, email_sent_date=?,
+                        auto_renewal_enabled=?, renewal_period_months=?, termination_notice_date=?,
+                        notes=?, updated_at=?
+                    WHERE id=?
+                """,
+                before=["DELETE FROM contracts"] if overwrite else (),
+                dry_run=dry_run,
+            )
+            if dry_run:
+                return plan.result
             conn.commit()
+            publish_change('contracts', None, RELOAD)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
-        return result
+        return plan.result
 
     # ========================================
     # 契約自動延長機能
@@ -3149,6 +3488,7 @@ class OrderManagementDB:
                   reason, executed_by, notes))
 
             conn.commit()
+            publish_change('contracts', [contract_id], UPDATE)
             log_message(f"契約ID {contract_id} を延長しました: {current_end_date_str} → {new_end_date_str}")
             return True
 
@@ -3353,7 +3693,81 @@ class OrderManagementDB:
     # 費用項目管理
     # ========================================
 
-    def get_expense_items_with_details(self, search_term=None, payment_status=None, status=None, payment_month=None, show_archived=False):
+    def build_expense_items_query(self, search_term=None, payment_status=None, status=None, payment_month=None, show_archived=False,
+                                  item_ids=None):
+        """費用項目一覧のクエリを作成（get_expense_items_with_details・CSV出力で共用）
+
+        show_archived の場合はアーカイブDBを含むビュー（expense_items_all）を参照するため、
+        attach_archives() した接続で実行してください。
+
+        Args:
+            get_expense_items_with_details と同じ
+
+        Returns:
+            tuple: (クエリ, パラメータ)
+        """
+        query = """
+            SELECT ei.id, ei.production_id, prod.name as production_name,
+                   ei.partner_id, part.name as partner_name,
+                   ei.item_name, ei.amount, ei.implementation_date,
+                   ei.expected_payment_date, ei.status, ei.payment_status,
+                   ei.contract_id, ei.notes, ei.work_type,
+                   ei.order_number, ei.order_date, ei.invoice_received_date,
+                   ei.actual_payment_date, ei.invoice_number, ei.withholding_tax,
+                   ei.consumption_tax, ei.payment_amount, ei.invoice_file_path,
+                   ei.payment_method, ei.approver, ei.approval_date, ei.amount_pending,
+                   {} as in_archive
+            FROM {} ei
+            LEFT JOIN productions prod ON ei.production_id = prod.id
+            LEFT JOIN partners part ON ei.partner_id = part.id
+            WHERE 1=1
+        """.format(
+            # アーカイブDBにだけある行（発注管理DBの更新・削除の対象外）
+            "ei.id NOT IN (SELECT id FROM main.expense_items)" if show_archived else "0",
+            'expense_items_all' if show_archived else 'expense_items')
+        params = []
+
+        # 番組名が空のレコードを除外（削除された番組を参照している不正データ）
+        query += " AND prod.name IS NOT NULL AND prod.name != ''"
+
+        # アーカイブフィルタ
+        if not show_archived:
+            query += " AND (ei.archived = 0 OR ei.archived IS NULL)"
+
+        if search_term:
+            query += """ AND (prod.name LIKE ? OR part.name LIKE ? OR ei.item_name LIKE ?)"""
+            params.extend([f"%{search_term}%"] * 3)
+
+        if payment_status:
+            query += " AND ei.payment_status = ?"
+            params.append(payment_status)
+
+        if status:
+            query += " AND ei.status = ?"
+            params.append(status)
+
+        if payment_month == "until_current_month_end":
+            # 今月末までの支払予定
+            query += """ AND ei.expected_payment_date <= date('now', 'start of month', '+1 month', '-1 day')"""
+        elif payment_month == "until_next_month_end":
+            # 来月末までの支払予定
+            query += """ AND ei.expected_payment_date <= date('now', 'start of month', '+2 months', '-1 day')"""
+        elif payment_month:
+            # YYYY-MM形式の月でフィルタ（expected_payment_dateの年月が一致）
+            query += " AND strftime('%Y-%m', ei.expected_payment_date) = ?"
+            params.append(payment_month)
+
+        if item_ids is not None:
+            # 指定した費用項目のみ（変更通知を反映する際の再取得用）
+            item_ids = list(item_ids)
+            query += f" AND ei.id IN ({','.join('?' * len(item_ids))})"
+            params.extend(item_ids)
+
+        query += " ORDER BY ei.expected_payment_date DESC, ei.id DESC"
+        return query, params
+
+    def get_expense_items_with_details(self, search_term=None, payment_status=None, status=None, payment_month=None, show_archived=False,
+                                       item_ids=None):
         """費用項目を詳細情報付きで取得
 
         Args:
@@ -3361,72 +3775,32 @@ class OrderManagementDB:
             payment_status: 支払状態フィルタ
             status: 状態フィルタ
             payment_month: 支払月フィルタ（YYYY-MM形式または"current_unpaid"）
-            show_archived: アーカイブ済み項目を表示するか
+            show_archived: アーカイブ済み項目（アーカイブDBの項目を含む）を表示するか
+            item_ids: 取得する費用項目IDのリスト（Noneの場合は条件に合うすべて）
 
         Returns:
-            list: (id, production_id, production_name, partner_id, partner_name,
+            List[ExpenseItem]: (id, production_id, production_name, partner_id, partner_name,
                    item_name, amount, implementation_date, expected_payment_date,
                    status, payment_status, contract_id, notes, work_type,
                    order_number, order_date, invoice_received_date, actual_payment_date,
                    invoice_number, withholding_tax, consumption_tax, payment_amount,
-                   invoice_file_path, payment_method, approver, approval_date, amount_pending)
+                   invoice_file_path, payment_method, approver, approval_date, amount_pending,
+                   in_archive)
+            （列番号での参照も可能。in_archive はアーカイブDBにだけある行で、編集・削除できない）
         """
         conn = self._get_connection()
+        detach_archives = attach_archives(conn, self.db_path) if show_archived else None
+        # 保持中の共有接続ではなく、このカーソルだけに設定する
         cursor = conn.cursor()
+        cursor.row_factory = record_factory(ExpenseItem)
 
         try:
-            query = """
-                SELECT ei.id, ei.production_id, prod.name as production_name,
-                       ei.partner_id, part.name as partner_name,
-                       ei.item_name, ei.amount, ei.implementation_date,
-                       ei.expected_payment_date, ei.status, ei.payment_status,
-                       ei.contract_id, ei.notes, ei.work_type,
-                       ei.order_number, ei.order_date, ei.invoice_received_date,
-                       ei.actual_payment_date, ei.invoice_number, ei.withholding_tax,
-                       ei.consumption_tax, ei.payment_amount, ei.invoice_file_path,
-                       ei.payment_method, ei.approver, ei.approval_date, ei.amount_pending
-                FROM expense_items ei
-                LEFT JOIN productions prod ON ei.production_id = prod.id
-                LEFT JOIN partners part ON ei.partner_id = part.id
-                WHERE 1=1
-            """
-            params = []
-
-            # 番組名が空のレコードを除外（削除された番組を参照している不正データ）
-            query += " AND prod.name IS NOT NULL AND prod.name != ''"
-
-            # アーカイブフィルタ
-            if not show_archived:
-                query += " AND (ei.archived = 0 OR ei.archived IS NULL)"
-
-            if search_term:
-                query += """ AND (prod.name LIKE ? OR part.name LIKE ? OR ei.item_name LIKE ?)"""
-                params.extend([f"%{search_term}%"] * 3)
-
-            if payment_status:
-                query += " AND ei.payment_status = ?"
-                params.append(payment_status)
-
-            if status:
-                query += " AND ei.status = ?"
-                params.append(status)
-
-            if payment_month == "until_current_month_end":
-                # 今月末までの支払予定
-                query += """ AND ei.expected_payment_date <= date('now', 'start of month', '+1 month', '-1 day')"""
-            elif payment_month == "until_next_month_end":
-                # 来月末までの支払予定
-                query += """ AND ei.expected_payment_date <= date('now', 'start of month', '+2 months', '-1 day')"""
-            elif payment_month:
-                # YYYY-MM形式の月でフィルタ（expected_payment_dateの年月が一致）
-                query += " AND strftime('%Y-%m', ei.expected_payment_date) = ?"
-                params.append(payment_month)
-
-            query += " ORDER BY ei.expected_payment_date DESC, ei.id DESC"
-
-            cursor.execute(query, params)
+            cursor.execute(*self.build_expense_items_query(
+                search_term, payment_status, status, payment_month, show_archived, item_ids))
             return cursor.fetchall()
         finally:
+            if detach_archives:
+                detach_archives()
             conn.close()
 
     def get_payment_months(self):
@@ -3452,37 +3826,57 @@ class OrderManagementDB:
     def archive_old_expense_items(self, months_old=12):
         """古い支払済み項目をアーカイブ
 
+        対象の費用項目と履歴を年別のアーカイブDB（archive_YYYY.db）に移動し、
+        発注管理DBから削除します（order_management/archive_store.py 参照）。
+        以前にアーカイブ済み（archived = 1）にした項目も移動します。
+        番組別費用集計の全件（all_count, all_amount）には移動後も含めます。
+        移動の前に発注管理DBとアーカイブDBの復元ポイント（pre_archive）を作成します。
+
         Args:
             months_old: アーカイブ対象の月数（デフォルト12ヶ月）
 
         Returns:
             int: アーカイブした件数
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        self._ensure_expense_rollup()
+
+        # 削除トリガーで減算される全件の集計を戻す（アーカイブ済みを含む全件のため）
+        restore_rollup = f"""
+            INSERT INTO production_expense_rollup (production_id, year_month, all_count, all_amount)
+            SELECT ei.production_id, {_expense_rollup_month('ei')}, COUNT(*), SUM(COALESCE(ei.amount, 0))
+            FROM expense_items ei
+            WHERE ei.id IN (SELECT id FROM temp.archive_move)
+            GROUP BY 1, 2
+            ON CONFLICT(production_id, year_month) DO UPDATE
+            SET all_count = all_count + excluded.all_count, all_amount = all_amount + excluded.all_amount
+        """
 
+        conn = self._get_connection()
         try:
-            cursor.execute("""
-                UPDATE expense_items
-                SET archived = 1, archived_date = CURRENT_DATE
-                WHERE payment_status = '支払済'
-                AND expected_payment_date < date('now', ? || ' months')
-                AND archived = 0
-            """, (f'-{months_old}',))
-
-            count = cursor.rowcount
-            conn.commit()
+            candidates = conn.execute(
+                f"SELECT COUNT(*) FROM expense_items WHERE {ARCHIVE_CANDIDATES_WHERE}", (f'-{months_old}',)
+            ).fetchone()[0]
+            if candidates:
+                # 移動前に発注管理DBとアーカイブDBの検証済みの復元ポイントを作成（作成できない場合は移動しない）
+                for source in [conn] + archive_files(self.db_path):
+                    create_restore_point(source, "pre_archive")
+
+            count = move_to_archive(conn, self.db_path, ARCHIVE_CANDIDATES_WHERE,
+                                    (f'-{months_old}',), before_delete=[(restore_rollup, ())])
+            publish_change('expense_items', None, RELOAD)
             log_message(f"{count}件の費用項目をアーカイブしました")
             return count
         except Exception as e:
-            conn.rollback()
             log_message(f"アーカイブエラー: {e}")
             raise
         finally:
             conn.close()
 
     def get_archive_candidate_count(self, months_old=12):
-        """アーカイブ対象件数を取得
+        """アーカイブ対象件数を取得（指定月数より前の支払済み項目）
+
+        以前にアーカイブ済み（archived = 1）にした項目は含みません
+        （get_flagged_archived_count）。
 
         Args:
             months_old: アーカイブ対象の月数（デフォルト12ヶ月）
@@ -3494,12 +3888,25 @@ class OrderManagementDB:
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM expense_items
-                WHERE payment_status = '支払済'
-                AND expected_payment_date < date('now', ? || ' months')
-                AND archived = 0
-            """, (f'-{months_old}',))
+            cursor.execute(f"SELECT COUNT(*) FROM expense_items WHERE {ARCHIVE_OLD_PAID_WHERE}",
+                           (f'-{months_old}',))
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_flagged_archived_count(self):
+        """以前にアーカイブ済み（archived = 1）にして発注管理DBに残っている件数
+
+        archive_old_expense_items ではこれらもアーカイブDBに移動します。
+
+        Returns:
+            int: 件数
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM expense_items WHERE {ARCHIVE_FLAGGED_WHERE}")
             return cursor.fetchone()[0]
         finally:
             conn.close()
@@ -3516,6 +3923,7 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM expense_items WHERE id = ?", (expense_id,))
             conn.commit()
+            publish_change('expense_items', [expense_id], DELETE)
         finally:
             conn.close()
 
@@ -3542,6 +3950,7 @@ class OrderManagementDB:
             cursor.execute(query, list(expense_ids))
             deleted_count = cursor.rowcount
             conn.commit()
+            publish_change('expense_items', expense_ids, DELETE)
 
             return deleted_count
         except Exception as e:
@@ -3581,6 +3990,7 @@ class OrderManagementDB:
             cursor.execute(query, params)
             updated_count = cursor.rowcount
             conn.commit()
+            publish_change('expense_items', expense_ids, UPDATE)
 
             return updated_count
         except Exception as e:
@@ -3710,6 +4120,7 @@ class OrderManagementDB:
                 expense_id = cursor.lastrowid
 
             conn.commit()
+            publish_change('expense_items', [expense_id], UPDATE if expense_data.get('id') else INSERT)
             return expense_id
         finally:
             conn.close()
@@ -3751,9 +4162,6 @@ class OrderManagementDB:
         Returns:
             int: 合計出現回数
         """
-        from datetime import datetime
-        import calendar
-
         # 曜日マッピング
         weekday_map = {
             '月': 0, '火': 1, '水': 2, '木': 3,
@@ -3789,7 +4197,6 @@ class OrderManagementDB:
         Returns:
             int: 生成した費用項目の件数
         """
-        from datetime import datetime
         from dateutil.relativedelta import relativedelta
 
         conn = self._get_connection()
@@ -3824,12 +4231,7 @@ class OrderManagementDB:
             # 単発契約の場合
             if spot_amount and spot_amount > 0:
                 # 重複チェック：同じ契約ID・実施日・金額の費用項目が既に存在するか確認
-                cursor.execute("""
-                    SELECT COUNT(*) FROM expense_items
-                    WHERE contract_id = ?
-                      AND implementation_date = ?
-                      AND amount = ?
-                """, (contract_id, implementation_date, spot_amount))
+                cursor.execute(CONTRACT_EXPENSE_EXISTS_SQL, (contract_id, implementation_date, spot_amount))
 
                 exists = cursor.fetchone()[0] > 0
 
@@ -3868,12 +4270,7 @@ class OrderManagementDB:
                     impl_date_str = current_date.strftime('%Y-%m-%d')
 
                     # 重複チェック：同じ契約ID・実施日・金額の費用項目が既に存在するか確認
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM expense_items
-                        WHERE contract_id = ?
-                          AND implementation_date = ?
-                          AND amount = ?
-                    """, (contract_id, impl_date_str, unit_price))
+                    cursor.execute(CONTRACT_EXPENSE_EXISTS_SQL, (contract_id, impl_date_str, unit_price))
 
                     exists = cursor.fetchone()[0] > 0
 
@@ -3933,12 +4330,8 @@ class OrderManagementDB:
 
                     impl_date_str = current_date.strftime('%Y-%m-%d')
 
-                    # 重複チェック
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM expense_items
-                        WHERE contract_id = ?
-                          AND implementation_date = ?
-                    """, (contract_id, impl_date_str))
+                    # 重複チェック（アーカイブDBに移動した費用項目を含む）
+                    cursor.execute(CONTRACT_MONTH_EXPENSE_EXISTS_SQL, (contract_id, impl_date_str))
 
                     exists = cursor.fetchone()[0] > 0
 
@@ -3959,6 +4352,7 @@ class OrderManagementDB:
                     current_date = current_date + relativedelta(months=1)
 
             conn.commit()
+            publish_change('expense_items', None, INSERT)
             return generated_count
         finally:
             conn.close()
@@ -3982,6 +4376,7 @@ class OrderManagementDB:
             """, (contract_id,))
             deleted_count = cursor.rowcount
             conn.commit()
+            publish_change('expense_items', None, DELETE)
             return deleted_count
         finally:
             conn.close()
@@ -4036,6 +4431,7 @@ class OrderManagementDB:
                 VALUES (?, ?, ?)
             """, (contract_id, cast_id, role))
             conn.commit()
+            publish_change('contract_cast', [cursor.lastrowid], INSERT)
             return cursor.lastrowid
         except Exception as e:
             conn.rollback()
@@ -4065,6 +4461,7 @@ class OrderManagementDB:
                 """, (contract_id, cast_id, role))
 
             conn.commit()
+            publish_change('contract_cast', None, UPDATE)
         except Exception as e:
             conn.rollback()
             raise e
@@ -4083,6 +4480,7 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM contract_cast WHERE id = ?", (contract_cast_id,))
             conn.commit()
+            publish_change('contract_cast', [contract_cast_id], DELETE)
         finally:
             conn.close()
 
@@ -4103,6 +4501,7 @@ class OrderManagementDB:
                 WHERE id = ?
             """, (role, contract_cast_id))
             conn.commit()
+            publish_change('contract_cast', [contract_cast_id], UPDATE)
         finally:
             conn.close()
 
@@ -4147,27 +4546,27 @@ class OrderManagementDB:
         cursor = conn.cursor()
 
         try:
+            # 番組別費用集計テーブル（月ごとの行）を番組単位に合計する
             query = """
                 SELECT
                     p.id,
                     p.name,
                     p.production_type,
-                    COUNT(*) as item_count,
-                    SUM(CASE WHEN ei.amount_pending = 1 THEN 0 ELSE ei.amount END) as total_amount,
-                    SUM(CASE WHEN ei.payment_status = '未払い' THEN 1 ELSE 0 END) as unpaid_count,
-                    SUM(CASE WHEN ei.payment_status = '未払い' AND ei.amount_pending = 0
-                         THEN ei.amount ELSE 0 END) as unpaid_amount,
-                    SUM(CASE WHEN ei.payment_status = '支払済' THEN 1 ELSE 0 END) as paid_count,
-                    SUM(CASE WHEN ei.payment_status = '支払済' THEN ei.amount ELSE 0 END) as paid_amount,
-                    SUM(CASE WHEN ei.amount_pending = 1 THEN 1 ELSE 0 END) as pending_count,
-                    COUNT(DISTINCT strftime('%Y-%m', ei.expected_payment_date)) as month_count,
-                    CASE WHEN COUNT(DISTINCT strftime('%Y-%m', ei.expected_payment_date)) > 0
-                         THEN SUM(CASE WHEN ei.amount_pending = 1 THEN 0 ELSE ei.amount END) /
-                              COUNT(DISTINCT strftime('%Y-%m', ei.expected_payment_date))
+                    SUM(r.item_count) as item_count,
+                    SUM(r.total_amount) as total_amount,
+                    SUM(r.unpaid_count) as unpaid_count,
+                    SUM(r.unpaid_amount) as unpaid_amount,
+                    SUM(r.paid_count) as paid_count,
+                    SUM(r.paid_amount) as paid_amount,
+                    SUM(r.pending_count) as pending_count,
+                    SUM(CASE WHEN r.year_month != '' THEN 1 ELSE 0 END) as month_count,
+                    CASE WHEN SUM(CASE WHEN r.year_month != '' THEN 1 ELSE 0 END) > 0
+                         THEN SUM(r.total_amount) /
+                              SUM(CASE WHEN r.year_month != '' THEN 1 ELSE 0 END)
                          ELSE 0 END as monthly_average
-                FROM expense_items ei
-                JOIN productions p ON ei.production_id = p.id
-                WHERE (ei.archived = 0 OR ei.archived IS NULL)
+                FROM production_expense_rollup r
+                JOIN productions p ON r.production_id = p.id
+                WHERE r.item_count > 0
             """
             params = []
 
@@ -4259,18 +4658,17 @@ class OrderManagementDB:
 
         try:
             cursor.execute("""
-                SELECT 
-                    strftime('%Y-%m', ei.expected_payment_date) as month,
-                    COUNT(*) as item_count,
-                    SUM(CASE WHEN ei.amount_pending = 1 THEN 0 ELSE ei.amount END) as total_amount,
-                    SUM(CASE WHEN ei.payment_status = '未払い' THEN 1 ELSE 0 END) as unpaid_count,
-                    SUM(CASE WHEN ei.payment_status = '支払済' THEN 1 ELSE 0 END) as paid_count
-                FROM expense_items ei
-                WHERE ei.production_id = ?
-                  AND (ei.archived = 0 OR ei.archived IS NULL)
-                  AND ei.expected_payment_date IS NOT NULL
-                GROUP BY month
-                ORDER BY month ASC
+                SELECT
+                    year_month as month,
+                    item_count,
+                    total_amount,
+                    unpaid_count,
+                    paid_count
+                FROM production_expense_rollup
+                WHERE production_id = ?
+                  AND item_count > 0
+                  AND year_month != ''
+                ORDER BY year_month ASC
             """, (production_id,))
             return cursor.fetchall()
         finally:
@@ -4320,38 +4718,8 @@ class OrderManagementDB:
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
-                SELECT
-                    ei.id,
-                    p.name as partner_name,
-                    ei.item_name,
-                    ei.amount,
-                    ei.implementation_date,
-                    ei.expected_payment_date,
-                    ei.payment_status,
-                    ei.status,
-                    ei.notes,
-                    ei.amount_pending,
-                    ei.work_type,
-                    corner.name as corner_name,
-                    ei.corner_id,
-                    ei.contract_id,
-                    ei.invoice_received_date,
-                    ei.actual_payment_date,
-                    ei.payment_matched_id,
-                    c.document_status
-                FROM expense_items ei
-                LEFT JOIN partners p ON ei.partner_id = p.id
-                LEFT JOIN productions corner ON ei.corner_id = corner.id
-                LEFT JOIN contracts c ON ei.contract_id = c.id
-                WHERE (ei.production_id = ?
-                       OR ei.production_id IN (
-                           SELECT id FROM productions WHERE parent_production_id = ?
-                       ))
-                  AND strftime('%Y-%m', ei.expected_payment_date) = ?
-                  AND (ei.archived = 0 OR ei.archived IS NULL)
-                ORDER BY ei.implementation_date ASC, ei.id ASC
-            """, (production_id, production_id, year_month))
+            cursor.execute(PRODUCTION_MONTH_DETAILS_SQL,
+                           (production_id, production_id, year_month, year_month))
             return cursor.fetchall()
         finally:
             conn.close()
@@ -4369,39 +4737,29 @@ class OrderManagementDB:
                 'unmatched_payments': 未照合支払い数
             }
         """
-        import sqlite3
-        from datetime import datetime, timedelta
-
-        # billing.dbに接続
-        billing_conn = sqlite3.connect(billing_db_path)
-        billing_cursor = billing_conn.cursor()
-
-        # order_management.dbに接続
+        # order_management.dbに接続し、billing.dbを ATTACH（両方の更新を1回のコミットで確定）
         order_conn = self._get_connection()
         order_cursor = order_conn.cursor()
+        detach = attach_databases(order_conn, 'orders', {'billing': billing_db_path})
+        billing_cursor = order_conn.cursor()
 
         try:
-            # billing.dbから支払いデータを取得
+            # billing.dbから支払いデータを取得（費用項目に照合済みの支払い = payment_expense_items を除く）
             billing_cursor.execute("""
                 SELECT id, payee, payee_code, amount, payment_date, status
-                FROM payments
+                FROM billing.payments
                 WHERE status != '照合済み'
+                  AND id NOT IN (SELECT payment_id FROM payment_expense_items)
             """)
             payments = billing_cursor.fetchall()
 
             # 未照合の費用項目を取得
-            order_cursor.execute("""
-                SELECT ei.id, ei.item_name, p.name as partner_name, p.code as partner_code,
-                       ei.amount, ei.expected_payment_date, ei.payment_status
-                FROM expense_items ei
-                LEFT JOIN partners p ON ei.partner_id = p.id
-                WHERE ei.payment_matched_id IS NULL
-                  AND ei.payment_status != '支払済'
-                  AND (ei.archived = 0 OR ei.archived IS NULL)
-            """)
+            order_cursor.execute(UNMATCHED_EXPENSE_ITEMS_SQL)
             expenses = order_cursor.fetchall()
 
             matched_count = 0
+            matched_expense_ids = []
+            matched_payment_ids = []
 
             # 各支払いデータと費用項目を照合
             for payment in payments:
@@ -4469,17 +4827,20 @@ class OrderManagementDB:
 
                     # paymentsの状態も更新
                     billing_cursor.execute("""
-                        UPDATE payments
+                        UPDATE billing.payments
                         SET status = '照合済み'
                         WHERE id = ?
                     """, (payment_id,))
 
                     matched_count += 1
+                    matched_expense_ids.append(expense_id)
+                    matched_payment_ids.append(payment_id)
                     break  # この支払いは照合済み
 
             # 変更をコミット
             order_conn.commit()
-            billing_conn.commit()
+            publish_change('expense_items', matched_expense_ids, UPDATE)
+            publish_change('payments', matched_payment_ids, UPDATE)
 
             # 未照合件数を取得
             order_cursor.execute("""
@@ -4491,8 +4852,9 @@ class OrderManagementDB:
             unmatched_expenses = order_cursor.fetchone()[0]
 
             billing_cursor.execute("""
-                SELECT COUNT(*) FROM payments
+                SELECT COUNT(*) FROM billing.payments
                 WHERE status != '照合済み'
+                  AND id NOT IN (SELECT payment_id FROM payment_expense_items)
             """)
             unmatched_payments = billing_cursor.fetchone()[0]
 
@@ -4503,7 +4865,7 @@ class OrderManagementDB:
             }
 
         finally:
-            billing_conn.close()
+            detach()
             order_conn.close()
 
     def get_unmatched_payments_from_billing(self, billing_db_path='billing.db'):
@@ -4519,51 +4881,40 @@ class OrderManagementDB:
             list: 未登録支払いデータのリスト
                   [(payment_id, subject, project_name, payee, payee_code, amount, payment_date, status), ...]
         """
-        import sqlite3
-
-        # billing.dbに接続
-        billing_conn = sqlite3.connect(billing_db_path)
-        billing_cursor = billing_conn.cursor()
-
-        # order_management.dbに接続
+        # order_management.dbに接続し、billing.dbを ATTACH
         om_conn = self._get_connection()
+        detach = attach_databases(om_conn, 'orders', {'billing': billing_db_path})
         om_cursor = om_conn.cursor()
 
         try:
-            # billing.dbからすべての支払いデータを取得
-            billing_cursor.execute("""
-                SELECT id, subject, project_name, payee, payee_code, amount, payment_date, status
-                FROM payments
-                ORDER BY payment_date DESC
-            """)
-            all_payments = billing_cursor.fetchall()
-
-            # 未登録の支払いデータを格納するリスト
-            unmatched_payments = []
-
-            for payment in all_payments:
-                payment_id, subject, project_name, payee, payee_code, amount, payment_date, status = payment
-
-                # expense_itemsテーブルで対応する費用項目を検索
-                # 照合キー: partner名 (payee) と amount の完全一致のみ
-                # 項目名（item_name）は無視（billing.dbとexpense_itemsで項目名が異なるため）
-                om_cursor.execute("""
-                    SELECT ei.id
+            # 対応する費用項目がない支払いデータを取得
+            # 照合キー: partner名 (payee) と amount の完全一致のみ
+            # 項目名（item_name）は無視（billing.dbとexpense_itemsで項目名が異なるため）
+            om_cursor.execute("""
+                SELECT pay.id, pay.subject, pay.project_name, pay.payee, pay.payee_code,
+                       pay.amount, pay.payment_date, pay.status
+                FROM billing.payments pay
+                WHERE NOT EXISTS (
+                    SELECT 1
                     FROM expense_items ei
-                    LEFT JOIN partners p ON ei.partner_id = p.id
-                    WHERE p.name = ?
-                      AND ei.amount = ?
-                    LIMIT 1
-                """, (payee, amount))
-
-                # 対応する費用項目が見つからない場合のみ未登録として追加
-                if om_cursor.fetchone() is None:
-                    unmatched_payments.append(payment)
-
-            return unmatched_payments
+                    JOIN partners p ON ei.partner_id = p.id
+                    WHERE p.name = pay.payee
+                      AND ei.amount = pay.amount
+                )
+                -- アーカイブDBに移動した費用項目も登録済みとして扱う
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM archived_expense_keys ak
+                    JOIN partners p ON ak.partner_id = p.id
+                    WHERE p.name = pay.payee
+                      AND ak.amount = pay.amount
+                )
+                ORDER BY pay.payment_date DESC
+            """)
+            return om_cursor.fetchall()
 
         finally:
-            billing_conn.close()
+            detach()
             om_conn.close()
 
     def get_productions_for_month(self, month_str):
@@ -4854,7 +5205,7 @@ class OrderManagementDB:
         Returns:
             List[Tuple]: テンプレートリスト
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -4894,7 +5245,7 @@ class OrderManagementDB:
 
     def get_expense_template_by_id(self, template_id):
         """テンプレートをIDで取得"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -4916,7 +5267,7 @@ class OrderManagementDB:
 
     def add_expense_template(self, data: dict) -> int:
         """費用テンプレートを追加"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -4945,6 +5296,7 @@ class OrderManagementDB:
 
             template_id = cursor.lastrowid
             conn.commit()
+            publish_change('expense_templates', [template_id], INSERT)
             return template_id
 
         finally:
@@ -4952,7 +5304,7 @@ class OrderManagementDB:
 
     def update_expense_template(self, template_id: int, data: dict):
         """費用テンプレートを更新"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -4991,18 +5343,20 @@ class OrderManagementDB:
             ))
 
             conn.commit()
+            publish_change('expense_templates', [template_id], UPDATE)
 
         finally:
             conn.close()
 
     def delete_expense_template(self, template_id: int):
         """費用テンプレートを削除"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
             cursor.execute("DELETE FROM expense_templates WHERE id = ?", (template_id,))
             conn.commit()
+            publish_change('expense_templates', [template_id], DELETE)
 
         finally:
             conn.close()
@@ -5013,7 +5367,7 @@ class OrderManagementDB:
 
     def get_production_partners(self, production_id: int):
         """番組の制作会社リストを取得"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5035,7 +5389,7 @@ class OrderManagementDB:
 
     def add_production_partner(self, production_id: int, partner_id: int, role: str = '制作'):
         """番組に制作会社を追加"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5046,6 +5400,7 @@ class OrderManagementDB:
 
             pp_id = cursor.lastrowid
             conn.commit()
+            publish_change('production_partners', [pp_id], INSERT)
             return pp_id
 
         finally:
@@ -5053,23 +5408,110 @@ class OrderManagementDB:
 
     def delete_production_partner(self, pp_id: int):
         """番組-制作会社関連を削除"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
             cursor.execute("DELETE FROM production_partners WHERE id = ?", (pp_id,))
             conn.commit()
+            publish_change('production_partners', [pp_id], DELETE)
 
         finally:
             conn.close()
 
+    # ========================================
+    # 放送例外関連メソッド
+    # ========================================
+
+    def get_broadcast_exceptions(self, production_id=None, start_date=None, end_date=None):
+        """放送例外（休止・追加放送）を取得
+
+        Args:
+            production_id: 番組ID（指定した場合は全番組共通の例外も含む）
+            start_date: 開始日 "YYYY-MM-DD"
+            end_date: 終了日 "YYYY-MM-DD"
+
+        Returns:
+            list: (id, production_id, production_name, broadcast_date, exception_type, reason)
+        """
+        query = """
+            SELECT be.id, be.production_id, prod.name as production_name,
+                   be.broadcast_date, be.exception_type, be.reason
+            FROM broadcast_exceptions be
+            LEFT JOIN productions prod ON be.production_id = prod.id
+            WHERE 1=1
+        """
+        params = []
+        if production_id is not None:
+            query += " AND (be.production_id = ? OR be.production_id IS NULL)"
+            params.append(production_id)
+        if start_date:
+            query += " AND be.broadcast_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND be.broadcast_date <= ?"
+            params.append(end_date)
+        query += " ORDER BY be.broadcast_date, be.id"
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def add_broadcast_exception(self, broadcast_date: str, exception_type: str = '休止',
+                                production_id: int = None, reason: str = ''):
+        """放送例外を登録
+
+        Args:
+            broadcast_date: 日付 "YYYY-MM-DD"
+            exception_type: '休止'（放送なし）または '追加'（追加放送）
+            production_id: 番組ID（Noneの場合は全番組。祝日等の休止用）
+            reason: 理由（特番、祝日等）
+
+        Returns:
+            int: 登録した放送例外のID
+        """
+        if exception_type not in (EXCEPTION_CANCELLED, EXCEPTION_ADDED):
+            raise ValueError(f"不正な放送例外の種類です: {exception_type}")
+        if exception_type == EXCEPTION_ADDED and production_id is None:
+            raise ValueError("追加放送は番組を指定してください")
+        datetime.strptime(broadcast_date, '%Y-%m-%d')
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO broadcast_exceptions (production_id, broadcast_date, exception_type, reason)
+                VALUES (?, ?, ?, ?)
+            """, (production_id, broadcast_date, exception_type, reason))
+            exception_id = cursor.lastrowid
+            conn.commit()
+            publish_change('broadcast_exceptions', [exception_id], INSERT)
+            return exception_id
+        finally:
+            conn.close()
+
+    def delete_broadcast_exception(self, exception_id: int):
+        """放送例外を削除"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM broadcast_exceptions WHERE id = ?", (exception_id,))
+            conn.commit()
+            publish_change('broadcast_exceptions', [exception_id], DELETE)
+        finally:
+            conn.close()
+
     # ========================================
     # 自動生成関連メソッド
     # ========================================
 
     def get_active_monthly_templates(self, target_month: str):
         """自動生成対象の月次テンプレートを取得"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5096,7 +5538,7 @@ class OrderManagementDB:
 
     def check_generation_log(self, template_id: int, month: str) -> bool:
         """指定月のテンプレートが既に生成済みかチェック"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5113,7 +5555,7 @@ class OrderManagementDB:
 
     def record_generation_log(self, template_id: int, month: str, expense_id: int):
         """費用生成ログを記録"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5129,7 +5571,7 @@ class OrderManagementDB:
 
     def add_expense_item(self, data: dict) -> int:
         """費用項目を追加（自動生成用）"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
@@ -5159,6 +5601,7 @@ class OrderManagementDB:
 
             expense_id = cursor.lastrowid
             conn.commit()
+            publish_change('expense_items', [expense_id], INSERT)
             return expense_id
 
         finally:
@@ -5202,6 +5645,7 @@ class OrderManagementDB:
                 cast_data.get('notes', '')
             ))
             conn.commit()
+            publish_change('cast', [cursor.lastrowid], INSERT)
             return cursor.lastrowid
         finally:
             conn.close()
@@ -5229,6 +5673,7 @@ class OrderManagementDB:
                 partner_data.get('notes', '')
             ))
             conn.commit()
+            publish_change('partners', [cursor.lastrowid], INSERT)
             return cursor.lastrowid
         finally:
             conn.close()
@@ -5275,6 +5720,7 @@ class OrderManagementDB:
 
             cursor.execute(sql, update_values)
             conn.commit()
+            publish_change('productions', [production_id], UPDATE)
             return True
 
         except Exception as e:
@@ -5346,6 +5792,7 @@ class OrderManagementDB:
                 sql = f"UPDATE expense_templates SET {', '.join(update_fields)} WHERE id = ?"
                 cursor.execute(sql, update_values)
                 conn.commit()
+                publish_change('expense_templates', [template_id], UPDATE)
                 return template_id
             else:
                 # 新規作成
@@ -5371,6 +5818,7 @@ class OrderManagementDB:
                     template_data.get('notes', '')
                 ))
                 conn.commit()
+                publish_change('expense_templates', [cursor.lastrowid], INSERT)
                 return cursor.lastrowid
 
         except Exception as e:
@@ -5397,6 +5845,7 @@ class OrderManagementDB:
         try:
             cursor.execute("DELETE FROM expense_templates WHERE id = ?", (template_id,))
             conn.commit()
+            publish_change('expense_templates', [template_id], DELETE)
             return True
         except Exception as e:
             conn.rollback()
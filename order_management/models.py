@@ -102,6 +102,154 @@ class StatusHistory:
     notes: str = ""
 
 
+class RowRecord:
+    """DB行のレコード（基底クラス）
+
+    __slots__ で列を保持するため、行ごとのインスタンス辞書を持ちません
+    （dict や sqlite3.Row より省メモリ）。属性（item.amount）に加えて、
+    列番号（item[6]）・キー（item['amount']、item.get('amount')）でも参照できるため、
+    タプルや dict を返していたメソッドをそのまま置き換えられます。
+    列は __slots__ の順序です。
+    """
+    __slots__ = ()
+
+    def __init__(self, *values, **fields):
+        names = self.__slots__
+        if len(values) > len(names):
+            raise TypeError(f"{type(self).__name__}: 列数が多すぎます（{len(values)} > {len(names)}）")
+        for name, value in zip(names, values):
+            setattr(self, name, value)
+        for name in names[len(values):]:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"{type(self).__name__}: 不明な列 {', '.join(fields)}")
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.__slots__:
+                raise KeyError(key)
+            return getattr(self, key)
+        if isinstance(key, slice):
+            return tuple(self)[key]
+        return getattr(self, self.__slots__[key])
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        for name in self.__slots__:
+            yield getattr(self, name)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __eq__(self, other):
+        if isinstance(other, (RowRecord, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def get(self, key, default=None):
+        """dict.get と同じ（列がない場合は default）"""
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def record_factory(record_type):
+    """カーソルの行をレコードに変換する row_factory を作成
+
+    列名（SELECT の別名）でフィールドに対応付けます。列の並びがフィールドと
+    同じ場合は位置で変換し、SELECT にないフィールドは None になります。
+
+    使用例:
+        cursor = conn.cursor()
+        cursor.row_factory = record_factory(ExpenseItem)
+        items = cursor.execute(query).fetchall()  # List[ExpenseItem]
+    """
+    fields = record_type.__slots__
+    # (cursor.description, 列番号のリスト) 列番号がNoneの場合は位置で変換
+    plan = [(None, None)]
+
+    def factory(cursor, row):
+        description = cursor.description
+        cached_description, indexes = plan[0]
+        if description is not cached_description:
+            names = [column[0] for column in description]
+            unknown = set(names) - set(fields)
+            if unknown:
+                raise ValueError(f"{record_type.__name__}: 不明な列 {', '.join(sorted(unknown))}")
+            if names == list(fields):
+                indexes = None
+            else:
+                indexes = [names.index(name) if name in names else None for name in fields]
+            plan[0] = (description, indexes)
+
+        if indexes is None:
+            return record_type(*row)
+        return record_type(*[row[i] if i is not None else None for i in indexes])
+
+    return factory
+
+
+class ExpenseItem(RowRecord):
+    """費用項目（OrderManagementDB.get_expense_items_with_details の行）"""
+    __slots__ = (
+        'id', 'production_id', 'production_name', 'partner_id', 'partner_name',
+        'item_name', 'amount', 'implementation_date', 'expected_payment_date',
+        'status', 'payment_status', 'contract_id', 'notes', 'work_type',
+        'order_number', 'order_date', 'invoice_received_date', 'actual_payment_date',
+        'invoice_number', 'withholding_tax', 'consumption_tax', 'payment_amount',
+        'invoice_file_path', 'payment_method', 'approver', 'approval_date', 'amount_pending',
+        'in_archive',  # アーカイブDBにだけある行（閲覧のみ）
+    )
+
+
+class Payment(RowRecord):
+    """支払実績（billing.db の payments テーブル）"""
+    __slots__ = (
+        'id', 'subject', 'project_name', 'payee', 'payee_code', 'amount',
+        'payment_date', 'status', 'type', 'client_name', 'department',
+        'project_status', 'project_start_date', 'project_end_date', 'budget',
+        'approver', 'urgency_level',
+    )
+
+
+class Contract(RowRecord):
+    """発注契約（contracts テーブルと番組名・取引先名）"""
+    __slots__ = (
+        'id', 'production_id', 'production_name', 'partner_id', 'partner_name',
+        'partner_code', 'item_name', 'contract_start_date', 'contract_end_date',
+        'implementation_date', 'payment_type', 'unit_price', 'spot_amount',
+        'order_category', 'document_type', 'document_status', 'pdf_status',
+        'pdf_distributed_date', 'email_sent_date',
+    )
+
+
+class ScheduleEntry(RowRecord):
+    """月次支払予定（DatabaseManager.generate_monthly_payment_schedule の1件）"""
+    __slots__ = (
+        'item_name', 'partner_id', 'partner_name', 'partner_code', 'year_month',
+        'amount', 'order_contract_id', 'order_category', 'document_type',
+        'document_status', 'pdf_status', 'pdf_distributed_date', 'email_sent_date',
+        'program_name', 'contract_start_date', 'contract_end_date',
+    )
+
+
 # ステータス定義
 STATUS_ORDER_PLANNED = "発注予定"
 STATUS_DRAFT_CREATED = "下書き作成済"
@@ -7,6 +7,10 @@ from PyQt5.QtCore import Qt
 from order_management.database_manager import OrderManagementDB
 from order_management.ui.cast_edit_dialog import CastEditDialog
 from order_management.ui.ui_helpers import create_readonly_table_item
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
+from ui.search_controller import SearchController
+from search_cache import file_stamp, like_filter, patch_rows
 import csv
 import codecs
 
@@ -17,8 +21,19 @@ class CastMasterWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.db = OrderManagementDB()
+        self.search = SearchController(
+            self,
+            query=lambda: (self.search_edit.text(), ()),
+            fetch=lambda term, filters: self.db.get_casts(term),
+            display=self._display_casts,
+            narrow=like_filter(1, 2),  # 出演者名・所属事務所
+            stamp=lambda: file_stamp(self.db.db_path),
+        )
         self._setup_ui()
         self.load_casts()
+        # 変更通知で一覧を更新（削除は該当行のみ除く）
+        self.search.watch(['cast', 'partners'],
+                          patch=lambda rows, event, term, filters: patch_rows(rows, event, 'cast'))
 
     def _setup_ui(self):
         """UIセットアップ"""
@@ -31,7 +46,7 @@ class CastMasterWidget(QWidget):
         search_label = QLabel("検索:")
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("出演者名、所属事務所で検索...")
-        self.search_edit.textChanged.connect(self.load_casts)
+        self.search_edit.textChanged.connect(self.search.schedule)
         top_layout.addWidget(search_label)
         top_layout.addWidget(self.search_edit)
         top_layout.addStretch()
@@ -84,9 +99,10 @@ class CastMasterWidget(QWidget):
 
     def load_casts(self):
         """出演者一覧を読み込み"""
-        search_term = self.search_edit.text()
-        casts = self.db.get_casts(search_term)
+        self.search.reload()
 
+    def _display_casts(self, casts):
+        """出演者一覧を表示"""
         self.table.setRowCount(len(casts))
 
         for row, cast in enumerate(casts):
@@ -103,8 +119,7 @@ class CastMasterWidget(QWidget):
     def add_cast(self):
         """新規出演者追加"""
         dialog = CastEditDialog(self)
-        if dialog.exec_():
-            self.load_casts()
+        dialog.exec_()
 
     def edit_cast(self):
         """出演者編集"""
@@ -121,8 +136,7 @@ class CastMasterWidget(QWidget):
             return
 
         dialog = CastEditDialog(self, cast)
-        if dialog.exec_():
-            self.load_casts()
+        dialog.exec_()
 
     def delete_cast(self):
         """出演者削除（複数選択対応）"""
@@ -168,10 +182,7 @@ class CastMasterWidget(QWidget):
                 except Exception as e:
                     error_messages.append(f"{cast_name}: {str(e)}")
 
-            # 結果を表示
-            if success_count > 0:
-                self.load_casts()
-
+            # 結果を表示（一覧は変更通知で更新）
             if error_messages:
                 error_text = "\n".join(error_messages)
                 QMessageBox.warning(
@@ -185,47 +196,20 @@ class CastMasterWidget(QWidget):
                 )
 
     def export_to_csv(self):
-        """出演者データをCSVに出力"""
-        try:
-            # ファイル保存ダイアログ
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "CSV出力",
-                "出演者マスター.csv",
-                "CSV Files (*.csv)"
-            )
-
-            if not file_path:
-                return
-
-            # 全ての出演者データを取得
-            casts = self.db.get_casts("")
-
-            # CSV出力（UTF-8 with BOM）
-            with codecs.open(file_path, 'w', 'utf-8-sig') as f:
-                writer = csv.writer(f)
-
-                # ヘッダー行
-                writer.writerow(['ID', '出演者名', '所属事務所', '所属コード', '備考'])
-
-                # データ行
-                for cast in casts:
-                    writer.writerow([
-                        cast[0],  # ID
-                        cast[1] or '',  # 出演者名
-                        cast[2] or '',  # 所属事務所
-                        cast[3] or '',  # 所属コード
-                        cast[4] or ''   # 備考
-                    ])
-
-            QMessageBox.information(
-                self,
-                "CSV出力完了",
-                f"{len(casts)}件の出演者データをCSVに出力しました。\n\n{file_path}"
-            )
-
-        except Exception as e:
-            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました:\n{e}")
+        """出演者データをCSVに出力（バックグラウンドでDBから直接出力）"""
+        query, params = self.db.build_casts_query("")
+        job = CSVExportJob.from_query(
+            self.db.db_path, query, params,
+            headers=['ID', '出演者名', '所属事務所', '所属コード', '備考'],
+            row_mapper=lambda cast: [
+                cast[0],  # ID
+                cast[1] or '',  # 出演者名
+                cast[2] or '',  # 所属事務所
+                cast[3] or '',  # 所属コード
+                cast[4] or ''   # 備考
+            ],
+        )
+        run_csv_export(self, job, "CSV出力", "出演者マスター.csv", label="出演者データ")
 
     def import_from_csv(self):
         """CSVから出演者データを読み込み"""
@@ -288,8 +272,5 @@ class CastMasterWidget(QWidget):
 
             QMessageBox.information(self, "CSV読み込み完了", message)
 
-            # データを再読み込み
-            self.load_casts()
-
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"CSV読み込みに失敗しました:\n{e}")
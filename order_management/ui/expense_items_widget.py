@@ -15,6 +15,14 @@ import codecs
 from order_management.database_manager import OrderManagementDB
 from order_management.ui.ui_helpers import create_button
 from order_management.ui.expense_item_edit_dialog import ExpenseItemEditDialog
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
+from ui.search_controller import SearchController
+from search_cache import file_stamp, fold_like, patch_rows
+
+# ID列に保存する「アーカイブDBにだけある行か」（閲覧のみで、編集・削除できない）
+ARCHIVE_ONLY_ROLE = Qt.UserRole + 1
+ARCHIVE_ONLY_FOREGROUND = QColor(128, 128, 128)
 
 
 class ExpenseItemsWidget(QWidget):
@@ -23,9 +31,21 @@ class ExpenseItemsWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.db = OrderManagementDB()
+        self.search = SearchController(
+            self,
+            query=self._get_search_query,
+            fetch=self._fetch_expense_rows,
+            display=self._display_expense_rows,
+            narrow=self._narrow_expense_rows,
+            stamp=lambda: file_stamp(self.db.db_path, 'billing.db'),
+        )
 
         self.init_ui()
-        self.load_expense_items()
+        # フィルター初期化時に読み込み済みの場合はキャッシュから表示（再描画しない）
+        self.search.refresh()
+        # 保存・削除等の変更通知で表示を更新（費用項目の更新・削除は該当行のみ反映）
+        self.search.watch(['expense_items', 'productions', 'partners', 'contracts', 'payments'],
+                          patch=self._patch_expense_rows)
 
     def init_ui(self):
         """UIの初期化"""
@@ -83,42 +103,42 @@ class ExpenseItemsWidget(QWidget):
         filter_layout.addWidget(QLabel("検索:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("番組名、取引先名、項目名で検索")
-        self.search_input.textChanged.connect(self.load_expense_items)
+        self.search_input.textChanged.connect(self.search.schedule)
         filter_layout.addWidget(self.search_input)
 
         filter_layout.addWidget(QLabel("支払状態:"))
         self.payment_status_filter = QComboBox()
         self.payment_status_filter.addItems(["すべて", "未払い", "支払済"])
-        self.payment_status_filter.currentTextChanged.connect(self.load_expense_items)
+        self.payment_status_filter.currentTextChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.payment_status_filter)
 
         filter_layout.addWidget(QLabel("状態:"))
         self.status_filter = QComboBox()
         self.status_filter.addItems(["すべて", "発注予定", "発注済", "請求書受領", "支払完了"])
-        self.status_filter.currentTextChanged.connect(self.load_expense_items)
+        self.status_filter.currentTextChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.status_filter)
 
         filter_layout.addWidget(QLabel("支払月:"))
         self.payment_month_filter = QComboBox()
         self.payment_month_filter.addItem("すべて", None)
         self._populate_payment_months()
-        self.payment_month_filter.currentTextChanged.connect(self.load_expense_items)
+        self.payment_month_filter.currentTextChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.payment_month_filter)
 
         filter_layout.addWidget(QLabel("契約:"))
         self.contract_filter = QComboBox()
         self.contract_filter.addItems(["すべて", "契約あり", "契約なし"])
-        self.contract_filter.currentTextChanged.connect(self.load_expense_items)
+        self.contract_filter.currentTextChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.contract_filter)
 
         filter_layout.addWidget(QLabel("データ種別:"))
         self.data_type_filter = QComboBox()
         self.data_type_filter.addItems(["すべて", "登録済み費用項目のみ", "未登録支払いのみ"])
-        self.data_type_filter.currentTextChanged.connect(self.load_expense_items)
+        self.data_type_filter.currentTextChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.data_type_filter)
 
         self.show_archived_checkbox = QCheckBox("アーカイブ済みを表示")
-        self.show_archived_checkbox.stateChanged.connect(self.load_expense_items)
+        self.show_archived_checkbox.stateChanged.connect(self.search.refresh)
         filter_layout.addWidget(self.show_archived_checkbox)
 
         layout.addLayout(filter_layout)
@@ -151,6 +171,7 @@ class ExpenseItemsWidget(QWidget):
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
         self.table.setSelectionMode(QTableWidget.ExtendedSelection)  # 複数選択を許可
         self.table.doubleClicked.connect(self.edit_expense_item)
+        self.table.itemSelectionChanged.connect(self._update_edit_buttons)
 
         # ソート機能を有効化
         self.table.setSortingEnabled(True)
@@ -226,24 +247,42 @@ class ExpenseItemsWidget(QWidget):
 
     def load_expense_items(self):
         """費用項目と未登録支払いデータを読み込んで表示"""
-        search_term = self.search_input.text()
+        self.search.reload()
+
+    def _get_search_query(self):
+        """現在の検索条件を取得
+
+        Returns:
+            tuple: (検索キーワード, キーワード以外の検索条件)
+        """
         payment_status = self.payment_status_filter.currentText()
         status = self.status_filter.currentText()
-        payment_month = self.payment_month_filter.currentData()
-        contract_filter = self.contract_filter.currentText()
-        data_type_filter = self.data_type_filter.currentText()
-        show_archived = self.show_archived_checkbox.isChecked()
 
-        if payment_status == "すべて":
-            payment_status = None
-        if status == "すべて":
-            status = None
+        filters = (
+            None if payment_status == "すべて" else payment_status,
+            None if status == "すべて" else status,
+            self.payment_month_filter.currentData(),
+            self.contract_filter.currentText(),
+            self.data_type_filter.currentText(),
+            self.show_archived_checkbox.isChecked(),
+            # 「今月末まで」等は日付によって結果が変わるため条件に含める
+            datetime.now().strftime('%Y-%m-%d'),
+        )
+        return self.search_input.text(), filters
+
+    def _fetch_expense_rows(self, search_term, filters):
+        """費用項目と未登録支払いデータを取得
+
+        Returns:
+            tuple: (費用項目のリスト, 未登録支払いのリスト)
+        """
+        payment_status, status, payment_month, contract_filter, data_type_filter, show_archived, _ = filters
 
         # データ種別フィルタに応じてデータを取得
         expense_items = []
         unmatched_payments = []
 
-        if data_type_filter == "登録済み費用項目のみ":
+        if data_type_filter in ("すべて", "登録済み費用項目のみ"):
             # データベースから費用項目を取得
             expense_items = self.db.get_expense_items_with_details(
                 search_term=search_term,
@@ -254,60 +293,83 @@ class ExpenseItemsWidget(QWidget):
             )
 
             # 契約フィルターを適用（クライアント側でフィルタリング）
-            if contract_filter == "契約あり":
-                expense_items = [item for item in expense_items if item[11] is not None and item[11] != "" and item[11] != 0]
-            elif contract_filter == "契約なし":
-                expense_items = [item for item in expense_items if item[11] is None or item[11] == "" or item[11] == 0]
+            expense_items = self._apply_contract_filter(expense_items, contract_filter)
 
-        elif data_type_filter == "未登録支払いのみ":
+        if data_type_filter in ("すべて", "未登録支払いのみ"):
             # billing.dbから未登録支払いデータを取得
             try:
                 all_unmatched = self.db.get_unmatched_payments_from_billing('billing.db')
                 # 検索フィルタを適用
-                if search_term:
-                    unmatched_payments = [
-                        p for p in all_unmatched
-                        if (p[3] and search_term.lower() in p[3].lower()) or  # payee
-                           (p[2] and search_term.lower() in p[2].lower())     # project_name
-                    ]
-                else:
-                    unmatched_payments = all_unmatched
+                unmatched_payments = self._filter_unmatched_payments(all_unmatched, search_term)
             except Exception as e:
                 print(f"未登録支払いデータ取得エラー: {e}")
                 unmatched_payments = []
 
-        elif data_type_filter == "すべて":
-            # 両方のデータを取得
-            # 1. 費用項目を取得
-            expense_items = self.db.get_expense_items_with_details(
+        return expense_items, unmatched_payments
+
+    def _apply_contract_filter(self, expense_items, contract_filter):
+        """契約の有無で費用項目を絞り込み"""
+        if contract_filter == "契約あり":
+            return [item for item in expense_items if item[11] is not None and item[11] != "" and item[11] != 0]
+        if contract_filter == "契約なし":
+            return [item for item in expense_items if item[11] is None or item[11] == "" or item[11] == 0]
+        return expense_items
+
+    def _patch_expense_rows(self, rows, event, search_term, filters):
+        """費用項目の更新・削除を検索結果に反映（反映できない場合はNone）"""
+        payment_status, status, payment_month, contract_filter, data_type_filter, show_archived, _ = filters
+        # 未登録支払いは費用項目の取引先・金額で判定するため、表示中は全件再読み込みする
+        if data_type_filter != "登録済み費用項目のみ":
+            return None
+
+        def refetch(item_ids):
+            items = self.db.get_expense_items_with_details(
                 search_term=search_term,
                 payment_status=payment_status,
                 status=status,
                 payment_month=payment_month,
-                show_archived=show_archived
+                show_archived=show_archived,
+                item_ids=item_ids
             )
-
-            # 契約フィルターを適用
-            if contract_filter == "契約あり":
-                expense_items = [item for item in expense_items if item[11] is not None and item[11] != "" and item[11] != 0]
-            elif contract_filter == "契約なし":
-                expense_items = [item for item in expense_items if item[11] is None or item[11] == "" or item[11] == 0]
-
-            # 2. 未登録支払いデータを取得
-            try:
-                all_unmatched = self.db.get_unmatched_payments_from_billing('billing.db')
-                # 検索フィルタを適用
-                if search_term:
-                    unmatched_payments = [
-                        p for p in all_unmatched
-                        if (p[3] and search_term.lower() in p[3].lower()) or  # payee
-                           (p[2] and search_term.lower() in p[2].lower())     # project_name
-                    ]
-                else:
-                    unmatched_payments = all_unmatched
-            except Exception as e:
-                print(f"未登録支払いデータ取得エラー: {e}")
-                unmatched_payments = []
+            return self._apply_contract_filter(items, contract_filter)
+
+        expense_items, unmatched_payments = rows
+        expense_items = patch_rows(expense_items, event, 'expense_items', refetch)
+        if expense_items is None:
+            return None
+
+        # get_expense_items_with_details と同じ並び順（支払予定日の降順、未設定は最後）
+        expense_items.sort(key=lambda item: (item[8] is not None, item[8] or "", item[0]), reverse=True)
+        return expense_items, unmatched_payments
+
+    def _filter_unmatched_payments(self, payments, search_term):
+        """未登録支払いを支払先・案件名で絞り込み"""
+        if not search_term:
+            return payments
+        term = search_term.lower()
+        return [
+            p for p in payments
+            if (p[3] and term in p[3].lower()) or  # payee
+               (p[2] and term in p[2].lower())     # project_name
+        ]
+
+    def _narrow_expense_rows(self, rows, search_term):
+        """前回の検索結果を、より長いキーワードで絞り込み
+
+        費用項目は get_expense_items_with_details と同じく
+        番組名・取引先名・項目名の LIKE 検索と同じ条件で絞り込みます。
+        """
+        expense_items, unmatched_payments = rows
+        term = fold_like(search_term)
+        expense_items = [
+            item for item in expense_items
+            if any(item[col] is not None and term in fold_like(item[col]) for col in (2, 4, 5))
+        ]
+        return expense_items, self._filter_unmatched_payments(unmatched_payments, search_term)
+
+    def _display_expense_rows(self, rows):
+        """費用項目と未登録支払いデータを表示"""
+        expense_items, unmatched_payments = rows
 
         # テーブルを完全にクリア
         # ソートを一時的に無効化（データ設定中のソートによる行ズレを防止）
@@ -340,7 +402,7 @@ class ExpenseItemsWidget(QWidget):
             #            status, payment_status, contract_id, notes, work_type,
             #            order_number, order_date, invoice_received_date, actual_payment_date,
             #            invoice_number, withholding_tax, consumption_tax, payment_amount,
-            #            invoice_file_path, payment_method, approver, approval_date, amount_pending)
+            #            invoice_file_path, payment_method, approver, approval_date, amount_pending, in_archive)
 
             item_id = item[0]
             production_name = item[2] or ""
@@ -355,6 +417,7 @@ class ExpenseItemsWidget(QWidget):
             notes = item[12] or ""
             work_type = item[13] or "制作"
             amount_pending = item[26] if len(item) > 26 else 0
+            in_archive = bool(item[27]) if len(item) > 27 else False
 
             # 統計更新
             if amount_pending == 1:
@@ -412,6 +475,7 @@ class ExpenseItemsWidget(QWidget):
             # テーブルにデータを設定
             id_item = QTableWidgetItem(str(item_id))
             id_item.setData(Qt.UserRole, item_id)
+            id_item.setData(ARCHIVE_ONLY_ROLE, in_archive)
             self.table.setItem(current_row, 0, id_item)
             self.table.setItem(current_row, 1, QTableWidgetItem(production_name))
             self.table.setItem(current_row, 2, QTableWidgetItem(partner_name))
@@ -444,6 +508,14 @@ class ExpenseItemsWidget(QWidget):
                     if item:
                         item.setBackground(row_color)
 
+            # アーカイブDBにだけある行は灰色の文字（閲覧のみ）
+            if in_archive:
+                for col in range(self.table.columnCount()):
+                    item = self.table.item(current_row, col)
+                    if item:
+                        item.setForeground(ARCHIVE_ONLY_FOREGROUND)
+                        item.setToolTip("アーカイブDBの項目です（閲覧のみ）")
+
             current_row += 1
 
         # 2. 未登録支払いデータを表示
@@ -531,8 +603,8 @@ class ExpenseItemsWidget(QWidget):
         """契約なし項目のみを表示"""
         # 契約フィルターを「契約なし」に設定
         self.contract_filter.setCurrentText("契約なし")
-        # データを再読み込み
-        self.load_expense_items()
+        # データを再読み込み（条件が変わらない場合はキャッシュから）
+        self.search.refresh()
 
     def _show_overdue_items(self, event):
         """期限超過項目のみを表示"""
@@ -554,14 +626,19 @@ class ExpenseItemsWidget(QWidget):
         """1年以上前の支払済み項目をアーカイブ"""
         try:
             count = self.db.get_archive_candidate_count(12)
-            if count == 0:
+            flagged_count = self.db.get_flagged_archived_count()
+            if count == 0 and flagged_count == 0:
                 QMessageBox.information(self, "アーカイブ",
                     "アーカイブ対象の項目はありません。\n\n"
                     "（1年以上前の支払済み項目が対象です）")
                 return
 
+            # 以前にアーカイブ済みにした項目も移動するため、件数を分けて表示
+            flagged_note = (f"以前にアーカイブ済みにした項目（{flagged_count}件）も\n"
+                            f"アーカイブDBに移動します。\n\n" if flagged_count else "")
             reply = QMessageBox.question(self, "アーカイブ確認",
                 f"1年以上前の支払済み項目（{count}件）をアーカイブしますか？\n\n"
+                f"{flagged_note}"
                 f"アーカイブした項目は通常表示されなくなりますが、\n"
                 f"「アーカイブ済みを表示」をチェックすると閲覧できます。",
                 QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
@@ -570,7 +647,6 @@ class ExpenseItemsWidget(QWidget):
                 archived_count = self.db.archive_old_expense_items(12)
                 QMessageBox.information(self, "アーカイブ完了",
                     f"✓ {archived_count}件の項目をアーカイブしました。")
-                self.load_expense_items()
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"アーカイブに失敗しました:\n{e}")
 
@@ -582,16 +658,36 @@ class ExpenseItemsWidget(QWidget):
             try:
                 self.db.save_expense_item(expense_data)
                 QMessageBox.information(self, "成功", "費用項目を追加しました。")
-                self.load_expense_items()
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"費用項目の追加に失敗しました:\n{e}")
 
+    def _has_archive_only_rows(self, selected_rows):
+        """選択行にアーカイブDBにだけある行（閲覧のみ）が含まれるか"""
+        return any(self.table.item(index.row(), 0).data(ARCHIVE_ONLY_ROLE) for index in selected_rows)
+
+    def _update_edit_buttons(self):
+        """アーカイブDBの行を選択している間は編集・削除・番組変更を無効にする"""
+        enabled = not self._has_archive_only_rows(self.table.selectionModel().selectedRows())
+        for button in (self.edit_button, self.delete_button, self.change_production_button):
+            button.setEnabled(enabled)
+
+    def _reject_archive_only_rows(self, selected_rows):
+        """アーカイブDBの行が選択されていれば警告する（編集・削除できないため）"""
+        if not self._has_archive_only_rows(selected_rows):
+            return False
+        QMessageBox.warning(self, "警告",
+            "アーカイブDBに移動した費用項目は閲覧のみです。\n"
+            "編集・削除・番組の変更はできません。")
+        return True
+
     def edit_expense_item(self):
         """選択された費用項目を編集"""
         selected_rows = self.table.selectionModel().selectedRows()
         if not selected_rows:
             QMessageBox.warning(self, "警告", "編集する費用項目を選択してください。")
             return
+        if self._reject_archive_only_rows(selected_rows):
+            return
 
         row = selected_rows[0].row()
         expense_id = self.table.item(row, 0).data(Qt.UserRole)
@@ -602,7 +698,6 @@ class ExpenseItemsWidget(QWidget):
             try:
                 self.db.save_expense_item(expense_data)
                 QMessageBox.information(self, "成功", "費用項目を更新しました。")
-                self.load_expense_items()
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"費用項目の更新に失敗しました:\n{e}")
 
@@ -612,6 +707,8 @@ class ExpenseItemsWidget(QWidget):
         if not selected_rows:
             QMessageBox.warning(self, "警告", "削除する費用項目を選択してください。")
             return
+        if self._reject_archive_only_rows(selected_rows):
+            return
 
         # 選択された費用項目のIDと名前を取得
         items_to_delete = []
@@ -645,8 +742,7 @@ class ExpenseItemsWidget(QWidget):
                 expense_ids = [item_id for item_id, _, _ in items_to_delete]
                 deleted_count = self.db.delete_expense_items_bulk(expense_ids)
 
-                # 結果を表示
-                self.load_expense_items()
+                # 結果を表示（一覧は変更通知で更新）
                 QMessageBox.information(
                     self, "成功",
                     f"{deleted_count}件の費用項目を削除しました。"
@@ -663,6 +759,8 @@ class ExpenseItemsWidget(QWidget):
         if not selected_rows:
             QMessageBox.warning(self, "警告", "番組を変更する費用項目を選択してください。")
             return
+        if self._reject_archive_only_rows(selected_rows):
+            return
 
         # 選択された費用項目の情報を取得
         items_to_change = []
@@ -703,7 +801,6 @@ class ExpenseItemsWidget(QWidget):
                     self, "成功",
                     f"{updated_count}件の費用項目の番組を変更しました。"
                 )
-                self.load_expense_items()
             except Exception as e:
                 QMessageBox.critical(
                     self, "エラー",
@@ -765,80 +862,56 @@ class ExpenseItemsWidget(QWidget):
         return None
 
     def export_to_csv(self):
-        """費用項目データをCSVに出力"""
-        try:
-            # ファイル保存ダイアログ
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "CSV出力",
-                "費用項目.csv",
-                "CSV Files (*.csv)"
-            )
-
-            if not file_path:
-                return
-
-            # 現在表示されている全ての費用項目データを取得
-            expense_items = self.db.get_expense_items_with_details()
-
-            # CSV出力（UTF-8 with BOM）
-            with codecs.open(file_path, 'w', 'utf-8-sig') as f:
-                writer = csv.writer(f)
-
-                # ヘッダー行
-                writer.writerow([
-                    'ID', '契約ID', '番組名', '取引先名', '項目名', '業務種別',
-                    '金額', '実施日', '発注番号', '発注日', '状態',
-                    '請求書受領日', '支払予定日', '実際支払日', '請求書番号',
-                    '支払状態', '源泉徴収額', '消費税額', '支払金額',
-                    '請求書ファイルパス', '支払方法', '承認者', '承認日', '備考'
-                ])
-
-                # データ行
-                for item in expense_items:
-                    # item structure based on get_expense_items_with_details:
-                    # (id, production_id, production_name, partner_id, partner_name,
-                    #  item_name, amount, implementation_date, expected_payment_date,
-                    #  status, payment_status, contract_id, notes, work_type,
-                    #  order_number, order_date, invoice_received_date, actual_payment_date,
-                    #  invoice_number, withholding_tax, consumption_tax, payment_amount,
-                    #  invoice_file_path, payment_method, approver, approval_date)
-
-                    writer.writerow([
-                        item[0] or '',   # ID
-                        item[11] or '',  # 契約ID
-                        item[2] or '',   # 番組名
-                        item[4] or '',   # 取引先名
-                        item[5] or '',   # 項目名
-                        item[13] or '',  # 業務種別
-                        item[6] or '',   # 金額
-                        item[7] or '',   # 実施日
-                        item[14] or '',  # 発注番号
-                        item[15] or '',  # 発注日
-                        item[9] or '',   # 状態
-                        item[16] or '',  # 請求書受領日
-                        item[8] or '',   # 支払予定日
-                        item[17] or '',  # 実際支払日
-                        item[18] or '',  # 請求書番号
-                        item[10] or '',  # 支払状態
-                        item[19] or '',  # 源泉徴収額
-                        item[20] or '',  # 消費税額
-                        item[21] or '',  # 支払金額
-                        item[22] or '',  # 請求書ファイルパス
-                        item[23] or '',  # 支払方法
-                        item[24] or '',  # 承認者
-                        item[25] or '',  # 承認日
-                        item[12] or ''   # 備考
-                    ])
-
-            QMessageBox.information(
-                self,
-                "CSV出力完了",
-                f"{len(expense_items)}件の費用項目データをCSVに出力しました。\n\n{file_path}"
-            )
-
-        except Exception as e:
-            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました:\n{e}")
+        """費用項目データをCSVに出力（バックグラウンドでDBから直接出力）"""
+        query, params = self.db.build_expense_items_query()
+
+        def to_csv_row(item):
+            # item structure based on get_expense_items_with_details:
+            # (id, production_id, production_name, partner_id, partner_name,
+            #  item_name, amount, implementation_date, expected_payment_date,
+            #  status, payment_status, contract_id, notes, work_type,
+            #  order_number, order_date, invoice_received_date, actual_payment_date,
+            #  invoice_number, withholding_tax, consumption_tax, payment_amount,
+            #  invoice_file_path, payment_method, approver, approval_date)
+            return [
+                item[0] or '',   # ID
+                item[11] or '',  # 契約ID
+                item[2] or '',   # 番組名
+                item[4] or '',   # 取引先名
+                item[5] or '',   # 項目名
+                item[13] or '',  # 業務種別
+                item[6] or '',   # 金額
+                item[7] or '',   # 実施日
+                item[14] or '',  # 発注番号
+                item[15] or '',  # 発注日
+                item[9] or '',   # 状態
+                item[16] or '',  # 請求書受領日
+                item[8] or '',   # 支払予定日
+                item[17] or '',  # 実際支払日
+                item[18] or '',  # 請求書番号
+                item[10] or '',  # 支払状態
+                item[19] or '',  # 源泉徴収額
+                item[20] or '',  # 消費税額
+                item[21] or '',  # 支払金額
+                item[22] or '',  # 請求書ファイルパス
+                item[23] or '',  # 支払方法
+                item[24] or '',  # 承認者
+                item[25] or '',  # 承認日
+                item[12] or ''   # 備考
+            ]
+
+        job = CSVExportJob.from_query(
+            self.db.db_path, query, params,
+            headers=[
+                'ID', '契約ID', '番組名', '取引先名', '項目名', '業務種別',
+                '金額', '実施日', '発注番号', '発注日', '状態',
+                '請求書受領日', '支払予定日', '実際支払日', '請求書番号',
+                '支払状態', '源泉徴収額', '消費税額', '支払金額',
+                '請求書ファイルパス', '支払方法', '承認者', '承認日', '備考'
+            ],
+            row_mapper=to_csv_row,
+        )
+        run_csv_export(self, job, "CSV出力", "費用項目.csv", label="費用項目データ")
 
     def import_from_csv(self):
         """CSVから費用項目データを読み込み"""
@@ -901,8 +974,5 @@ class ExpenseItemsWidget(QWidget):
 
             QMessageBox.information(self, "CSV読み込み完了", message)
 
-            # データを再読み込み
-            self.load_expense_items()
-
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"CSV読み込みに失敗しました:\n{e}")
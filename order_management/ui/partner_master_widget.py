@@ -11,6 +11,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from partner_manager import PartnerManager
 from order_management.models import PARTNER_TYPES
+from ui.search_controller import SearchController
+from search_cache import file_stamp, like_filter, patch_rows
 
 
 class PartnerMasterWidget(QWidget):
@@ -19,8 +21,19 @@ class PartnerMasterWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.pm = PartnerManager()
+        self.search = SearchController(
+            self,
+            query=lambda: (self.search_edit.text(), self.type_filter.currentData()),
+            fetch=lambda term, partner_type: self.pm.get_partners(term, partner_type),
+            display=self._display_partners,
+            narrow=like_filter(1, 2, 3),  # 取引先名・コード・担当者
+            stamp=lambda: file_stamp(self.pm.db_path),
+        )
         self._setup_ui()
         self.load_partners()
+        # 変更通知で一覧を更新（削除は該当行のみ除く）
+        self.search.watch(['partners'],
+                          patch=lambda rows, event, term, partner_type: patch_rows(rows, event, 'partners'))
 
     def _setup_ui(self):
         """UIセットアップ"""
@@ -29,13 +42,21 @@ class PartnerMasterWidget(QWidget):
         # フィルターとボタン
         top_layout = QHBoxLayout()
 
+        # 検索
+        search_label = QLabel("検索:")
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("取引先名、コード、担当者で検索...")
+        self.search_edit.textChanged.connect(self.search.schedule)
+        top_layout.addWidget(search_label)
+        top_layout.addWidget(self.search_edit)
+
         # 取引先区分フィルター
         filter_label = QLabel("取引先区分:")
         self.type_filter = QComboBox()
         self.type_filter.addItem("全て", "")
         for ptype in PARTNER_TYPES:
             self.type_filter.addItem(ptype, ptype)
-        self.type_filter.currentIndexChanged.connect(self.load_partners)
+        self.type_filter.currentIndexChanged.connect(self.search.refresh)
 
         top_layout.addWidget(filter_label)
         top_layout.addWidget(self.type_filter)
@@ -88,9 +109,10 @@ class PartnerMasterWidget(QWidget):
 
     def load_partners(self):
         """取引先一覧を読み込み"""
-        partner_type = self.type_filter.currentData()
-        partners = self.pm.get_partners(partner_type=partner_type)
+        self.search.reload()
 
+    def _display_partners(self, partners):
+        """取引先一覧を表示"""
         self.table.setRowCount(len(partners))
 
         for row, partner in enumerate(partners):
@@ -137,7 +159,6 @@ class PartnerMasterWidget(QWidget):
                     return
 
                 self.pm.save_partner(partner_data, is_new=True)
-                self.load_partners()
                 QMessageBox.information(self, "成功", "取引先を追加しました")
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"保存に失敗しました: {e}")
@@ -167,7 +188,6 @@ class PartnerMasterWidget(QWidget):
                     return
 
                 self.pm.save_partner(partner_data, is_new=False)
-                self.load_partners()
                 QMessageBox.information(self, "成功", "取引先を更新しました")
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"更新に失敗しました: {e}")
@@ -216,10 +236,7 @@ class PartnerMasterWidget(QWidget):
                 except Exception as e:
                     error_messages.append(f"{partner_name}: {str(e)}")
 
-            # 結果を表示
-            if success_count > 0:
-                self.load_partners()
-
+            # 結果を表示（一覧は変更通知で更新）
             if error_messages:
                 error_text = "\n".join(error_messages)
                 QMessageBox.warning(
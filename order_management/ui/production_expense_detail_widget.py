@@ -9,6 +9,9 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
 
 from order_management.database_manager import OrderManagementDB
+from ui.change_listener import LazyRefresher
+from ui.search_controller import SearchController
+from search_cache import file_stamp, like_filter
 
 
 class ProductionExpenseDetailWidget(QWidget):
@@ -19,9 +22,19 @@ class ProductionExpenseDetailWidget(QWidget):
         self.db = OrderManagementDB()
         self.current_production_id = None
         self.current_month_filter = None  # None = 全期間
+        self.search = SearchController(
+            self,
+            query=self._get_production_list_query,
+            fetch=lambda term, filters: self.db.get_production_expense_summary(term, *filters),
+            display=self._display_production_list,
+            narrow=like_filter(1),  # 番組名
+            stamp=lambda: file_stamp(self.db.db_path),
+        )
 
         self.init_ui()
         self.load_production_list()
+        # 費用項目・番組の変更通知で一覧と詳細を更新（非表示の間は表示時まで遅延）
+        self.refresher = LazyRefresher(self, ['expense_items', 'productions'], self._reload_after_change)
 
     def init_ui(self):
         """UIの初期化"""
@@ -61,7 +74,7 @@ class ProductionExpenseDetailWidget(QWidget):
         search_layout.addWidget(QLabel("検索:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("番組名で検索")
-        self.search_input.textChanged.connect(self.load_production_list)
+        self.search_input.textChanged.connect(self.search.schedule)
         search_layout.addWidget(self.search_input)
         filter_layout.addLayout(search_layout)
 
@@ -69,7 +82,7 @@ class ProductionExpenseDetailWidget(QWidget):
         type_layout.addWidget(QLabel("種別:"))
         self.type_filter = QComboBox()
         self.type_filter.addItems(["全て", "レギュラー", "イベント", "特番", "コーナー"])
-        self.type_filter.currentTextChanged.connect(self.load_production_list)
+        self.type_filter.currentTextChanged.connect(self.search.refresh)
         type_layout.addWidget(self.type_filter)
         filter_layout.addLayout(type_layout)
 
@@ -77,7 +90,7 @@ class ProductionExpenseDetailWidget(QWidget):
         sort_layout.addWidget(QLabel("並び替え:"))
         self.sort_combo = QComboBox()
         self.sort_combo.addItems(["総費用額順", "月額平均順", "未払い件数順", "費用項目数順"])
-        self.sort_combo.currentTextChanged.connect(self.load_production_list)
+        self.sort_combo.currentTextChanged.connect(self.search.refresh)
         sort_layout.addWidget(self.sort_combo)
         filter_layout.addLayout(sort_layout)
 
@@ -210,6 +223,20 @@ class ProductionExpenseDetailWidget(QWidget):
 
     def load_production_list(self):
         """番組一覧を読み込み（グループ分け表示対応）"""
+        self.search.reload()
+
+    def _reload_after_change(self):
+        """データ変更後に番組一覧と選択中の番組の詳細を再読み込み"""
+        self.load_production_list()
+        if self.current_production_id:
+            self.load_production_detail(self.current_production_id)
+
+    def _get_production_list_query(self):
+        """番組一覧の検索条件を取得
+
+        Returns:
+            tuple: (検索キーワード, (sort_by, production_type_filter))
+        """
         search_term = self.search_input.text()
         sort_text = self.sort_combo.currentText()
         type_text = self.type_filter.currentText()
@@ -227,9 +254,10 @@ class ProductionExpenseDetailWidget(QWidget):
         # 番組タイプフィルタ
         production_type_filter = None if type_text == "全て" else type_text
 
-        # データ取得
-        productions = self.db.get_production_expense_summary(search_term, sort_by, production_type_filter)
+        return search_term, (sort_by, production_type_filter)
 
+    def _display_production_list(self, productions):
+        """番組一覧を表示"""
         # 継続番組と単発制作に分類
         continuous_productions = []  # レギュラー、コーナー
         single_productions = []  # イベント、特番、公開放送、公開収録、特別企画
@@ -652,13 +680,9 @@ class ProductionExpenseDetailWidget(QWidget):
                 # 番組情報を取得
                 production = self.db.get_production_by_id(production_id)
                 if production:
+                    # 保存後の一覧・詳細の更新は変更通知で行う
                     dialog = ProductionEditDialog(self, production)
-                    if dialog.exec_():
-                        # 編集後、リストを再読み込み
-                        self.load_production_list()
-                        # 同じ番組を再選択して詳細を更新
-                        if self.current_production_id == production_id:
-                            self.load_production_detail(production_id)
+                    dialog.exec_()
 
     def on_expense_item_double_clicked(self, item):
         """費用項目のダブルクリックイベント - 費用項目編集ダイアログを開く"""
@@ -682,12 +706,9 @@ class ProductionExpenseDetailWidget(QWidget):
             # 費用項目編集ダイアログを開く
             from order_management.ui.expense_item_edit_dialog import ExpenseItemEditDialog
 
+            # 保存後の一覧・詳細の更新は変更通知で行う
             dialog = ExpenseItemEditDialog(self, expense_item_id)
-            if dialog.exec_():
-                # 編集後、番組一覧と詳細を再読み込み
-                self.load_production_list()
-                if self.current_production_id:
-                    self.load_production_detail(self.current_production_id)
+            dialog.exec_()
 
     def update_month_filter(self):
         """月フィルタのコンボボックスを更新"""
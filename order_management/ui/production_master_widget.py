@@ -9,6 +9,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from order_management.database_manager import OrderManagementDB
 from order_management.ui.production_edit_dialog import ProductionEditDialog
+from ui.search_controller import SearchController
+from search_cache import file_stamp, like_filter
 import csv
 import codecs
 
@@ -19,8 +21,19 @@ class ProductionMasterWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.db = OrderManagementDB()
+        self.search = SearchController(
+            self,
+            query=lambda: (self.search_edit.text(),
+                           (self.type_filter.currentData(), self.status_filter.currentData())),
+            fetch=self._fetch_productions,
+            display=self._display_productions,
+            narrow=like_filter(1),  # 番組・イベント名
+            stamp=lambda: file_stamp(self.db.db_path),
+        )
         self._setup_ui()
         self.load_productions()
+        # 変更通知で一覧を更新（親子関係が変わるため常に再読み込み）
+        self.search.watch(['productions'])
 
     def _setup_ui(self):
         """UIセットアップ"""
@@ -33,7 +46,7 @@ class ProductionMasterWidget(QWidget):
         search_label = QLabel("検索:")
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("番組・イベント名で検索...")
-        self.search_edit.textChanged.connect(self.load_productions)
+        self.search_edit.textChanged.connect(self.search.schedule)
         top_layout.addWidget(search_label)
         top_layout.addWidget(self.search_edit)
 
@@ -45,7 +58,7 @@ class ProductionMasterWidget(QWidget):
         self.type_filter.addItem("イベント", "イベント")
         self.type_filter.addItem("特番", "特番")
         self.type_filter.addItem("コーナー", "コーナー")
-        self.type_filter.currentIndexChanged.connect(self.load_productions)
+        self.type_filter.currentIndexChanged.connect(self.search.refresh)
         top_layout.addWidget(type_label)
         top_layout.addWidget(self.type_filter)
 
@@ -55,7 +68,7 @@ class ProductionMasterWidget(QWidget):
         self.status_filter.addItem("全て", "")
         self.status_filter.addItem("放送中", "放送中")
         self.status_filter.addItem("終了", "終了")
-        self.status_filter.currentIndexChanged.connect(self.load_productions)
+        self.status_filter.currentIndexChanged.connect(self.search.refresh)
         top_layout.addWidget(status_label)
         top_layout.addWidget(self.status_filter)
         top_layout.addStretch()
@@ -114,9 +127,11 @@ class ProductionMasterWidget(QWidget):
 
     def load_productions(self):
         """番組・イベント一覧を読み込み（階層表示対応）"""
-        search_term = self.search_edit.text()
-        production_type = self.type_filter.currentData()
-        status = self.status_filter.currentData()
+        self.search.reload()
+
+    def _fetch_productions(self, search_term, filters):
+        """番組・イベント一覧を取得"""
+        production_type, status = filters
 
         # 階層情報付きで制作物を取得
         productions = self.db.get_productions_with_hierarchy(search_term, production_type, True)
@@ -125,6 +140,10 @@ class ProductionMasterWidget(QWidget):
         if status:
             productions = [p for p in productions if p[10] == status]
 
+        return productions
+
+    def _display_productions(self, productions):
+        """番組・イベント一覧を表示"""
         # 階層順にソート（親制作物の直後にその子制作物を配置）
         productions = self._sort_productions_hierarchically(productions)
 
@@ -233,8 +252,7 @@ class ProductionMasterWidget(QWidget):
     def add_production(self):
         """新規追加"""
         dialog = ProductionEditDialog(self)
-        if dialog.exec_():
-            self.load_productions()
+        dialog.exec_()
 
     def edit_production(self):
         """編集"""
@@ -251,8 +269,7 @@ class ProductionMasterWidget(QWidget):
             return
 
         dialog = ProductionEditDialog(self, production)
-        if dialog.exec_():
-            self.load_productions()
+        dialog.exec_()
 
     def delete_production(self):
         """削除（複数選択対応）"""
@@ -299,10 +316,7 @@ class ProductionMasterWidget(QWidget):
                 except Exception as e:
                     error_messages.append(f"{production_name}: {str(e)}")
 
-            # 結果を表示
-            if success_count > 0:
-                self.load_productions()
-
+            # 結果を表示（一覧は変更通知で更新）
             if error_messages:
                 error_text = "\n".join(error_messages)
                 QMessageBox.warning(
@@ -439,8 +453,5 @@ class ProductionMasterWidget(QWidget):
 
             QMessageBox.information(self, "CSV読み込み完了", message)
 
-            # データを再読み込み
-            self.load_productions()
-
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"CSV読み込みに失敗しました:\n{e}")
@@ -4,7 +4,7 @@
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
-    QPushButton, QLabel, QComboBox, QFileDialog, QMessageBox,
+    QPushButton, QLabel, QComboBox, QMessageBox,
     QHeaderView, QMenu, QAction
 )
 from PyQt5.QtCore import Qt, QDate
@@ -13,12 +13,13 @@ from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import calendar
-import csv
 
 from order_management.database_manager import OrderManagementDB
 from order_management.ui.custom_date_edit import ImprovedDateEdit
 from order_management.ui.production_edit_dialog import ProductionEditDialog
 from order_management.ui.expense_edit_dialog import ExpenseEditDialog
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
 
 
 class ProductionTimelineWidget(QWidget):
@@ -260,12 +261,12 @@ class ProductionTimelineWidget(QWidget):
 
         return total_count
 
-    def load_timeline(self):
-        """タイムラインを読み込み"""
-        self.tree.clear()
-        self.tree.setSortingEnabled(False)  # ソートを一時無効化
+    def _get_timeline_filters(self):
+        """画面のフィルター条件を取得
 
-        # フィルター条件取得
+        Returns:
+            tuple: (開始日, 終了日, 種別)
+        """
         year = self.year_combo.currentData()
         month = self.month_combo.currentData()
 
@@ -280,8 +281,18 @@ class ProductionTimelineWidget(QWidget):
             end_date = f"{year:04d}-{month:02d}-{last_day:02d}"
 
         production_type = self.type_filter.currentData()
-        program_id = self.program_filter.currentData()
+        return start_date, end_date, production_type
+
+    def iter_timeline_entries(self, start_date, end_date, production_type):
+        """タイムラインの番組・イベントと費用項目を順に返すジェネレーター
+
+        画面表示（load_timeline）とCSV出力で共用します。
+        DBアクセスのみでウィジェットには触れないため、別スレッドからも呼べます。
 
+        Yields:
+            dict: production_id / display_date / display_name / production_type /
+                  monthly_amount / expenses（表示対象の費用項目dictのリスト）/ expenses_total
+        """
         # 番組・イベント取得（全体から取得し、後でフィルタリング）
         productions = self.db.get_productions_with_hierarchy(
             search_term="",
@@ -312,11 +323,6 @@ class ProductionTimelineWidget(QWidget):
                 year_month = start_date_val[:7] if start_date_val else start_date[:7]
                 expanded_items.append((year_month, production, 1))
 
-        # 統計用変数
-        total_amount = 0
-        item_count = 0
-
-        # ツリー構築
         for year_month, production, broadcast_count in expanded_items:
             production_id = production[0]
             production_name = production[1]
@@ -343,29 +349,6 @@ class ProductionTimelineWidget(QWidget):
                 display_name = production_name
                 display_date = start_date_display
 
-            total_amount += monthly_amount
-            item_count += 1
-
-            # 番組・イベントノード作成
-            production_item = QTreeWidgetItem([
-                display_date,
-                display_name,
-                production_type_str,
-                f"{monthly_amount:,.0f}",
-                ""
-            ])
-
-            # 番組・イベントノードのスタイル
-            font = QFont()
-            font.setBold(True)
-            for col in range(5):
-                production_item.setFont(col, font)
-                production_item.setBackground(col, QBrush(QColor(240, 240, 240)))
-                production_item.setForeground(col, QBrush(QColor(0, 0, 0)))  # 黒色
-
-            # データを保存（編集用）
-            production_item.setData(0, Qt.UserRole, ("production", production_id))
-
             # 費用項目取得（契約由来 + 手動追加）
             all_expenses = []
 
@@ -423,15 +406,11 @@ class ProductionTimelineWidget(QWidget):
                 }
                 all_expenses.append(expense_info)
 
-            # 表示される費用項目の合計を計算
+            # 表示される費用項目を絞り込み、合計を計算
+            displayed_expenses = []
             displayed_expenses_total = 0
 
-            # 費用項目を表示
             for expense_info in all_expenses:
-                expense_id = expense_info['id']
-                item_name = expense_info['item_name']
-                amount = expense_info['amount']
-                status = expense_info['status']
                 payment_scheduled_date = expense_info['payment_date']
 
                 # レギュラー番組の場合、月フィルタリングを適用
@@ -452,14 +431,66 @@ class ProductionTimelineWidget(QWidget):
                             continue
 
                 # フィルターを通過した費用項目の金額を合計に加算
-                displayed_expenses_total += amount
+                displayed_expenses_total += expense_info['amount']
+                displayed_expenses.append(expense_info)
+
+            yield {
+                'production_id': production_id,
+                'display_date': display_date,
+                'display_name': display_name,
+                'production_type': production_type_str,
+                'monthly_amount': monthly_amount,
+                'expenses': displayed_expenses,
+                'expenses_total': displayed_expenses_total,
+            }
+
+    def load_timeline(self):
+        """タイムラインを読み込み"""
+        self.tree.clear()
+        self.tree.setSortingEnabled(False)  # ソートを一時無効化
+
+        # フィルター条件取得
+        start_date, end_date, production_type = self._get_timeline_filters()
+
+        # 統計用変数
+        total_amount = 0
+        item_count = 0
+
+        # ツリー構築
+        for entry in self.iter_timeline_entries(start_date, end_date, production_type):
+            total_amount += entry['monthly_amount']
+            item_count += 1
+
+            # 番組・イベントノード作成（金額は表示される費用項目の合計）
+            production_item = QTreeWidgetItem([
+                entry['display_date'],
+                entry['display_name'],
+                entry['production_type'],
+                f"{entry['expenses_total']:,.0f}",
+                ""
+            ])
+
+            # 番組・イベントノードのスタイル
+            font = QFont()
+            font.setBold(True)
+            for col in range(5):
+                production_item.setFont(col, font)
+                production_item.setBackground(col, QBrush(QColor(240, 240, 240)))
+                production_item.setForeground(col, QBrush(QColor(0, 0, 0)))  # 黒色
+
+            # データを保存（編集用）
+            production_item.setData(0, Qt.UserRole, ("production", entry['production_id']))
+
+            # 費用項目を表示
+            for expense_info in entry['expenses']:
+                status = expense_info['status']
 
                 # 費用項目ノード作成
                 expense_item = QTreeWidgetItem([
-                    payment_scheduled_date,
-                    item_name,
+                    expense_info['payment_date'],
+                    expense_info['item_name'],
                     "",
-                    f"{amount:,.0f}",
+                    f"{expense_info['amount']:,.0f}",
                     status
                 ])
 
@@ -478,13 +509,10 @@ class ProductionTimelineWidget(QWidget):
                 # データを保存（編集用）
                 # 契約由来の場合は契約ID、手動の場合は費用項目IDを保存
                 data_type = "contract" if expense_info['type'] == 'contract' else "expense"
-                expense_item.setData(0, Qt.UserRole, (data_type, expense_id))
+                expense_item.setData(0, Qt.UserRole, (data_type, expense_info['id']))
 
                 production_item.addChild(expense_item)
 
-            # 番組の合計額を実際に表示された費用項目の合計で更新
-            production_item.setText(3, f"{displayed_expenses_total:,.0f}")
-
             self.tree.addTopLevelItem(production_item)
 
         # ソートを再有効化
@@ -607,54 +635,42 @@ class ProductionTimelineWidget(QWidget):
         self.tree.collapseAll()
 
     def export_to_csv(self):
-        """CSV出力"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "CSV出力", f"production_timeline_{datetime.now().strftime('%Y%m%d')}.csv",
-            "CSV Files (*.csv)"
+        """CSV出力（表示中のツリーではなく、同じ条件でDBからバックグラウンドで出力）"""
+        start_date, end_date, production_type = self._get_timeline_filters()
+
+        def iter_rows():
+            for entry in self.iter_timeline_entries(start_date, end_date, production_type):
+                # 番組・イベント行
+                yield [
+                    entry['display_date'],
+                    entry['display_name'],
+                    entry['production_type'],
+                    f"{entry['expenses_total']:,.0f}",
+                    ""
+                ]
+
+                # 費用項目行（インデント付き）
+                for expense_info in entry['expenses']:
+                    yield [
+                        expense_info['payment_date'],
+                        "  " + expense_info['item_name'],  # インデント
+                        "",
+                        f"{expense_info['amount']:,.0f}",
+                        expense_info['status']
+                    ]
+
+        job = CSVExportJob(
+            headers=[
+                "実施日/支払予定日", "番組・イベント名/項目名",
+                "種別", "金額（円）", "ステータス"
+            ],
+            rows=iter_rows,
+        )
+        run_csv_export(
+            self, job, "CSV出力",
+            f"production_timeline_{datetime.now().strftime('%Y%m%d')}.csv",
+            label="タイムライン",
         )
-
-        if not file_path:
-            return
-
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-
-                # ヘッダー
-                writer.writerow([
-                    "実施日/支払予定日", "番組・イベント名/項目名",
-                    "種別", "金額（円）", "ステータス"
-                ])
-
-                # データ
-                root = self.tree.invisibleRootItem()
-                for i in range(root.childCount()):
-                    production_item = root.child(i)
-
-                    # 番組・イベント行
-                    writer.writerow([
-                        production_item.text(0),
-                        production_item.text(1),
-                        production_item.text(2),
-                        production_item.text(3),
-                        production_item.text(4)
-                    ])
-
-                    # 費用項目行（インデント付き）
-                    for j in range(production_item.childCount()):
-                        expense_item = production_item.child(j)
-                        writer.writerow([
-                            expense_item.text(0),
-                            "  " + expense_item.text(1),  # インデント
-                            expense_item.text(2),
-                            expense_item.text(3),
-                            expense_item.text(4)
-                        ])
-
-            QMessageBox.information(self, "成功", f"CSV出力が完了しました:\n{file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました:\n{str(e)}")
 
     def print_timeline(self):
         """印刷"""
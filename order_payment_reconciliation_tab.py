@@ -3,15 +3,78 @@
 発注マスタから月次支払予定リストを生成し、実際の支払データと照合する画面
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLabel, QComboBox,
+                             QTableView, QLabel, QComboBox,
                              QMessageBox, QHeaderView, QGroupBox, QGridLayout)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QBrush
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QColor
 from datetime import datetime
 from order_management.database_manager import OrderManagementDB
 from database import DatabaseManager
+from ui.grouped_table_model import CollapsibleGroupProxyModel, GroupedTableModel
+from ui.record_table_model import Column
 from utils import log_message, format_amount
 
+TEXT_COLOR = QColor(0, 0, 0)  # 黒
+
+# ステータスに応じた背景色
+STATUS_COLORS = {
+    '支払済': QColor(144, 238, 144),  # 薄緑
+    '金額相違': QColor(255, 255, 153),  # 薄黄
+    '未払い': QColor(255, 182, 193),  # 薄赤
+}
+OTHER_STATUS_COLOR = QColor(211, 211, 211)  # グレー
+
+# 明細行（発注）の列
+COLUMNS = [
+    Column("取引先コード", lambda order: ""),
+    Column("取引先名", lambda order: ""),
+    Column("発注番号", lambda order: order['order_number']),
+    Column("案件名", lambda order: order['project_name']),
+    Column("項目名", lambda order: order['item_name']),
+    Column("支払タイプ", lambda order: order.get('payment_type', '-'), alignment=Qt.AlignCenter),
+    Column("計算内訳", lambda order: order.get('calculation_detail', '-')),
+    Column("発注金額", lambda order: format_amount(order['amount']),
+           alignment=Qt.AlignRight | Qt.AlignVCenter),
+    Column("支払予定日", lambda order: order['expected_payment_date']),
+    Column("支払タイミング", lambda order: order.get('payment_timing', '-'), alignment=Qt.AlignCenter),
+    Column("ステータス", lambda order: order['payment_status'],
+           background=lambda order: STATUS_COLORS.get(order['payment_status'], OTHER_STATUS_COLOR),
+           foreground=lambda order: TEXT_COLOR, alignment=Qt.AlignCenter),
+]
+
+# 見出し行（取引先）の表示
+GROUP_DISPLAY = {
+    0: lambda partner, orders: partner['partner_code'] or "",
+    1: lambda partner, orders: partner['partner_name'] or "",
+    2: lambda partner, orders: f"{len(orders)}件",
+    7: lambda partner, orders: format_amount(sum(order['amount'] or 0 for order in orders)),
+}
+
+
+class ReconciliationLoadWorker(QThread):
+    """照合データ（月次支払リスト・サマリー）の読み込みスレッド"""
+
+    loaded = pyqtSignal(int, object, object)  # (読み込み番号, 月次支払リスト, サマリー)
+    failed = pyqtSignal(int, str)  # (読み込み番号, エラー内容)
+
+    def __init__(self, order_db, request_id, year, month, parent=None):
+        super().__init__(parent)
+        self.order_db = order_db
+        self.request_id = request_id
+        self.year = year
+        self.month = month
+
+    def run(self):
+        try:
+            payment_list = self.order_db.generate_monthly_payment_list(self.year, self.month)
+            summary = self.order_db.get_payment_summary(self.year, self.month)
+            self.loaded.emit(self.request_id, payment_list, summary)
+        except Exception as e:
+            log_message(f"照合データ読み込みエラー: {e}")
+            import traceback
+            log_message(f"エラー詳細: {traceback.format_exc()}")
+            self.failed.emit(self.request_id, str(e))
+
 
 class OrderPaymentReconciliationTab(QWidget):
     """発注・支払照合タブ"""
@@ -20,6 +83,9 @@ class OrderPaymentReconciliationTab(QWidget):
         super().__init__()
         self.order_db = OrderManagementDB()
         self.db_manager = DatabaseManager()
+        # 読み込み番号（年月を続けて切り替えた場合は最後の読み込み結果だけを表示）
+        self._load_request = 0
+        self._load_workers = set()  # 実行中の読み込みスレッド（破棄されないよう保持）
         self.init_ui()
 
     def init_ui(self):
@@ -96,14 +162,14 @@ class OrderPaymentReconciliationTab(QWidget):
         summary_group.setLayout(summary_layout)
         layout.addWidget(summary_group)
 
-        # テーブル
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)
-        self.table.setHorizontalHeaderLabels([
-            "取引先コード", "取引先名", "発注番号", "案件名", "項目名",
-            "支払タイプ", "計算内訳", "発注金額", "支払予定日",
-            "支払タイミング", "ステータス"
-        ])
+        # テーブル（取引先ごとの見出し行と発注の明細行。見出し行のクリックで開閉）
+        self.model = GroupedTableModel(COLUMNS, group_display=GROUP_DISPLAY)
+        self.proxy = CollapsibleGroupProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.clicked.connect(self.proxy.toggle_group_at)
 
         # カラム幅を調整
         header = self.table.horizontalHeader()
@@ -120,7 +186,8 @@ class OrderPaymentReconciliationTab(QWidget):
         header.setSectionResizeMode(10, QHeaderView.ResizeToContents)  # ステータス
 
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
 
         layout.addWidget(self.table)
 
@@ -135,107 +202,51 @@ class OrderPaymentReconciliationTab(QWidget):
         self.load_reconciliation_data()
 
     def load_reconciliation_data(self):
-        """照合データを読み込み"""
+        """照合データをバックグラウンドで読み込み"""
         try:
             year = int(self.year_combo.currentText())
             month = int(self.month_combo.currentText())
-
-            log_message(f"{year}年{month}月の照合データを読み込み中...")
-
-            # 月次支払リストを取得
-            payment_list = self.order_db.generate_monthly_payment_list(year, month)
-
-            # サマリーを取得
-            summary = self.order_db.get_payment_summary(year, month)
-
-            # サマリーを更新
-            self.update_summary(summary)
-
-            # テーブルをクリア
-            self.table.setRowCount(0)
-
-            # テーブルに表示
-            row = 0
-            for partner in payment_list:
-                partner_code = partner['partner_code']
-                partner_name = partner['partner_name']
-
-                for order in partner['orders']:
-                    self.table.insertRow(row)
-
-                    # 取引先コード (col 0)
-                    self.table.setItem(row, 0, QTableWidgetItem(partner_code))
-
-                    # 取引先名 (col 1)
-                    self.table.setItem(row, 1, QTableWidgetItem(partner_name))
-
-                    # 発注番号 (col 2)
-                    self.table.setItem(row, 2, QTableWidgetItem(order['order_number']))
-
-                    # 案件名 (col 3)
-                    self.table.setItem(row, 3, QTableWidgetItem(order['project_name']))
-
-                    # 項目名 (col 4)
-                    self.table.setItem(row, 4, QTableWidgetItem(order['item_name']))
-
-                    # 支払タイプ (col 5)
-                    payment_type = order.get('payment_type', '-')
-                    payment_type_item = QTableWidgetItem(payment_type)
-                    payment_type_item.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(row, 5, payment_type_item)
-
-                    # 計算内訳 (col 6)
-                    calculation_detail = order.get('calculation_detail', '-')
-                    self.table.setItem(row, 6, QTableWidgetItem(calculation_detail))
-
-                    # 発注金額 (col 7)
-                    amount_item = QTableWidgetItem(format_amount(order['amount']))
-                    amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    self.table.setItem(row, 7, amount_item)
-
-                    # 支払予定日 (col 8)
-                    self.table.setItem(row, 8, QTableWidgetItem(order['expected_payment_date']))
-
-                    # 支払タイミング (col 9)
-                    payment_timing = order.get('payment_timing', '-')
-                    payment_timing_item = QTableWidgetItem(payment_timing)
-                    payment_timing_item.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(row, 9, payment_timing_item)
-
-                    # ステータス (col 10)
-                    status = order['payment_status']
-                    status_item = QTableWidgetItem(status)
-                    status_item.setTextAlignment(Qt.AlignCenter)
-
-                    # ステータスに応じて色分け
-                    text_color = QColor(0, 0, 0)  # 黒
-                    if status == '支払済':
-                        status_item.setBackground(QColor(144, 238, 144))  # 薄緑
-                    elif status == '金額相違':
-                        status_item.setBackground(QColor(255, 255, 153))  # 薄黄
-                    elif status == '未払い':
-                        status_item.setBackground(QColor(255, 182, 193))  # 薄赤
-                    else:
-                        status_item.setBackground(QColor(211, 211, 211))  # グレー
-
-                    status_item.setForeground(QBrush(text_color))
-                    self.table.setItem(row, 10, status_item)
-
-                    row += 1
-
-            # ステータスバー更新
-            total_orders = sum(len(p['orders']) for p in payment_list)
-            self.status_label.setText(
-                f"{year}年{month}月: {len(payment_list)}取引先、{total_orders}件の発注データを表示"
-            )
-
-            log_message(f"照合データ読み込み完了: {len(payment_list)}取引先、{total_orders}件")
-
-        except Exception as e:
-            log_message(f"照合データ読み込みエラー: {e}")
-            import traceback
-            log_message(f"エラー詳細: {traceback.format_exc()}")
-            QMessageBox.critical(self, "エラー", f"データの読み込みに失敗しました:\n{str(e)}")
+        except ValueError:
+            return
+
+        log_message(f"{year}年{month}月の照合データを読み込み中...")
+        self.status_label.setText(f"{year}年{month}月の照合データを読み込んでいます...")
+
+        self._load_request += 1
+        worker = ReconciliationLoadWorker(self.order_db, self._load_request, year, month)
+        worker.loaded.connect(lambda request_id, payment_list, summary, year=year, month=month:
+                              self._on_reconciliation_loaded(request_id, year, month, payment_list, summary))
+        worker.failed.connect(self._on_reconciliation_failed)
+        worker.finished.connect(lambda: self._load_workers.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        self._load_workers.add(worker)
+        worker.start()
+
+    def _on_reconciliation_loaded(self, request_id, year, month, payment_list, summary):
+        """読み込み結果を表示（古い読み込みの結果は捨てる）"""
+        if request_id != self._load_request:
+            return
+
+        # サマリーを更新
+        self.update_summary(summary)
+
+        # 取引先ごとの見出し行と発注の明細行を1つのリストとして表示
+        self.model.set_groups((partner, partner['orders']) for partner in payment_list)
+
+        # ステータスバー更新
+        total_orders = sum(len(p['orders']) for p in payment_list)
+        self.status_label.setText(
+            f"{year}年{month}月: {len(payment_list)}取引先、{total_orders}件の発注データを表示"
+        )
+
+        log_message(f"照合データ読み込み完了: {len(payment_list)}取引先、{total_orders}件")
+
+    def _on_reconciliation_failed(self, request_id, message):
+        """読み込みエラー"""
+        if request_id != self._load_request:
+            return
+        self.status_label.setText("照合データの読み込みに失敗しました")
+        QMessageBox.critical(self, "エラー", f"データの読み込みに失敗しました:\n{message}")
 
     def update_summary(self, summary):
         """サマリーを更新"""
@@ -5,6 +5,7 @@
 import sqlite3
 from typing import List, Optional, Tuple
 from utils import log_message
+from change_events import publish_change, INSERT, UPDATE, DELETE
 
 
 class PartnerManager:
@@ -157,6 +158,7 @@ class PartnerManager:
                 log_message(f"取引先更新完了: ID={partner_id}")
 
             conn.commit()
+            publish_change('partners', [partner_id], INSERT if is_new else UPDATE)
             return partner_id
 
         except sqlite3.Error as e:
@@ -177,6 +179,7 @@ class PartnerManager:
         try:
             cursor.execute("DELETE FROM partners WHERE id = ?", (partner_id,))
             conn.commit()
+            publish_change('partners', [partner_id], DELETE)
             log_message(f"取引先削除完了: ID={partner_id}")
 
         except sqlite3.Error as e:
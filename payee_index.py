@@ -0,0 +1,132 @@
+"""支払い先マスターのメモリ上の索引
+
+支払い先入力の自動補完・コード自動入力で使う、支払い先名 → コードの索引です。
+payee_master.db から一度だけ読み込み、以降の検索ではDBにアクセスしません。
+PyQt5には依存しません（画面側の共有モデルは payee_line_edit.py）。
+
+- 支払い先マスターの変更通知（change_events の 'payee_master'）で破棄し、次回使用時に読み込み直す
+- 他のプロセスでの変更は refresh_if_changed()（DBファイルの状態を比較）で反映する
+
+使用例:
+    index = get_payee_index(db_manager)
+    code = index.code_for("株式会社サンプル")
+    names = index.search("サンプル")  # 前方一致 → 部分一致の順
+"""
+import bisect
+import os
+import threading
+
+from change_events import change_bus
+from search_cache import file_stamp, fold_like
+
+PAYEE_MASTER_TABLE = 'payee_master'
+
+# DBファイルのパス → PayeeIndex
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class PayeeIndex:
+    """支払い先名 → コードの索引（前方一致・部分一致検索付き）"""
+
+    def __init__(self, fetch, stamp=None):
+        """
+        Args:
+            fetch: (支払い先名, コード) のリストを返す関数
+            stamp: データの状態を返す関数（refresh_if_changed で使用）
+        """
+        self.fetch = fetch
+        self.stamp = stamp
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stamp_value = None
+        self._codes = {}      # 支払い先名 -> コード
+        self._names = []      # 支払い先名（名前順）
+        self._folded = []     # (比較用の名前, 支払い先名) の名前順リスト（前方一致用）
+        self.version = 0      # 読み込むたびに増える（画面側の再設定判定用）
+
+    def invalidate(self):
+        """索引を破棄（次回使用時に読み込み直す）"""
+        with self._lock:
+            self._loaded = False
+
+    def refresh_if_changed(self):
+        """DBファイルが変わっていれば索引を破棄
+
+        Returns:
+            bool: 破棄した場合True
+        """
+        if self.stamp is None:
+            return False
+        value = self.stamp()
+        with self._lock:
+            if not self._loaded or value == self._stamp_value:
+                return False
+            self._loaded = False
+        return True
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded:
+                return
+            stamp_value = self.stamp() if self.stamp is not None else None
+            rows = self.fetch()
+
+            codes = {}
+            for name, code in rows:
+                if name and name not in codes:
+                    codes[name] = code or ""
+            self._codes = codes
+            self._names = sorted(codes)
+            self._folded = sorted((fold_like(name), name) for name in codes)
+            self._stamp_value = stamp_value
+            self._loaded = True
+            self.version += 1
+
+    def names(self):
+        """支払い先名の一覧（名前順）"""
+        self._ensure_loaded()
+        return list(self._names)
+
+    def code_for(self, name):
+        """支払い先名に一致するコード（なければ空文字）"""
+        self._ensure_loaded()
+        return self._codes.get(name, "")
+
+    def search(self, term, limit=None):
+        """キーワードを含む支払い先名を検索（大文字・小文字はLIKEと同じく区別しない）
+
+        前方一致するものを先に、続いて途中に含むものを名前順に返します。
+        """
+        self._ensure_loaded()
+        folded_term = fold_like(term or "")
+        if not folded_term:
+            return self._names[:limit] if limit else list(self._names)
+
+        start = bisect.bisect_left(self._folded, (folded_term,))
+        prefix = []
+        for folded, name in self._folded[start:]:
+            if not folded.startswith(folded_term):
+                break
+            prefix.append(name)
+
+        prefix_set = set(prefix)
+        contains = [name for folded, name in self._folded
+                    if name not in prefix_set and folded_term in folded]
+        result = sorted(prefix) + sorted(contains)
+        return result[:limit] if limit else result
+
+
+def get_payee_index(db_manager):
+    """DatabaseManager の支払い先マスターの索引を取得（DBファイルごとに共有）"""
+    path = os.path.abspath(db_manager.payee_master_db)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = PayeeIndex(
+                fetch=db_manager.get_payee_suggestions,
+                stamp=lambda: file_stamp(path),
+            )
+            change_bus.subscribe(lambda event: index.invalidate(), tables=[PAYEE_MASTER_TABLE])
+            _indexes[path] = index
+    return index
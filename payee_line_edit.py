@@ -0,0 +1,83 @@
+"""支払い先入力欄（自動補完・コード自動入力付き）
+
+候補は payee_index の索引から作る共有の QStringListModel を使います。
+入力欄をいくつ作っても支払い先マスターの読み込みは1回で、入力中はDBにアクセスしません。
+支払い先マスターが変更されると、共有モデルを更新します。
+"""
+from PyQt5.QtCore import QStringListModel, Qt
+from PyQt5.QtWidgets import QCompleter, QLineEdit
+
+from payee_index import PAYEE_MASTER_TABLE, get_payee_index
+from ui.change_listener import get_change_relay
+from utils import format_payee_code
+
+# PayeeIndex -> 共有モデル
+_models = {}
+
+
+class _PayeeModel(QStringListModel):
+    """支払い先名の共有モデル（支払い先マスターの変更で更新）"""
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self._version = None
+        self.refresh()
+        get_change_relay().changed.connect(self._handle_change)
+
+    def refresh(self):
+        """索引が読み込み直されていればモデルを更新"""
+        names = self.index.names()
+        if self.index.version != self._version:
+            self._version = self.index.version
+            self.setStringList(names)
+
+    def _handle_change(self, event):
+        if event.table == PAYEE_MASTER_TABLE:
+            # 索引の無効化（payee_index の購読）より先に呼ばれる場合があるため、ここでも無効化する
+            self.index.invalidate()
+            self.refresh()
+
+
+def get_payee_model(db_manager):
+    """支払い先名の共有モデルを取得"""
+    index = get_payee_index(db_manager)
+    model = _models.get(index)
+    if model is None:
+        model = _models[index] = _PayeeModel(index)
+    return model
+
+
+def refresh_payee_model(db_manager):
+    """他のプロセスで支払い先マスターが変更されていれば共有モデルを更新"""
+    get_payee_index(db_manager).refresh_if_changed()
+    get_payee_model(db_manager).refresh()
+
+
+class PayeeLineEdit(QLineEdit):
+    """支払い先入力用のカスタムLineEdit（自動補完機能付き）"""
+
+    def __init__(self, db_manager, code_field=None):
+        super().__init__()
+        self.db_manager = db_manager
+        self.code_field = code_field  # 連動するコードフィールド
+        self.payee_index = get_payee_index(db_manager)
+        self.setup_completer()
+
+        # テキスト変更時にコードを自動入力
+        self.textChanged.connect(self.auto_fill_code)
+
+    def setup_completer(self):
+        """オートコンプリーターの設定（候補は共有モデル）"""
+        completer = QCompleter(get_payee_model(self.db_manager), self)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        self.setCompleter(completer)
+
+    def auto_fill_code(self, text):
+        """支払い先名が変更された時にコードを自動入力（0埋め対応）"""
+        if self.code_field and text:
+            code = self.payee_index.code_for(text)
+            if code:
+                formatted_code = format_payee_code(code)
+                self.code_field.setText(formatted_code)
@@ -4,15 +4,62 @@
 不足している項目（発注書類、受領確認、支払実績）を一覧表示します。
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLabel,
+                             QTableView, QLabel,
                              QRadioButton, QButtonGroup, QLineEdit, QHeaderView,
                              QMessageBox, QComboBox, QGroupBox, QGridLayout)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QBrush
+from PyQt5.QtGui import QColor
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
 from database import DatabaseManager
+from filter_store import FilterStore
+from ui.record_table_model import Column, MaskFilterProxyModel, RecordTableModel
+
+# Phase 3.1: 行全体の背景色
+CRITICAL_COLOR = QColor(255, 220, 220)  # 🔴 赤
+WARNING_COLOR = QColor(255, 255, 200)   # 🟡 黄
+COMPLETED_COLOR = QColor(220, 255, 220) # 🟢 緑
+
+
+def _row_status(item):
+    """行の区分（critical / warning / completed）と状態列の表示"""
+    has_order = item['has_order']
+    receipt_ok = item['receipt_status'] == "✓"
+    payment_ok = item['payment_status'] == "✓"
+    document_status = item.get('document_status', '未完了')
+
+    if not payment_ok:
+        # 支払未完了 → 赤背景（最優先）
+        return 'critical', "🚨 支払未"
+    if not has_order:
+        # 発注なし → 黄背景
+        return 'warning', "未発注"
+    if not receipt_ok or document_status == '未完了':
+        # 書類不備 or 書類未完了 → 黄背景
+        if document_status == '未完了':
+            return 'warning', "⚠️ 書類未完了"
+        return 'warning', "⚠️ 書類不備"
+    # すべてOK → 緑背景
+    return 'completed', "✅ 完了"
+
+
+ROW_COLORS = {
+    'critical': CRITICAL_COLOR,
+    'warning': WARNING_COLOR,
+    'completed': COMPLETED_COLOR,
+}
+
+COLUMNS = [
+    Column("番組名", lambda item: item['program_name']),
+    Column("費用項目", lambda item: item['item_name']),
+    Column("取引先", lambda item: item['partner_name']),
+    Column("年月", lambda item: item['year_month']),
+    Column("予定金額", lambda item: f"{int(item['scheduled_amount']):,}円" if item['scheduled_amount'] else "-"),
+    Column("実績金額", lambda item: f"{int(item['actual_amount']):,}円" if item['actual_amount'] else "-"),
+    # 状態列（問題の内容を表示）
+    Column("状態", lambda item: _row_status(item)[1], alignment=Qt.AlignCenter),
+]
 
 
 class PaymentOrderCheckTab(QWidget):
@@ -22,6 +69,7 @@ class PaymentOrderCheckTab(QWidget):
         super().__init__()
         self.db = DatabaseManager()
         self.check_data = []  # チェック結果データを保持
+        self.store = FilterStore([])
         self.init_ui()
 
         # 現在の月をデフォルトで設定
@@ -137,11 +185,15 @@ class PaymentOrderCheckTab(QWidget):
         layout.addWidget(dashboard_group)
 
         # === 中央: テーブル ===
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "番組名", "費用項目", "取引先", "年月", "予定金額", "実績金額", "状態"
-        ])
+        # 行は読み込み時に1回だけモデルに設定し、フィルタ変更はプロキシで表示行を切り替える
+        self.model = RecordTableModel(
+            COLUMNS, background=lambda item: ROW_COLORS[_row_status(item)[0]]
+        )
+        self.proxy = MaskFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
 
         # カラム幅の設定
         header = self.table.horizontalHeader()
@@ -153,8 +205,8 @@ class PaymentOrderCheckTab(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # 実績金額
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)  # 状態
 
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)  # 編集不可
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)  # 編集不可
 
         layout.addWidget(self.table)
 
@@ -192,125 +244,44 @@ class PaymentOrderCheckTab(QWidget):
             return
 
         self.check_data = self.db.check_payments_against_schedule(target_month)
+        self.store = FilterStore(
+            self.check_data,
+            search_fields=('partner_name', 'item_name'),
+            flags={
+                'green': lambda item: item['status_color'] == "green",
+                'critical': lambda item: _row_status(item)[0] == 'critical',
+                'warning': lambda item: _row_status(item)[0] == 'warning',
+            },
+        )
+        self.model.set_rows(self.store.rows)
         self.apply_filter()
         self.update_statistics()
 
     def apply_filter(self):
-        """フィルタを適用してテーブルを更新"""
-        filter_type = None
+        """フィルタを適用してテーブルを更新（表示する行を切り替えるだけで行は作り直さない）"""
+        include, exclude = (), ()
         if self.rb_problem.isChecked():
-            filter_type = "problem"
+            exclude = ('green',)
         elif self.rb_completed.isChecked():
-            filter_type = "completed"
-
-        search_term = self.search_input.text().lower()
-
-        # フィルタリング
-        filtered_data = []
-        for item in self.check_data:
-            # フィルタタイプチェック
-            if filter_type == "problem" and item['status_color'] == "green":
-                continue
-            if filter_type == "completed" and item['status_color'] != "green":
-                continue
-
-            # 検索キーワードチェック
-            if search_term:
-                if (search_term not in item['partner_name'].lower() and
-                    search_term not in item['item_name'].lower()):
-                    continue
-
-            filtered_data.append(item)
-
-        # テーブル更新
-        self.populate_table(filtered_data)
-
-    def populate_table(self, data):
-        """テーブルにデータを表示（Phase 3: 行全体の色分け強化）"""
-        self.table.setRowCount(len(data))
-
-        # 統計カウンター
-        critical_count = 0  # 🚨 支払未完了
-        warning_count = 0   # ⚠️ 書類不備
-        completed_count = 0 # ✅ 完了
-
-        for row, item in enumerate(data):
-            has_order = item['has_order']
-            receipt_ok = item['receipt_status'] == "✓"
-            payment_ok = item['payment_status'] == "✓"
-
-            # Phase 3.1: 行全体の背景色を決定
-            document_status = item.get('document_status', '未完了')
-
-            if not payment_ok:
-                # 支払未完了 → 赤背景（最優先）
-                row_color = QColor(255, 220, 220)  # 🔴 赤
-                critical_count += 1
-                status_text = "🚨 支払未"
-            elif not has_order:
-                # 発注なし → 黄背景
-                row_color = QColor(255, 255, 200)  # 🟡 黄
-                warning_count += 1
-                status_text = "未発注"
-            elif not receipt_ok or document_status == '未完了':
-                # 書類不備 or 書類未完了 → 黄背景
-                row_color = QColor(255, 255, 200)  # 🟡 黄
-                warning_count += 1
-                if document_status == '未完了':
-                    status_text = "⚠️ 書類未完了"
-                else:
-                    status_text = "⚠️ 書類不備"
-            else:
-                # すべてOK → 緑背景
-                row_color = QColor(220, 255, 220)  # 🟢 緑
-                completed_count += 1
-                status_text = "✅ 完了"
-
-            # 番組名
-            program_widget = QTableWidgetItem(item['program_name'])
-            program_widget.setBackground(row_color)
-            self.table.setItem(row, 0, program_widget)
-
-            # 費用項目
-            item_widget = QTableWidgetItem(item['item_name'])
-            item_widget.setBackground(row_color)
-            self.table.setItem(row, 1, item_widget)
-
-            # 取引先
-            partner_widget = QTableWidgetItem(item['partner_name'])
-            partner_widget.setBackground(row_color)
-            self.table.setItem(row, 2, partner_widget)
-
-            # 年月
-            month_widget = QTableWidgetItem(item['year_month'])
-            month_widget.setBackground(row_color)
-            self.table.setItem(row, 3, month_widget)
-
-            # 予定金額
-            scheduled_amount = f"{int(item['scheduled_amount']):,}円" if item['scheduled_amount'] else "-"
-            scheduled_widget = QTableWidgetItem(scheduled_amount)
-            scheduled_widget.setBackground(row_color)
-            self.table.setItem(row, 4, scheduled_widget)
-
-            # 実績金額
-            actual_amount = f"{int(item['actual_amount']):,}円" if item['actual_amount'] else "-"
-            actual_widget = QTableWidgetItem(actual_amount)
-            actual_widget.setBackground(row_color)
-            self.table.setItem(row, 5, actual_widget)
-
-            # 状態列（問題の内容を表示）
-            status_item = QTableWidgetItem(status_text)
-            status_item.setTextAlignment(Qt.AlignCenter)
-            status_item.setBackground(row_color)
-            self.table.setItem(row, 6, status_item)
-
-        # Phase 3.3: ダッシュボードを更新
-        self._update_payment_dashboard(critical_count, warning_count, completed_count, len(data))
+            include = ('green',)
+
+        mask = self.store.select(include, exclude, self.search_input.text())
+        self.proxy.set_mask(mask)
+
+        # Phase 3.3: 表示中の行でダッシュボードを更新
+        critical = mask & self.store.flag('critical')
+        warning = mask & self.store.flag('warning')
+        self._update_payment_dashboard(
+            self.store.count(critical),
+            self.store.count(warning),
+            self.store.count(mask & ~critical & ~warning),
+            self.store.count(mask),
+        )
 
     def update_statistics(self):
         """統計情報を更新"""
-        total = len(self.check_data)
-        completed = sum(1 for item in self.check_data if item['status_color'] == "green")
+        total = len(self.store)
+        completed = self.store.count(self.store.flag('green'))
         problem = total - completed
 
         self.stats_label.setText(
@@ -20,7 +20,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QDate, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QColor, QFont, QBrush
-from utils import format_amount, log_message
+from datetime import datetime
+from utils import format_amount, format_payee_code, log_message
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
+from ui.change_listener import LazyRefresher
 
 
 class PaymentTab(QWidget):
@@ -53,6 +57,9 @@ class PaymentTab(QWidget):
         # レイアウト設定
         self.setup_ui()
 
+        # 他のタブでの変更は、次に表示されたときに反映
+        self.refresher = LazyRefresher(self, ['payments'], self.refresh_data, hidden_only=True)
+
     def setup_ui(self):
         # メインレイアウト
         main_layout = QVBoxLayout(self)
@@ -439,8 +446,6 @@ class PaymentTab(QWidget):
             )
 
             # 最終更新時刻の更新
-            from datetime import datetime
-
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.app.last_update_label.setText(f"最終更新: {current_time}")
 
@@ -738,44 +743,31 @@ class PaymentTab(QWidget):
 
     # ===== メニューバー/ツールバー用の共通アクション =====
     def export_csv(self):
-        """CSV出力（メニュー/ツールバー用）"""
-        try:
-            # 現在表示されているデータをCSVで出力
-            from PyQt5.QtWidgets import QFileDialog
-            import csv
-            from datetime import datetime
-            
-            # ファイル保存ダイアログ
-            filename, _ = QFileDialog.getSaveFileName(
-                self,
-                "支払いデータをCSVで保存",
-                f"payment_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "CSV files (*.csv)"
-            )
-            
-            if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # ヘッダーを書き込み
-                    headers = []
-                    for col in range(self.payment_tree.columnCount()):
-                        headers.append(self.payment_tree.headerItem().text(col))
-                    writer.writerow(headers)
-                    
-                    # データを書き込み
-                    for i in range(self.payment_tree.topLevelItemCount()):
-                        item = self.payment_tree.topLevelItem(i)
-                        row_data = []
-                        for col in range(self.payment_tree.columnCount()):
-                            row_data.append(item.text(col))
-                        writer.writerow(row_data)
-                
-                QMessageBox.information(self, "完了", f"支払いデータを保存しました:\n{filename}")
-                
-        except Exception as e:
-            log_message(f"CSV出力エラー: {e}")
-            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました: {e}")
+        """CSV出力（メニュー/ツールバー用）
+
+        検索条件に一致する支払いデータをDBから直接、バックグラウンドで出力します。
+        """
+        search_term = self.search_entry.text().strip() or None
+        query, params = self.db_manager.build_payment_data_query(search_term)
+
+        job = CSVExportJob.from_query(
+            self.db_manager.billing_db, query, params,
+            headers=["件名", "費用項目", "支払い先", "コード", "金額", "支払日", "状態"],
+            row_mapper=lambda row: [
+                row[1] or "",  # 件名
+                row[2] or "",  # 費用項目
+                row[3] or "",  # 支払い先
+                format_payee_code(row[4]) if row[4] else "",  # 支払い先コード
+                format_amount(row[5]),  # 金額（整形）
+                row[6] or "",  # 支払日
+                row[7] or "",  # 状態
+            ],
+        )
+        run_csv_export(
+            self, job, "支払いデータをCSVで保存",
+            f"payment_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            label="支払いデータ",
+        )
     
     def create_new_entry(self):
         """新規エントリ作成（メニュー/ツールバー用）"""
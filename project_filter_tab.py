@@ -23,6 +23,8 @@ from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from PyQt5.QtGui import QColor, QFont, QBrush
 from order_management.ui.custom_date_edit import ImprovedDateEdit
 from utils import format_amount, log_message
+from csv_exporter import CSVExportJob
+from ui.csv_export import run_csv_export
 
 
 class ProjectFilterTab(QWidget):
@@ -375,6 +377,7 @@ class ProjectFilterTab(QWidget):
             
             # オプションの内容をログ出力
             log_message(f"取得したオプション: {list(options.keys())}")
+            facet_counts = options.get('facet_counts', {})
             
             # 支払い月フィルターの更新
             self.payment_month_filter.clear()
@@ -396,7 +399,8 @@ class ProjectFilterTab(QWidget):
                     self.payment_month_filter.setEnabled(True)
                     for month in payment_months:
                         if month:  # Noneや空文字を除外
-                            self.payment_month_filter.addItem(month)
+                            self.add_facet_item(self.payment_month_filter, month,
+                                                facet_counts.get('payment_month'))
                     
                     log_message(f"支払い月フィルターに{len(payment_months)}件の選択肢を追加")
                     self.status_info_label.setText("準備完了")
@@ -415,7 +419,8 @@ class ProjectFilterTab(QWidget):
                 
                 for status in project_statuses:
                     if status:
-                        self.project_status_filter.addItem(status)
+                        self.add_facet_item(self.project_status_filter, status,
+                                            facet_counts.get('project_status'))
                         
                 log_message(f"案件状況フィルターに{len(project_statuses)}件の選択肢を追加")
             
@@ -429,7 +434,8 @@ class ProjectFilterTab(QWidget):
                 
                 for status in payment_statuses:
                     if status:
-                        self.payment_status_filter.addItem(status)
+                        self.add_facet_item(self.payment_status_filter, status,
+                                            facet_counts.get('status'))
                         
                 log_message(f"支払い状態フィルターに{len(payment_statuses)}件の選択肢を追加")
 
@@ -440,6 +446,12 @@ class ProjectFilterTab(QWidget):
             # エラー時のフォールバック
             self.load_payment_months_fallback()
     
+    def add_facet_item(self, combo, value, counts=None):
+        """絞込みの選択肢を追加（支払い件数をツールチップに表示）"""
+        combo.addItem(value)
+        if counts and value in counts:
+            combo.setItemData(combo.count() - 1, f"支払い {counts[value]}件", Qt.ToolTipRole)
+
     def load_payment_months_fallback(self):
         """フォールバック: 直接データベースから支払い月を取得"""
         try:
@@ -870,59 +882,54 @@ class ProjectFilterTab(QWidget):
 
     # ===== メニューバー/ツールバー用の共通アクション =====
     def export_csv(self):
-        """CSV出力（メニュー/ツールバー用）"""
-        try:
-            # 現在表示されているデータをCSVで出力
-            from PyQt5.QtWidgets import QFileDialog
-            import csv
-            from datetime import datetime
-            
-            # 案件データまたは支払いデータを出力
-            active_tree = None
-            filename_prefix = "project_filter"
-            
-            if hasattr(self, 'project_tree') and self.project_tree.topLevelItemCount() > 0:
-                active_tree = self.project_tree
-                filename_prefix = "projects"
-            elif hasattr(self, 'payment_tree') and self.payment_tree.topLevelItemCount() > 0:
-                active_tree = self.payment_tree
-                filename_prefix = "filtered_payments"
-            
-            if not active_tree:
-                QMessageBox.information(self, "CSV出力", "出力するデータがありません。")
-                return
-            
-            # ファイル保存ダイアログ
-            filename, _ = QFileDialog.getSaveFileName(
-                self,
-                "データをCSVで保存",
-                f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "CSV files (*.csv)"
+        """CSV出力（メニュー/ツールバー用）
+
+        案件一覧（絞込み条件）または選択案件の支払い一覧を、
+        DBから直接バックグラウンドで出力します。
+        """
+        from datetime import datetime
+
+        if self.project_tree.topLevelItemCount() > 0:
+            query, params = self.db_manager.build_project_filter_query(self.current_filters)
+            filename_prefix = "projects"
+            job = CSVExportJob.from_query(
+                self.db_manager.billing_db, query, params,
+                headers=["案件名", "クライアント", "部門", "状況", "予算", "支払件数"],
+                row_mapper=lambda row: [
+                    row[0] or "未設定",  # 案件名
+                    row[1] or "未設定",  # クライアント
+                    row[2] or "未設定",  # 部門
+                    row[3] or "進行中",  # 状況
+                    format_amount(row[6] or 0),  # 予算
+                    f"{row[7] or 0}件",  # 支払件数
+                ],
             )
-            
-            if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # ヘッダーを書き込み
-                    headers = []
-                    for col in range(active_tree.columnCount()):
-                        headers.append(active_tree.headerItem().text(col))
-                    writer.writerow(headers)
-                    
-                    # データを書き込み
-                    for i in range(active_tree.topLevelItemCount()):
-                        item = active_tree.topLevelItem(i)
-                        row_data = []
-                        for col in range(active_tree.columnCount()):
-                            row_data.append(item.text(col))
-                        writer.writerow(row_data)
-                
-                QMessageBox.information(self, "完了", f"データを保存しました:\n{filename}")
-                
-        except Exception as e:
-            log_message(f"CSV出力エラー: {e}")
-            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました: {e}")
+        elif self.current_project:
+            query, params = self.db_manager.build_payments_by_project_query(
+                self.current_project, self.current_filters.get('payment_month')
+            )
+            filename_prefix = "filtered_payments"
+            job = CSVExportJob.from_query(
+                self.db_manager.billing_db, query, params,
+                headers=["支払先", "件名", "金額", "支払期限", "状態", "緊急度"],
+                row_mapper=lambda row: [
+                    row[3] or "",  # 支払先
+                    row[1] or "",  # 件名
+                    format_amount(row[5] or 0),  # 金額
+                    row[6] or "",  # 支払期限
+                    row[7] or "未処理",  # 状態
+                    row[8] or "通常",  # 緊急度
+                ],
+            )
+        else:
+            QMessageBox.information(self, "CSV出力", "出力するデータがありません。")
+            return
+
+        run_csv_export(
+            self, job, "データをCSVで保存",
+            f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            label="データ",
+        )
     
     def create_new_entry(self):
         """新規エントリ作成（メニュー/ツールバー用）"""
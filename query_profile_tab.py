@@ -0,0 +1,125 @@
+"""クエリプロファイルタブ
+
+クエリプロファイラー（BILLING_QUERY_PROFILE=1）有効時に、
+メソッド別・SQL文別の実行時間集計を表示します。
+"""
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QTableWidget, QTableWidgetItem, QLabel,
+                             QHeaderView, QMessageBox, QComboBox)
+from PyQt5.QtCore import Qt
+
+import query_profiler
+
+
+class QueryProfileTab(QWidget):
+    """クエリプロファイルタブ"""
+
+    def __init__(self):
+        super().__init__()
+        self.profiler = query_profiler.get_profiler()
+        self.init_ui()
+        self.load_data()
+
+    def init_ui(self):
+        """UIの初期化"""
+        layout = QVBoxLayout()
+
+        # === 上部: 操作エリア ===
+        control_layout = QHBoxLayout()
+
+        control_layout.addWidget(QLabel("表示:"))
+        self.view_combo = QComboBox()
+        self.view_combo.addItem("メソッド別", "methods")
+        self.view_combo.addItem("SQL文別", "statements")
+        self.view_combo.currentIndexChanged.connect(self.load_data)
+        control_layout.addWidget(self.view_combo)
+
+        control_layout.addStretch()
+
+        refresh_btn = QPushButton("🔄 更新")
+        refresh_btn.clicked.connect(self.load_data)
+        control_layout.addWidget(refresh_btn)
+
+        dump_btn = QPushButton("💾 ダンプ出力")
+        dump_btn.clicked.connect(self.dump_profile)
+        control_layout.addWidget(dump_btn)
+
+        reset_btn = QPushButton("リセット")
+        reset_btn.clicked.connect(self.reset_profile)
+        control_layout.addWidget(reset_btn)
+
+        layout.addLayout(control_layout)
+
+        # === 中央: テーブル ===
+        self.table = QTableWidget()
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        # === 下部: 統計情報 ===
+        self.stats_label = QLabel("")
+        layout.addWidget(self.stats_label)
+
+        self.setLayout(layout)
+
+    def load_data(self):
+        """集計結果をテーブルに表示"""
+        self.table.setSortingEnabled(False)
+
+        if self.view_combo.currentData() == "statements":
+            headers = ["呼び出し元", "合計(ms)", "回数", "平均(ms)", "最大(ms)", "行数", "SQL"]
+            rows = [
+                (s['caller'], s['total_ms'], s['count'], s['avg_ms'],
+                 s['max_ms'], s['rows'], s['sql'])
+                for s in self.profiler.get_statement_stats()
+            ]
+        else:
+            headers = ["メソッド", "合計(ms)", "SQL回数", "SQL種類", "行数", "接続数", "接続(ms)"]
+            rows = [
+                (m['caller'], m['total_ms'], m['count'], m['statements'],
+                 m['rows'], m['connections'], m['connect_ms'])
+                for m in self.profiler.get_method_stats()
+            ]
+
+        self.table.clear()
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(len(rows))
+
+        for row_index, row in enumerate(rows):
+            for col_index, value in enumerate(row):
+                item = QTableWidgetItem()
+                if isinstance(value, float):
+                    item.setData(Qt.DisplayRole, round(value, 2))
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                elif isinstance(value, int):
+                    item.setData(Qt.DisplayRole, value)
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                else:
+                    item.setText(str(value))
+                self.table.setItem(row_index, col_index, item)
+
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(len(headers) - 1, QHeaderView.Stretch)
+        self.table.setSortingEnabled(True)
+
+        self.stats_label.setText(
+            f"計測開始: {self.profiler.started_at.strftime('%Y-%m-%d %H:%M:%S')} | "
+            f"スロークエリ: {self.profiler.slow_count}件"
+            f"（閾値 {self.profiler.slow_query_ms:.0f}ms）"
+        )
+
+    def dump_profile(self):
+        """集計結果をJSONに出力"""
+        path = self.profiler.dump()
+        if path:
+            QMessageBox.information(self, "ダンプ出力", f"クエリプロファイルを出力しました:\n{path}")
+        else:
+            QMessageBox.information(self, "ダンプ出力", "記録されたクエリがありません")
+
+    def reset_profile(self):
+        """集計結果をリセット"""
+        self.profiler.reset()
+        self.load_data()
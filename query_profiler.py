@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""SQLクエリプロファイラー
+
+DatabaseManager / OrderManagementDB が発行するSQLを計測するための
+オプトイン計測レイヤーです。環境変数で有効化した場合のみ動作し、
+無効時は sqlite3.connect() をそのまま呼び出します。
+
+使用方法:
+    # 有効化（閾値はミリ秒、省略時は100ms）
+    BILLING_QUERY_PROFILE=1 BILLING_SLOW_QUERY_MS=50 python app.py
+
+    # 終了時に logs/query_profile_*.json へ集計結果が書き出されます
+    python query_profiler.py --dump            # 最新のダンプを表示
+    python query_profiler.py --dump FILE.json  # 指定ファイルを表示
+
+記録内容:
+    - 呼び出し元メソッド（例: OrderManagementDB.get_expense_items_with_details）
+    - SQL文ごとの実行時間（execute + fetch）、取得行数
+    - 接続オープンにかかった時間
+    - 実行時間のヒストグラム
+    - 閾値を超えたSQLは EXPLAIN QUERY PLAN 付きでスロークエリログへ出力
+"""
+import atexit
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from utils import log_message
+
+# 有効化フラグ・閾値の環境変数
+PROFILE_ENV_VAR = "BILLING_QUERY_PROFILE"
+SLOW_QUERY_ENV_VAR = "BILLING_SLOW_QUERY_MS"
+DEFAULT_SLOW_QUERY_MS = 100.0
+
+# ログ出力先（utils.log_message と同じ logs/ を使用）
+LOG_DIR = "logs"
+
+# ヒストグラムのバケット上限（ミリ秒）
+HISTOGRAM_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000]
+
+# 呼び出し元として扱うモジュール
+_CALLER_MODULES = ("database.py", "database_manager.py")
+
+# 接続取得用のヘルパーメソッド（呼び出し元の特定時は読み飛ばす）
+_CONNECTION_HELPERS = ("_get_connection", "_connect")
+
+_SQL_WHITESPACE = re.compile(r"\s+")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def is_enabled():
+    """プロファイラーが有効か判定
+
+    Returns:
+        bool: 環境変数 BILLING_QUERY_PROFILE が有効値の場合True
+    """
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_slow_query_threshold_ms():
+    """スロークエリ閾値（ミリ秒）を取得"""
+    try:
+        return float(os.environ.get(SLOW_QUERY_ENV_VAR, DEFAULT_SLOW_QUERY_MS))
+    except ValueError:
+        return DEFAULT_SLOW_QUERY_MS
+
+
+def normalize_sql(sql):
+    """集計キー用にSQLを正規化
+
+    空白を1文字に詰め、IN (?, ?, ...) のプレースホルダー列を1つにまとめます。
+    """
+    normalized = _SQL_WHITESPACE.sub(" ", sql).strip()
+    return _SQL_IN_LIST.sub("(?, ...)", normalized)
+
+
+def _find_caller():
+    """SQLを発行したデータベースマネージャーのメソッド名を特定"""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename != "query_profiler.py":
+            if filename in _CALLER_MODULES and frame.f_code.co_name not in _CONNECTION_HELPERS:
+                owner = frame.f_locals.get("self")
+                if owner is not None:
+                    return f"{type(owner).__name__}.{frame.f_code.co_name}"
+                return f"{filename}:{frame.f_code.co_name}"
+            if fallback is None:
+                fallback = f"{filename}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class QueryProfiler:
+    """クエリ統計の集計とスロークエリログ出力を担当"""
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_ms = (
+            slow_query_ms if slow_query_ms is not None else get_slow_query_threshold_ms()
+        )
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """集計結果をクリア"""
+        with self._lock:
+            self.started_at = datetime.now()
+            self.statements = {}   # (caller, sql) -> 集計
+            self.connections = {}  # caller -> 接続オープン集計
+            self.slow_count = 0
+
+    def record_connection(self, caller, database, elapsed_ms):
+        """接続オープン時間を記録"""
+        with self._lock:
+            stat = self.connections.setdefault(caller, {
+                'caller': caller,
+                'databases': set(),
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+            })
+            stat['databases'].add(os.path.basename(str(database)))
+            stat['count'] += 1
+            stat['total_ms'] += elapsed_ms
+            stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+
+    def record_statement(self, caller, sql, elapsed_ms, rows):
+        """SQL実行結果を記録
+
+        Returns:
+            bool: スロークエリ閾値を超えた場合True
+        """
+        key = (caller, normalize_sql(sql))
+        with self._lock:
+            stat = self.statements.get(key)
+            if stat is None:
+                stat = {
+                    'caller': caller,
+                    'sql': key[1],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'rows': 0,
+                    'histogram': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+                }
+                self.statements[key] = stat
+
+            stat['count'] += 1
+            stat['total_ms'] += elapsed_ms
+            stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+            stat['rows'] += rows
+
+            bucket = len(HISTOGRAM_BUCKETS_MS)
+            for index, upper in enumerate(HISTOGRAM_BUCKETS_MS):
+                if elapsed_ms <= upper:
+                    bucket = index
+                    break
+            stat['histogram'][bucket] += 1
+
+            is_slow = elapsed_ms >= self.slow_query_ms
+            if is_slow:
+                self.slow_count += 1
+            return is_slow
+
+    def write_slow_query(self, caller, sql, params, elapsed_ms, rows, plan):
+        """スロークエリログに1件書き込み"""
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            log_file = os.path.join(
+                LOG_DIR, f"slow_queries_{datetime.now().strftime('%Y%m%d')}.log"
+            )
+            param_text = repr(params)
+            if len(param_text) > 300:
+                param_text = param_text[:300] + "..."
+
+            lines = [
+                f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] "
+                f"{elapsed_ms:.1f}ms rows={rows} caller={caller}",
+                f"  SQL: {normalize_sql(sql)}",
+                f"  params: {param_text}",
+            ]
+            if plan:
+                lines.append("  QUERY PLAN:")
+                lines.extend(f"    {detail}" for detail in plan)
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n\n")
+        except Exception as e:
+            print(f"スロークエリログ書き込みエラー: {e}")
+
+    def get_statement_stats(self, sort_by="total_ms"):
+        """SQL文ごとの集計を取得
+
+        Args:
+            sort_by: ソートキー（total_ms, count, max_ms, rows）
+
+        Returns:
+            list: 集計dictのリスト（avg_ms を含む、降順）
+        """
+        with self._lock:
+            stats = []
+            for stat in self.statements.values():
+                item = dict(stat)
+                item['histogram'] = list(stat['histogram'])
+                item['avg_ms'] = stat['total_ms'] / stat['count'] if stat['count'] else 0.0
+                stats.append(item)
+        stats.sort(key=lambda s: s.get(sort_by, 0), reverse=True)
+        return stats
+
+    def get_method_stats(self):
+        """呼び出し元メソッドごとの集計を取得
+
+        Returns:
+            list: [{'caller', 'statements', 'count', 'total_ms', 'rows',
+                    'connections', 'connect_ms'}, ...]（total_ms降順）
+        """
+        methods = {}
+        for stat in self.get_statement_stats():
+            method = methods.setdefault(stat['caller'], {
+                'caller': stat['caller'],
+                'statements': 0,
+                'count': 0,
+                'total_ms': 0.0,
+                'rows': 0,
+                'connections': 0,
+                'connect_ms': 0.0,
+            })
+            method['statements'] += 1
+            method['count'] += stat['count']
+            method['total_ms'] += stat['total_ms']
+            method['rows'] += stat['rows']
+
+        with self._lock:
+            for caller, conn_stat in self.connections.items():
+                method = methods.setdefault(caller, {
+                    'caller': caller,
+                    'statements': 0,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'rows': 0,
+                    'connections': 0,
+                    'connect_ms': 0.0,
+                })
+                method['connections'] = conn_stat['count']
+                method['connect_ms'] = conn_stat['total_ms']
+
+        return sorted(
+            methods.values(),
+            key=lambda m: m['total_ms'] + m['connect_ms'],
+            reverse=True,
+        )
+
+    def to_dict(self):
+        """JSONシリアライズ可能な形式で集計結果を返す"""
+        with self._lock:
+            connections = [
+                {**stat, 'databases': sorted(stat['databases'])}
+                for stat in self.connections.values()
+            ]
+        return {
+            'started_at': self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'dumped_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'slow_query_ms': self.slow_query_ms,
+            'slow_count': self.slow_count,
+            'histogram_buckets_ms': HISTOGRAM_BUCKETS_MS,
+            'methods': self.get_method_stats(),
+            'statements': self.get_statement_stats(),
+            'connections': connections,
+        }
+
+    def dump(self, path=None):
+        """集計結果をJSONファイルに書き出し
+
+        Args:
+            path: 出力先。Noneの場合は logs/query_profile_YYYYMMDD_HHMMSS.json
+
+        Returns:
+            str: 書き出したファイルパス（記録がない場合はNone）
+        """
+        if not self.statements and not self.connections:
+            return None
+
+        if path is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            path = os.path.join(
+                LOG_DIR, f"query_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """実行時間と取得行数を計測するカーソル
+
+    SELECTはfetchが終わるまでを1回の実行として計測し、
+    それ以外の文は execute 直後に記録します。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None
+
+    def _begin(self, sql, params, caller):
+        self._finish()
+        self._pending = {
+            'sql': sql,
+            'params': params,
+            'caller': caller,
+            'elapsed_ms': 0.0,
+            'rows': 0,
+        }
+        pending_cursors = getattr(self.connection, '_pending_cursors', None)
+        if pending_cursors is not None:
+            pending_cursors.add(self)
+
+    def _add(self, started, rows=0):
+        if self._pending is not None:
+            self._pending['elapsed_ms'] += (time.perf_counter() - started) * 1000
+            self._pending['rows'] += rows
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        pending_cursors = getattr(self.connection, '_pending_cursors', None)
+        if pending_cursors is not None:
+            pending_cursors.discard(self)
+        profiler = get_profiler()
+        is_slow = profiler.record_statement(
+            pending['caller'], pending['sql'], pending['elapsed_ms'], pending['rows']
+        )
+        if is_slow:
+            plan = _explain_query_plan(self.connection, pending['sql'], pending['params'])
+            profiler.write_slow_query(
+                pending['caller'], pending['sql'], pending['params'],
+                pending['elapsed_ms'], pending['rows'], plan
+            )
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters, _find_caller())
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._add(started)
+            if self.description is None:
+                if self._pending is not None and self.rowcount > 0:
+                    self._pending['rows'] = self.rowcount
+                self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, (), _find_caller())
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._add(started, max(self.rowcount, 0))
+            self._finish()
+        return self
+
+    def executescript(self, sql_script):
+        self._begin(sql_script, (), _find_caller())
+        started = time.perf_counter()
+        try:
+            super().executescript(sql_script)
+        finally:
+            self._add(started)
+            self._finish()
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(started, 1 if row is not None else 0)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(started, len(rows))
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(started, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(started)
+            self._finish()
+            raise
+        self._add(started, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """ProfilingCursor を返す接続クラス
+
+    記録が終わっていない（fetch途中の）カーソルだけを保持し、
+    commit / close 時に記録します。記録済みのカーソルは保持しません。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_cursors = set()
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        self._finish_cursors()
+        super().commit()
+
+    def close(self):
+        self._finish_cursors()
+        super().close()
+
+    def _finish_cursors(self):
+        for cursor in list(self._pending_cursors):
+            cursor._finish()
+
+
+def _explain_query_plan(conn, sql, params):
+    """EXPLAIN QUERY PLAN の結果を取得（取得できない文は空リスト）"""
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if head not in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE"):
+        return []
+    try:
+        plan_cursor = sqlite3.Connection.cursor(conn)
+        plan_cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+        plan = [str(row[-1]) for row in plan_cursor.fetchall()]
+        plan_cursor.close()
+        return plan
+    except sqlite3.Error as e:
+        return [f"(EXPLAIN失敗: {e})"]
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """プロセス共通のプロファイラーを取得（初回呼び出し時に生成）"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = QueryProfiler()
+                atexit.register(_dump_at_exit)
+                log_message(
+                    f"クエリプロファイラー有効（スロークエリ閾値: {_profiler.slow_query_ms:.0f}ms）"
+                )
+    return _profiler
+
+
+def _dump_at_exit():
+    try:
+        path = _profiler.dump() if _profiler is not None else None
+        if path:
+            print(f"クエリプロファイルを出力しました: {path}")
+    except Exception as e:
+        print(f"クエリプロファイル出力エラー: {e}")
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect() の代替
+
+    プロファイラー有効時は計測付きの接続を返し、接続オープン時間も記録します。
+    無効時は sqlite3.connect() と同一です。
+    """
+    if not is_enabled():
+        return sqlite3.connect(database, **kwargs)
+
+    caller = _find_caller()
+    started = time.perf_counter()
+    kwargs.setdefault("factory", ProfilingConnection)
+    conn = sqlite3.connect(database, **kwargs)
+    get_profiler().record_connection(caller, database, (time.perf_counter() - started) * 1000)
+    return conn
+
+
+def format_report(data, limit=20):
+    """集計結果（to_dict形式）をテキストレポートに整形"""
+    lines = [
+        f"計測期間: {data['started_at']} 〜 {data['dumped_at']}",
+        f"スロークエリ: {data['slow_count']}件（閾値 {data['slow_query_ms']:.0f}ms）",
+        "",
+        "■ メソッド別（合計時間順）",
+        f"{'合計ms':>10} {'SQL回数':>8} {'行数':>8} {'接続数':>6} {'接続ms':>8}  メソッド",
+    ]
+    for method in data['methods'][:limit]:
+        lines.append(
+            f"{method['total_ms']:>10.1f} {method['count']:>8} {method['rows']:>8} "
+            f"{method['connections']:>6} {method['connect_ms']:>8.1f}  {method['caller']}"
+        )
+
+    bucket_labels = [f"≤{b}ms" for b in data['histogram_buckets_ms']] + ["それ以上"]
+    lines.extend(["", "■ SQL文別（合計時間順）"])
+    for stat in data['statements'][:limit]:
+        sql = stat['sql'] if len(stat['sql']) <= 120 else stat['sql'][:120] + "..."
+        histogram = ", ".join(
+            f"{label}:{count}" for label, count in zip(bucket_labels, stat['histogram']) if count
+        )
+        lines.append(
+            f"{stat['total_ms']:>10.1f}ms  {stat['count']}回  平均{stat['avg_ms']:.2f}ms  "
+            f"最大{stat['max_ms']:.1f}ms  {stat['rows']}行  {stat['caller']}"
+        )
+        lines.append(f"    {sql}")
+        lines.append(f"    [{histogram}]")
+    return "\n".join(lines)
+
+
+def find_latest_dump():
+    """logs/ 内の最新のプロファイルダンプを取得"""
+    dumps = glob.glob(os.path.join(LOG_DIR, "query_profile_*.json"))
+    if not dumps:
+        return None
+    return max(dumps, key=os.path.getmtime)
+
+
+# コマンドライン実行用
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='クエリプロファイル表示ツール')
+    parser.add_argument('--dump', nargs='?', const='', metavar='FILE',
+                        help='プロファイルダンプを表示（省略時は最新）')
+    parser.add_argument('--limit', type=int, default=20, help='表示件数')
+    args = parser.parse_args()
+
+    dump_path = args.dump or find_latest_dump()
+    if not dump_path or not os.path.exists(dump_path):
+        print(f"プロファイルダンプが見つかりません（{PROFILE_ENV_VAR}=1 で計測してください）")
+        sys.exit(1)
+
+    with open(dump_path, "r", encoding="utf-8") as f:
+        print(format_report(json.load(f), limit=args.limit))
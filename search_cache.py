@@ -0,0 +1,210 @@
+"""検索結果キャッシュ
+
+一覧画面のインクリメンタル検索で使う、検索条件 → 結果のLRUキャッシュです。
+PyQt5には依存しません（画面側のデバウンス処理は ui/search_controller.py）。
+
+- 同じ条件での再検索はキャッシュから返す
+- 入力中のキーワードが前回のキーワードを含む場合（"番組" → "番組A" 等）は、
+  前回の結果をメモリ上で絞り込み、SQLiteへの問い合わせを省略する
+- データの更新（DBファイルの変更、または invalidate()）でキャッシュを破棄する
+- 変更通知（change_events）で行IDが分かる更新・削除は、キャッシュ上の行だけを差し替える
+
+使用例:
+    cache = SearchResultCache(stamp=lambda: file_stamp("order_management.db"))
+    rows, source = cache.get(term, (), fetch=lambda term, filters: db.get_casts(term),
+                             narrow=like_filter(1, 2))
+"""
+import os
+from collections import OrderedDict
+
+from change_events import DELETE, UPDATE
+
+# キャッシュする検索条件の数
+DEFAULT_CACHE_SIZE = 16
+
+# SQLiteのLIKEと同じく、ASCII文字のみ大文字・小文字を区別しない
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# LIKEのワイルドカード（含まれる場合はメモリ上で絞り込まない）
+_LIKE_WILDCARDS = ("%", "_")
+
+
+def fold_like(value):
+    """LIKE と同じ規則で比較するための文字列変換"""
+    return str(value).translate(_ASCII_LOWER)
+
+
+def like_filter(*columns):
+    """指定した列のいずれかにキーワードを含む行に絞り込む関数を作成
+
+    `col1 LIKE %term% OR col2 LIKE %term% ...` で検索するクエリの結果
+    （行のリスト）を絞り込むためのものです。
+
+    Args:
+        columns: 検索対象の列インデックス
+
+    Returns:
+        function: narrow(rows, term) -> rows
+    """
+    def narrow(rows, term):
+        folded = fold_like(term)
+        return [row for row in rows
+                if any(row[col] is not None and folded in fold_like(row[col]) for col in columns)]
+    return narrow
+
+
+def patch_rows(rows, event, table, refetch=None, id_column=0):
+    """行IDの分かる変更イベントを結果（行のリスト）に反映
+
+    削除は該当行を除き、更新は refetch で同じ検索条件のまま該当行だけを
+    再取得して差し替えます（条件に合わなくなった行は除く）。
+    挿入や、更新で新たに条件に合うようになった行は位置が決まらないため反映できません。
+
+    Args:
+        rows: 検索結果
+        event: change_events.ChangeEvent
+        table: 検索結果の行IDが属するテーブル名（他のテーブルの変更は反映できない）
+        refetch: refetch(ids) で該当行を同じ検索条件で取得する関数
+        id_column: 行IDの列インデックス
+
+    Returns:
+        list: 反映後の結果（反映できない場合はNone）
+    """
+    if event.table != table or not event.ids or event.kind not in (UPDATE, DELETE):
+        return None
+
+    ids = set(event.ids)
+    if event.kind == DELETE:
+        return [row for row in rows if row[id_column] not in ids]
+
+    if refetch is None:
+        return None
+
+    updated = {row[id_column]: row for row in refetch(ids)}
+    current_ids = {row[id_column] for row in rows}
+    if not set(updated) <= current_ids:
+        return None
+
+    return [updated.get(row[id_column]) if row[id_column] in ids else row
+            for row in rows
+            if row[id_column] not in ids or row[id_column] in updated]
+
+
+def file_stamp(*paths):
+    """DBファイル（とWALファイル）のサイズ・更新日時
+
+    キャッシュの有効判定に使います。DBへの書き込みがあると値が変わります。
+    """
+    stamp = []
+    for path in paths:
+        for target in (path, path + "-wal"):
+            try:
+                stat = os.stat(target)
+                stamp.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stamp.append(None)
+    return tuple(stamp)
+
+
+class SearchResultCache:
+    """検索条件 → 結果のLRUキャッシュ"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, stamp=None):
+        """
+        Args:
+            max_entries: キャッシュする検索条件の数
+            stamp: データの状態を返す関数（値が変わるとキャッシュを破棄）
+        """
+        self.max_entries = max_entries
+        self.stamp = stamp
+        self._entries = OrderedDict()  # (filters, term) -> 結果
+        self._stamp_value = None
+
+    def invalidate(self):
+        """キャッシュを破棄"""
+        self._entries.clear()
+        self._stamp_value = None
+
+    def sync_stamp(self):
+        """現在のデータの状態を記録（変更通知をキャッシュに反映した後に呼ぶ）"""
+        if self.stamp is not None:
+            self._stamp_value = self.stamp()
+
+    def peek(self, term, filters):
+        """キャッシュ済みの結果（なければNone）"""
+        return self._entries.get((filters, term or ""))
+
+    def apply_change(self, event, patch, keys=None):
+        """変更イベントをキャッシュに反映
+
+        Args:
+            event: change_events.ChangeEvent
+            patch: patch(結果, event, term, filters) で反映後の結果を返す関数
+                   （Noneを返したエントリは破棄）
+            keys: 反映する (filters, term) のリスト（Noneの場合は全エントリ。それ以外は破棄）
+        """
+        for key in list(self._entries):
+            filters, term = key
+            patched = None
+            if keys is None or key in keys:
+                patched = patch(self._entries[key], event, term, filters)
+            if patched is None:
+                del self._entries[key]
+            else:
+                self._entries[key] = patched
+
+    def get(self, term, filters, fetch, narrow=None):
+        """検索結果を取得
+
+        Args:
+            term: 検索キーワード
+            filters: キーワード以外の検索条件（ハッシュ可能な値）
+            fetch: fetch(term, filters) でDBから結果を取得する関数
+            narrow: narrow(結果, term) で結果を絞り込む関数（Noneの場合は絞り込まない）
+
+        Returns:
+            tuple: (結果, 取得元)。取得元は 'cache' / 'narrowed' / 'fetched'
+        """
+        term = term or ""
+        self._check_stamp()
+
+        key = (filters, term)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key], 'cache'
+
+        base = self._find_narrowing_base(term, filters) if narrow else None
+        if base is not None:
+            result = narrow(self._entries[base], term)
+            self._entries.move_to_end(base)
+            source = 'narrowed'
+        else:
+            result = fetch(term, filters)
+            source = 'fetched'
+
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result, source
+
+    def _check_stamp(self):
+        if self.stamp is None:
+            return
+        value = self.stamp()
+        if value != self._stamp_value:
+            self._entries.clear()
+            self._stamp_value = value
+
+    def _find_narrowing_base(self, term, filters):
+        """絞り込みの元にできるキャッシュ（最も長いキーワードのもの）を探す"""
+        if any(wildcard in term for wildcard in _LIKE_WILDCARDS):
+            return None
+
+        folded = fold_like(term)
+        best = None
+        for cached_filters, cached_term in self._entries:
+            if cached_filters != filters or fold_like(cached_term) not in folded:
+                continue
+            if best is None or len(cached_term) > len(best[1]):
+                best = (cached_filters, cached_term)
+        return best
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""ベンチマーク用の合成データ生成
+
+乱数シードを固定して、番組・取引先・契約・費用項目と
+AccountingApprovalList 形式の支払いCSVを任意の規模で生成します。
+同じシード・同じ規模であれば常に同じデータになります。
+
+使用方法:
+    python synthetic_data.py WORKDIR --productions 200 --partners 300 \
+        --contracts 1000 --expense-items 20000 --payment-rows 10000,100000
+
+生成物（WORKDIR内）:
+    order_management.db   テンプレート（リポジトリの order_management.db）の
+                          スキーマを複製し、合成データを投入したもの
+    billing.db 他         DatabaseManager.init_db() で初期化したもの
+    AccountingApprovalList_synthetic_<行数>.csv
+"""
+import csv
+import glob
+import os
+import random
+import sqlite3
+import sys
+from datetime import date
+
+from config import AppConfig
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_ORDER_DB = os.path.join(REPO_DIR, "order_management.db")
+
+DEFAULT_SEED = 20251116
+DEFAULT_PAYMENT_ROWS = [10000, 100000, 1000000]
+
+# 支払いCSVのうち費用項目と一致させる割合（残りはランダムな支払い）
+MATCHING_PAYMENT_RATIO = 0.3
+
+# 費用項目を生成しない契約の割合（費用項目自動生成の計測対象）
+CONTRACTS_WITHOUT_ITEMS_RATIO = 0.1
+
+# 合成データの期間（費用項目・支払いの日付はこの範囲に収まる）
+DATA_START_YEAR = 2024
+DATA_MONTHS = 24
+
+PRODUCTION_TYPES = ["レギュラー", "レギュラー", "レギュラー", "コーナー", "イベント", "特別企画"]
+BROADCAST_DAY_PATTERNS = ["月", "火", "水", "木", "金", "土", "日", "月,水,金", "月,火,水,木", "土,日"]
+ITEM_NAMES = ["出演料", "制作費", "構成料", "技術費", "編集費", "音響費", "ディレクター費", "使用料"]
+WORK_TYPES = ["制作", "出演"]
+PAYMENT_STATUSES = ["未払い", "未払い", "未払い", "支払済"]
+CSV_STATUSES = ["社内承認中", "承認済", "支払済"]
+PARTNER_NAME_PREFIXES = ["株式会社", "有限会社", "合同会社", ""]
+
+
+def _month_add(year, month, months):
+    """年月に月数を加算"""
+    total = year * 12 + (month - 1) + months
+    return total // 12, total % 12 + 1
+
+
+def _month_end(year, month):
+    """月末日を取得"""
+    next_year, next_month = _month_add(year, month, 1)
+    return date.fromordinal(date(next_year, next_month, 1).toordinal() - 1)
+
+
+def _partner_code(index):
+    """6桁の取引先コード（実データと同じ桁数）"""
+    return f"{100000 + index:06d}"
+
+
+def clone_template_schema(template_path, target_path):
+    """テンプレートDBのスキーマ（とマイグレーション履歴）を複製
+
+    データ行は schema_versions 以外すべて削除します。
+    """
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"テンプレートDBが見つかりません: {template_path}")
+
+    source = sqlite3.connect(template_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+
+    try:
+        cursor = target.cursor()
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table'
+              AND name NOT IN ('schema_versions', 'sqlite_sequence')
+              AND name NOT LIKE 'sqlite_%'
+        """)
+        for (table,) in cursor.fetchall():
+            cursor.execute(f'DELETE FROM "{table}"')
+        cursor.execute("DELETE FROM sqlite_sequence")
+        target.commit()
+        target.execute("VACUUM")
+    finally:
+        target.close()
+
+
+class SyntheticDataGenerator:
+    """シード固定の合成データ生成クラス"""
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self.seed = seed
+        self.random = random.Random(seed)
+        # 支払いCSVで一致させるための (取引先名, コード, 金額, 支払予定日)
+        self.expense_payment_keys = []
+
+    def populate_order_db(self, db_path, productions=200, partners=300,
+                          contracts=1000, expense_items=20000, casts=0):
+        """order_management.db に合成データを投入
+
+        Args:
+            db_path: 投入先DB（clone_template_schema 済みであること）
+            productions: 番組数
+            partners: 取引先数
+            contracts: 契約数
+            expense_items: 費用項目数（末尾1割の契約を除いて紐付けて生成）
+            casts: 出演者数
+
+        Returns:
+            dict: 各テーブルの投入件数
+        """
+        rnd = self.random
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            # 取引先
+            partner_rows = []
+            for i in range(partners):
+                prefix = rnd.choice(PARTNER_NAME_PREFIXES)
+                partner_rows.append((
+                    i + 1, f"{prefix}合成取引先{i + 1:05d}", _partner_code(i + 1),
+                    rnd.choice(["発注先", "支払先", "両方"])
+                ))
+            cursor.executemany("""
+                INSERT INTO partners (id, name, code, partner_type)
+                VALUES (?, ?, ?, ?)
+            """, partner_rows)
+
+            # 番組（コーナーは先頭のレギュラー番組にぶら下げる）
+            production_rows = []
+            regular_ids = []
+            for i in range(productions):
+                production_id = i + 1
+                production_type = rnd.choice(PRODUCTION_TYPES)
+                parent_id = None
+                if production_type == "コーナー" and regular_ids:
+                    parent_id = rnd.choice(regular_ids)
+                elif production_type == "レギュラー":
+                    regular_ids.append(production_id)
+
+                start_year, start_month = _month_add(DATA_START_YEAR, 1, rnd.randrange(6))
+                end_year, end_month = _month_add(start_year, start_month, rnd.randrange(12, DATA_MONTHS))
+                production_rows.append((
+                    production_id, f"合成番組{production_id:05d}", production_type,
+                    date(start_year, start_month, 1).isoformat(),
+                    _month_end(end_year, end_month).isoformat(),
+                    rnd.choice(BROADCAST_DAY_PATTERNS), "放送中", parent_id
+                ))
+            cursor.executemany("""
+                INSERT INTO productions (id, name, production_type, start_date, end_date,
+                                         broadcast_days, status, parent_production_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, production_rows)
+
+            # 出演者
+            cast_rows = [
+                (i + 1, f"合成出演者{i + 1:05d}", rnd.randrange(1, partners + 1))
+                for i in range(casts)
+            ]
+            cursor.executemany("""
+                INSERT INTO cast (id, name, partner_id) VALUES (?, ?, ?)
+            """, cast_rows)
+
+            # 契約
+            contract_rows = []
+            for i in range(contracts):
+                contract_id = i + 1
+                production = production_rows[rnd.randrange(productions)]
+                partner_id = rnd.randrange(1, partners + 1)
+                is_spot = rnd.random() < 0.15
+                payment_type = "回数ベース" if (not is_spot and rnd.random() < 0.2) else "月額固定"
+                unit_price = None if is_spot else float(rnd.randrange(10, 300) * 1000)
+                spot_amount = float(rnd.randrange(10, 500) * 1000) if is_spot else None
+                contract_rows.append((
+                    contract_id, production[0], partner_id, rnd.choice(WORK_TYPES),
+                    rnd.choice(ITEM_NAMES),
+                    "regular_count" if payment_type == "回数ベース" else "regular_fixed",
+                    production[3], production[4], payment_type, unit_price, spot_amount,
+                    rnd.choice(["翌月末払い", "翌月末払い", "当月末払い"]),
+                    "単発発注書" if is_spot else "レギュラー制作発注書",
+                    production[3] if is_spot else None,
+                    rnd.choice(["未", "完了"]), rnd.choice(["未配布", "配布済"])
+                ))
+            cursor.executemany("""
+                INSERT INTO contracts (id, production_id, partner_id, work_type, item_name,
+                                       contract_type, contract_start_date, contract_end_date,
+                                       payment_type, unit_price, spot_amount, payment_timing,
+                                       order_category, implementation_date,
+                                       document_status, pdf_status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, contract_rows)
+
+            # 費用項目（契約の月次展開を模して生成）
+            partner_by_id = {row[0]: row for row in partner_rows}
+            contracts_with_items = max(1, int(contracts * (1 - CONTRACTS_WITHOUT_ITEMS_RATIO)))
+            expense_rows = []
+            for i in range(expense_items):
+                contract = contract_rows[rnd.randrange(contracts_with_items)]
+                year, month = _month_add(DATA_START_YEAR, 1, rnd.randrange(DATA_MONTHS))
+                implementation = date(year, month, 1)
+                pay_year, pay_month = _month_add(year, month, 1 if contract[11] == "翌月末払い" else 0)
+                expected_payment = _month_end(pay_year, pay_month)
+                amount = contract[10] or contract[9]
+                payment_status = rnd.choice(PAYMENT_STATUSES)
+                expense_rows.append((
+                    contract[0], contract[1], contract[2], contract[4], amount,
+                    implementation.isoformat(), expected_payment.isoformat(),
+                    "発注予定", payment_status, contract[3]
+                ))
+
+                partner = partner_by_id[contract[2]]
+                self.expense_payment_keys.append((partner[1], partner[2], amount, expected_payment))
+
+            cursor.executemany("""
+                INSERT INTO expense_items (contract_id, production_id, partner_id, item_name,
+                                           amount, implementation_date, expected_payment_date,
+                                           status, payment_status, work_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, expense_rows)
+
+            conn.commit()
+            return {
+                'partners': len(partner_rows),
+                'productions': len(production_rows),
+                'casts': len(cast_rows),
+                'contracts': len(contract_rows),
+                'expense_items': len(expense_rows),
+            }
+        finally:
+            conn.close()
+
+    def write_payment_csv(self, csv_path, rows, header=None, encoding="cp932"):
+        """AccountingApprovalList 形式の支払いCSVを書き出し
+
+        Args:
+            csv_path: 出力先
+            rows: 行数
+            header: ヘッダー行（Noneの場合は get_payment_csv_header()）
+            encoding: 文字コード（実データに合わせてcp932）
+
+        Returns:
+            int: 書き出した行数
+        """
+        rnd = self.random
+        header = header or get_payment_csv_header()
+        mapping = AppConfig.HEADER_MAPPING
+        index = {field: header.index(name) for name, field in mapping.items() if name in header}
+        width = len(header)
+
+        with open(csv_path, "w", encoding=encoding, newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(header)
+
+            for i in range(rows):
+                if self.expense_payment_keys and rnd.random() < MATCHING_PAYMENT_RATIO:
+                    payee, code, amount, payment_date = rnd.choice(self.expense_payment_keys)
+                else:
+                    partner_index = rnd.randrange(1, 5000)
+                    payee = f"合成取引先{partner_index:05d}"
+                    code = _partner_code(partner_index)
+                    amount = float(rnd.randrange(1, 500) * 1000)
+                    year, month = _month_add(DATA_START_YEAR, 1, rnd.randrange(DATA_MONTHS))
+                    payment_date = _month_end(year, month)
+
+                record = [""] * width
+                values = {
+                    'subject': f"合成請求{i + 1:07d}",
+                    'project_name': f"合成番組{rnd.randrange(1, 1000):05d} {rnd.choice(ITEM_NAMES)}",
+                    'payee': payee,
+                    # 実データ同様、先頭0が落ちたコードも混ぜる
+                    'payee_code': code.lstrip("0") if rnd.random() < 0.1 else code,
+                    'amount': f"{int(amount):,}",
+                    'payment_date': payment_date.strftime("%Y/%m/%d"),
+                    'status': rnd.choice(CSV_STATUSES),
+                }
+                for field, value in values.items():
+                    if field in index:
+                        record[index[field]] = value
+                writer.writerow(record)
+
+        return rows
+
+
+def get_payment_csv_header():
+    """実データ（data/AccountingApprovalList_*.csv）のヘッダー行を取得
+
+    実データが無い場合は HEADER_MAPPING の列のみのヘッダーを返します。
+    """
+    samples = sorted(glob.glob(os.path.join(AppConfig.get_data_folder(), "AccountingApprovalList_*.csv")))
+    for sample in samples:
+        for encoding in ("utf-8", "cp932"):
+            try:
+                with open(sample, "r", encoding=encoding, newline="") as f:
+                    return next(csv.reader(f))
+            except (UnicodeDecodeError, StopIteration):
+                continue
+    return list(AppConfig.HEADER_MAPPING.keys())
+
+
+def build_workspace(workdir, seed=DEFAULT_SEED, productions=200, partners=300,
+                    contracts=1000, expense_items=20000, casts=0,
+                    payment_rows=None):
+    """ベンチマーク用の作業ディレクトリを生成
+
+    Args:
+        workdir: 作業ディレクトリ（存在しない場合は作成）
+        seed: 乱数シード
+        productions, partners, contracts, expense_items, casts: 各テーブルの件数
+        payment_rows: 生成する支払いCSVの行数リスト
+
+    Returns:
+        dict: {'counts': 投入件数, 'payment_csvs': {行数: CSVパス}}
+    """
+    from database import DatabaseManager
+
+    payment_rows = DEFAULT_PAYMENT_ROWS if payment_rows is None else payment_rows
+    os.makedirs(workdir, exist_ok=True)
+    order_db_path = os.path.join(workdir, "order_management.db")
+    clone_template_schema(TEMPLATE_ORDER_DB, order_db_path)
+
+    # DatabaseManager は相対パスでDBを開くため、作業ディレクトリで初期化する
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        DatabaseManager().init_db()
+    finally:
+        os.chdir(previous_dir)
+
+    generator = SyntheticDataGenerator(seed)
+    counts = generator.populate_order_db(
+        order_db_path, productions=productions, partners=partners,
+        contracts=contracts, expense_items=expense_items, casts=casts
+    )
+
+    header = get_payment_csv_header()
+    payment_csvs = {}
+    for rows in payment_rows:
+        csv_path = os.path.join(workdir, f"AccountingApprovalList_synthetic_{rows}.csv")
+        generator.write_payment_csv(csv_path, rows, header=header)
+        payment_csvs[rows] = csv_path
+
+    return {'counts': counts, 'payment_csvs': payment_csvs}
+
+
+def parse_sizes(text):
+    """'10000,100000' 形式の行数リストをパース"""
+    return [int(value.replace("_", "")) for value in text.split(",") if value.strip()]
+
+
+# コマンドライン実行用
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ベンチマーク用合成データ生成')
+    parser.add_argument('workdir', help='出力先ディレクトリ')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='乱数シード')
+    parser.add_argument('--productions', type=int, default=200, help='番組数')
+    parser.add_argument('--partners', type=int, default=300, help='取引先数')
+    parser.add_argument('--contracts', type=int, default=1000, help='契約数')
+    parser.add_argument('--expense-items', type=int, default=20000, help='費用項目数')
+    parser.add_argument('--casts', type=int, default=0, help='出演者数')
+    parser.add_argument('--payment-rows', type=parse_sizes,
+                        default=DEFAULT_PAYMENT_ROWS, help='支払いCSVの行数（カンマ区切り）')
+    args = parser.parse_args()
+
+    try:
+        result = build_workspace(
+            args.workdir, seed=args.seed, productions=args.productions,
+            partners=args.partners, contracts=args.contracts,
+            expense_items=args.expense_items, casts=args.casts,
+            payment_rows=args.payment_rows
+        )
+    except FileNotFoundError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+    print(f"合成データを生成しました: {args.workdir}")
+    for table, count in result['counts'].items():
+        print(f"  {table}: {count:,}件")
+    for rows, path in result['payment_csvs'].items():
+        print(f"  支払いCSV {rows:,}行: {os.path.basename(path)}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""アーカイブDBへの移動のテストスクリプト
+
+発注管理DBのコピーに対して archive_old_expense_items を実行し、
+費用項目・履歴の移動、番組別費用集計の全件、「アーカイブ済みを表示」の結果、
+再実行・バックアップから戻した発注管理DBでの再移動を確認します。
+アーカイブ後の契約からの再生成・番組の削除が、移動した費用項目を参照することも確認します。
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from order_management.archive_store import ARCHIVE_YEAR_SQL, archive_path, archive_years
+from order_management.database_manager import ARCHIVE_CANDIDATES_WHERE, OrderManagementDB
+
+MONTHS_OLD = 12
+
+
+def _rollup_totals(db_path):
+    """番組別費用集計の全件（番組・月 -> (all_count, all_amount)）"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            (production_id, year_month): (count, round(amount, 2))
+            for production_id, year_month, count, amount in conn.execute("""
+                SELECT production_id, year_month, all_count, all_amount
+                FROM production_expense_rollup WHERE all_count != 0
+            """)
+        }
+    finally:
+        conn.close()
+
+
+def _listed(db):
+    """「アーカイブ済みを表示」の一覧（in_archive を除く）"""
+    return [tuple(item)[:-1] for item in db.get_expense_items_with_details(show_archived=True)]
+
+
+def _archived_ids(db_path, table, column='id'):
+    """アーカイブDBの行（年 -> ID のリスト）"""
+    result = {}
+    for year in archive_years(db_path):
+        conn = sqlite3.connect(archive_path(db_path, year))
+        try:
+            result[year] = [row[0] for row in conn.execute(f"SELECT {column} FROM {table}")]
+        finally:
+            conn.close()
+    return result
+
+
+def _prepare(db_path):
+    """アーカイブ済みの行と履歴を用意し、移動する費用項目（ID -> 年）を返す"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("""
+            UPDATE expense_items SET archived = 1
+            WHERE id IN (SELECT id FROM expense_items ORDER BY id LIMIT 10)
+        """)
+        targets = dict(conn.execute(
+            f"SELECT id, {ARCHIVE_YEAR_SQL} FROM expense_items WHERE {ARCHIVE_CANDIDATES_WHERE}",
+            (f'-{MONTHS_OLD}',)))
+        for expense_id in list(targets)[:3]:
+            conn.execute("""
+                INSERT INTO status_history (expense_id, old_status, new_status)
+                VALUES (?, '発注予定', '発注済')
+            """, (expense_id,))
+        conn.execute("""
+            INSERT INTO order_history (expense_id, order_number) VALUES (?, 'TEST-ARCHIVE-1')
+        """, (next(iter(targets)),))
+        conn.commit()
+        return targets
+    finally:
+        conn.close()
+
+
+def _check_moved(db_path, targets, rollup, listed, db):
+    """移動後の発注管理DB・アーカイブDB・集計・一覧を確認"""
+    conn = sqlite3.connect(db_path)
+    try:
+        live_ids = {row[0] for row in conn.execute("SELECT id FROM expense_items")}
+        live_history = conn.execute(
+            "SELECT COUNT(*) FROM status_history WHERE expense_id IN ({})".format(
+                ",".join("?" * len(targets))), list(targets)).fetchone()[0]
+    finally:
+        conn.close()
+    assert not live_ids & set(targets), "移動した費用項目が発注管理DBに残っています"
+    assert live_history == 0, "移動した費用項目の履歴が発注管理DBに残っています"
+
+    archived = _archived_ids(db_path, 'expense_items')
+    archived_ids = [expense_id for ids in archived.values() for expense_id in ids]
+    assert sorted(archived_ids) == sorted(targets), "アーカイブDBの費用項目が移動した項目と一致しません"
+    for year, ids in archived.items():
+        assert all(targets[expense_id] == year for expense_id in ids), f"archive_{year}.db の年が違います"
+
+    status_history = [i for ids in _archived_ids(db_path, 'status_history', 'expense_id').values() for i in ids]
+    order_history = [i for ids in _archived_ids(db_path, 'order_history', 'expense_id').values() for i in ids]
+    assert len(status_history) == 3 and len(order_history) == 1, "履歴がアーカイブDBに移動していません"
+
+    assert _rollup_totals(db_path) == rollup, "移動後の集計（全件）が移動前と違います"
+    db.rebuild_expense_rollup()
+    assert _rollup_totals(db_path) == rollup, "再集計の全件が移動前と違います"
+    assert _listed(db) == listed, "「アーカイブ済みを表示」の一覧が移動前と違います"
+
+
+def test_archive_store():
+    """移動・再実行・発注管理DBを戻した後の再移動を確認"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "order_management.db")
+        shutil.copyfile(os.path.join(cwd, "order_management.db"), db_path)
+        os.chdir(tmp_dir)  # 復元ポイント（backups/）を一時フォルダに作成する
+        try:
+            db = OrderManagementDB(db_path)
+            targets = _prepare(db_path)
+            assert targets, "移動する費用項目がありません"
+            snapshot = os.path.join(tmp_dir, "snapshot.db")
+            shutil.copyfile(db_path, snapshot)
+
+            # 移動前（アーカイブ済みのフラグのみ）の集計と一覧
+            rollup = _rollup_totals(db_path)
+            listed = _listed(db)
+
+            assert db.archive_old_expense_items(MONTHS_OLD) == len(targets)
+            _check_moved(db_path, targets, rollup, listed, db)
+            print(f"✓ {len(targets)}件を {', '.join(archive_years(db_path))}年のアーカイブDBに移動しました")
+
+            # 再実行（移動する項目がない）
+            assert db.archive_old_expense_items(MONTHS_OLD) == 0
+            _check_moved(db_path, targets, rollup, listed, db)
+            print("✓ 再実行では何も移動しません")
+
+            # 移動前の発注管理DBに戻す（アーカイブDBはそのまま）
+            shutil.copyfile(snapshot, db_path)
+            db = OrderManagementDB(db_path)
+            assert _listed(db) == listed, "戻した発注管理DBで一覧が重複しています"
+            db.rebuild_expense_rollup()
+            assert _rollup_totals(db_path) == rollup, "戻した発注管理DBで集計が重複しています"
+
+            assert db.archive_old_expense_items(MONTHS_OLD) == len(targets)
+            _check_moved(db_path, targets, rollup, listed, db)
+            print("✓ 発注管理DBを戻した後も重複せずに再移動できます")
+        finally:
+            os.chdir(cwd)
+
+    print("\n✓ アーカイブDBへの移動は正常に動作しています")
+
+
+def _contract_for(conn, payment_type):
+    """全期間を支払済みにできる（終了済みの）契約と番組のID"""
+    return conn.execute("""
+        SELECT c.id, c.production_id FROM contracts c
+        JOIN productions p ON p.id = c.production_id
+        WHERE c.payment_type = ? AND c.unit_price > 0
+          AND (c.spot_amount IS NULL OR c.spot_amount = 0)
+          AND c.contract_start_date IS NOT NULL
+          AND c.contract_end_date < date('now', '-2 months')
+          AND (? != '回数ベース' OR COALESCE(p.broadcast_days, '') != '')
+        ORDER BY c.id
+    """, (payment_type, payment_type)).fetchone()
+
+
+def test_archive_then_regenerate():
+    """アーカイブDBに移動した費用項目を、契約からの再生成・番組の削除が参照することを確認"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "order_management.db")
+        shutil.copyfile(os.path.join(cwd, "order_management.db"), db_path)
+        os.chdir(tmp_dir)
+        try:
+            db = OrderManagementDB(db_path)
+            conn = sqlite3.connect(db_path)
+            try:
+                contracts = [_contract_for(conn, payment_type) for payment_type in ('月額固定', '回数ベース')]
+            finally:
+                conn.close()
+            assert all(contracts), "対象の契約がありません"
+
+            for contract_id, _ in contracts:
+                db.generate_expense_items_from_contract(contract_id)
+
+            conn = sqlite3.connect(db_path)
+            try:
+                ids = ",".join(str(contract_id) for contract_id, _ in contracts)
+                generated = conn.execute(
+                    f"SELECT COUNT(*) FROM expense_items WHERE contract_id IN ({ids})").fetchone()[0]
+                conn.execute(f"""
+                    UPDATE expense_items SET payment_status = '支払済'
+                    WHERE contract_id IN ({ids}) AND expected_payment_date < date('now')
+                """)
+                conn.commit()
+            finally:
+                conn.close()
+
+            assert db.archive_old_expense_items(0) > 0
+            for contract_id, _ in contracts:
+                assert db.generate_expense_items_from_contract(contract_id) == 0, \
+                    f"契約 {contract_id} の費用項目がアーカイブ後に重複して生成されました"
+
+            conn = sqlite3.connect(db_path)
+            try:
+                live = conn.execute(
+                    f"SELECT COUNT(*) FROM expense_items WHERE contract_id IN ({ids})").fetchone()[0]
+                archived = conn.execute(
+                    f"SELECT COUNT(*) FROM archived_expense_keys WHERE contract_id IN ({ids})").fetchone()[0]
+                # 番組に残る費用項目を削除し、アーカイブDBの費用項目だけが紐付く状態にする
+                production_id = contracts[0][1]
+                conn.execute("DELETE FROM expense_items WHERE production_id = ?", (production_id,))
+                conn.commit()
+            finally:
+                conn.close()
+            assert archived > 0 and live + archived == generated, (live, archived, generated)
+            print(f"✓ アーカイブ後の再生成で重複しません（{archived}件がアーカイブDB）")
+
+            try:
+                db.delete_production(production_id)
+            except Exception as e:
+                assert "費用項目" in str(e), e
+            else:
+                raise AssertionError("アーカイブDBの費用項目が紐付く番組を削除できました")
+            print("✓ アーカイブDBの費用項目が紐付く番組は削除できません")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    test_archive_store()
+    test_archive_then_regenerate()
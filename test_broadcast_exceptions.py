@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""放送例外（休止・追加放送）のテストスクリプト
+
+休止・追加放送のある月について build_monthly_broadcast_counts の放送回数を確認し、
+発注管理DBのコピーで放送例外の登録・削除と月間放送回数への反映を確認します。
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from database import DatabaseManager
+from order_management.broadcast_utils import (
+    EXCEPTION_ADDED,
+    EXCEPTION_CANCELLED,
+    build_monthly_broadcast_counts,
+)
+from order_management.database_manager import OrderManagementDB
+
+
+def test_build_monthly_broadcast_counts():
+    """休止・追加放送のある月の放送回数を確認（2024年10月は1日が火曜）"""
+    broadcast_days = {1: "月,水,金", 2: "土", 3: ""}
+    exceptions = [
+        (None, "2024-10-14", EXCEPTION_CANCELLED),  # 全番組の休止（月曜）: 番組1のみ対象
+        (1, "2024-10-14", EXCEPTION_CANCELLED),     # 同じ日の重複登録は1回として扱う
+        (1, "2024-10-18", EXCEPTION_CANCELLED),     # 番組1の休止（金曜）
+        (1, "2024-10-15", EXCEPTION_ADDED),         # 番組1の追加放送（火曜）
+        (1, "2024-10-16", EXCEPTION_ADDED),         # 放送曜日（水曜）の追加は数えない
+        (2, "2024-10-05", EXCEPTION_CANCELLED),     # 番組2の休止（土曜）
+        (2, "2024-10-07", EXCEPTION_CANCELLED),     # 放送曜日以外の休止は数えない
+        (None, "2024-10-20", EXCEPTION_ADDED),      # 番組を指定しない追加放送は数えない
+        (1, "2024-11-04", EXCEPTION_CANCELLED),     # 11月の休止（月曜）
+        (1, "2024-12-02", EXCEPTION_CANCELLED),     # 対象外の月
+        (1, "不正な日付", EXCEPTION_CANCELLED),
+    ]
+
+    counts = build_monthly_broadcast_counts(broadcast_days, ["2024-10", "2024-11"])
+    assert counts == {
+        (1, "2024-10"): 13, (2, "2024-10"): 4,
+        (1, "2024-11"): 13, (2, "2024-11"): 5,
+    }, counts
+
+    counts = build_monthly_broadcast_counts(broadcast_days, ["2024-10", "2024-11"], exceptions)
+    assert counts == {
+        (1, "2024-10"): 12, (2, "2024-10"): 3,
+        (1, "2024-11"): 12, (2, "2024-11"): 5,
+    }, counts
+    print("✓ 休止・追加放送が月間放送回数に反映されます")
+
+
+def test_broadcast_exceptions_in_database():
+    """放送例外の登録・削除が月間放送回数に反映されることを確認"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "order_management.db")
+        shutil.copyfile(os.path.join(cwd, "order_management.db"), db_path)
+        os.chdir(tmp_dir)  # DatabaseManager は作業フォルダの order_management.db を使う
+        try:
+            order_db = OrderManagementDB(db_path)
+            db = DatabaseManager()
+
+            # 回数ベース契約がある木曜放送の番組（2024年10月の木曜は5回）
+            conn = sqlite3.connect(db_path)
+            try:
+                production_id = conn.execute("""
+                    SELECT id FROM productions WHERE broadcast_days = '木'
+                      AND id IN (SELECT production_id FROM contracts WHERE payment_type = '回数ベース')
+                    ORDER BY id
+                """).fetchone()[0]
+            finally:
+                conn.close()
+            month = ("2024-10",)
+            assert db.get_monthly_broadcast_counts(month)[(production_id, "2024-10")] == 5
+
+            cancelled_id = order_db.add_broadcast_exception("2024-10-10", EXCEPTION_CANCELLED, reason="祝日")
+            added_id = order_db.add_broadcast_exception(
+                "2024-10-12", EXCEPTION_ADDED, production_id=production_id, reason="特番")
+            listed = order_db.get_broadcast_exceptions(production_id, "2024-10-01", "2024-10-31")
+            assert [(row[0], row[4]) for row in listed] == [
+                (cancelled_id, EXCEPTION_CANCELLED), (added_id, EXCEPTION_ADDED)], listed
+            assert db.get_monthly_broadcast_counts(month)[(production_id, "2024-10")] == 5
+
+            order_db.delete_broadcast_exception(added_id)
+            assert db.get_monthly_broadcast_counts(month)[(production_id, "2024-10")] == 4
+
+            order_db.delete_broadcast_exception(cancelled_id)
+            assert order_db.get_broadcast_exceptions(production_id) == []
+            assert db.get_monthly_broadcast_counts(month)[(production_id, "2024-10")] == 5
+
+            # 不明な種類・番組を指定しない追加放送・日付の形式違いは登録しない
+            for args in (
+                ("2024-10-10", "不明"),
+                ("2024-10-12", EXCEPTION_ADDED),
+                ("2024/10/10", EXCEPTION_CANCELLED),
+            ):
+                try:
+                    order_db.add_broadcast_exception(*args)
+                except ValueError:
+                    continue
+                raise AssertionError(f"不正な放送例外を登録できました: {args}")
+        finally:
+            os.chdir(cwd)
+
+    print("✓ 放送例外の登録・削除が月間放送回数に反映されます")
+
+
+if __name__ == '__main__':
+    test_build_monthly_broadcast_counts()
+    test_broadcast_exceptions_in_database()
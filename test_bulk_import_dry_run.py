@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""CSV一括取込の検証のみ（dry_run）のテストスクリプト
+
+発注管理DBのコピーで、反映時に制約違反となる行（存在しない番組名・重複した出演者名）が
+dry_run でも同じエラーになり、件数が反映時と一致し、DBが変更されないことを確認します。
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from order_management.database_manager import OrderManagementDB
+
+
+def _dump(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return list(conn.iterdump())
+    finally:
+        conn.close()
+
+
+def test_dry_run_matches_apply():
+    """dry_run の結果が反映時の結果と一致し、DBが変更されないことを確認"""
+    casts = [
+        {'ID': '', '出演者名': '取込テスト出演者', '所属事務所': 'テスト事務所', '所属コード': '', '備考': ''},
+        {'ID': '', '出演者名': '取込テスト出演者', '所属事務所': 'テスト事務所', '所属コード': '', '備考': ''},
+    ]
+    expense_items = [
+        {'ID': '', '契約ID': '', '番組名': '存在しない番組', '取引先名': '', '項目名': '出演料',
+         '業務種別': '出演', '金額': '1000', '実施日': '2024-10-01', '状態': '発注予定', '支払状態': '未払い'},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "order_management.db")
+        shutil.copyfile("order_management.db", db_path)
+        db = OrderManagementDB(db_path)
+
+        for method, rows in (
+            (db.import_casts_from_csv, casts),
+            (db.import_expense_items_from_csv, expense_items),
+        ):
+            before = _dump(db_path)
+            checked = method(rows, dry_run=True)
+            assert checked.pop('dry_run') is True
+            assert _dump(db_path) == before, f"{method.__name__}: dry_run でDBが変更されました"
+
+            applied = method(rows)
+            assert checked == applied, (method.__name__, checked, applied)
+            assert applied['errors'], applied  # 制約違反の行がエラーとして記録される
+
+    print("✓ dry_run の検証結果が反映時と一致し、DBは変更されません")
+
+
+if __name__ == '__main__':
+    test_dry_run_matches_apply()
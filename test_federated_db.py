@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""複数DBの ATTACH（federated_db）のテストスクリプト
+
+一時フォルダの発注管理DB・支払い先マスター・billing.db を ATTACH し、
+横断ビューと正規化した支払い先コードを確認します。
+"""
+import os
+import sqlite3
+import tempfile
+
+from federated_db import open_federated
+
+
+def _create(path, script):
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(script)
+    finally:
+        conn.close()
+
+
+def test_cross_db_views():
+    """payee_partners が正規化したコードのインデックスで結合し、payment_expense_items が照合済みの組を返すことを確認"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {alias: os.path.join(tmp_dir, f"{alias}.db") for alias in ('orders', 'payee_master', 'billing')}
+        _create(paths['orders'], """
+            CREATE TABLE partners (id INTEGER PRIMARY KEY, name TEXT UNIQUE, code TEXT);
+            INSERT INTO partners (id, name, code) VALUES (1, '取引先A', '12'), (2, '取引先B', 'A001'),
+                                                         (3, '取引先C', ''), (4, '取引先D', NULL);
+            CREATE TABLE expense_items (id INTEGER PRIMARY KEY, order_number TEXT, production_id INTEGER,
+                                        partner_id INTEGER, item_name TEXT, amount REAL,
+                                        expected_payment_date TEXT, payment_status TEXT,
+                                        payment_matched_id INTEGER);
+            INSERT INTO expense_items (id, partner_id, amount, payment_matched_id) VALUES (10, 1, 1000, 100), (11, 2, 500, NULL);
+        """)
+        _create(paths['payee_master'], """
+            CREATE TABLE payee_master (id INTEGER PRIMARY KEY, payee_name TEXT UNIQUE, payee_code TEXT);
+            INSERT INTO payee_master (id, payee_name, payee_code) VALUES
+                (1, '支払い先A', ' 0012'), (2, '支払い先B', 'A001'), (3, '支払い先空', ''), (4, '支払い先NULL', NULL);
+        """)
+        _create(paths['billing'], """
+            CREATE TABLE payments (id INTEGER PRIMARY KEY, subject TEXT, project_name TEXT, payee TEXT,
+                                   payee_code TEXT, amount REAL, payment_date TEXT, status TEXT);
+            INSERT INTO payments (id, payee, amount) VALUES (100, '取引先A', 1000), (101, '取引先B', 500);
+        """)
+
+        conn = open_federated(paths, 'orders')
+        try:
+            pairs = conn.execute("SELECT payee_id, partner_id FROM payee_partners ORDER BY payee_id").fetchall()
+            assert pairs == [(1, 1), (2, 2)], pairs  # 空・NULLのコード同士は結合しない
+
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM payee_partners WHERE payee_name = '支払い先A'"))
+            assert "idx_partners_code_key" in plan, plan
+
+            # 正規化したコードはトリガーで更新される
+            conn.execute("INSERT INTO partners (id, name, code) VALUES (5, '取引先E', ' 7 ')")
+            conn.execute("UPDATE partners SET code = '13' WHERE id = 2")
+            keys = dict(conn.execute("SELECT id, code_key FROM partners WHERE id IN (2, 5)"))
+            assert keys == {2: '0013', 5: '0007'}, keys
+
+            matched = conn.execute("SELECT payment_id, expense_item_id FROM payment_expense_items").fetchall()
+            assert matched == [(100, 10)], matched
+        finally:
+            conn.close()
+
+    print("✓ 横断ビュー（payee_partners / payment_expense_items）は正常に動作しています")
+
+
+if __name__ == '__main__':
+    test_cross_db_views()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""費用項目のインデックスのテストスクリプト
+
+発注管理DBのコピーに対して、照合・重複チェック・番組別月別明細のクエリが
+対応するインデックスを使っているか（EXPLAIN QUERY PLAN）を確認します。
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from order_management.database_manager import OrderManagementDB, check_expense_index_usage
+
+
+def test_expense_index_usage():
+    """各クエリのプランが対応するインデックスを使うことを確認（ANALYZE の前後）"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "order_management.db")
+        if os.path.exists("order_management.db"):
+            shutil.copyfile("order_management.db", db_path)
+        OrderManagementDB(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            problems = check_expense_index_usage(conn)
+            conn.execute("ANALYZE")
+            problems += check_expense_index_usage(conn)
+        finally:
+            conn.close()
+
+    for problem in problems:
+        print(f"✗ {problem['index']} を使っていません: {problem['plan']}")
+    assert problems == []
+    print("✓ 費用項目のクエリはすべて対応するインデックスを使っています")
+
+
+if __name__ == '__main__':
+    test_expense_index_usage()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""支払い先入力欄の候補モデルのテストスクリプト
+
+一時フォルダの支払い先マスターを変更し、変更通知で共有モデルの候補が
+更新されることを確認します。
+"""
+import os
+import sys
+import tempfile
+
+from PyQt5.QtCore import QCoreApplication
+
+from database import DatabaseManager
+from payee_line_edit import get_payee_model
+from ui.change_listener import get_change_relay
+
+
+def test_payee_model_follows_payee_master_changes():
+    """支払い先マスターの変更通知で候補が更新されることを確認"""
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            db = DatabaseManager()
+            db.init_payee_master_db()
+            db.update_or_create_payee_master("既存の支払い先", "1")
+
+            # 画面側の変更通知（アプリでは起動時に作成される）を索引より先に購読させる
+            get_change_relay()
+            model = get_payee_model(db)
+            assert model.stringList() == ["既存の支払い先"]
+
+            db.update_or_create_payee_master("追加した支払い先", "2")
+            app.processEvents()
+            assert sorted(model.stringList()) == ["既存の支払い先", "追加した支払い先"], model.stringList()
+        finally:
+            os.chdir(cwd)
+
+    print("✓ 支払い先マスターの変更が入力候補に反映されます")
+
+
+if __name__ == '__main__':
+    test_payee_model_follows_payee_master_changes()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""クエリプロファイラーのテストスクリプト
+
+一時データベースに対してSQLを発行し、集計結果を確認します。
+"""
+import os
+import tempfile
+
+import query_profiler
+
+
+def test_query_profiler():
+    """SQL実行時間・行数・接続オープンが記録されることを確認"""
+    previous = os.environ.get(query_profiler.PROFILE_ENV_VAR)
+    os.environ[query_profiler.PROFILE_ENV_VAR] = "1"
+    try:
+        profiler = query_profiler.get_profiler()
+        profiler.reset()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "profile_test.db")
+            conn = query_profiler.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            cursor.executemany("INSERT INTO items (name) VALUES (?)", [(f"item{i}",) for i in range(50)])
+            conn.commit()
+
+            cursor.execute("SELECT id, name FROM items WHERE id IN (?, ?, ?)", (1, 2, 3))
+            rows = cursor.fetchall()
+            assert not conn._pending_cursors, "記録済みのカーソルを接続が保持しています"
+            conn.close()
+
+        assert len(rows) == 3
+
+        stats = {s['sql']: s for s in profiler.get_statement_stats()}
+        select_stat = stats["SELECT id, name FROM items WHERE id IN (?, ...)"]
+        assert select_stat['count'] == 1
+        assert select_stat['rows'] == 3
+        assert sum(select_stat['histogram']) == 1
+
+        insert_stat = stats["INSERT INTO items (name) VALUES (?)"]
+        assert insert_stat['rows'] == 50
+    finally:
+        # 後続のテストでプロファイラーが有効にならないよう元に戻す
+        if previous is None:
+            os.environ.pop(query_profiler.PROFILE_ENV_VAR, None)
+        else:
+            os.environ[query_profiler.PROFILE_ENV_VAR] = previous
+
+    methods = profiler.get_method_stats()
+    assert sum(m['connections'] for m in methods) == 1
+
+    report = query_profiler.format_report(profiler.to_dict())
+    print(report)
+    print("\n✓ クエリプロファイラーは正常に動作しています")
+
+
+if __name__ == '__main__':
+    test_query_profiler()
@@ -2,5 +2,7 @@
 from .menu_builder import MenuBuilder
 from .toolbar_builder import ToolbarBuilder
 from .status_bar import StatusBarManager
+from .csv_export import run_csv_export
+from .search_controller import SearchController
 
-__all__ = ['MenuBuilder', 'ToolbarBuilder', 'StatusBarManager']
+__all__ = ['MenuBuilder', 'ToolbarBuilder', 'StatusBarManager', 'run_csv_export', 'SearchController']
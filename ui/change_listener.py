@@ -0,0 +1,92 @@
+"""データ変更通知の画面側受信
+
+change_events のイベントを Qt のシグナルに載せ替え、メインスレッドで受け取ります
+（インポート等で別スレッドから書き込まれた場合も画面はメインスレッドで更新されます）。
+
+LazyRefresher は、表示中のウィジェットには変更をすぐ反映し、表示されていない
+タブは「要再読み込み」として記録して、次に表示されたときに1回だけ再読み込みします。
+
+使用例:
+    self.refresher = LazyRefresher(self, ['payments'], self.refresh_data)
+    # 表示中は画面側で再読み込みしている場合（他のタブからの変更のみ反映）
+    self.refresher = LazyRefresher(self, ['payments'], self.refresh_data, hidden_only=True)
+"""
+from PyQt5.QtCore import QEvent, QObject, QTimer, pyqtSignal
+
+from change_events import change_bus
+
+_relay = None
+
+
+class ChangeRelay(QObject):
+    """変更イベントをメインスレッドに転送するシグナル"""
+
+    changed = pyqtSignal(object)  # change_events.ChangeEvent
+
+
+def get_change_relay():
+    """アプリ全体で共有する ChangeRelay を取得（初回呼び出し時に作成）"""
+    global _relay
+    if _relay is None:
+        _relay = ChangeRelay()
+        change_bus.subscribe(_relay.changed.emit)
+    return _relay
+
+
+class LazyRefresher(QObject):
+    """変更通知に応じてウィジェットを再読み込み（非表示の間は表示時まで遅延）"""
+
+    def __init__(self, widget, tables, reload, on_change=None, hidden_only=False):
+        """
+        Args:
+            widget: 対象のウィジェット（親オブジェクトにもなる）
+            tables: 監視するテーブル名
+            reload: 再読み込みする関数
+            on_change: 表示中に変更があったとき on_change(event) を呼ぶ関数
+                       （Noneの場合は reload を呼ぶ）
+            hidden_only: True の場合、表示中の変更は無視する
+        """
+        super().__init__(widget)
+        self.widget = widget
+        self.tables = set(tables)
+        self.reload = reload
+        self.on_change = on_change
+        self.hidden_only = hidden_only
+        self.dirty = False
+
+        # 連続した変更通知（照合・一括インポート等）を1回の再読み込みにまとめる
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(0)
+        self._reload_timer.timeout.connect(self._reload_now)
+
+        get_change_relay().changed.connect(self._handle_change)
+        widget.installEventFilter(self)
+
+    def _handle_change(self, event):
+        if event.table not in self.tables:
+            return
+        if not self.widget.isVisible():
+            self.dirty = True
+        elif self.hidden_only:
+            return
+        elif self.on_change is not None:
+            self.on_change(event)
+        else:
+            self._reload_timer.start()
+
+    def invalidate(self):
+        """再読み込みを要求（表示中はすぐ、非表示の間は次に表示されたとき）"""
+        if self.widget.isVisible():
+            self._reload_timer.start()
+        else:
+            self.dirty = True
+
+    def _reload_now(self):
+        self.dirty = False
+        self.reload()
+
+    def eventFilter(self, obj, event):
+        if obj is self.widget and event.type() == QEvent.Show and self.dirty:
+            self._reload_timer.start()
+        return False
@@ -0,0 +1,138 @@
+"""CSV出力の画面側処理
+
+保存先・文字コードの選択、バックグラウンドスレッドでの出力、
+進捗ダイアログ（キャンセル可能）をまとめて扱います。
+出力そのものは csv_exporter.CSVExportJob が行います。
+"""
+import os
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from csv_exporter import EXPORT_ENCODINGS, ExportCancelled
+from utils import log_message
+
+# 実行中の出力スレッド（ガベージコレクションで破棄されないよう保持）
+_active_workers = set()
+
+
+class CSVExportWorker(QThread):
+    """CSV出力スレッド"""
+
+    progress = pyqtSignal(int, int)  # (書き込み済み件数, 総件数 または -1)
+    completed = pyqtSignal(int)  # 書き込んだ件数
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, job, file_path, encoding, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.file_path = file_path
+        self.encoding = encoding
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """出力をキャンセル"""
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            count = self.job.write(
+                self.file_path,
+                encoding=self.encoding,
+                progress_callback=lambda written, total: self.progress.emit(
+                    written, total if total is not None else -1),
+                cancel_event=self.cancel_event,
+            )
+            self.completed.emit(count)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            log_message(f"CSV出力エラー: {e}")
+            self.failed.emit(str(e))
+
+
+def get_export_file_path(parent, title, default_name):
+    """保存先と文字コードを選択
+
+    Returns:
+        tuple: (ファイルパス, 文字コード)。キャンセル時は (None, None)
+    """
+    filters = [f"CSV {label} (*.csv)" for _, label in EXPORT_ENCODINGS]
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+        parent, title, default_name, ";;".join(filters)
+    )
+    if not file_path:
+        return None, None
+
+    encoding = EXPORT_ENCODINGS[0][0]
+    for (value, _), filter_text in zip(EXPORT_ENCODINGS, filters):
+        if selected_filter == filter_text:
+            encoding = value
+    return file_path, encoding
+
+
+def run_csv_export(parent, job, title="CSV出力", default_name="export.csv", label="データ"):
+    """保存先を選択してCSV出力をバックグラウンドで実行
+
+    Args:
+        parent: 親ウィジェット
+        job: csv_exporter.CSVExportJob
+        title: 保存ダイアログのタイトル
+        default_name: 既定のファイル名
+        label: 完了メッセージに表示するデータ名
+
+    Returns:
+        CSVExportWorker: 開始した出力スレッド（キャンセル時はNone）
+    """
+    file_path, encoding = get_export_file_path(parent, title, default_name)
+    if not file_path:
+        return None
+
+    progress_dialog = QProgressDialog(f"{label}をCSVに出力しています...", "キャンセル", 0, 0, parent)
+    progress_dialog.setWindowTitle(title)
+    progress_dialog.setWindowModality(Qt.NonModal)
+    progress_dialog.setMinimumDuration(500)
+    progress_dialog.setAutoClose(False)
+    progress_dialog.setAutoReset(False)
+
+    worker = CSVExportWorker(job, file_path, encoding)
+    _active_workers.add(worker)
+
+    def on_progress(written, total):
+        if total >= 0:
+            progress_dialog.setMaximum(max(total, 1))
+            progress_dialog.setValue(min(written, total))
+        progress_dialog.setLabelText(f"{label}をCSVに出力しています... {written:,}件")
+
+    def on_completed(count):
+        progress_dialog.close()
+        log_message(f"{label}を{file_path}に出力しました（{count}件）")
+        QMessageBox.information(
+            parent, "CSV出力完了",
+            f"{count}件の{label}をCSVに出力しました。\n\n{file_path}"
+        )
+
+    def on_cancelled():
+        progress_dialog.close()
+        log_message(f"{label}のCSV出力をキャンセルしました")
+
+    def on_failed(message):
+        progress_dialog.close()
+        QMessageBox.critical(parent, "エラー", f"CSV出力に失敗しました:\n{message}")
+
+    def on_finished():
+        _active_workers.discard(worker)
+        worker.deleteLater()
+
+    worker.progress.connect(on_progress)
+    worker.completed.connect(on_completed)
+    worker.cancelled.connect(on_cancelled)
+    worker.failed.connect(on_failed)
+    worker.finished.connect(on_finished)
+    progress_dialog.canceled.connect(worker.cancel)
+
+    log_message(f"{label}のCSV出力を開始: {os.path.basename(file_path)}（{encoding}）")
+    worker.start()
+    return worker
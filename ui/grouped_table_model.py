@@ -0,0 +1,172 @@
+"""グループ別一覧用のテーブルモデル
+
+グループ（見出し行）とその明細行を1つのリストに展開して表示するモデルと、
+折りたたんだグループの明細行を隠すプロキシモデルです。
+折りたたみ・展開はプロキシの判定を更新するだけで、モデルは作り直しません。
+
+使用例:
+    self.model = GroupedTableModel(
+        DETAIL_COLUMNS,
+        group_display={1: lambda group, records: group['partner_name']},
+    )
+    self.proxy = CollapsibleGroupProxyModel(self)
+    self.proxy.setSourceModel(self.model)
+    self.table.setModel(self.proxy)
+    self.table.clicked.connect(self.proxy.toggle_group_at)  # 見出し行のクリックで開閉
+
+    self.model.set_groups([(partner, partner['orders']) for partner in payment_list])
+"""
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont
+
+from ui.record_table_model import RECORD_ROLE
+
+# 見出し行の背景色
+GROUP_BACKGROUND = QColor(230, 236, 245)
+
+# 見出し行の開閉マーク
+EXPANDED_MARK = "▼"
+COLLAPSED_MARK = "▶"
+
+
+class GroupedTableModel(QAbstractTableModel):
+    """見出し行と明細行を展開した1つのリストを表示する読み取り専用のモデル
+
+    self.rows の各要素は (グループ番号, 明細行 または None（見出し行）) です。
+    """
+
+    # 開閉状態が変わった（プロキシが表示行を更新する）
+    collapsed_changed = pyqtSignal()
+
+    def __init__(self, columns, group_display=None, parent=None):
+        """
+        Args:
+            columns: 明細行の列定義（ui.record_table_model.Column のリスト）
+            group_display: 列番号 -> 見出し行の表示を返す関数 (グループ, 明細行のリスト) -> 文字列
+                           （0列目には開閉マークを付ける）
+            parent: 親オブジェクト
+        """
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.group_display = dict(group_display or {})
+        self.groups = []       # [(グループ, 明細行のリスト)]
+        self.rows = []         # [(グループ番号, 明細行 または None)]
+        self.group_rows = []   # グループ番号 -> 見出し行の行番号
+        self.collapsed = set()
+
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def set_groups(self, groups):
+        """表示するグループを置き換える（開閉状態は初期化）"""
+        self.beginResetModel()
+        self.groups = [(group, list(records)) for group, records in groups]
+        self.rows = []
+        self.group_rows = []
+        for group_index, (_, records) in enumerate(self.groups):
+            self.group_rows.append(len(self.rows))
+            self.rows.append((group_index, None))
+            self.rows.extend((group_index, record) for record in records)
+        self.collapsed = set()
+        self.endResetModel()
+
+    def is_group_row(self, row):
+        """見出し行か"""
+        return self.rows[row][1] is None
+
+    def group_of(self, row):
+        """行のグループ番号"""
+        return self.rows[row][0]
+
+    def is_hidden(self, row):
+        """折りたたまれたグループの明細行か"""
+        group_index, record = self.rows[row]
+        return record is not None and group_index in self.collapsed
+
+    def set_collapsed(self, group_index, collapsed):
+        """グループを折りたたむ・展開する"""
+        if (group_index in self.collapsed) == collapsed:
+            return
+        if collapsed:
+            self.collapsed.add(group_index)
+        else:
+            self.collapsed.discard(group_index)
+        header_row = self.group_rows[group_index]
+        self.dataChanged.emit(self.index(header_row, 0), self.index(header_row, 0))
+        self.collapsed_changed.emit()
+
+    def toggle_group(self, group_index):
+        """グループの開閉を切り替える"""
+        self.set_collapsed(group_index, group_index not in self.collapsed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group_index, record = self.rows[index.row()]
+        column = index.column()
+
+        if record is None:
+            return self._group_data(group_index, column, role)
+
+        spec = self.columns[column]
+        if role == Qt.DisplayRole:
+            return spec.display(record)
+        if role == RECORD_ROLE:
+            return record
+        if role == Qt.BackgroundRole and spec.background:
+            return spec.background(record)
+        if role == Qt.ForegroundRole and spec.foreground:
+            return spec.foreground(record)
+        if role == Qt.TextAlignmentRole and spec.alignment is not None:
+            return int(spec.alignment)
+        return None
+
+    def _group_data(self, group_index, column, role):
+        """見出し行のデータ"""
+        group, records = self.groups[group_index]
+        if role == Qt.DisplayRole:
+            display = self.group_display.get(column)
+            text = display(group, records) if display else ""
+            if column == 0:
+                mark = COLLAPSED_MARK if group_index in self.collapsed else EXPANDED_MARK
+                text = f"{mark} {text}"
+            return text
+        if role == RECORD_ROLE:
+            return group
+        if role == Qt.BackgroundRole:
+            return GROUP_BACKGROUND
+        if role == Qt.FontRole:
+            return self._bold
+        if role == Qt.TextAlignmentRole:
+            alignment = self.columns[column].alignment
+            return int(alignment) if alignment is not None else None
+        return None
+
+
+class CollapsibleGroupProxyModel(QSortFilterProxyModel):
+    """折りたたまれたグループの明細行を隠すプロキシ"""
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.collapsed_changed.connect(self.invalidateFilter)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self.sourceModel().is_hidden(source_row)
+
+    def toggle_group_at(self, index):
+        """見出し行のインデックスならグループの開閉を切り替える"""
+        model = self.sourceModel()
+        source_row = self.mapToSource(index).row()
+        if source_row >= 0 and model.is_group_row(source_row):
+            model.toggle_group(model.group_of(source_row))
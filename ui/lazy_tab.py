@@ -0,0 +1,57 @@
+"""表示時に作成するタブ
+
+タブの中身（とそのモジュールのインポート）を、最初に表示されるまで遅らせます。
+起動時に作成・インポートするのは最初に表示するタブだけになります。
+
+使用例:
+    def create_master_tab():
+        from master_tab import MasterTab
+        tab = MasterTab(tab_control, app)
+        tab.refresher.invalidate()  # 表示されたときにデータを読み込む
+        return tab
+
+    self.master_tab = LazyTab(create_master_tab)
+    tab_control.addTab(self.master_tab, "費用マスター")
+    # 中身が必要な場合（未作成ならここで作成）
+    self.master_tab.widget().refresh_data()
+"""
+from PyQt5.QtWidgets import QVBoxLayout, QWidget
+
+
+class LazyTab(QWidget):
+    """最初に表示されたときに中身を作成するタブ"""
+
+    def __init__(self, factory, parent=None):
+        """
+        Args:
+            factory: 中身のウィジェットを作成して返す関数
+            parent: 親ウィジェット
+        """
+        super().__init__(parent)
+        self._factory = factory
+        self._widget = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def widget(self):
+        """中身のウィジェット（未作成の場合は作成する）"""
+        if self._widget is None:
+            self._widget = self._factory()
+            self.layout().addWidget(self._widget)
+        return self._widget
+
+    def loaded_widget(self):
+        """作成済みの中身のウィジェット（未作成の場合はNone）"""
+        return self._widget
+
+    def showEvent(self, event):
+        self.widget()
+        super().showEvent(event)
+
+
+def unwrap_tab(widget):
+    """LazyTab の場合は中身のウィジェットを返す（未作成なら作成する）"""
+    if isinstance(widget, LazyTab):
+        return widget.widget()
+    return widget
@@ -0,0 +1,119 @@
+"""絞り込み一覧用のテーブルモデル
+
+filter_store.FilterStore の行を QTableView に表示するモデルと、
+ビット集合で行の表示・非表示を切り替えるプロキシモデルです。
+表示フィルタ・検索を変更しても行やセルのオブジェクトは作り直さず、
+プロキシの判定だけを更新して再描画します。
+
+使用例:
+    columns = [
+        Column("番組名", lambda row: row['program_name']),
+        Column("金額", lambda row: f"{int(row['amount']):,}円", alignment=Qt.AlignRight),
+    ]
+    self.model = RecordTableModel(columns, background=lambda row: QColor(...))
+    self.proxy = MaskFilterProxyModel(self)
+    self.proxy.setSourceModel(self.model)
+    self.table.setModel(self.proxy)
+
+    self.model.set_rows(store.rows)     # 読み込み時
+    self.proxy.set_mask(store.select(...))  # フィルタ変更時
+"""
+from collections import namedtuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+# 行のデータ（dict）を返すロール
+RECORD_ROLE = Qt.UserRole
+
+# 列の定義
+#   header: 見出し
+#   display: 行 -> 表示する文字列
+#   background / foreground: 行 -> QColor（None の場合は行全体の設定）
+#   alignment: 文字の配置
+Column = namedtuple('Column', ['header', 'display', 'background', 'foreground', 'alignment'])
+Column.__new__.__defaults__ = (None, None, None)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """行（dict）のリストを表示する読み取り専用のモデル"""
+
+    def __init__(self, columns, background=None, foreground=None, parent=None):
+        """
+        Args:
+            columns: Column のリスト
+            background: 行 -> 行全体の背景色（QColor または None）
+            foreground: 行 -> 行全体の文字色（QColor または None）
+            parent: 親オブジェクト
+        """
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.background = background
+        self.foreground = foreground
+        self.rows = []
+
+    def set_rows(self, rows):
+        """表示する行を置き換える"""
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def record(self, row):
+        """行番号の行データ"""
+        return self.rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.DisplayRole:
+            return column.display(row)
+        if role == RECORD_ROLE:
+            return row
+        if role == Qt.BackgroundRole:
+            color = column.background(row) if column.background else None
+            if color is None and self.background:
+                color = self.background(row)
+            return color
+        if role == Qt.ForegroundRole:
+            color = column.foreground(row) if column.foreground else None
+            if color is None and self.foreground:
+                color = self.foreground(row)
+            return color
+        if role == Qt.TextAlignmentRole and column.alignment is not None:
+            return int(column.alignment)
+        return None
+
+
+class MaskFilterProxyModel(QSortFilterProxyModel):
+    """ビット集合（i ビット目 = 元モデルの i 行目）に含まれる行だけを表示するプロキシ"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mask = None  # None の場合はすべて表示
+
+    def set_mask(self, mask):
+        """表示する行のビット集合を設定（None ですべて表示）"""
+        if mask == self._mask:
+            return
+        self._mask = mask
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._mask is None or bool(self._mask >> source_row & 1)
+
+    def record(self, index):
+        """プロキシのインデックスの行データ"""
+        return index.data(RECORD_ROLE)
@@ -0,0 +1,120 @@
+"""一覧画面のインクリメンタル検索
+
+検索ボックスの入力をデバウンスし、search_cache.SearchResultCache を通して
+結果を取得・表示します。結果が前回表示したものと同じ場合は再描画しません。
+
+使用例:
+    self.search = SearchController(
+        self,
+        query=lambda: (self.search_edit.text(), ()),
+        fetch=lambda term, filters: self.db.get_casts(term),
+        display=self._display_casts,
+        narrow=like_filter(1, 2),
+        stamp=lambda: file_stamp(self.db.db_path),
+    )
+    self.search_edit.textChanged.connect(self.search.schedule)
+    # 変更通知で再読み込み（非表示の間は表示時まで遅延）
+    self.search.watch(['cast', 'partners'])
+"""
+from PyQt5.QtCore import QObject, QTimer
+
+from change_events import UPDATE
+from search_cache import DEFAULT_CACHE_SIZE, SearchResultCache
+from ui.change_listener import LazyRefresher
+
+# 最後の入力から検索を実行するまでの待ち時間（ミリ秒）
+DEFAULT_DEBOUNCE_MS = 250
+
+
+class SearchController(QObject):
+    """デバウンス・キャッシュ付きの検索コントローラー"""
+
+    def __init__(self, parent, query, fetch, display, narrow=None, stamp=None,
+                 debounce_ms=DEFAULT_DEBOUNCE_MS, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            parent: 親ウィジェット
+            query: 現在の (キーワード, その他の検索条件) を返す関数
+            fetch: fetch(キーワード, 検索条件) でDBから結果を取得する関数
+            display: display(結果) で結果を画面に表示する関数
+            narrow: narrow(結果, キーワード) で結果を絞り込む関数（Noneの場合は常にDBを検索）
+            stamp: データの状態を返す関数（値が変わるとキャッシュを破棄）
+            debounce_ms: 入力から検索までの待ち時間（ミリ秒）
+            cache_size: キャッシュする検索条件の数
+        """
+        super().__init__(parent)
+        self.query = query
+        self.fetch = fetch
+        self.display = display
+        self.narrow = narrow
+        self.cache = SearchResultCache(cache_size, stamp)
+        self.patch = None
+        self.refresher = None
+        self._displayed_key = None
+        self._force_display = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.refresh)
+
+        # 変更通知を反映した後の再表示（連続した通知は1回にまとめる）
+        self._redisplay_timer = QTimer(self)
+        self._redisplay_timer.setSingleShot(True)
+        self._redisplay_timer.setInterval(0)
+        self._redisplay_timer.timeout.connect(self.refresh)
+
+    def watch(self, tables, patch=None):
+        """変更通知を購読
+
+        表示中は patch でキャッシュ上の該当行だけを差し替えて再表示し、
+        非表示の間は次に表示されたときに再読み込みします。
+
+        Args:
+            tables: 監視するテーブル名
+            patch: patch(結果, event, term, filters) で反映後の結果を返す関数
+                   （反映できない場合はNoneを返す。Noneの場合は常に再読み込み）
+        """
+        self.patch = patch
+        self.refresher = LazyRefresher(self.parent(), tables, self.reload,
+                                       on_change=self._apply_change)
+
+    def schedule(self, *_):
+        """入力が止まってから検索を実行（textChanged 等に接続）"""
+        self._timer.start()
+
+    def refresh(self, *_):
+        """すぐに検索を実行（フィルター変更時等）"""
+        self._timer.stop()
+        term, filters = self.query()
+        result, source = self.cache.get(term, filters, self.fetch, self.narrow)
+
+        key = (filters, term)
+        if source == 'cache' and key == self._displayed_key and not self._force_display:
+            return
+        self._displayed_key = key
+        self._force_display = False
+        self.display(result)
+
+    def reload(self, *_):
+        """キャッシュを破棄してDBから再読み込み（データ更新後等）"""
+        self.invalidate()
+        self.refresh()
+
+    def _apply_change(self, event):
+        """表示中の変更通知をキャッシュに反映して再表示"""
+        if self.patch is None:
+            self.invalidate()
+        else:
+            # 更新の反映にはDB問い合わせが必要なため、表示中の条件のみ反映する
+            keys = [self._displayed_key] if event.kind == UPDATE else None
+            self.cache.apply_change(event, self.patch, keys)
+            # 反映済みの変更でキャッシュが破棄されないよう、DBの状態を記録し直す
+            self.cache.sync_stamp()
+            self._force_display = True
+        self._redisplay_timer.start()
+
+    def invalidate(self):
+        """キャッシュを破棄"""
+        self.cache.invalidate()
+        self._displayed_key = None